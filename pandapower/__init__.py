@@ -16,6 +16,7 @@ from pandapower.groups import *
 from pandapower.diagnostic import *
 from pandapower.runpm import *
 from pandapower.pf.runpp_3ph import runpp_3ph
+from pandapower.pf.runpp_batch import runpp_batch
 
 import geojson
 geojson.geometry.DEFAULT_PRECISION = 8
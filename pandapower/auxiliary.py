@@ -354,6 +354,34 @@ class pandapowerNet(ADict):
                 par + res + res_cost
         return "\n".join(lines)
 
+    def __getitem__(self, key):
+        # results deferred by the power flow options result_tables / result_columns are extracted when
+        # their result table is accessed for the first time
+        if "_pending_results" in self and key in dict.__getitem__(self, "_pending_results")["tables"]:
+            from pandapower.results import _extract_pending_results
+            _extract_pending_results(self, key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+
+def _set_pending_results(net, pending):
+    """
+    Stores the deferred results in net["_pending_results"]. They are extracted by
+    pandapowerNet.__getitem__() when their result table is accessed. Returns False if the results
+    cannot be deferred for this net.
+    """
+    if pending is not None:
+        if not isinstance(net, pandapowerNet):
+            return False
+        net["_pending_results"] = pending
+    elif "_pending_results" in net:
+        del net["_pending_results"]
+    return True
+
 
 @pd.api.extensions.register_series_accessor("geojson")
 class GeoAccessor:
@@ -1633,6 +1661,8 @@ def _init_runpp_options(net, algorithm, calculate_voltage_angles, init,
     # scipy spsolve options in NR power flow
     use_umfpack = kwargs.get("use_umfpack", True)
     permc_spec = kwargs.get("permc_spec", None)
+    linear_solver = kwargs.get("linear_solver", "spsolve")
+    result_tables, result_columns = _get_result_selection(**kwargs)
     lightsim2grid = kwargs.get("lightsim2grid", "auto")
 
     # for all the parameters from 'overrule_options' we need to collect them
@@ -1746,7 +1776,8 @@ def _init_runpp_options(net, algorithm, calculate_voltage_angles, init,
     _add_pf_options(net, tolerance_mva=tolerance_mva, trafo_loading=trafo_loading,
                     numba=numba, ac=ac, algorithm=algorithm, max_iteration=max_iteration,
                     v_debug=v_debug, only_v_results=only_v_results, use_umfpack=use_umfpack,
-                    permc_spec=permc_spec, lightsim2grid=lightsim2grid)
+                    permc_spec=permc_spec, linear_solver=linear_solver, lightsim2grid=lightsim2grid,
+                    result_tables=result_tables, result_columns=result_columns)
     net._options.update(overrule_options)
 
 
@@ -1759,6 +1790,23 @@ def _init_nx_options(net):
                      voltage_depend_loads=False, delta=0, trafo3w_losses="hv")
 
 
+def _get_result_selection(result_tables=None, result_columns=None, **kwargs):
+    """
+    checks the power flow options result_tables and result_columns
+    """
+    if isinstance(result_tables, str):
+        result_tables = [result_tables]
+    if result_tables is not None:
+        result_tables = list(result_tables)
+    if result_columns is not None:
+        if not isinstance(result_columns, dict):
+            raise ValueError("result_columns must be a dict of result tables and their columns, e.g. "
+                             "{'bus': ['vm_pu'], 'line': ['loading_percent']}")
+        result_columns = {table: [columns] if isinstance(columns, str) else list(columns)
+                          for table, columns in result_columns.items()}
+    return result_tables, result_columns
+
+
 def _init_rundcpp_options(net, trafo_model, trafo_loading, recycle, check_connectivity,
                           switch_rx_ratio, trafo3w_losses, **kwargs):
     ac = False
@@ -1775,6 +1823,7 @@ def _init_rundcpp_options(net, trafo_model, trafo_loading, recycle, check_connec
     max_iteration = None
     tolerance_mva = None
     only_v_results = kwargs.get("only_v_results", False)
+    result_tables, result_columns = _get_result_selection(**kwargs)
     net._options = {}
     _add_ppc_options(net, calculate_voltage_angles=calculate_voltage_angles,
                      trafo_model=trafo_model, check_connectivity=check_connectivity,
@@ -1783,7 +1832,8 @@ def _init_rundcpp_options(net, trafo_model, trafo_loading, recycle, check_connec
                      voltage_depend_loads=False, delta=0, trafo3w_losses=trafo3w_losses)
     _add_pf_options(net, tolerance_mva=tolerance_mva, trafo_loading=trafo_loading,
                     numba=numba, ac=ac, algorithm=algorithm, max_iteration=max_iteration,
-                    only_v_results=only_v_results)
+                    only_v_results=only_v_results, result_tables=result_tables,
+                    result_columns=result_columns)
 
 
 def _init_runopp_options(net, calculate_voltage_angles, check_connectivity, switch_rx_ratio, delta,
@@ -4,6 +4,10 @@
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
 
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 import warnings
@@ -37,11 +41,26 @@ try:
 except ImportError:
     KLU_solver_available = False
 
-from pandapower.run import runpp
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from pandapower.auxiliary import LoadflowNotConverged
+from pandapower.pd2ppc import _pd2ppc
+from pandapower.pypower.idx_brch import F_BUS, T_BUS, PF
+from pandapower.pypower.idx_bus import BASE_KV
+from pandapower.pypower.makeYbus import branch_vectors
+from pandapower.pypower.newtonpf import newtonpf
+from pandapower.pypower.makeLODF import makeLODF
+from pandapower.pypower.makePTDF import makePTDF
+from pandapower.run import runpp, rundcpp
+
+# elements whose outages are screened with the line outage distribution factors and whose loading is estimated
+SCREENED_ELEMENTS = ("line", "trafo")
 
 
 def run_contingency(net, nminus1_cases, pf_options=None, pf_options_nminus1=None, write_to_net=True,
-                    contingency_evaluation_function=runpp, **kwargs):
+                    contingency_evaluation_function=runpp, n_jobs=1, screening_margin=None, warm_start=False,
+                    **kwargs):
     """
     Obtain either loading (N-0) or max. loading (N-0 and all N-1 cases), and min/max bus voltage magnitude.
     The variable "temperature_degree_celsius" can be used in addition to "loading_percent" to obtain max. temperature.
@@ -71,6 +90,26 @@ def run_contingency(net, nminus1_cases, pf_options=None, pf_options_nminus1=None
         "cause_index": index of the element ("line", "trafo", "trafo3w") that causes max. loading of this element
     **contingency_evaluation_function** - func
         function to use for power flow calculation, default pp.runpp
+    **n_jobs** - int
+        number of processes for the N-1 cases (default 1: serial calculation, -1: number of CPUs). The N-1
+        cases are split into contiguous chunks that are calculated by a process pool. Every worker receives one
+        binary snapshot (pickle) of the net at its start and the partial min/max results of the chunks are merged
+        afterwards, so that the results are the same as for the serial calculation.
+        contingency_evaluation_function and kwargs have to be picklable (e.g. no lambda functions).
+    **screening_margin** - float
+        if given, the N-1 cases are screened with a DC power flow and line outage distribution factors first
+        (see screen_contingencies_dc()). Only the outages that lead to an estimated loading above the loading limit
+        minus screening_margin (in percent) are calculated with contingency_evaluation_function. The min/max
+        results only contain the calculated N-1 cases. The screening report is returned in
+        contingency_results["screening"].
+    **warm_start** - bool
+        if True, the N-1 cases of lines and trafos are calculated with newtonpf directly: the ppci and Ybus of the
+        base case are built once, each outage is applied as a rank-2 update of Ybus and the Newton-Raphson
+        iterations start from the voltages of the base case. The results are written directly to
+        contingency_results without the result tables of the net. Outages that split the grid and outages of other
+        elements are calculated with runpp. Only possible with contingency_evaluation_function=runpp and the
+        Newton-Raphson algorithm without enforce_q_lims, tdpf and FACTS devices, otherwise runpp is used for all
+        N-1 cases.
 
     OUTPUT
     -------
@@ -92,15 +131,7 @@ def run_contingency(net, nminus1_cases, pf_options=None, pf_options_nminus1=None
         pf_options_nminus1 = {key: val for key, val in pf_options_nminus1.items() if key not in
                               kwargs.keys()}
 
-    contingency_results = {element: {"index": net[element].index.values}
-                           for element in ("bus", "line", "trafo", "trafo3w") if len(net[element]) > 0}
-    for element in contingency_results.keys():
-        if element == "bus":
-            continue
-        contingency_results[element].update(
-            {"causes_overloading": np.zeros_like(net[element].index.values, dtype=bool),
-             "cause_element": np.empty_like(net[element].index.values, dtype=object),
-             "cause_index": np.empty_like(net[element].index.values, dtype=np.int64)})
+    contingency_results = _init_contingency_results(net)
     result_variables = {**{"bus": ["vm_pu"]},
                         **{key: ["loading_percent"] for key in ("line", "trafo", "trafo3w") if len(net[key]) > 0}}
     if len(net.line) > 0 and (net.get("_options", {}).get("tdpf", False) or
@@ -108,21 +139,26 @@ def run_contingency(net, nminus1_cases, pf_options=None, pf_options_nminus1=None
         result_variables["line"].append("temperature_degree_celsius")
 
     # for n-1
-    for element, val in nminus1_cases.items():
-        for i in val["index"]:
-            if not net[element].at[i, "in_service"]:
-                continue
-            net[element].at[i, 'in_service'] = False
-            try:
-                contingency_evaluation_function(net, **pf_options_nminus1, **kwargs)
-                _update_contingency_results(net, contingency_results, result_variables, nminus1=True,
-                                            cause_element=element, cause_index=i)
-            except Exception as err:
-                logger.error(f"{element} {i} causes {err}")
-                if raise_errors:
-                    raise err
-            finally:
-                net[element].at[i, 'in_service'] = True
+    cases = [(element, i) for element, val in nminus1_cases.items() for i in val["index"]]
+    if screening_margin is not None:
+        screening = screen_contingencies_dc(net, nminus1_cases, screening_margin)
+        contingency_results["screening"] = screening
+        critical = set(zip(screening.element.values[screening.critical.values],
+                           screening.element_index.values[screening.critical.values]))
+        cases = [case for case in cases if case in critical]
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if warm_start and contingency_evaluation_function is not runpp:
+        logger.warning("warm_start is only possible with contingency_evaluation_function=runpp")
+        warm_start = False
+    if n_jobs > 1 and len(cases) > 1:
+        _run_nminus1_cases_parallel(net, cases, contingency_results, result_variables, n_jobs,
+                                    contingency_evaluation_function, pf_options_nminus1, raise_errors, kwargs,
+                                    warm_start)
+    else:
+        warm_start_base = _init_warm_start(net, pf_options_nminus1, kwargs) if warm_start and len(cases) else None
+        _run_nminus1_cases(net, cases, contingency_results, result_variables, contingency_evaluation_function,
+                           pf_options_nminus1, raise_errors, kwargs, warm_start_base)
 
     # for n-0
     contingency_evaluation_function(net, **pf_options, **kwargs)
@@ -130,6 +166,8 @@ def run_contingency(net, nminus1_cases, pf_options=None, pf_options_nminus1=None
 
     if write_to_net:
         for element, element_results in contingency_results.items():
+            if element == "screening":
+                continue
             index = element_results["index"]
             for var, val in element_results.items():
                 if var == "index" or var in net[f"res_{element}"].columns.values:
@@ -139,6 +177,368 @@ def run_contingency(net, nminus1_cases, pf_options=None, pf_options_nminus1=None
     return contingency_results
 
 
+def screen_contingencies_dc(net, nminus1_cases, screening_margin=20.):
+    """
+    DC screening of N-1 cases with line outage distribution factors (LODF). The active power flows after the
+    outage of a line or trafo are estimated from the flows of one DC power flow, and the loading of the lines and
+    trafos is estimated from these flows (at 1 p.u. voltage, without reactive power). An outage is critical if the
+    estimated loading of any line or trafo exceeds its loading limit minus screening_margin. The loading limit is
+    "max_loading_percent_nminus1" or "max_loading_percent" (100 % if not available).
+    Outages of other elements and outages that split the grid cannot be estimated and are always critical.
+    Bus voltages are not screened.
+
+    The DC power flow overwrites the results of the net.
+
+    INPUT
+    ----------
+    **net** - pandapowerNet
+
+    **nminus1_cases** - dict
+        describes all N-1 cases, e.g. {"line": {"index": [1, 2, 3]}, "trafo": {"index": [0]}}
+
+    **screening_margin** - float
+        margin in percent between the estimated loading and the loading limit. Outages that lead to an estimated
+        loading above limit - screening_margin are critical. Use a margin that covers the reactive power flows and
+        the deviations of the voltages from 1 p.u.
+
+    OUTPUT
+    -------
+    **screening** - DataFrame
+        one row per N-1 case with the columns "element", "element_index", "critical" (the case has to be
+        calculated), "estimated_max_loading_percent", "limiting_element" and "limiting_index" (the line or trafo
+        with the smallest reserve to its loading limit) and "reason"
+    """
+    cases = [(element, i) for element, val in nminus1_cases.items() for i in val["index"]]
+    screening = pd.DataFrame({"element": pd.Series([c[0] for c in cases], dtype=object),
+                              "element_index": np.array([c[1] for c in cases], dtype=np.int64),
+                              "critical": np.ones(len(cases), dtype=bool),
+                              "estimated_max_loading_percent": np.full(len(cases), np.nan),
+                              "limiting_element": pd.Series([None] * len(cases), dtype=object),
+                              "limiting_index": np.full(len(cases), -1, dtype=np.int64),
+                              "reason": pd.Series(["no DC estimate for the outage of this element"] * len(cases),
+                                                  dtype=object)})
+    if not len(cases):
+        return screening
+
+    rundcpp(net)
+    ppc_flows = np.real(net._ppc["branch"][:, PF])
+    _, ppci = _pd2ppc(net)
+    branch_is = ppci["internal"]["branch_is"]
+    ppc_to_ppci = np.full(len(branch_is), -1, dtype=np.int64)
+    ppc_to_ppci[branch_is] = np.arange(np.sum(branch_is))
+    flows = ppc_flows[branch_is]
+
+    # ratings and loading limits of the monitored branches in the order of ppc["branch"]
+    rating_mw = np.full(len(branch_is), np.nan)
+    limit = np.full(len(branch_is), np.nan)
+    ppc_element = np.empty(len(branch_is), dtype=object)
+    ppc_index = np.full(len(branch_is), -1, dtype=np.int64)
+    lookup = net._pd2ppc_lookups["branch"]
+    for element in SCREENED_ELEMENTS:
+        if element not in lookup:
+            continue
+        f, t = lookup[element]
+        df = net[element]
+        if element == "line":
+            vn_kv = net.bus.loc[df.from_bus.values, "vn_kv"].values
+            rating_mw[f:t] = df.max_i_ka.values * df.df.values * df.parallel.values * vn_kv * np.sqrt(3)
+        else:
+            rating_mw[f:t] = df.sn_mva.values * df.parallel.values
+        limit_column = "max_loading_percent_nminus1" if "max_loading_percent_nminus1" in df.columns else \
+            "max_loading_percent"
+        limit[f:t] = df[limit_column].fillna(100.).values if limit_column in df.columns else 100.
+        ppc_element[f:t] = element
+        ppc_index[f:t] = df.index.values
+    rating_mw, limit = rating_mw[branch_is], limit[branch_is]
+    ppci_element, ppci_index = ppc_element[branch_is], ppc_index[branch_is]
+    monitored = np.flatnonzero(~np.isnan(rating_mw) & (rating_mw > 0))
+
+    # ppci branch of every screened N-1 case
+    case_branch = np.full(len(cases), -1, dtype=np.int64)
+    for element in SCREENED_ELEMENTS:
+        is_element = (screening.element == element).values
+        if element not in lookup or not np.any(is_element):
+            continue
+        rows = np.flatnonzero(is_element)
+        position = net[element].index.get_indexer(screening.element_index.values[rows])
+        in_service = np.zeros(len(rows), dtype=bool)
+        in_service[position >= 0] = net[element].in_service.values[position[position >= 0]]
+        case_branch[rows[in_service]] = ppc_to_ppci[lookup[element][0] + position[in_service]]
+        screening.loc[rows[~in_service], "critical"] = False
+        screening.loc[rows[~in_service], "reason"] = "element is out of service"
+        screening.loc[rows[in_service & (case_branch[rows] < 0)], "reason"] = "element is not connected to the grid"
+    estimated = np.flatnonzero(case_branch >= 0)
+    if not len(estimated) or not len(monitored):
+        return screening
+
+    ptdf = makePTDF(ppci["baseMVA"], ppci["bus"], ppci["branch"], using_sparse_solver=True)
+    lodf = makeLODF(ppci["branch"], ptdf)
+    outage_branches = case_branch[estimated]
+    splits_grid = ~np.all(np.isfinite(lodf[:, outage_branches]), axis=0)
+    screening.loc[estimated[splits_grid], "reason"] = "outage splits the grid"
+    estimated, outage_branches = estimated[~splits_grid], outage_branches[~splits_grid]
+
+    # flows after the outages: one column per outage
+    outage_flows = flows[monitored, None] + lodf[np.ix_(monitored, outage_branches)] * flows[outage_branches]
+    loading = np.abs(outage_flows) / rating_mw[monitored, None] * 100.
+    loading[monitored[:, None] == outage_branches[None, :]] = 0.
+    reserve = limit[monitored, None] - loading
+    limiting = monitored[np.argmin(reserve, axis=0)]
+    critical = np.min(reserve, axis=0) < screening_margin
+    screening.loc[estimated, "estimated_max_loading_percent"] = np.max(loading, axis=0)
+    screening.loc[estimated, "limiting_element"] = ppci_element[limiting]
+    screening.loc[estimated, "limiting_index"] = ppci_index[limiting]
+    screening.loc[estimated, "critical"] = critical
+    screening.loc[estimated, "reason"] = np.where(
+        critical, "estimated loading above the limit minus the screening margin",
+        "estimated loading below the limit minus the screening margin")
+    return screening
+
+
+def _init_contingency_results(net):
+    contingency_results = {element: {"index": net[element].index.values}
+                           for element in ("bus", "line", "trafo", "trafo3w") if len(net[element]) > 0}
+    for element in contingency_results.keys():
+        if element == "bus":
+            continue
+        contingency_results[element].update(
+            {"causes_overloading": np.zeros_like(net[element].index.values, dtype=bool),
+             "cause_element": np.empty_like(net[element].index.values, dtype=object),
+             "cause_index": np.empty_like(net[element].index.values, dtype=np.int64)})
+    return contingency_results
+
+
+def _run_nminus1_cases(net, cases, contingency_results, result_variables, contingency_evaluation_function,
+                       pf_options_nminus1, raise_errors, kwargs, warm_start_base=None):
+    for element, i in cases:
+        if not net[element].at[i, "in_service"]:
+            continue
+        net[element].at[i, 'in_service'] = False
+        try:
+            result_values = None if warm_start_base is None else \
+                _run_warm_start_case(net, warm_start_base, element, i)
+            if result_values is None:
+                contingency_evaluation_function(net, **pf_options_nminus1, **kwargs)
+            _update_contingency_results(net, contingency_results, result_variables, nminus1=True,
+                                        cause_element=element, cause_index=i, result_values=result_values)
+        except Exception as err:
+            logger.error(f"{element} {i} causes {err}")
+            if raise_errors:
+                raise err
+        finally:
+            net[element].at[i, 'in_service'] = True
+
+
+# the copy of the net in a worker process of the parallel contingency analysis
+_worker_net = None
+
+
+def _init_contingency_worker(net_snapshot):
+    global _worker_net
+    _worker_net = pickle.loads(net_snapshot)
+
+
+def _run_nminus1_chunk(cases, result_variables, contingency_evaluation_function, pf_options_nminus1,
+                       raise_errors, kwargs, warm_start=False):
+    contingency_results = _init_contingency_results(_worker_net)
+    warm_start_base = _init_warm_start(_worker_net, pf_options_nminus1, kwargs) if warm_start else None
+    _run_nminus1_cases(_worker_net, cases, contingency_results, result_variables, contingency_evaluation_function,
+                       pf_options_nminus1, raise_errors, kwargs, warm_start_base)
+    return contingency_results
+
+
+def _run_nminus1_cases_parallel(net, cases, contingency_results, result_variables, n_jobs,
+                                contingency_evaluation_function, pf_options_nminus1, raise_errors, kwargs,
+                                warm_start=False):
+    """
+    Calculates the N-1 cases in a process pool. The cases are split into contiguous chunks (more chunks than
+    workers for a better load balance), which are merged in their original order.
+    """
+    n_chunks = min(len(cases), 4 * n_jobs)
+    chunks = [list(chunk) for chunk in np.array_split(np.arange(len(cases)), n_chunks)]
+    net_snapshot = pickle.dumps(net, protocol=pickle.HIGHEST_PROTOCOL)
+    with ProcessPoolExecutor(max_workers=min(n_jobs, n_chunks), initializer=_init_contingency_worker,
+                             initargs=(net_snapshot,)) as executor:
+        futures = [executor.submit(_run_nminus1_chunk, [cases[i] for i in chunk], result_variables,
+                                   contingency_evaluation_function, pf_options_nminus1, raise_errors, kwargs,
+                                   warm_start)
+                   for chunk in chunks]
+        for future in futures:
+            _merge_contingency_results(contingency_results, future.result(), result_variables)
+
+
+def _init_warm_start(net, pf_options_nminus1, kwargs):
+    """
+    Runs the power flow of the base case and stores everything that is needed to calculate the outages of lines and
+    trafos with newtonpf: ppci, admittance matrices, voltages and the lookups for the results. Returns None if the
+    power flow options or the net do not allow the warm start.
+    """
+    try:
+        runpp(net, **pf_options_nminus1, **kwargs)
+    except Exception as err:
+        logger.warning(f"warm start is not used because the base case power flow failed: {err}")
+        return None
+    options = net._options
+    internal = net._ppc["internal"]
+    if options["algorithm"] not in ("nr", "iwamoto_nr") or options["enforce_q_lims"] or options["tdpf"] or \
+            options.get("lightsim2grid", False) or "Ybus_without_facts" not in internal or \
+            any(len(internal[facts]) for facts in ("svc", "tcsc", "ssc", "vsc")):
+        logger.info("warm start is not possible with the power flow options or FACTS devices, runpp is used "
+                    "for all N-1 cases")
+        return None
+
+    V, Ybus, Yf, Yt, Sbus = internal["V"], internal["Ybus_without_facts"], internal["Yf"], internal["Yt"], \
+        internal["Sbus"]
+    ref, pv, pq = internal["ref"], internal["pv"], internal["pq"]
+    ppc, ppci = _pd2ppc(net)
+    if len(ppci["bus_dc"]) or len(ppci["branch_dc"]):
+        logger.info("warm start is not possible with DC buses, runpp is used for all N-1 cases")
+        return None
+    Ybus = Ybus.tocsr(copy=True)
+    Ybus.sort_indices()
+    nb, nl = Ybus.shape[0], ppci["branch"].shape[0]
+    f_bus = np.real(ppci["branch"][:, F_BUS]).astype(np.int64)
+    t_bus = np.real(ppci["branch"][:, T_BUS]).astype(np.int64)
+    Ytt, Yff, Yft, Ytf = branch_vectors(ppci["branch"], nl)
+    branch_is = ppci["internal"]["branch_is"]
+    ppc_to_ppci = np.full(len(branch_is), -1, dtype=np.int64)
+    ppc_to_ppci[branch_is] = np.arange(nl)
+    bus_lookup = net._pd2ppc_lookups["bus"]
+    return {"ppci": ppci, "options": options, "V": V, "Ybus": Ybus, "Yf": Yf.tocsr(), "Yt": Yt.tocsr(),
+            "Sbus": Sbus, "ref": ref, "pv": pv, "pq": pq, "f_bus": f_bus, "t_bus": t_bus,
+            "Y_branch": np.vstack([Yff, Yft, Ytf, Ytt]).T, "ppc_to_ppci": ppc_to_ppci, "branch_is": branch_is,
+            "n_components": connected_components(csr_matrix((np.ones(nl), (f_bus, t_bus)), shape=(nb, nb)),
+                                                 directed=False)[0],
+            "bus_idx": bus_lookup[net.bus.index.values],
+            "ppc_f_bus": np.real(ppc["branch"][:, F_BUS]).astype(np.int64),
+            "ppc_t_bus": np.real(ppc["branch"][:, T_BUS]).astype(np.int64),
+            "ppc_base_kv": ppc["bus"][:, BASE_KV].copy(), "branch_lookup": net._pd2ppc_lookups["branch"]}
+
+
+def _splits_grid(base, k):
+    f, t = base["f_bus"][k], base["t_bus"][k]
+    parallel = np.flatnonzero(((base["f_bus"] == f) & (base["t_bus"] == t)) |
+                              ((base["f_bus"] == t) & (base["t_bus"] == f)))
+    if len(parallel) > 1:
+        return False
+    keep = np.ones(len(base["f_bus"]), dtype=bool)
+    keep[k] = False
+    nb = base["Ybus"].shape[0]
+    graph = csr_matrix((np.ones(np.sum(keep)), (base["f_bus"][keep], base["t_bus"][keep])), shape=(nb, nb))
+    return connected_components(graph, directed=False)[0] > base["n_components"]
+
+
+def _run_warm_start_case(net, base, element, index):
+    """
+    Calculates the outage of a line or trafo with newtonpf, starting from the voltages of the base case. The
+    branch is removed from Ybus by subtracting its 2x2 admittance matrix (the sparsity pattern is kept).
+
+    OUTPUT:
+        **result_values** (dict) - results for _update_contingency_results(), None if the outage cannot be
+        calculated with the warm start (other elements, outages that split the grid)
+    """
+    if element not in ("line", "trafo") or element not in base["branch_lookup"]:
+        return None
+    position = net[element].index.get_loc(index)
+    k = base["ppc_to_ppci"][base["branch_lookup"][element][0] + position]
+    if k < 0 or _splits_grid(base, k):
+        return None
+
+    Ybus = base["Ybus"].copy()
+    f, t = base["f_bus"][k], base["t_bus"][k]
+    for n, (row, col) in enumerate(((f, f), (f, t), (t, f), (t, t))):
+        start, end = Ybus.indptr[row], Ybus.indptr[row + 1]
+        Ybus.data[start + np.searchsorted(Ybus.indices[start:end], col)] -= base["Y_branch"][k, n]
+
+    V, success, iterations, *_ = newtonpf(Ybus, base["Sbus"], base["V"], base["ref"], base["pv"], base["pq"],
+                                          base["ppci"], base["options"])
+    if not success:
+        raise LoadflowNotConverged("Power Flow nr did not converge after %d iterations!" % iterations)
+    return _warm_start_results(net, base, V, k)
+
+
+def _warm_start_results(net, base, V, k):
+    # branch flows like in pfsoln and _get_branch_flows, in the order of ppc["branch"]
+    baseMVA = base["ppci"]["baseMVA"]
+    i_f, i_t = base["Yf"] * V, base["Yt"] * V
+    i_f[k] = i_t[k] = 0.
+    s_ft = np.zeros((len(base["branch_is"]), 2))
+    s_ft[base["branch_is"], 0] = np.abs(V[base["f_bus"]] * np.conj(i_f)) * baseMVA
+    s_ft[base["branch_is"], 1] = np.abs(V[base["t_bus"]] * np.conj(i_t)) * baseMVA
+    vm_ppc = np.full(len(base["ppc_base_kv"]), np.nan)
+    vm_ppc[:len(V)] = np.abs(V)
+    vm_ft = np.vstack([vm_ppc[base["ppc_f_bus"]] * base["ppc_base_kv"][base["ppc_f_bus"]],
+                       vm_ppc[base["ppc_t_bus"]] * base["ppc_base_kv"][base["ppc_t_bus"]]]).T
+    i_ft = s_ft / vm_ft / np.sqrt(3)
+
+    result_values = {"bus": {"vm_pu": vm_ppc[base["bus_idx"]]}}
+    lookup = base["branch_lookup"]
+    trafo_loading = base["options"]["trafo_loading"]
+    if "line" in lookup:
+        f, t = lookup["line"]
+        line = net.line
+        i_max = line.max_i_ka.values * line.df.values * line.parallel.values
+        with np.errstate(invalid='ignore'):
+            i_ka = np.max(i_ft[f:t], axis=1)
+        loading = np.full_like(i_ka, fill_value=np.inf, dtype=np.float64)
+        np.divide(i_ka, i_max, where=i_max != 0, out=loading, dtype=np.float64)
+        result_values["line"] = {"loading_percent": loading * 100}
+    if "trafo" in lookup:
+        f, t = lookup["trafo"]
+        trafo = net.trafo
+        if trafo_loading == "current":
+            vns = np.vstack([trafo.vn_hv_kv.values, trafo.vn_lv_kv.values]).T
+            lds = i_ft[f:t] * vns * np.sqrt(3) / trafo.sn_mva.values[:, np.newaxis] * 100.
+        else:
+            lds = s_ft[f:t] / trafo.sn_mva.values[:, np.newaxis] * 100.
+        with np.errstate(invalid='ignore'):
+            ld_trafo = np.max(lds, axis=1)
+        result_values["trafo"] = {"loading_percent": ld_trafo / trafo.parallel.values / trafo.df.values}
+    if "trafo3w" in lookup:
+        f, t = lookup["trafo3w"]
+        hv, mv = int(f + (t - f) / 3), int(f + 2 * (t - f) / 3)
+        t3 = net.trafo3w
+        if trafo_loading == "current":
+            lds = [i_ft[f:hv, 0] * t3.vn_hv_kv.values * np.sqrt(3) / t3.sn_hv_mva.values * 100,
+                   i_ft[hv:mv, 1] * t3.vn_mv_kv.values * np.sqrt(3) / t3.sn_mv_mva.values * 100,
+                   i_ft[mv:t, 1] * t3.vn_lv_kv.values * np.sqrt(3) / t3.sn_lv_mva.values * 100]
+        else:
+            lds = [s_ft[f:hv, 0] / t3.sn_hv_mva.values * 100., s_ft[hv:mv, 1] / t3.sn_mv_mva.values * 100.,
+                   s_ft[mv:t, 1] / t3.sn_lv_mva.values * 100.]
+        with np.errstate(invalid='ignore'):
+            result_values["trafo3w"] = {"loading_percent": np.max(np.vstack(lds), axis=0)}
+    return result_values
+
+
+def _merge_contingency_results(contingency_results, chunk_results, result_variables):
+    """
+    Merges the min/max results of a chunk of N-1 cases into contingency_results. The chunks must be merged in the
+    order of the N-1 cases: as in the serial calculation, the cause of the max. loading is only replaced if the
+    loading of a later case is strictly higher.
+    """
+    for element, vars in result_variables.items():
+        results, chunk = contingency_results[element], chunk_results[element]
+        if "causes_overloading" in results:
+            results["causes_overloading"] |= chunk["causes_overloading"]
+        for var in vars:
+            max_key, min_key = f"max_{var}", f"min_{var}"
+            if max_key not in chunk:
+                continue  # all cases of the chunk failed
+            if max_key not in results:
+                results[max_key], results[min_key] = chunk[max_key].copy(), chunk[min_key].copy()
+                if var == "loading_percent":
+                    results["cause_index"][:] = chunk["cause_index"]
+                    results["cause_element"][:] = chunk["cause_element"]
+                continue
+            if var == "loading_percent":
+                replace = (chunk[max_key] > results[max_key]) | (np.isnan(results[max_key]) &
+                                                                 ~np.isnan(chunk[max_key]))
+                results["cause_index"][replace] = chunk["cause_index"][replace]
+                results["cause_element"][replace] = chunk["cause_element"][replace]
+            results[max_key] = np.fmax(results[max_key], chunk[max_key])
+            results[min_key] = np.fmin(results[min_key], chunk[min_key])
+
+
 def run_contingency_ls2g(net, nminus1_cases, contingency_evaluation_function=runpp, **kwargs):
     """
     Execute contingency analysis using the lightsim2grid library. This works much faster than using
@@ -358,10 +758,10 @@ def _convert_trafo_phase_shifter(net, trafotable="trafo", tap_param="tap_changer
 
 
 def _update_contingency_results(net, contingency_results, result_variables, nminus1, cause_element=None,
-                                cause_index=None):
+                                cause_index=None, result_values=None):
     for element, vars in result_variables.items():
         for var in vars:
-            val = net[f"res_{element}"][var].values
+            val = net[f"res_{element}"][var].values if result_values is None else result_values[element][var]
             if nminus1:
                 if var == "loading_percent":
                     s = 'max_loading_percent_nminus1' \
@@ -373,7 +773,10 @@ def _update_contingency_results(net, contingency_results, result_variables, nmin
                     if np.any(cause_mask):
                         contingency_results[cause_element]["causes_overloading"][
                             contingency_results[cause_element]["index"] == cause_index] = True
-                    max_mask = val > contingency_results[element].get("max_loading_percent", np.full_like(val, -1))
+                    current_max = contingency_results[element].get("max_loading_percent", np.full_like(val, np.nan))
+                    # elements that are out of service or had no valid result yet have NaN as max. loading
+                    max_mask = net[element]["in_service"].values & ((val > current_max) |
+                                                                    (np.isnan(current_max) & ~np.isnan(val)))
                     if np.any(max_mask):
                         contingency_results[element]["cause_index"][max_mask] = cause_index
                         contingency_results[element]["cause_element"][max_mask] = cause_element
@@ -384,7 +787,8 @@ def _update_contingency_results(net, contingency_results, result_variables, nmin
                          out=contingency_results[element][key],
                          where=net[element]["in_service"].values & ~np.isnan(val))
             else:
-                contingency_results[element][var] = val
+                # copy because the result tables can be updated in place by following power flows
+                contingency_results[element][var] = val.copy()
 
 
 def get_element_limits(net):
@@ -140,6 +140,39 @@ class BasicCtrl(JSONSerializableClass):
         """
         pass
 
+    def is_chunkable(self, container):
+        """
+        .. note:: This method is ONLY being called during time-series simulation with n_jobs > 1!
+
+        Returns True if the time steps can be split into chunks that are calculated independently
+        of each other, starting from the initial state of the container. This is not the case if
+        the controller carries a state from one time step to the next, e.g. tap positions that are
+        kept in the net. Controllers without such a state should return True.
+        """
+        return False
+
+    def get_controlled_variables(self, container):
+        """
+        .. note:: This method is ONLY being called during time-series simulation with skip_unchanged_steps!
+
+        Returns a list of (element, element_index, variable, read_write_flag) tuples of all values that
+        the controller writes to the container. The power flow of a time step is skipped if these values
+        of all controllers did not change since the last calculated time step. Controllers which depend on
+        further inputs, e.g. setpoints from a data source which are not written to the container, return
+        None.
+        """
+        return None
+
+    def get_input_variables(self, container):
+        """
+        Returns a list of (element, element_index, variable, read_write_flag) tuples of all values of the
+        container that is_converged() and control_step() depend on, e.g. results of the power flow. Together
+        with get_controlled_variables(), run_control uses them to check only the controllers whose inputs
+        changed and to skip power flows if no controlled value changed. The list is requested after
+        initialize_control(). Controllers which depend on further inputs return None.
+        """
+        return None
+
     def set_active(self, container, in_service):
         """
         Sets the controller in or out of service
@@ -225,6 +258,15 @@ class Controller(BasicCtrl):
     def finalize_step(self, net, time):
         super().finalize_step(net, time)
 
+    def is_chunkable(self, net):
+        return super().is_chunkable(net)
+
+    def get_controlled_variables(self, net):
+        return super().get_controlled_variables(net)
+
+    def get_input_variables(self, net):
+        return super().get_input_variables(net)
+
     def set_active(self, net, in_service):
         super().set_active(net, in_service)
 
@@ -179,6 +179,17 @@ class DERController(PQController):
 
     def _determine_target_powers(self, net):
         vm_pu = net.res_bus.loc[self.bus, "vm_pu"].set_axis(self.element_index)
+        target_p_mw, target_q_mvar = self._target_powers(vm_pu)
+
+        # --- Apply target p and q considering the damping factor coefficient ----------------------
+        self.target_p_mw = self.p_mw + (target_p_mw - self.p_mw) / self.damping_coef
+        self.target_q_mvar = self.q_mvar + (target_q_mvar - self.q_mvar) / self.damping_coef
+
+    def _target_powers(self, vm_pu):
+        """
+        Returns the powers in MW and Mvar which the DER should provide at the voltages vm_pu,
+        without the damping factor coefficient
+        """
         p_series_mw = getattr(self, "p_series_mw", getattr(self, "p_mw", self.sn_mva))
         q_series_mvar = getattr(self, "q_series_mw", self.q_mvar)
 
@@ -197,11 +208,7 @@ class DERController(PQController):
             p_pu, q_pu = self._saturate(p_pu, q_pu, vm_pu)
 
         # --- Third Step: Convert relative P, Q to p_mw, q_mvar
-        target_p_mw, target_q_mvar = p_pu * self.sn_mva, q_pu * self.sn_mva
-
-        # --- Apply target p and q considering the damping factor coefficient ----------------------
-        self.target_p_mw = self.p_mw + (target_p_mw - self.p_mw) / self.damping_coef
-        self.target_q_mvar = self.q_mvar + (target_q_mvar - self.q_mvar) / self.damping_coef
+        return p_pu * self.sn_mva, q_pu * self.sn_mva
 
     def _step_p(self, p_series_mw=None):
         return p_series_mw / self.sn_mva
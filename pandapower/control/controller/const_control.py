@@ -88,14 +88,15 @@ class ConstControl(Controller):
         self.set_recycle(net)
 
     def set_recycle(self, net):
-        allowed_elements = ["load", "sgen", "storage", "gen", "ext_grid", "trafo", "trafo3w", "line"]
+        allowed_elements = ["load", "sgen", "storage", "gen", "ext_grid", "trafo", "trafo3w", "line", "svc", "tcsc",
+                            "ssc", "vsc"]
         if net.controller.at[self.index, 'recycle'] is False or self.element not in allowed_elements:
             # if recycle is set to False by the user when creating the controller it is deactivated
             # or when const control controls an element which is not able to be recycled
             net.controller.at[self.index, 'recycle'] = False
             return
         # these variables determine what is re-calculated during a time series run
-        recycle = dict(trafo=False, gen=False, bus_pq=False)
+        recycle = dict(trafo=False, gen=False, bus_pq=False, facts=False)
         if self.element in ["sgen", "load", "storage"] and self.variable in ["p_mw", "q_mvar",
                                                                              "scaling"]:
             recycle["bus_pq"] = True
@@ -104,6 +105,8 @@ class ConstControl(Controller):
             recycle["gen"] = True
         if self.element in ["trafo", "trafo3w", "line"]:
             recycle["trafo"] = True
+        if self.element in ["svc", "tcsc", "ssc", "vsc"]:
+            recycle["facts"] = True
         # recycle is either the dict what should be recycled
         # or False if the element + variable combination is not supported
         net.controller.at[self.index, 'recycle'] = recycle if any(list(recycle.values())) else False
@@ -140,5 +143,24 @@ class ConstControl(Controller):
         """
         self.applied = True
 
+    def is_chunkable(self, net):
+        """
+        The values are read from the data source in every time step (or reset to the initial values),
+        there is no state between the time steps.
+        """
+        return True
+
+    def get_controlled_variables(self, net):
+        """
+        The values of the data source are the only values written to the net.
+        """
+        return [(self.element, self.element_index, self.variable, self.write_flag)]
+
+    def get_input_variables(self, net):
+        """
+        The controller is converged after the values were applied in one power flow, it does not read the net.
+        """
+        return list()
+
     def __str__(self):
         return super().__str__() + " [%s.%s]" % (self.element, self.variable)
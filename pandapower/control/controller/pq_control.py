@@ -216,6 +216,22 @@ class PQController(ConstControl):
         self.p_mw = net[self.element].loc[self.element_index, "p_mw"]
         self.q_mvar = net[self.element].loc[self.element_index, "q_mvar"]
 
+    def get_controlled_variables(self, net):
+        """
+        The powers depend on the profiles and the limits of the controller, which are not kept in the net.
+        """
+        return None
+
+    def get_input_variables(self, net):
+        return None
+
+    def is_chunkable(self, net):
+        """
+        The powers are limited by the controller and damped with the powers of the previous time step
+        (e.g. by the DERController), so the time steps cannot be calculated independently.
+        """
+        return False
+
     def __str__(self):
         if len(self.element_index) > 6:
             return f"PQController(len(element_index)={len(self.element_index)}"
@@ -89,6 +89,11 @@ class ContinuousTapControl(TrafoController):
             net[self.element].tap_pos = net[self.element].tap_pos.astype(float)
         write_to_net(net, self.element, self.element_index, "tap_pos", self.tap_pos, self._read_write_flag)
 
+    def get_input_variables(self, net):
+        # the voltages at the controlled buses and the tap positions
+        return [("res_bus", self.trafobus, "vm_pu", self._read_write_flag),
+                (self.element, self.element_index, "tap_pos", self._read_write_flag)]
+
     def is_converged(self, net):
         """
         The ContinuousTapControl is converged, when the difference of the voltage between control steps is smaller
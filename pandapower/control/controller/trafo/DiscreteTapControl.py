@@ -129,6 +129,11 @@ class DiscreteTapControl(TrafoController):
         write_to_net(net, self.element, self.element_index, 'tap_pos',
                      self.tap_pos, self._read_write_flag)
 
+    def get_input_variables(self, net):
+        # the voltages at the controlled buses and the tap positions
+        return [("res_bus", self.trafobus, "vm_pu", self._read_write_flag),
+                (self.element, self.element_index, "tap_pos", self._read_write_flag)]
+
     def is_converged(self, net):
         """
         Checks if the voltage is within the desired voltage band, then returns True
@@ -182,6 +182,10 @@ class TrafoController(Controller):
         recycle = dict(trafo=True, gen=False, bus_pq=False)
         net.controller.at[self.index, 'recycle'] = recycle
 
+    def get_controlled_variables(self, net):
+        # the tap positions are the only values written to the net
+        return [(self.element, self.element_index, "tap_pos", self._read_write_flag)]
+
     # def timestep(self, net):
     #     self.tap_pos = net[self.element].at[self.element_index, "tap_pos"]
 
@@ -14,6 +14,8 @@ from pandapower.auxiliary import NetCalculationNotConverged, ControllerNotConver
 from pandapower.powerflow import LoadflowNotConverged
 from pandapower.optimal_powerflow import OPFNotConverged
 from pandapower.control.util.auxiliary import asarray
+from pandapower.control.util.controller_graph import get_controller_graph
+from pandapower.control.util.sensitivity import sensitivity_control_step, supports_sensitivity_control
 
 logger = pplog.getLogger(__name__)
 
@@ -92,6 +94,8 @@ def ctrl_variables_default(net, **kwargs):
     ctrl_variables["initial_run"] = check_for_initial_run(ctrl_variables["controller_order"])
     ctrl_variables['continue_on_divergence'] = False
     ctrl_variables['check_each_level'] = True
+    ctrl_variables['incremental_control'] = True
+    ctrl_variables['sensitivity_control'] = False
     ctrl_variables["errors"] = (LoadflowNotConverged, OPFNotConverged, NetCalculationNotConverged)
     return ctrl_variables
 
@@ -119,6 +123,12 @@ def prepare_run_ctrl(net, ctrl_variables, **kwargs):
     if ('check_each_level') in kwargs and (ctrl_var is None or 'check_each_level' not in ctrl_var.keys()):
         check = kwargs.pop('check_each_level')
         ctrl_variables['check_each_level'] = check
+    if ('incremental_control') in kwargs and (ctrl_var is None or 'incremental_control' not in ctrl_var.keys()):
+        incremental = kwargs.pop('incremental_control')
+        ctrl_variables['incremental_control'] = incremental
+    if ('sensitivity_control') in kwargs and (ctrl_var is None or 'sensitivity_control' not in ctrl_var.keys()):
+        sensitivity = kwargs.pop('sensitivity_control')
+        ctrl_variables['sensitivity_control'] = sensitivity
 
     return ctrl_variables
 
@@ -190,6 +200,12 @@ def _evaluate_net(net, levelorder, ctrl_variables, **kwargs):
 
 def control_implementation(net, controller_order, ctrl_variables, max_iter,
                            evaluate_net_fct=_evaluate_net, **kwargs):
+    graph = ctrl_variables.get("controller_graph", None)
+    sensitivity = ctrl_variables.get("sensitivity_control", False)
+    if graph is not None:
+        _control_implementation_incremental(net, controller_order, ctrl_variables, max_iter, evaluate_net_fct,
+                                            graph, **kwargs)
+        return
 
     run_count=0
     # run each controller step in given controller order
@@ -201,7 +217,7 @@ def control_implementation(net, controller_order, ctrl_variables, max_iter,
         converged = ctrl_variables['converged']
         run_count = 0
         while not ctrl_converged and run_count <= max_iter and converged:
-            ctrl_converged = _control_step(levelorder, run_count)
+            ctrl_converged = _control_step(levelorder, run_count, sensitivity)
             # call to run function (usually runpp) after each controller was called
             # this function is called at least once per level
             if not ctrl_converged:
@@ -213,24 +229,84 @@ def control_implementation(net, controller_order, ctrl_variables, max_iter,
     # is required if you only want to check if in the last level everything is converged
     check_final_convergence(run_count, max_iter, ctrl_variables['converged'])
 
+
+def _control_implementation_incremental(net, controller_order, ctrl_variables, max_iter, evaluate_net_fct, graph,
+                                        **kwargs):
+    # like control_implementation, but after the first iteration of a level only the controllers which were not
+    # converged or whose inputs changed are checked, and the power flow is skipped if no controlled value changed
+    # since the last power flow
+    run_count = 0
+    # values written by the controllers at the last power flow, None if there was no power flow yet
+    pf_outputs = graph.output_values() if ctrl_variables['initial_run'] else None
+    for level, levelorder in enumerate(controller_order):
+        _reset_convergence(levelorder)
+        ctrl_converged = False
+        converged = ctrl_variables['converged']
+        run_count = 0
+        check = np.ones(len(levelorder), dtype=bool)
+        is_converged = np.zeros(len(levelorder), dtype=bool)
+        inputs = graph.input_values(level)
+        while not ctrl_converged and run_count <= max_iter and converged:
+            ctrl_converged = _control_step_incremental(levelorder, run_count, check, is_converged,
+                                                       ctrl_variables.get("sensitivity_control", False))
+            if not ctrl_converged:
+                run_count += 1
+                outputs = graph.output_values()
+                if pf_outputs is None or not np.array_equal(outputs, pf_outputs, equal_nan=True):
+                    ctrl_variables = evaluate_net_fct(net, levelorder, ctrl_variables, **kwargs)
+                    pf_outputs = graph.output_values()
+                else:
+                    logger.debug("no controlled value changed, the power flow is skipped")
+                new_inputs = graph.input_values(level)
+                check = ~is_converged | graph.changed_inputs(level, inputs, new_inputs)
+                inputs = new_inputs
+        if ctrl_variables['check_each_level']:
+            check_final_convergence(run_count, max_iter, ctrl_variables['converged'])
+    check_final_convergence(run_count, max_iter, ctrl_variables['converged'])
+
+
 def _reset_convergence(levelorder):
     for ctrl, net in levelorder:
         ctrl.level_reset(net)
 
 
-def _control_step(levelorder, run_count):
+def _control_step(levelorder, run_count, sensitivity=False):
     # keep track of stopping criteria
     converged = True
     logger.debug("Controller Iteration #%i" % run_count)
+    # controllers whose setpoints are predicted with the voltage sensitivities
+    predicted = list()
     # run each controller until all are converged
     for ctrl, net in levelorder:
         # call control step while controller ist not converged yet
         if not ctrl.is_converged(net):
-            ctrl.control_step(net)
+            if sensitivity and supports_sensitivity_control(ctrl):
+                predicted.append((ctrl, net))
+            else:
+                ctrl.control_step(net)
             converged = False
+    if len(predicted):
+        sensitivity_control_step(predicted)
     return converged
 
 
+def _control_step_incremental(levelorder, run_count, check, is_converged, sensitivity=False):
+    # calls control step of the checked controllers which are not converged
+    logger.debug("Controller Iteration #%i" % run_count)
+    predicted = list()
+    for i in np.flatnonzero(check):
+        ctrl, net = levelorder[i]
+        is_converged[i] = ctrl.is_converged(net)
+        if not is_converged[i]:
+            if sensitivity and supports_sensitivity_control(ctrl):
+                predicted.append((ctrl, net))
+            else:
+                ctrl.control_step(net)
+    if len(predicted):
+        sensitivity_control_step(predicted)
+    return bool(np.all(is_converged))
+
+
 def _control_repair(levelorder):
     for ctrl, net in levelorder:
         ctrl.repair_control(net)
@@ -265,6 +341,21 @@ def run_control(net, ctrl_variables=None, max_iter=30, **kwargs):
                                            (only relevant if ctrl_varibales is None, otherwise it needs \
                                            to be defined in ctrl_variables anyway)
 
+        **incremental_control** (bool, True) - if all controllers define their input and controlled variables \
+                                              (see Controller.get_input_variables()), only the controllers \
+                                              whose inputs changed are checked again after a power flow and \
+                                              power flows are skipped if no controlled value changed \
+                                              (only relevant if ctrl_varibales is None, otherwise it needs \
+                                              to be defined in ctrl_variables anyway)
+
+        **sensitivity_control** (bool, False) - if True, the setpoints of ContinuousTapControl, \
+                                               DiscreteTapControl and DERControllers with a Q model are \
+                                               predicted with the voltage sensitivities of the last power \
+                                               flow, so that the next power flow mostly only verifies them \
+                                               (see sensitivity_control_step()). (only relevant if \
+                                               ctrl_varibales is None, otherwise it needs to be defined in \
+                                               ctrl_variables anyway)
+
     Runs controller until each one converged or max_iter is hit.
 
     1. Call initialize_control() on each controller
@@ -279,13 +370,23 @@ def run_control(net, ctrl_variables=None, max_iter=30, **kwargs):
 
     """
     ctrl_variables = prepare_run_ctrl(net, ctrl_variables)
-    kwargs["recycle"], kwargs["only_v_results"] = get_recycle(ctrl_variables)
+    if "incremental_control" in kwargs:
+        ctrl_variables["incremental_control"] = kwargs.pop("incremental_control")
+    if "sensitivity_control" in kwargs:
+        ctrl_variables["sensitivity_control"] = kwargs.pop("sensitivity_control")
+    recycle, kwargs["only_v_results"] = get_recycle(ctrl_variables)
+    # recycle="auto" detects the changes of the controllers itself
+    kwargs["recycle"] = "auto" if recycle is None and kwargs.get("recycle", None) == "auto" else recycle
 
     controller_order = ctrl_variables["controller_order"]
 
     # initialize each controller prior to the first power flow
     control_initialization(controller_order)
 
+    # dependency graph of the controllers for the incremental control loop, None if it is not possible
+    ctrl_variables["controller_graph"] = get_controller_graph(controller_order) \
+        if ctrl_variables.get('incremental_control', True) else None
+
     # initial power flow (takes time, but is not needed for every kind of controller)
     ctrl_variables = net_initialization(net, ctrl_variables, **kwargs)
 
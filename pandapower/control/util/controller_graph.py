@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pandaplan.core.pplog as pplog
+except ImportError:
+    import logging as pplog
+
+logger = pplog.getLogger(__name__)
+
+
+class _VariableSet:
+    """
+    Values of a list of (net, element, element_index, variable) tuples, which are read with one access per
+    column of the element tables.
+    """
+
+    def __init__(self, variables):
+        columns = dict()
+        position = 0
+        # start position of each variable in the values
+        self.starts = list()
+        for net, element, element_index, variable in variables:
+            element_index = np.atleast_1d(np.asarray(element_index)).ravel()
+            self.starts.append(position)
+            _, column_index, column_positions = columns.setdefault((id(net), element, variable),
+                                                                   (net, list(), list()))
+            column_index.append(element_index)
+            column_positions.append(np.arange(position, position + len(element_index)))
+            position += len(element_index)
+        self.n_values = position
+        self.columns = [(net, element, variable, np.concatenate(element_index), np.concatenate(positions))
+                        for (_, element, variable), (net, element_index, positions) in columns.items()]
+        # row positions of the element index of each column, which are updated if the element table changes
+        self._row_positions = [(None, None)] * len(self.columns)
+
+    def values(self):
+        values = np.empty(self.n_values)
+        for i, (net, element, variable, element_index, positions) in enumerate(self.columns):
+            table = net[element]
+            table_index, rows = self._row_positions[i]
+            if table_index is not table.index:
+                rows = table.index.get_indexer(element_index)
+                self._row_positions[i] = (table.index, rows)
+            column = table[variable].to_numpy(dtype=np.float64, na_value=np.nan)
+            values[positions] = np.where(rows >= 0, column[rows], np.nan)
+        return values
+
+
+class ControllerGraph:
+    """
+    Dependency graph of the controllers of a net: each controller is connected to the values it reads
+    (Controller.get_input_variables()) and to the values it writes (Controller.get_controlled_variables()).
+    The power flow connects all written values to all results. The values are read with one access per column
+    of the element tables, so that run_control can detect with few pandas operations
+
+        - which controllers have to be checked again because their inputs changed and
+        - if the power flow can be skipped because no controlled value changed since the last power flow.
+
+    Use get_controller_graph() to create the graph of a controller order.
+
+    INPUT:
+        **controller_order** (list) - levels of (controller, net) tuples, see get_controller_order()
+
+        **inputs** (list) - input variables of each controller of each level
+
+        **outputs** (list) - controlled variables of all controllers
+    """
+
+    def __init__(self, controller_order, inputs, outputs):
+        self.controller_order = controller_order
+        self.levels = list()
+        for levelorder, level_inputs in zip(controller_order, inputs):
+            variables = [(net, *variable[:3]) for (ctrl, net), ctrl_inputs in zip(levelorder, level_inputs)
+                         for variable in ctrl_inputs]
+            variable_set = _VariableSet(variables)
+            # controller of each input value, to detect the controllers of changed inputs
+            n_inputs = [sum(len(np.atleast_1d(np.asarray(variable[1])).ravel()) for variable in ctrl_inputs)
+                        for ctrl_inputs in level_inputs]
+            self.levels.append((variable_set, np.repeat(np.arange(len(levelorder)), n_inputs)))
+        self.outputs = _VariableSet(outputs)
+
+    def input_values(self, level):
+        """
+        Returns the values of the inputs of all controllers of a level
+        """
+        return self.levels[level][0].values()
+
+    def changed_inputs(self, level, old_values, new_values):
+        """
+        Returns a boolean array which is True for the controllers of a level whose inputs changed
+        """
+        controllers = self.levels[level][1]
+        changed = np.zeros(len(self.controller_order[level]), dtype=bool)
+        different = ~((old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values)))
+        changed[controllers[different]] = True
+        return changed
+
+    def output_values(self):
+        """
+        Returns the values written by all controllers
+        """
+        return self.outputs.values()
+
+
+def get_controller_graph(controller_order):
+    """
+    Creates the ControllerGraph of a controller order. Returns None if a controller does not define its input
+    or controlled variables, or if they are not numeric columns of element tables.
+
+    INPUT:
+        **controller_order** (list) - levels of (controller, net) tuples, see get_controller_order()
+    """
+    inputs, outputs = list(), list()
+    for levelorder in controller_order:
+        level_inputs = list()
+        for ctrl, net in levelorder:
+            ctrl_inputs = ctrl.get_input_variables(net)
+            ctrl_outputs = ctrl.get_controlled_variables(net)
+            if ctrl_inputs is None or ctrl_outputs is None:
+                return None
+            for element, element_index, variable, flag in list(ctrl_inputs) + list(ctrl_outputs):
+                if flag == "object" or element not in net or not isinstance(net[element], pd.DataFrame) or \
+                        variable not in net[element].columns or \
+                        not pd.api.types.is_numeric_dtype(net[element][variable].dtype):
+                    return None
+            level_inputs.append(ctrl_inputs)
+            outputs.extend((net, *variable[:3]) for variable in ctrl_outputs)
+        inputs.append(level_inputs)
+    return ControllerGraph(controller_order, inputs, outputs)
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import hstack, vstack
+from scipy.sparse.linalg import splu
+
+from pandapower.auxiliary import write_to_net
+from pandapower.control.controller.DERController.der_control import DERController
+from pandapower.control.controller.trafo.ContinuousTapControl import ContinuousTapControl
+from pandapower.control.controller.trafo.DiscreteTapControl import DiscreteTapControl
+from pandapower.pd2ppc import _update_trafo_ppc
+from pandapower.pypower.dSbus_dV import dSbus_dV
+from pandapower.pypower.idx_brch import F_BUS, T_BUS
+from pandapower.pypower.makeYbus import makeYbus
+
+try:
+    import pandaplan.core.pplog as pplog
+except ImportError:
+    import logging as pplog
+
+logger = pplog.getLogger(__name__)
+
+# elements whose reactive power is given in load convention
+LOAD_CONVENTION_ELEMENTS = ["load", "storage"]
+
+
+def _jacobian(internal):
+    # Jacobian matrix of the power flow with the variables [Va[pv], Va[pq], Vm[pq]] and the mismatches
+    # [P[pv], P[pq], Q[pq]]
+    pvpq = np.r_[internal["pv"], internal["pq"]]
+    pq = internal["pq"]
+    n = len(pvpq) + len(pq)
+    J = internal.get("J", None)
+    if J is None or J.shape != (n, n):
+        # the power flow converged without iterations or the Jacobian matrix is extended by the distributed slack
+        # or by FACTS devices
+        dS_dVm, dS_dVa = dSbus_dV(internal["Ybus"], internal["V"])
+        dS_dVm, dS_dVa = dS_dVm.tocsr(), dS_dVa.tocsr()
+        J = vstack([hstack([dS_dVa[pvpq][:, pvpq].real, dS_dVm[pvpq][:, pq].real]),
+                    hstack([dS_dVa[pq][:, pvpq].imag, dS_dVm[pq][:, pq].imag])])
+    return J.tocsc(), pvpq, pq
+
+
+def _trafo_branch_rows(net, element, element_index):
+    # rows of the branches of the transformers in ppc["branch"]
+    f, _ = net._pd2ppc_lookups["branch"][element]
+    positions = net[element].index.get_indexer(element_index)
+    if element == "trafo":
+        return f + positions
+    # the three branches of each trafo3w are stored side by side (hv, mv, lv)
+    n = len(net[element])
+    return np.concatenate([f + side * n + positions for side in range(3)])
+
+
+def _tap_injections(net, tap_elements, internal):
+    # changes of the calculated bus power injections per tap step of each transformer
+    ppc = net._ppc
+    V = internal["V"]
+    injections = np.zeros((len(V), len(tap_elements)), dtype=np.complex128)
+    if not len(tap_elements):
+        return injections
+    elements = list(dict.fromkeys(element for element, _ in tap_elements))
+    tap_steps = {element: np.zeros(len(net[element])) for element in elements}
+    rows, columns = list(), list()
+    for column, (element, element_index) in enumerate(tap_elements):
+        element_rows = _trafo_branch_rows(net, element, [element_index])
+        tap_steps[element][net[element].index.get_loc(element_index)] = 1.
+        rows.append(element_rows)
+        columns.append(np.full(len(element_rows), column))
+    rows, columns = np.concatenate(rows), np.concatenate(columns)
+
+    # the branch parameters of all transformers are calculated one tap step above and below the current tap
+    # positions, as each branch only depends on the tap position of its own transformer. The central difference
+    # is used, as the changes of the admittances at both sides of a transformer almost cancel each other out
+    tap_pos = {element: net[element]["tap_pos"] for element in elements}
+    branches = list()
+    try:
+        for direction in [1., -1.]:
+            stepped_ppc = dict(ppc)
+            stepped_ppc["branch"] = ppc["branch"].copy()
+            for element in elements:
+                net[element]["tap_pos"] = tap_pos[element].values.astype(np.float64) + \
+                    direction * tap_steps[element]
+            _update_trafo_ppc(net, stepped_ppc)
+            branches.append(stepped_ppc["branch"])
+    finally:
+        for element in elements:
+            net[element]["tap_pos"] = tap_pos[element]
+
+    in_service = internal["branch_is"][rows]
+    rows, columns = rows[in_service], columns[in_service]
+    _, upper_Yf, upper_Yt = makeYbus(internal["baseMVA"], internal["bus"], branches[0][rows])
+    _, lower_Yf, lower_Yt = makeYbus(internal["baseMVA"], internal["bus"], branches[1][rows])
+    delta_if = (upper_Yf - lower_Yf) * V / 2
+    delta_it = (upper_Yt - lower_Yt) * V / 2
+    branch = ppc["branch"][rows]
+    f_bus = np.real(branch[:, F_BUS]).astype(np.int64)
+    t_bus = np.real(branch[:, T_BUS]).astype(np.int64)
+    np.add.at(injections, (f_bus, columns), V[f_bus] * np.conj(delta_if))
+    np.add.at(injections, (t_bus, columns), V[t_bus] * np.conj(delta_it))
+    # e.g. tap positions without a tap changer characteristic value
+    injections[:, ~np.all(np.isfinite(injections), axis=0)] = 0.
+    return injections
+
+
+def voltage_sensitivities(net, buses, tap_elements=(), q_elements=()):
+    """
+    Calculates the sensitivities of the voltage magnitudes at buses to the tap positions of transformers and to the
+    reactive power of elements from the Jacobian matrix of the last power flow. The sensitivities to the tap
+    positions are derived from the change of the branch admittances between one tap step above and below the
+    current tap positions.
+
+    INPUT:
+        **net** - The pandapower format network with the results of a converged AC power flow (runpp)
+
+        **buses** (list) - buses of the voltage magnitudes
+
+    OPTIONAL:
+        **tap_elements** (list, ()) - (element, element_index) tuples of the transformers, element is "trafo" or \
+            "trafo3w"
+
+        **q_elements** (list, ()) - (element, element_index) tuples of the elements whose reactive power changes, \
+            e.g. ("sgen", 0)
+
+    OUTPUT:
+        **sensitivities** (ndarray) - change of vm_pu at the buses (rows) per tap step of the transformers and per \
+            Mvar of the elements (columns). Transformers and elements which are out of service or connected to \
+            buses with a fixed voltage magnitude have zero sensitivities.
+    """
+    if net["_ppc"] is None or not net.get("converged", False) or "internal" not in net["_ppc"] or \
+            "V" not in net["_ppc"]["internal"]:
+        raise UserWarning("The voltage sensitivities require the results of a converged AC power flow")
+    internal = net._ppc["internal"]
+    bus_lookup = net._pd2ppc_lookups["bus"]
+    J, pvpq, pq = _jacobian(internal)
+    n_bus = len(internal["V"])
+
+    injections = np.zeros((n_bus, len(tap_elements) + len(q_elements)), dtype=np.complex128)
+    injections[:, :len(tap_elements)] = _tap_injections(net, tap_elements, internal)
+    for column, (element, element_index) in enumerate(q_elements, start=len(tap_elements)):
+        bus = bus_lookup[net[element].at[element_index, "bus"]]
+        sign = -1. if element in LOAD_CONVENTION_ELEMENTS else 1.
+        scaling = net[element].at[element_index, "scaling"] if "scaling" in net[element].columns else 1.
+        if bus < n_bus and net[element].at[element_index, "in_service"]:
+            # the calculated injections have to balance the additional reactive power
+            injections[bus, column] = -1j * sign * scaling / internal["baseMVA"]
+
+    delta_f = np.vstack([injections[pvpq].real, injections[pq].imag])
+    delta_x = -splu(J).solve(delta_f) if delta_f.size else delta_f
+    sensitivities = np.zeros((n_bus + 1, injections.shape[1]))
+    sensitivities[pq] = delta_x[len(pvpq):]
+    ppci_buses = bus_lookup[np.asarray(buses, dtype=np.int64)]
+    # buses which are not in the power flow, e.g. isolated buses
+    ppci_buses = np.where((ppci_buses >= 0) & (ppci_buses < n_bus), ppci_buses, n_bus)
+    return sensitivities[ppci_buses]
+
+
+def supports_sensitivity_control(ctrl):
+    """
+    Returns True if the setpoints of the controller can be predicted by sensitivity_control_step()
+    """
+    if type(ctrl) in [ContinuousTapControl, DiscreteTapControl]:
+        return ctrl.element in ["trafo", "trafo3w"]
+    return type(ctrl) is DERController and ctrl.q_model is not None and ctrl.element in ["sgen"] + \
+        LOAD_CONVENTION_ELEMENTS
+
+
+class _TapUnknowns:
+    # tap positions of the transformers of a tap controller which are predicted
+
+    def __init__(self, ctrl, net):
+        self.ctrl = ctrl
+        self.element_index = np.atleast_1d(ctrl.element_index)
+        self.bus = np.atleast_1d(ctrl.trafobus)
+        self.tap_pos = np.atleast_1d(ctrl.tap_pos).astype(np.float64)
+        tap_min, tap_max = np.atleast_1d(ctrl.tap_min), np.atleast_1d(ctrl.tap_max)
+        self.tap_min, self.tap_max = np.minimum(tap_min, tap_max), np.maximum(tap_min, tap_max)
+        self.vm_pu = net.res_bus.vm_pu.loc[self.bus].values
+        self.discrete = isinstance(ctrl, DiscreteTapControl)
+        if self.discrete:
+            # the middle of the voltage band for the transformers with voltages outside of the band
+            lower = np.broadcast_to(ctrl.vm_lower_pu, self.bus.shape)
+            upper = np.broadcast_to(ctrl.vm_upper_pu, self.bus.shape)
+            self.vm_set_pu = (lower + upper) / 2
+            self.predicted = (self.vm_pu < lower) | (self.vm_pu > upper)
+        else:
+            self.vm_set_pu = np.broadcast_to(ctrl.vm_set_pu, self.bus.shape).astype(np.float64)
+            self.predicted = np.ones(len(self.bus), dtype=bool)
+        self.predicted &= ~np.isnan(self.vm_pu)
+
+    def unknowns(self):
+        return [(self.ctrl.element, idx) for idx in self.element_index[self.predicted]]
+
+    def buses(self):
+        return self.bus[self.predicted]
+
+    def bounds(self):
+        if self.discrete or self.ctrl.check_tap_bounds:
+            return self.tap_min[self.predicted], self.tap_max[self.predicted]
+        return np.full(self.predicted.sum(), -np.inf), np.full(self.predicted.sum(), np.inf)
+
+    def write(self, net, delta_tap, sensitivity):
+        tap_pos = self.tap_pos.copy()
+        if self.discrete:
+            steps = np.round(delta_tap)
+            # at least one step towards the voltage band, as in DiscreteTapControl.control_step()
+            direction = np.sign(self.vm_set_pu[self.predicted] - self.vm_pu[self.predicted]) * np.sign(sensitivity)
+            steps = np.where(steps == 0, direction, steps)
+            tap_pos[self.predicted] = np.clip(tap_pos[self.predicted] + steps, self.tap_min[self.predicted],
+                                              self.tap_max[self.predicted])
+        else:
+            tap_pos[self.predicted] += delta_tap
+        ctrl = self.ctrl
+        ctrl.tap_pos = tap_pos if np.ndim(ctrl.element_index) else tap_pos[0]
+        if self.discrete:
+            ctrl._hunting_taps = np.vstack([ctrl._hunting_taps, ctrl.tap_pos])
+            if ctrl.hunting_limit is not None and ctrl._hunting_taps.shape[0] > ctrl.hunting_limit:
+                ctrl._hunting_taps = ctrl._hunting_taps[1:, :]
+        elif net[ctrl.element].tap_pos.dtype != "float":
+            net[ctrl.element].tap_pos = net[ctrl.element].tap_pos.astype(float)
+        write_to_net(net, ctrl.element, ctrl.element_index, "tap_pos", ctrl.tap_pos, ctrl._read_write_flag)
+
+
+class _ReactivePowerUnknowns:
+    # reactive powers of the elements of a DERController which are predicted
+
+    def __init__(self, ctrl, net):
+        self.ctrl = ctrl
+        self.element_index = pd.Index(ctrl.element_index)
+        self.q_mvar = np.asarray(ctrl.q_mvar, dtype=np.float64)
+
+    def unknowns(self):
+        return [(self.ctrl.element, idx) for idx in self.element_index]
+
+    def buses(self):
+        return np.asarray(self.ctrl.bus)
+
+    def target_powers(self, vm_pu):
+        p_mw, q_mvar = self.ctrl._target_powers(pd.Series(vm_pu, index=self.element_index))
+        return np.asarray(p_mw, dtype=np.float64), np.asarray(q_mvar, dtype=np.float64)
+
+    def write(self, net, vm_pu):
+        p_mw, q_mvar = self.target_powers(vm_pu)
+        self.ctrl.p_mw = pd.Series(p_mw, index=self.element_index)
+        self.ctrl.q_mvar = pd.Series(q_mvar, index=self.element_index)
+        self.ctrl.write_to_net(net)
+
+
+def _predict_setpoints(net, controllers, max_iter=50, tol=1e-9):
+    # predicts the setpoints of the controllers with the voltage sensitivities. Returns the controllers whose
+    # setpoints could not be predicted
+    if net["_ppc"] is None or not net.get("converged", False) or "V" not in net["_ppc"].get("internal", dict()):
+        return controllers
+    taps, powers = list(), list()
+    for ctrl in controllers:
+        if isinstance(ctrl, DERController):
+            powers.append(_ReactivePowerUnknowns(ctrl, net))
+        elif not ctrl.nothing_to_do(net):
+            taps.append(_TapUnknowns(ctrl, net))
+    tap_elements = [unknown for tap in taps for unknown in tap.unknowns()]
+    q_elements = [unknown for power in powers for unknown in power.unknowns()]
+    buses = np.concatenate([tap.buses() for tap in taps] + [power.buses() for power in powers] + [[]])
+    sensitivities = voltage_sensitivities(net, buses, tap_elements, q_elements)
+    n_taps = len(tap_elements)
+    vm_pu = net.res_bus.vm_pu.loc[buses].values
+
+    # transformers without influence on the voltage at their controlled bus are controlled by control_step()
+    diagonal = np.diagonal(sensitivities)[:n_taps]
+    tap_sections = np.cumsum([0] + [len(tap.unknowns()) for tap in taps])
+    not_predicted = [tap.ctrl for tap, start, end in zip(taps, tap_sections[:-1], tap_sections[1:])
+                     if np.any(np.abs(diagonal[start:end]) < 1e-12)]
+    if len(not_predicted):
+        return not_predicted + _predict_setpoints(
+            net, [ctrl for ctrl in controllers if not any(ctrl is other for other in not_predicted)], max_iter, tol)
+
+    vm_set_pu = np.concatenate([tap.vm_set_pu[tap.predicted] for tap in taps] + [[]])
+    tap_pos = np.concatenate([tap.tap_pos[tap.predicted] for tap in taps] + [[]])
+    bounds = [tap.bounds() for tap in taps]
+    tap_min = np.concatenate([lower for lower, _ in bounds] + [[]])
+    tap_max = np.concatenate([upper for _, upper in bounds] + [[]])
+    q_mvar = np.concatenate([power.q_mvar for power in powers] + [[]])
+    q_sections = np.cumsum([n_taps] + [len(power.element_index) for power in powers])
+
+    # the tap positions are solved for the voltage setpoints and the reactive powers are iterated on the
+    # characteristics of the controllers with the linearized voltages
+    delta = np.zeros(sensitivities.shape[1])
+    for _ in range(max_iter):
+        if n_taps:
+            rhs = vm_set_pu - vm_pu[:n_taps] - sensitivities[:n_taps, n_taps:] @ delta[n_taps:]
+            delta_tap = np.linalg.lstsq(sensitivities[:n_taps, :n_taps], rhs, rcond=None)[0]
+            delta[:n_taps] = np.clip(tap_pos + delta_tap, tap_min, tap_max) - tap_pos
+        if not len(powers):
+            break
+        vm_linear = vm_pu + sensitivities @ delta
+        delta_q = np.concatenate([power.target_powers(vm_linear[start:end])[1] for power, start, end in
+                                  zip(powers, q_sections[:-1], q_sections[1:])]) - q_mvar
+        converged = np.allclose(delta_q, delta[n_taps:], atol=tol, rtol=0)
+        delta[n_taps:] = delta_q
+        if converged:
+            break
+
+    vm_linear = vm_pu + sensitivities @ delta
+    for tap, start, end in zip(taps, tap_sections[:-1], tap_sections[1:]):
+        tap.write(net, delta[start:end], diagonal[start:end])
+    for power, start, end in zip(powers, q_sections[:-1], q_sections[1:]):
+        power.write(net, vm_linear[start:end])
+    return list()
+
+
+def sensitivity_control_step(controllers):
+    """
+    Control step of tap changer and DER controllers which predicts their setpoints from the voltage sensitivities
+    of the last power flow instead of approaching them iteratively: The tap positions of ContinuousTapControl and
+    DiscreteTapControl are solved for the voltage setpoints and the reactive powers of DERControllers with a Q
+    model are iterated on their characteristics with the linearized voltages, considering the influence of all
+    controllers on each other. Then, the next power flow verifies the setpoints. The control_step() of the
+    controllers is called if there are no power flow results or if a transformer has no influence on the voltage
+    at the controlled bus.
+
+    INPUT:
+        **controllers** (list) - (controller, net) tuples of the not converged controllers, see \
+            supports_sensitivity_control()
+    """
+    nets = dict()
+    for ctrl, net in controllers:
+        nets.setdefault(id(net), (net, list()))[1].append(ctrl)
+    for net, net_controllers in nets.values():
+        for ctrl in _predict_setpoints(net, net_controllers):
+            ctrl.control_step(net)
@@ -1 +1,2 @@
 from pandapower.estimation.state_estimation import *
+from pandapower.estimation.tracking import *
@@ -4,8 +4,8 @@
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
 import numpy as np
-from scipy.sparse import csr_matrix, vstack, hstack
-from scipy.sparse.linalg import spsolve, norm, inv
+from scipy.sparse import csr_matrix, csc_matrix, diags, issparse, vstack, hstack
+from scipy.sparse.linalg import LinearOperator, norm, onenormest, splu
 
 from pandapower.estimation.algorithm.estimator import BaseEstimatorIRWLS, get_estimator
 from pandapower.estimation.algorithm.matrix_base import BaseAlgebra, \
@@ -22,6 +22,70 @@ std_logger = logging.getLogger(__name__)
 
 __all__ = ["WLSAlgorithm", "WLSZeroInjectionConstraintsAlgorithm", "IRWLSAlgorithm"]
 
+# condition number of the gain matrix above which a warning is logged
+ILL_CONDITIONED_GAIN = 10**18
+
+
+def factorize_gain_matrix(G_m):
+    """
+    Sparse LU factorization of the gain matrix (or of the constrained system matrix), which is used for the state
+    update and for the condition estimate.
+    """
+    return splu(csc_matrix(G_m))
+
+
+def estimate_condition_number(G_m, factor):
+    """
+    Estimates the 1-norm condition number of the gain matrix from its factorization with the block 1-norm
+    estimator of Higham and Tisseur (a generalization of Hager's method). Only a few solves with the factor are
+    needed, the inverse of the gain matrix is never built.
+
+    INPUT:
+        **G_m** (sparse matrix) - gain matrix
+
+        **factor** (SuperLU) - factorization of G_m, see factorize_gain_matrix()
+
+    OUTPUT:
+        **cond** (float) - estimate of norm(G_m, 1) * norm(inv(G_m), 1)
+    """
+    inverse = LinearOperator(G_m.shape, matvec=factor.solve, rmatvec=lambda x: factor.solve(x, trans="T"),
+                             dtype=np.float64)
+    return norm(G_m, 1) * onenormest(inverse)
+
+
+def residual_covariance_diagonal(H, R_inv, G_m, factor=None, block_size=256):
+    """
+    Diagonal of the covariance matrix of the residuals Omega = R - H * G_m^-1 * H^T, which is needed for the
+    normalized residuals. The diagonal of H * G_m^-1 * H^T is computed from solves of G_m with blocks of columns
+    of H^T, evaluated only at the nonzero entries of H^T. Neither the inverse of G_m nor the full Omega is built.
+
+    INPUT:
+        **H** (sparse matrix) - measurement jacobian
+
+        **R_inv** (sparse matrix) - diagonal inverse of the measurement covariance matrix
+
+        **G_m** (sparse matrix) - gain matrix H^T * R_inv * H
+
+    OPTIONAL:
+        **factor** (SuperLU, None) - factorization of G_m, see factorize_gain_matrix(). G_m is factorized if
+        it is not given
+
+        **block_size** (int, 256) - number of columns of H^T which are solved at once
+
+    OUTPUT:
+        **omega** (np.array) - diagonal of Omega
+    """
+    if factor is None or factor.shape != G_m.shape:
+        factor = factorize_gain_matrix(G_m)
+    H_T = csc_matrix(H).T.tocsc()
+    n_meas = H_T.shape[1]
+    h_g_h = np.empty(n_meas)
+    for start in range(0, n_meas, block_size):
+        H_T_block = H_T[:, start:start + block_size]
+        solution = factor.solve(H_T_block.toarray())
+        h_g_h[start:start + block_size] = np.asarray(H_T_block.multiply(solution).sum(axis=0)).ravel()
+    return 1 / csr_matrix(R_inv).diagonal() - h_g_h
+
 
 class BaseAlgorithm:
     def __init__(self, tolerance, maximum_iterations, logger=std_logger):
@@ -34,6 +98,8 @@ class BaseAlgorithm:
         # Parameters for estimate
         self.eppci = None
         self.pp_meas_indices = None
+        # factorization of the last gain matrix
+        self.gain_factor = None
 
     def check_observability(self, eppci: ExtendedPPCI, z):
         # Check if observability criterion is fulfilled and the state estimation is possible
@@ -55,6 +121,25 @@ class BaseAlgorithm:
             self.logger.debug("State Estimation not successful ({:d}/{:d} iterations)".format(cur_it,
                                                                                               self.max_iterations))
 
+    def solve_gain_system(self, G_m, rhs, check_condition=False):
+        # factorizes the gain matrix once and uses the factor for the state update and for the optional
+        # condition estimate
+        rhs = rhs.toarray().ravel() if issparse(rhs) else np.asarray(rhs).ravel()
+        try:
+            factor = factorize_gain_matrix(G_m)
+        except RuntimeError:
+            # singular gain matrix, the state update is not defined
+            self.logger.warning("WARNING: Gain matrix is singular")
+            self.gain_factor = None
+            return np.full(len(rhs), np.nan)
+        # the factor of the last iteration is kept for the bad data tests
+        self.gain_factor = factor
+        if check_condition:
+            cond = estimate_condition_number(G_m, factor)
+            if cond > ILL_CONDITIONED_GAIN:
+                self.logger.warning("WARNING: Gain matrix is ill-conditioned: {:.2E}".format(cond))
+        return factor.solve(rhs)
+
     def initialize(self, eppci: ExtendedPPCI):
         # Check observability
         self.eppci = eppci
@@ -80,7 +165,7 @@ class WLSAlgorithm(BaseAlgorithm):
         self.obj_func = None
         logging.basicConfig(level=logging.DEBUG)
 
-    def estimate(self, eppci: ExtendedPPCI, **kwargs):
+    def estimate(self, eppci: ExtendedPPCI, check_condition=False, **kwargs):
         self.initialize(eppci)
         # matrix calculation object
         sem = BaseAlgebra(eppci)
@@ -88,7 +173,7 @@ class WLSAlgorithm(BaseAlgorithm):
         current_error, cur_it = 100., 0
         # invert covariance matrix
         eppci.r_cov[eppci.r_cov<(10**(-5))] = 10**(-5)
-        r_inv = csr_matrix(np.diagflat(1 / eppci.r_cov ** 2))
+        r_inv = diags(1 / eppci.r_cov ** 2, format="csr")
         E = eppci.E
         while current_error > self.tolerance and cur_it < self.max_iterations:
             # self.logger.debug("Starting iteration {:d}".format(1 + cur_it))
@@ -110,15 +195,10 @@ class WLSAlgorithm(BaseAlgorithm):
                 # gain matrix G_m
                 # G_m = H^t * R^-1 * H
                 G_m = H.T * (r_inv * H)
-                norm_G = norm(G_m, np.inf)
-                norm_invG = norm(inv(G_m), np.inf)
-                cond = norm_G*norm_invG
-                if cond > 10**18:
-                    self.logger.warning("WARNING: Gain matrix is ill-conditioned: {:.2E}".format(cond))
 
                 # state vector difference d_E
                 # d_E = G_m^-1 * (H' * R^-1 * r)
-                d_E = spsolve(G_m, H.T * (r_inv * r))
+                d_E = self.solve_gain_system(G_m, H.T * (r_inv * r), check_condition)
 
                 # Scaling of Delta_X to avoid divergence due o ill-conditioning and 
                 # operating conditions far from starting state variables
@@ -137,7 +217,7 @@ class WLSAlgorithm(BaseAlgorithm):
 
                 # Restore full weighting matrix with current measurements
                 if cur_it == 0 and eppci.any_i_meas:
-                    r_inv = csr_matrix(np.diagflat(1 / eppci.r_cov ** 2))
+                    r_inv = diags(1 / eppci.r_cov ** 2, format="csr")
 
                 # prepare next iteration
                 cur_it += 1
@@ -153,17 +233,17 @@ class WLSAlgorithm(BaseAlgorithm):
         # self.obj_func = obj_func
         if self.successful:
             # store variables required for chi^2 and r_N_max test:
-            self.R_inv = r_inv.toarray()
-            self.Gm = G_m.toarray()
+            self.R_inv = r_inv
+            self.Gm = G_m
             self.r = r.toarray()
-            self.H = H.toarray()
+            self.H = H
             # create h(x) for the current iteration
             self.hx = sem.create_hx(eppci.E)
         return eppci
 
 
 class WLSZeroInjectionConstraintsAlgorithm(BaseAlgorithm):
-    def estimate(self, eppci: ExtendedPPCI, **kwargs):
+    def estimate(self, eppci: ExtendedPPCI, check_condition=False, **kwargs):
         # state vector built from delta, |V| and zero injections
         # Find pq bus with zero p,q and shunt admittance
         if not np.any(eppci["bus"][:, bus_cols + ZERO_INJ_FLAG]):
@@ -181,7 +261,7 @@ class WLSZeroInjectionConstraintsAlgorithm(BaseAlgorithm):
         sem = BaseAlgebraZeroInjConstraints(eppci)
 
         current_error, cur_it = 100., 0
-        r_inv = csr_matrix((np.diagflat(1 / eppci.r_cov) ** 2))
+        r_inv = diags(1 / eppci.r_cov ** 2, format="csr")
         E = eppci.E
         # update the E matrix
         E_ext = np.r_[eppci.E, new_states]
@@ -213,7 +293,7 @@ class WLSZeroInjectionConstraintsAlgorithm(BaseAlgorithm):
                 C_rhs = vstack((rhs, -c_rxh))  # creating the righ hand side with new constraints
 
                 # state vector difference d_E and update E
-                d_E_ext = spsolve(M_tx, C_rhs)
+                d_E_ext = self.solve_gain_system(M_tx, C_rhs, check_condition)
                 E_ext += d_E_ext.ravel()
                 E = E_ext[:E.shape[0]]
                 eppci.update_E(E)
@@ -233,7 +313,7 @@ class WLSZeroInjectionConstraintsAlgorithm(BaseAlgorithm):
 
 
 class IRWLSAlgorithm(BaseAlgorithm):
-    def estimate(self, eppci: ExtendedPPCI, estimator="wls", **kwargs):
+    def estimate(self, eppci: ExtendedPPCI, estimator="wls", check_condition=False, **kwargs):
         self.initialize(eppci)
 
         # matrix calculation object
@@ -256,7 +336,7 @@ class IRWLSAlgorithm(BaseAlgorithm):
                 G_m = H.T * (phi * H)
 
                 # state vector difference d_E and update E
-                d_E = spsolve(G_m, H.T * (phi * r))
+                d_E = self.solve_gain_system(G_m, H.T * (phi * r), check_condition)
                 E += d_E.ravel()
                 eppci.update_E(E)
 
@@ -289,7 +369,7 @@ class AFWLSAlgorithm(BaseAlgorithm):
         self.obj_func = None
         logging.basicConfig(level=logging.DEBUG)
 
-    def estimate(self, eppci: ExtendedPPCI, **kwargs):
+    def estimate(self, eppci: ExtendedPPCI, check_condition=False, **kwargs):
         self.initialize(eppci)
         # matrix calculation object
         sem = BaseAlgebra(eppci)
@@ -297,7 +377,7 @@ class AFWLSAlgorithm(BaseAlgorithm):
         current_error, cur_it = 100., 0
         # invert covariance matrix
         eppci.r_cov[eppci.r_cov<(10**(-5))] = 10**(-5)
-        r_inv = csr_matrix(np.diagflat(1 / eppci.r_cov ** 2))
+        r_inv = diags(1 / eppci.r_cov ** 2, format="csr")
         E = eppci.E
         num_clusters = len(self.eppci["clusters"])
         while current_error > self.tolerance and cur_it < self.max_iterations:
@@ -317,14 +397,9 @@ class AFWLSAlgorithm(BaseAlgorithm):
 
                 # gain matrix G_m
                 G_m = H.T * (r_inv * H)
-                norm_G = norm(G_m, np.inf)
-                norm_invG = norm(inv(G_m), np.inf)
-                cond = norm_G*norm_invG
-                if cond > 10**18:
-                    self.logger.warning("WARNING: Gain matrix is ill-conditioned: {:.2E}".format(cond))
 
                 # state vector difference d_E
-                d_E = spsolve(G_m, H.T * (r_inv * r))
+                d_E = self.solve_gain_system(G_m, H.T * (r_inv * r), check_condition)
 
                 # Update E with d_E
                 E += d_E.ravel()
@@ -337,7 +412,7 @@ class AFWLSAlgorithm(BaseAlgorithm):
 
                 # Restore full weighting matrix
                 if cur_it == 0 and eppci.any_i_meas:
-                    r_inv = csr_matrix(np.diagflat(1 / eppci.r_cov ** 2))
+                    r_inv = diags(1 / eppci.r_cov ** 2, format="csr")
 
                 # prepare next iteration
                 cur_it += 1
@@ -353,10 +428,10 @@ class AFWLSAlgorithm(BaseAlgorithm):
         # self.obj_func = obj_func
         if self.successful:
             # store variables required for chi^2 and r_N_max test:
-            self.R_inv = r_inv.toarray()
-            self.Gm = G_m.toarray()
+            self.R_inv = r_inv
+            self.Gm = G_m
             self.r = r.toarray()
-            self.H = H.toarray()
+            self.H = H
             # split voltage and allocation factor variables
             E1 = E[:-num_clusters]
             E2 = E[-num_clusters:]
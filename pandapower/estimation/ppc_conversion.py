@@ -89,6 +89,212 @@ def _init_ppc(net, v_start, delta_start, calculate_voltage_angles):
     return ppc, ppci
 
 
+class _MeasurementIndex:
+    """
+    Maps the rows of net.measurement to the measurement columns of the ppci: the ppci bus or branch row, the
+    value, standard deviation and index columns, the unit conversion and the merging of several measurements of
+    the same quantity. Everything but the measurement values is computed once, so that the measurement columns of
+    each estimation are filled with one gather of the values. The index is cached in the net and rebuilt if the
+    structure of the measurements (measurement and element types, elements, sides, standard deviations) or the
+    ppci changes.
+    """
+
+    def __init__(self, net, ppci):
+        self.signature = self._signature(net, ppci)
+        meas = net.measurement
+        n_meas = len(meas)
+        meas_type = meas.measurement_type.values
+        element_type = meas.element_type.values
+        element = meas.element.values.astype(np.int64)
+        side_bus = self._side_bus(net, meas)
+
+        # unit conversion of values and standard deviations: p, q and i to p.u., angles to radians
+        scale = np.ones(n_meas)
+        is_pq = np.isin(meas_type, ("p", "q"))
+        scale[is_pq] = 1 / ppci["baseMVA"]
+        is_i = meas_type == "i"
+        if np.any(is_i):
+            base_bus = np.where(np.isnan(side_bus[is_i]), element[is_i], side_bus[is_i]).astype(np.int64)
+            base_i_ka = ppci["baseMVA"] / net.bus.vn_kv.loc[base_bus].values
+            scale[is_i] = 1 / (base_i_ka / np.sqrt(3))
+        scale[np.isin(meas_type, ("ia", "va"))] = np.deg2rad(1.)
+        std_dev = meas.std_dev.values.astype(np.float64) * scale
+        # convert injection reference to consumption reference for bus power measurements
+        is_bus = element_type == "bus"
+        value_scale = np.where(is_bus & is_pq, -scale, scale)
+
+        # ppci table (0: bus, 1: branch), row and value column of each measurement, -1 if it is not mapped
+        table = np.full(n_meas, -1, dtype=np.int64)
+        row = np.full(n_meas, -1, dtype=np.int64)
+        column = np.full(n_meas, -1, dtype=np.int64)
+
+        map_bus = net["_pd2ppc_lookups"]["bus"]
+        n_bus = ppci["bus"].shape[0]
+        for meas_kind, ix in BUS_MEAS_PPCI_IX.items():
+            mask = is_bus & (meas_type == meas_kind)
+            if not np.any(mask):
+                continue
+            bus_positions = map_bus[element[mask]]
+            if np.any(bus_positions >= n_bus):
+                std_logger.warning("Measurement defined in pp-grid does not exist in ppci, will be deleted!")
+            mask[mask] = bus_positions < n_bus
+            table[mask], row[mask], column[mask] = 0, map_bus[element[mask]], ix["VALUE"]
+
+        for br_type, br_positions in self._branch_positions(net, ppci).items():
+            sides = ("hv", "mv", "lv") if br_type == "trafo3w" else \
+                (BR_SIDE[br_type]["f"], BR_SIDE[br_type]["t"])
+            for meas_kind in ("p", "q", "i", "ia"):
+                mask = (element_type == br_type) & (meas_type == meas_kind) & \
+                       np.isin(element, br_positions.index.values)
+                if not np.any(mask):
+                    continue
+                for side in sides:
+                    br_side = "f" if side == sides[0] else "t"
+                    side_mask = mask.copy()
+                    side_mask[mask] = side_bus[mask] == net[br_type][side + "_bus"].loc[element[mask]].values
+                    if not np.any(side_mask):
+                        continue
+                    table[side_mask] = 1
+                    row[side_mask] = br_positions.loc[element[side_mask], side].values
+                    column[side_mask] = BR_MEAS_PPCI_IX[(meas_kind, br_side)]["VALUE"]
+
+        # measurements of the same quantity are merged into one ppci entry (slot): the weighted mean of all
+        # measurements, except for bus power measurements of different elements, which are summed up
+        self.rows = np.flatnonzero(table >= 0)
+        n_columns = max(bus_cols_se, branch_cols_se)
+        slot_keys = (table[self.rows] * (max(n_bus, ppci["branch"].shape[0]) + 1) + row[self.rows]) * n_columns + \
+            column[self.rows]
+        slot_keys, first, self.slots = np.unique(slot_keys, return_index=True, return_inverse=True)
+        self.n_slots = len(slot_keys)
+        is_sum = is_bus[self.rows] & is_pq[self.rows]
+        group_element = np.where(is_sum, element[self.rows], -1)
+        _, groups = np.unique(np.c_[self.slots, group_element], axis=0, return_inverse=True)
+        groups = groups.ravel()
+        group_size = np.bincount(groups)
+        meas_std_dev = std_dev[self.rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = 1 / np.square(meas_std_dev)
+            group_weight = np.bincount(groups, weights=weight)
+            merge_coefficient = np.where(group_size[groups] > 1, weight / group_weight[groups], 1.)
+            group_std_dev = np.sqrt(1 / group_weight)
+        # single measurements are not merged
+        group_std_dev[groups[group_size[groups] == 1]] = meas_std_dev[group_size[groups] == 1]
+        group_slot = np.zeros(len(group_size), dtype=np.int64)
+        group_slot[groups] = self.slots
+        slot_std_dev = np.sqrt(np.bincount(group_slot, weights=np.square(group_std_dev), minlength=self.n_slots))
+        single_group = np.bincount(group_slot, minlength=self.n_slots) == 1
+        slot_group = np.zeros(self.n_slots, dtype=np.int64)
+        slot_group[group_slot] = np.arange(len(group_slot))
+        slot_std_dev[single_group] = group_std_dev[slot_group[single_group]]
+        self.coefficients = value_scale[self.rows] * merge_coefficient
+
+        # ppci positions of the slots and the measurement columns which only depend on the structure: standard
+        # deviations and the pandapower index of the (first) measurement of each slot
+        slot_table, slot_row, slot_column = table[self.rows][first], row[self.rows][first], column[self.rows][first]
+        self.bus_slots = np.flatnonzero(slot_table == 0)
+        self.branch_slots = np.flatnonzero(slot_table == 1)
+        self.bus_template = np.full((n_bus, bus_cols_se), np.nan, dtype=ppci["bus"].dtype)
+        self.branch_template = np.full((ppci["branch"].shape[0], branch_cols_se), np.nan,
+                                       dtype=ppci["branch"].dtype)
+        bus_std_columns = {ix["VALUE"]: ix["STD"] for ix in BUS_MEAS_PPCI_IX.values()}
+        bus_idx_columns = {ix["VALUE"]: ix["IDX"] for ix in BUS_MEAS_PPCI_IX.values()}
+        branch_std_columns = {ix["VALUE"]: ix["STD"] for ix in BR_MEAS_PPCI_IX.values()}
+        branch_idx_columns = {ix["VALUE"]: ix["IDX"] for ix in BR_MEAS_PPCI_IX.values()}
+        slot_meas_index = meas.index.values[self.rows][first]
+        for slots, template, stds, idxs in ((self.bus_slots, self.bus_template, bus_std_columns, bus_idx_columns),
+                                            (self.branch_slots, self.branch_template, branch_std_columns,
+                                             branch_idx_columns)):
+            columns = slot_column[slots]
+            template[slot_row[slots], np.array([stds[c] for c in columns], dtype=np.int64)] = slot_std_dev[slots]
+            template[slot_row[slots], np.array([idxs[c] for c in columns], dtype=np.int64)] = \
+                slot_meas_index[slots]
+        self.bus_positions = (slot_row[self.bus_slots], slot_column[self.bus_slots])
+        self.branch_positions = (slot_row[self.branch_slots], slot_column[self.branch_slots])
+
+    @staticmethod
+    def _signature(net, ppci):
+        # everything the index depends on besides the measurement values
+        lookups = net["_pd2ppc_lookups"]
+        arrays = [lookups["bus"], ppci["internal"]["branch_is"], net.bus.index.values, net.bus.vn_kv.values,
+                  np.array([ppci["baseMVA"], ppci["bus"].shape[0], ppci["branch"].shape[0]])]
+        for br_type, bus_columns in (("line", ["from_bus", "to_bus"]), ("trafo", ["hv_bus", "lv_bus"]),
+                                     ("trafo3w", ["hv_bus", "mv_bus", "lv_bus"])):
+            arrays.extend([net[br_type].index.values, net[br_type][bus_columns].values])
+        structure = net.measurement[["measurement_type", "element_type", "element", "side", "std_dev"]].copy()
+        return structure, [np.array(a, copy=True) for a in arrays], dict(lookups["branch"])
+
+    def is_valid(self, net, ppci):
+        structure, arrays, branch_lookup = self._signature(net, ppci)
+        return structure.equals(self.signature[0]) and branch_lookup == self.signature[2] and \
+            len(arrays) == len(self.signature[1]) and \
+            all(np.array_equal(a, b) for a, b in zip(arrays, self.signature[1]))
+
+    @staticmethod
+    def _side_bus(net, meas):
+        # bus of the measured side of branch measurements, nan if the side is not given
+        side = meas.side
+        element = meas.element.values.astype(np.int64)
+        side_bus = pd.to_numeric(side.where(~side.isin(["from", "to", "hv", "mv", "lv"])),
+                                 errors="coerce").values.astype(np.float64)
+        for side_name in ("from", "to"):
+            mask = (side == side_name).values
+            if np.any(mask):
+                side_bus[mask] = net.line[side_name + "_bus"].loc[element[mask]].values
+        for side_name in ("hv", "mv", "lv"):
+            mask = (side == side_name).values
+            for element_type in np.unique(meas.element_type.values[mask]):
+                type_mask = mask & (meas.element_type.values == element_type)
+                side_bus[type_mask] = net[element_type][side_name + "_bus"].loc[element[type_mask]].values
+        return side_bus
+
+    @staticmethod
+    def _branch_positions(net, ppci):
+        # ppci branch rows of the sides of the lines and transformers in service
+        positions = dict()
+        br_is_mask = ppci['internal']['branch_is']
+        for br_type in ("line", "trafo"):
+            if net[br_type].empty:
+                continue
+            ix_start, ix_end = net["_pd2ppc_lookups"]["branch"][br_type]
+            is_mask = br_is_mask[ix_start:ix_end]
+            ix_offset = np.sum(br_is_mask[:ix_start])
+            br_ix = np.arange(ix_offset, ix_offset + np.sum(is_mask))
+            sides = BR_SIDE[br_type]
+            positions[br_type] = pd.DataFrame({sides["f"]: br_ix, sides["t"]: br_ix},
+                                              index=net[br_type].index.values[is_mask])
+        if not net.trafo3w.empty:
+            ix_start = net["_pd2ppc_lookups"]["branch"]["trafo3w"][0]
+            # only the HV side branch is needed to evaluate is/os status
+            is_mask = br_is_mask[ix_start:ix_start + len(net.trafo3w)]
+            num_is = np.sum(is_mask)
+            ix_offset = np.sum(br_is_mask[:ix_start])
+            br_ix = np.arange(ix_offset, ix_offset + num_is)
+            positions["trafo3w"] = pd.DataFrame({"hv": br_ix, "mv": br_ix + num_is, "lv": br_ix + 2 * num_is},
+                                                index=net.trafo3w.index.values[is_mask])
+        return positions
+
+    def gather(self, values):
+        """
+        Returns the measurement columns of the ppci bus and branch tables for the measurement values
+        """
+        slot_values = np.bincount(self.slots, weights=values[self.rows] * self.coefficients,
+                                  minlength=self.n_slots)
+        bus_append = self.bus_template.copy()
+        bus_append[self.bus_positions] = slot_values[self.bus_slots]
+        branch_append = self.branch_template.copy()
+        branch_append[self.branch_positions] = slot_values[self.branch_slots]
+        return bus_append, branch_append
+
+
+def _get_measurement_index(net, ppci):
+    # the measurement index is cached in the net and rebuilt if the measurements or the ppci change
+    meas_index = net.get("_measurement_index", None)
+    if not isinstance(meas_index, _MeasurementIndex) or not meas_index.is_valid(net, ppci):
+        meas_index = _MeasurementIndex(net, ppci)
+        net["_measurement_index"] = meas_index
+    return meas_index
+
+
 def _add_measurements_to_ppci(net, ppci, zero_injection, algorithm):
     """
 
@@ -97,212 +303,29 @@ def _add_measurements_to_ppci(net, ppci, zero_injection, algorithm):
     :param ppci: generated ppci
     :return: ppc with added columns
     """
-    meas = net.measurement.copy(deep=True)
-    if meas.empty:
+    if net.measurement.empty:
         raise Exception("No measurements are available in pandapower Network! Abort estimation!")
 
-    # Convert side from string to bus id
-    meas["side"] = meas.apply(lambda row:
-                              net['line'].at[row["element"], row["side"] + "_bus"] if
-                              row["side"] in ("from", "to") else
-                              net[row["element_type"]].at[row["element"], row["side"] + '_bus'] if
-                              row["side"] in ("hv", "mv", "lv") else row["side"], axis=1)
-
-    # convert p, q, i measurement to p.u., u already in p.u.
-    meas.loc[meas.measurement_type == "p", ["value", "std_dev"]] /= ppci["baseMVA"]
-    meas.loc[meas.measurement_type == "q", ["value", "std_dev"]] /= ppci["baseMVA"]
-
-    if not meas.query("measurement_type=='i'").empty:
-        meas_i_mask = (meas.measurement_type == 'i')
-        base_i_ka = ppci["baseMVA"] / net.bus.loc[(meas.side.fillna(meas.element))[meas_i_mask].values,
-                                                  "vn_kv"].values
-        meas.loc[meas_i_mask, "value"] /= base_i_ka / np.sqrt(3)
-        meas.loc[meas_i_mask, "std_dev"] /= base_i_ka / np.sqrt(3)
-
-    if not meas.query("(measurement_type=='ia' )| (measurement_type=='va')").empty:
-        meas_dg_mask = (meas.measurement_type == 'ia') | (meas.measurement_type == 'va')
-        meas.loc[meas_dg_mask, "value"] = np.deg2rad(meas.loc[meas_dg_mask, "value"])
-        meas.loc[meas_dg_mask, "std_dev"] = np.deg2rad(meas.loc[meas_dg_mask, "std_dev"])
-
-    # Get elements mapping from pandapower to ppc
-    map_bus = net["_pd2ppc_lookups"]["bus"]
-    meas_bus = meas[(meas['element_type'] == 'bus')]
-    if (map_bus[meas_bus['element'].values.astype(np.int64)] >= ppci["bus"].shape[0]).any():
-        std_logger.warning("Measurement defined in pp-grid does not exist in ppci, will be deleted!")
-        meas_bus = meas_bus[map_bus[meas_bus['element'].values.astype(np.int64)] < ppci["bus"].shape[0]]
-
-    # mapping to dict instead of np array ensures good performance for large indices
-    # (e.g., 999999999 requires a large np array even if there are only 2 buses)
-    # downside is loop comprehension to access the map
-    map_line, map_trafo, map_trafo3w = None, None, None
-    br_is_mask = ppci['internal']['branch_is']
-    if not net.line.empty:
-        line_is_mask = br_is_mask[np.arange(*net["_pd2ppc_lookups"]["branch"]["line"])]
-        num_line_is = np.sum(line_is_mask)
-        map_line = pd.Series(index=net.line.index.values[line_is_mask],
-                             data=np.arange(num_line_is))
-
-    if not net.trafo.empty:
-        trafo_ix_start, trafo_ix_end = net["_pd2ppc_lookups"]["branch"]["trafo"]
-        trafo_is_mask = br_is_mask[np.arange(trafo_ix_start, trafo_ix_end)]
-        num_trafo_is = np.sum(trafo_is_mask)
-        trafo_ix_offset = np.sum(br_is_mask[:trafo_ix_start])
-        map_trafo = pd.Series(index=net.trafo.index.values[trafo_is_mask],
-                              data=np.arange(trafo_ix_offset, trafo_ix_offset+num_trafo_is))
-
-    if not net.trafo3w.empty:
-        trafo3w_ix_start = net["_pd2ppc_lookups"]["branch"]["trafo3w"][0]
-        num_trafo3w = net.trafo3w.shape[0]
-        # Only the HV side branch is needed to evaluate is/os status
-        trafo3w_is_mask = br_is_mask[np.arange(trafo3w_ix_start,
-                                               trafo3w_ix_start+num_trafo3w)]
-        num_trafo3w_is = np.sum(trafo3w_is_mask)
-
-        trafo3w_ix_offset = np.sum(br_is_mask[:trafo3w_ix_start])
-        map_trafo3w = {trafo3w_ix: {'hv': br_ix,
-                                    'mv': br_ix + num_trafo3w_is,
-                                    'lv': br_ix + 2 * num_trafo3w_is}
-                       for trafo3w_ix, br_ix in
-                        zip(net.trafo3w.index.values[trafo3w_is_mask],
-                            np.arange(trafo3w_ix_offset,
-                                      trafo3w_ix_offset+num_trafo3w_is))}
-
     # set measurements for ppc format
     # add 9 columns to ppc[bus] for Vm, Vm std dev, P, P std dev, Q, Q std dev,
     # pandapower measurement indices V, P, Q
-    bus_append = np.full((ppci["bus"].shape[0], bus_cols_se), np.nan, dtype=ppci["bus"].dtype)
-
-    # Add measurements for bus
-    for meas_type in ("v", "va", "p", "q"):
-        this_meas = meas_bus[(meas_bus.measurement_type == meas_type)]
-        if len(this_meas):
-            bus_positions = map_bus[this_meas.element.values.astype(np.int64)]
-            if meas_type in ("p", "q"):
-                # Convert injection reference to consumption reference (P, Q)
-                this_meas.value *= -1
-            unique_bus_positions = np.unique(bus_positions)
-            if len(unique_bus_positions) < len(bus_positions):
-                std_logger.debug("P,Q Measurement duplication will be automatically merged!")
-                for bus in unique_bus_positions:
-                    this_meas_on_bus = this_meas.iloc[np.argwhere(bus_positions == bus).ravel(), :]
-                    element_positions = this_meas_on_bus["element"].values.astype(np.int64)
-                    unique_element_positions = np.unique(element_positions)
-                    if meas_type in ("v", "va"):
-                        merged_value, merged_std_dev = merge_measurements(this_meas_on_bus.value, this_meas_on_bus.std_dev)
-                        bus_append[bus, BUS_MEAS_PPCI_IX[meas_type]["VALUE"]] = merged_value
-                        bus_append[bus, BUS_MEAS_PPCI_IX[meas_type]["STD"]] = merged_std_dev
-                        bus_append[bus, BUS_MEAS_PPCI_IX[meas_type]["IDX"]] = this_meas_on_bus.index[0]
-                        continue
-                    for element in unique_element_positions:
-                        this_meas_on_element = this_meas_on_bus.iloc[np.argwhere(element_positions == element).ravel(), :]
-                        merged_value, merged_std_dev = merge_measurements(this_meas_on_element.value, this_meas_on_element.std_dev)
-                        this_meas_on_bus.loc[this_meas_on_element.index[0], ["value", "std_dev"]] = [merged_value, merged_std_dev]
-                        this_meas_on_bus.loc[this_meas_on_element.index[1:], ["value", "std_dev"]] = [0, 0]
-                    sum_value, sum_std_dev = sum_measurements(this_meas_on_bus.value, this_meas_on_bus.std_dev)
-                    bus_append[bus, BUS_MEAS_PPCI_IX[meas_type]["VALUE"]] = sum_value
-                    bus_append[bus, BUS_MEAS_PPCI_IX[meas_type]["STD"]] = sum_std_dev
-                    bus_append[bus, BUS_MEAS_PPCI_IX[meas_type]["IDX"]] = this_meas_on_bus.index[0]
-                continue
-
-            bus_append[bus_positions, BUS_MEAS_PPCI_IX[meas_type]["VALUE"]] = this_meas.value.values
-            bus_append[bus_positions, BUS_MEAS_PPCI_IX[meas_type]["STD"]] = this_meas.std_dev.values
-            bus_append[bus_positions, BUS_MEAS_PPCI_IX[meas_type]["IDX"]] = this_meas.index.values
+    # add 15 columns to mpc[branch] for Im_from, Im_from std dev, Im_to, Im_to std dev,
+    # P_from, P_from std dev, P_to, P_to std dev, Q_from, Q_from std dev,  Q_to, Q_to std dev,
+    # pandapower measurement index I, P, Q
+    meas_index = _get_measurement_index(net, ppci)
+    bus_append, branch_append = meas_index.gather(net.measurement.value.values.astype(np.float64))
 
     # add zero injection measurement and labels defined in parameter zero_injection
     bus_append = _add_zero_injection(net, ppci, bus_append, zero_injection)
     # add virtual measurements for artificial buses, which were created because
     # of an open line switch. p/q are 0. and std dev is 1e-6. (small value)
+    map_bus = net["_pd2ppc_lookups"]["bus"]
     new_in_line_buses = np.setdiff1d(np.arange(ppci["bus"].shape[0]), map_bus[map_bus >= 0])
     bus_append[new_in_line_buses, 2] = 0.
     bus_append[new_in_line_buses, 3] = 1e-6
     bus_append[new_in_line_buses, 4] = 0.
     bus_append[new_in_line_buses, 5] = 1e-6
 
-    # add 15 columns to mpc[branch] for Im_from, Im_from std dev, Im_to, Im_to std dev,
-    # P_from, P_from std dev, P_to, P_to std dev, Q_from, Q_from std dev,  Q_to, Q_to std dev,
-    # pandapower measurement index I, P, Q
-    branch_append = np.full((ppci["branch"].shape[0], branch_cols_se),
-                            np.nan, dtype=ppci["branch"].dtype)
-
-    # Add measurements for line and trafo
-    for br_type,  br_map in (("line", map_line), ("trafo", map_trafo)):
-        if br_map is None:
-            continue
-        for meas_type in ("p", "q", "i", "ia"):
-            this_meas = meas[(meas.measurement_type == meas_type) &
-                             (meas.element_type == br_type) &
-                              meas.element.isin(br_map.index)]
-            if len(this_meas):
-                for br_side in ("f", "t"):
-                    meas_this_side = this_meas[(this_meas.side.values.astype(np.int64) ==
-                                                net[br_type][BR_SIDE[br_type][br_side]+"_bus"]
-                                                [this_meas.element]).values]
-                    ix_side = br_map[meas_this_side.element.values].values
-                    unique_ix_side = np.unique(ix_side)
-                    if len(unique_ix_side) < len(ix_side):
-                        for branch in unique_ix_side:
-                            this_meas_on_branch = meas_this_side.iloc[np.argwhere(ix_side == branch).ravel(), :]
-                            merged_value, merged_std_dev = merge_measurements(this_meas_on_branch.value, this_meas_on_branch.std_dev)
-                            branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, br_side)]["VALUE"]] = merged_value
-                            branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, br_side)]["STD"]] = merged_std_dev
-                            branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, br_side)]["IDX"]] = this_meas_on_branch.index[0]
-                        continue
-
-                    branch_append[ix_side, BR_MEAS_PPCI_IX[(meas_type, br_side)]["VALUE"]] = meas_this_side.value.values
-                    branch_append[ix_side, BR_MEAS_PPCI_IX[(meas_type, br_side)]["STD"]] = meas_this_side.std_dev.values
-                    branch_append[ix_side, BR_MEAS_PPCI_IX[(meas_type, br_side)]["IDX"]] = meas_this_side.index.values
-
-    # Add measurements for trafo3w
-    if map_trafo3w is not None:
-        for meas_type in ("p", "q", "i", "ia"):
-            this_trafo3w_meas = meas[(meas.measurement_type == meas_type) &
-                                     (meas.element_type == "trafo3w") &
-                                      meas.element.isin(map_trafo3w)]
-            if len(this_trafo3w_meas):
-                meas_hv = this_trafo3w_meas[(this_trafo3w_meas.side.values ==
-                                             net.trafo3w.hv_bus[this_trafo3w_meas.element]).values]
-                meas_mv = this_trafo3w_meas[(this_trafo3w_meas.side.values ==
-                                             net.trafo3w.mv_bus[this_trafo3w_meas.element]).values]
-                meas_lv = this_trafo3w_meas[(this_trafo3w_meas.side.values ==
-                                             net.trafo3w.lv_bus[this_trafo3w_meas.element]).values]
-                ix_hv = [map_trafo3w[t]['hv'] for t in meas_hv.element.values]
-                ix_mv = [map_trafo3w[t]['mv'] for t in meas_mv.element.values]
-                ix_lv = [map_trafo3w[t]['lv'] for t in meas_lv.element.values]
-                unique_ix_hv = np.unique(ix_hv)
-                unique_ix_mv = np.unique(ix_mv)
-                unique_ix_lv = np.unique(ix_lv)
-                if len(unique_ix_hv) < len(ix_hv):
-                    for branch in unique_ix_hv:
-                        this_meas_on_branch = meas_hv.iloc[np.argwhere(ix_hv == branch).ravel(), :]
-                        merged_value, merged_std_dev = merge_measurements(this_meas_on_branch.value, this_meas_on_branch.std_dev)
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "f")]["VALUE"]] = merged_value
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "f")]["STD"]] = merged_std_dev
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "f")]["IDX"]] = this_meas_on_branch.index[0]
-                if len(unique_ix_mv) < len(ix_mv):
-                    for branch in unique_ix_mv:
-                        this_meas_on_branch = meas_mv.iloc[np.argwhere(ix_mv == branch).ravel(), :]
-                        merged_value, merged_std_dev = merge_measurements(this_meas_on_branch.value, this_meas_on_branch.std_dev)
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "t")]["VALUE"]] = merged_value
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "t")]["STD"]] = merged_std_dev
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "t")]["IDX"]] = this_meas_on_branch.index[0]
-                if len(unique_ix_lv) < len(ix_lv):
-                    for branch in unique_ix_lv:
-                        this_meas_on_branch = meas_lv.iloc[np.argwhere(ix_lv == branch).ravel(), :]
-                        merged_value, merged_std_dev = merge_measurements(this_meas_on_branch.value, this_meas_on_branch.std_dev)
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "t")]["VALUE"]] = merged_value
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "t")]["STD"]] = merged_std_dev
-                        branch_append[branch, BR_MEAS_PPCI_IX[(meas_type, "t")]["IDX"]] = this_meas_on_branch.index[0]
-                    continue
-                branch_append[ix_hv, BR_MEAS_PPCI_IX[(meas_type, "f")]["VALUE"]] = meas_hv.value.values
-                branch_append[ix_hv, BR_MEAS_PPCI_IX[(meas_type, "f")]["STD"]] = meas_hv.std_dev.values
-                branch_append[ix_hv, BR_MEAS_PPCI_IX[(meas_type, "f")]["IDX"]] = meas_hv.index.values
-                branch_append[ix_mv, BR_MEAS_PPCI_IX[(meas_type, "t")]["VALUE"]] = meas_mv.value.values
-                branch_append[ix_mv, BR_MEAS_PPCI_IX[(meas_type, "t")]["STD"]] = meas_mv.std_dev.values
-                branch_append[ix_mv, BR_MEAS_PPCI_IX[(meas_type, "t")]["IDX"]] = meas_mv.index.values
-                branch_append[ix_lv, BR_MEAS_PPCI_IX[(meas_type, "t")]["VALUE"]] = meas_lv.value.values
-                branch_append[ix_lv, BR_MEAS_PPCI_IX[(meas_type, "t")]["STD"]] = meas_lv.std_dev.values
-                branch_append[ix_lv, BR_MEAS_PPCI_IX[(meas_type, "t")]["IDX"]] = meas_lv.index.values
-
     # Check append or update
     if ppci["bus"].shape[1] == bus_cols:
         ppci["bus"] = np.hstack((ppci["bus"], bus_append))
@@ -10,7 +10,8 @@ from scipy.stats import chi2
 from pandapower.estimation.algorithm.base import (WLSAlgorithm,
                                                   WLSZeroInjectionConstraintsAlgorithm,
                                                   IRWLSAlgorithm,
-                                                  AFWLSAlgorithm)
+                                                  AFWLSAlgorithm,
+                                                  residual_covariance_diagonal)
 from pandapower.estimation.algorithm.lp import LPAlgorithm
 from pandapower.estimation.algorithm.optimization import OptAlgorithm
 from pandapower.estimation.ppc_conversion import pp2eppci, _initialize_voltage
@@ -29,7 +30,7 @@ ALGORITHM_MAPPING = {'wls': WLSAlgorithm,
                      'irwls': IRWLSAlgorithm,
                      'lp': LPAlgorithm,
                      'af-wls': AFWLSAlgorithm}
-ALLOWED_OPT_VAR = {"a", "opt_method", "estimator"}
+ALLOWED_OPT_VAR = {"a", "opt_method", "estimator", "check_condition"}
 
 
 def estimate(net, algorithm='wls',
@@ -79,6 +80,10 @@ def estimate(net, algorithm='wls',
                     if one of the bus among the buses connected through bb switch is given, then all of them will still \
                     be fused
 
+        **check_condition** (bool, False) - Estimate the condition number of the gain matrix in each iteration \
+            and log a warning if it is ill-conditioned (algorithms 'wls', 'wls_with_zero_constraint', 'irwls' \
+            and 'af-wls'). The estimate reuses the factorization of the gain matrix
+
     OUTPUT:
         **successful** (boolean) - Was the state estimation successful?
     """
@@ -337,7 +342,7 @@ class StateEstimation:
         self.estimate(v_in_out, delta_in_out, calculate_voltage_angles)
 
         # Performance index J(hx)
-        J = np.dot(self.solver.r.T, np.dot(self.solver.R_inv, self.solver.r))
+        J = self.solver.r.T @ (self.solver.R_inv @ self.solver.r)
 
         # Number of measurements
         m = len(self.net.measurement)
@@ -409,29 +414,25 @@ class StateEstimation:
 
             # Try to remove the bad data
             try:
-                # Error covariance matrix:
-                R = np.linalg.inv(self.solver.R_inv)
-
                 # for future debugging: this line's results have changed with the ppc
                 # overhaul in April 2017 after commit 9ae5b8f42f69ae39f8c8cf (which still works)
                 # there are differences of < 1e-10 for the Omega entries which cause
                 # the function to work far worse. As of now it is unclear if it's just numerical
                 # accuracy to blame or an error in the code. a sort in the ppc creation function
                 # was removed which caused this issue
-                # Covariance matrix of the residuals: \Omega = S*R = R - H*G^(-1)*H^T
-                # (S is the sensitivity matrix: r = S*e):
-                Omega = R - np.dot(self.solver.H, np.dot(np.linalg.inv(self.solver.Gm), self.solver.H.T))
-
-                # Diagonalize \Omega:
-                Omega = np.diag(np.diag(Omega))
+                # Diagonal of the covariance matrix of the residuals: \Omega = S*R = R - H*G^(-1)*H^T
+                # (S is the sensitivity matrix: r = S*e). Only the diagonal is computed from the sparse
+                # factorization of G, the full \Omega is not needed:
+                omega = residual_covariance_diagonal(self.solver.H, self.solver.R_inv, self.solver.Gm,
+                                                     self.solver.gain_factor)
 
                 # Compute squareroot (|.| since some -0.0 produced nans):
-                Omega = np.sqrt(np.absolute(Omega))
-
-                OmegaInv = np.linalg.inv(Omega)
+                omega = np.sqrt(np.absolute(omega))
+                if not np.all(omega > 0):
+                    raise np.linalg.LinAlgError("Covariance matrix of the residuals is singular")
 
                 # Compute normalized residuals (r^N_i = |r_i|/sqrt{Omega_ii}):
-                rN = np.dot(OmegaInv, np.absolute(self.solver.r))
+                rN = np.absolute(self.solver.r) / omega[:, np.newaxis]
 
                 if max(rN) <= rn_max_threshold:
                     self.logger.debug("Largest normalized residual test passed. "
@@ -454,7 +455,7 @@ class StateEstimation:
                     self.net.measurement = self.net.measurement.drop(meas_idx)
                     self.logger.debug("Bad data removed from the set of measurements.")
 
-            except np.linalg.linalg.LinAlgError:
+            except (np.linalg.linalg.LinAlgError, RuntimeError):
                 self.logger.error("A problem appeared while using the linear algebra methods."
                                   "Check and change the measurement set.")
                 return False
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import chi2
+
+from pandapower.estimation.algorithm.matrix_base import BaseAlgebra
+from pandapower.estimation.ppc_conversion import pp2eppci, _add_measurements_to_ppci, _initialize_voltage
+from pandapower.estimation.results import eppci2pp
+from pandapower.estimation.state_estimation import ALGORITHM_MAPPING, ALLOWED_OPT_VAR
+from pandapower.pypower.idx_bus import PD, QD
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+std_logger = logging.getLogger(__name__)
+
+__all__ = ["TrackingStateEstimation", "estimate_batch"]
+
+# algorithms whose state vector consists of the voltage angles and magnitudes only, so that the last estimate
+# can be used as start value of the next one
+TRACKING_ALGORITHMS = ("wls", "wls_with_zero_constraint", "irwls")
+
+
+class TrackingStateEstimation:
+    """
+    State estimation session for a sequence of measurement snapshots of a net with fixed topology and fixed
+    measurement set, e.g. the snapshots delivered by a SCADA system every few seconds. The extended ppci
+    (the ppci with the measurement columns, the admittance matrices and the measurement selection which
+    determines the sparsity structure of the measurement jacobian) is built once. For each snapshot only the
+    measurement values are updated, the estimation starts from the last successful estimate and the results are
+    returned as arrays. The result tables of the net are only written if write_results() is called.
+
+    INPUT:
+        **net** (pandapowerNet) - net with measurements, the values of the measurements are replaced by the
+        values of each snapshot
+
+    OPTIONAL:
+        **algorithm** (str, "wls") - estimation algorithm: "wls", "wls_with_zero_constraint" or "irwls"
+
+        **tolerance** (float, 1e-6) - convergence tolerance of the estimation
+
+        **maximum_iterations** (int, 10) - maximum number of iterations of each estimation
+
+        **init** (str, "flat") - start value of the first estimation: "flat", "results" or "slack"
+
+        **calculate_voltage_angles** (bool, True) - take into account absolute voltage angles and phase shifts
+        in transformers
+
+        **zero_injection** (str, iterable, None, "aux_bus") - zero injection buses, see estimate()
+
+        **logger** - logger of the estimation
+
+    EXAMPLE:
+        se = TrackingStateEstimation(net)
+        for values in snapshots:
+            if se.estimate(values):
+                vm_pu, va_degree = se.vm_pu, se.va_degree
+    """
+
+    def __init__(self, net, algorithm="wls", tolerance=1e-6, maximum_iterations=10, init="flat",
+                 calculate_voltage_angles=True, zero_injection="aux_bus", logger=None):
+        if algorithm not in TRACKING_ALGORITHMS:
+            raise UserWarning("Tracking state estimation is not available for algorithm %s, use one of %s"
+                              % (algorithm, TRACKING_ALGORITHMS))
+        self.logger = std_logger if logger is None else logger
+        self.net = net
+        self.algorithm = algorithm
+        self.zero_injection = zero_injection
+        self.solver = ALGORITHM_MAPPING[algorithm](tolerance, maximum_iterations, self.logger)
+
+        v_start, delta_start = _initialize_voltage(net, init, calculate_voltage_angles)
+        self.net, self.ppc, self.eppci = pp2eppci(net, v_start=v_start, delta_start=delta_start,
+                                                  calculate_voltage_angles=calculate_voltage_angles,
+                                                  zero_injection=zero_injection, algorithm=algorithm)
+        # order of the measurement values of the snapshots
+        self.measurement_index = net.measurement.index.copy()
+        self.n_z = len(self.eppci.z)
+
+        # ppci positions of the pandapower buses, buses which are not in the ppci get nan results
+        bus_lookup = net["_pd2ppc_lookups"]["bus"][net.bus.index.values]
+        self._bus_in_ppci = (bus_lookup >= 0) & (bus_lookup < self.eppci["bus"].shape[0])
+        self._bus_ppci = bus_lookup[self._bus_in_ppci]
+
+        # start value of the next estimation
+        self.E = self.eppci.E.copy()
+        self.successful = False
+
+    def update_measurements(self, values):
+        """
+        Replaces the measurement values by the values of a snapshot and updates the measurement vector of the
+        extended ppci.
+
+        INPUT:
+            **values** (iterable) - values of all measurements in the order of self.measurement_index, in the
+            units of net.measurement.value
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(self.measurement_index),):
+            raise UserWarning("%i measurement values are expected, got %s" % (len(self.measurement_index),
+                                                                              values.shape))
+        if not self.net.measurement.index.equals(self.measurement_index):
+            raise UserWarning("The measurements of the net have changed, create a new TrackingStateEstimation")
+        if np.any(np.isnan(values)):
+            raise UserWarning("The measurement set is fixed, measurement values must not be nan")
+        self.net.measurement["value"] = values
+        self.eppci.data = _add_measurements_to_ppci(self.net, self.eppci.data, self.zero_injection,
+                                                    self.algorithm)
+        self.eppci.update_meas()
+        if len(self.eppci.z) != self.n_z:
+            raise UserWarning("The measurement set has changed, create a new TrackingStateEstimation")
+
+    def estimate(self, values=None, **opt_vars):
+        """
+        Estimates the state of a snapshot, starting from the last successful estimate.
+
+        OPTIONAL:
+            **values** (iterable, None) - values of all measurements, see update_measurements(). If None, the
+            current measurement values are used
+
+            **opt_vars** - options of the algorithm, see estimate()
+
+        OUTPUT:
+            **successful** (bool) - True if the estimation converged
+        """
+        for var_name in opt_vars.keys():
+            if var_name not in ALLOWED_OPT_VAR:
+                self.logger.warning("Caution! %s is not allowed as parameter" % var_name
+                                    + " for estimate and will be ignored!")
+        if values is not None:
+            self.update_measurements(values)
+        self.eppci.update_E(self.E.copy())
+        eppci = self.solver.estimate(self.eppci, **opt_vars)
+        self.successful = bool(eppci is not False and self.solver.successful)
+        if self.successful:
+            self.E = self.eppci.E.copy()
+        else:
+            self.logger.warning("Estimation failed! The next estimation starts from the last successful one.")
+            self.eppci.update_E(self.E.copy())
+        return self.successful
+
+    @property
+    def objective_function_value(self):
+        """
+        Performance index J = r^T * R^-1 * r of the residuals r = z - h(x) of the last estimate, which is compared
+        to the chi^2 test threshold for bad data detection. nan if the estimation failed.
+        """
+        if not self.successful:
+            return np.nan
+        hx = getattr(self.solver, "hx", None)
+        if hx is None or len(hx) != len(self.eppci.z):
+            hx = BaseAlgebra(self.eppci).create_hx(self.eppci.E)
+        return np.sum(np.square((self.eppci.z - hx) / self.eppci.r_cov))
+
+    def chi2_threshold(self, chi2_prob_false=0.05):
+        """
+        Threshold of the chi^2 test for bad data, see StateEstimation.perform_chi2_test()
+        """
+        n_states = len(self.eppci.v) + len(self.eppci.delta) - 1
+        return chi2.ppf(1 - chi2_prob_false, len(self.measurement_index) - n_states)
+
+    def _bus_results(self, values):
+        results = np.full(len(self._bus_in_ppci), np.nan)
+        results[self._bus_in_ppci] = values[self._bus_ppci]
+        return results
+
+    @property
+    def vm_pu(self):
+        """
+        Estimated voltage magnitudes in the order of net.bus.index
+        """
+        return self._bus_results(self.eppci.v)
+
+    @property
+    def va_degree(self):
+        """
+        Estimated voltage angles in degrees in the order of net.bus.index
+        """
+        return self._bus_results(np.degrees(self.eppci.delta))
+
+    def write_results(self):
+        """
+        Writes the results of the last estimation to the result tables (res_bus_est, res_line_est, ...) of the
+        net.
+        """
+        # the bus demand of the ppci identifies the zero injection buses of the next snapshots, it must not be
+        # replaced by the estimated injections
+        demand = self.eppci["bus"][:, [PD, QD]].copy()
+        self.net = eppci2pp(self.net, self.ppc, self.eppci)
+        self.eppci["bus"][:, [PD, QD]] = demand
+        return self.net
+
+
+_worker_net = None
+
+
+def _init_batch_worker(net_snapshot):
+    global _worker_net
+    _worker_net = pickle.loads(net_snapshot)
+
+
+def _estimate_steps(net, measurement_values, se_kwargs, chi2_prob_false):
+    # estimates the time steps of a chunk in one session, each step starts from the estimate of the previous one
+    se = TrackingStateEstimation(net, algorithm="wls", **se_kwargs)
+    n_steps, n_bus = measurement_values.shape[0], len(net.bus)
+    results = {"vm_pu": np.full((n_steps, n_bus), np.nan),
+               "va_degree": np.full((n_steps, n_bus), np.nan),
+               "converged": np.zeros(n_steps, dtype=bool),
+               "iterations": np.zeros(n_steps, dtype=np.int64),
+               "objective_function_value": np.full(n_steps, np.nan)}
+    for step, values in enumerate(measurement_values):
+        converged = se.estimate(values)
+        results["iterations"][step] = se.solver.iterations
+        if not converged:
+            continue
+        results["vm_pu"][step] = se.vm_pu
+        results["va_degree"][step] = se.va_degree
+        results["converged"][step] = True
+        results["objective_function_value"][step] = se.objective_function_value
+    results["chi2_threshold"] = se.chi2_threshold(chi2_prob_false)
+    return results
+
+
+def _estimate_steps_worker(measurement_values, se_kwargs, chi2_prob_false):
+    return _estimate_steps(_worker_net, measurement_values, se_kwargs, chi2_prob_false)
+
+
+def estimate_batch(net, measurement_values, tolerance=1e-6, maximum_iterations=10, init="flat",
+                   calculate_voltage_angles=True, zero_injection="aux_bus", n_jobs=1, chi2_prob_false=0.05):
+    """
+    WLS state estimation of a time series of measurement values, e.g. for the re-estimation of archived
+    measurements. The extended ppci and the measurement mapping are built once (see TrackingStateEstimation),
+    each time step starts from the estimate of the previous one and the results are returned as arrays instead of
+    being written to the result tables of the net.
+
+    INPUT:
+        **net** (pandapowerNet) - net with the measurements of the time series
+
+        **measurement_values** (np.array, shape=(n_time_steps, n_measurements)) - values of all measurements
+        in each time step, in the order and the units of net.measurement
+
+    OPTIONAL:
+        **tolerance** (float, 1e-6) - convergence tolerance of the estimation
+
+        **maximum_iterations** (int, 10) - maximum number of iterations of each time step
+
+        **init** (str, "flat") - start value of the first time step: "flat", "results" or "slack"
+
+        **calculate_voltage_angles** (bool, True) - take into account absolute voltage angles and phase shifts
+        in transformers
+
+        **zero_injection** (str, iterable, None, "aux_bus") - zero injection buses, see estimate()
+
+        **n_jobs** (int, 1) - number of processes (-1: number of CPUs). The time steps are split into n_jobs
+        contiguous chunks, the first time step of each chunk starts from init
+
+        **chi2_prob_false** (float, 0.05) - probability of false alarms of the chi^2 test for bad data
+
+    OUTPUT:
+        **results** (dict) - "vm_pu" and "va_degree" (np.array, shape=(n_time_steps, n_bus), in the order of
+        net.bus.index, nan for failed time steps), "converged", "iterations", "objective_function_value" (the
+        chi^2 performance index J) and "bad_data" (J above the chi^2 test threshold) of each time step and the
+        "chi2_threshold"
+
+    EXAMPLE:
+        results = estimate_batch(net, measurement_values)
+        vm_pu = results["vm_pu"][results["converged"]]
+    """
+    measurement_values = np.asarray(measurement_values, dtype=np.float64)
+    if measurement_values.ndim != 2 or measurement_values.shape[1] != len(net.measurement):
+        raise UserWarning("measurement_values must have the shape (n_time_steps, %i)" % len(net.measurement))
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    se_kwargs = {"tolerance": tolerance, "maximum_iterations": maximum_iterations, "init": init,
+                 "calculate_voltage_angles": calculate_voltage_angles, "zero_injection": zero_injection}
+
+    # the session replaces the measurement values of the net, the original values are restored afterwards
+    original_values = net.measurement["value"].copy()
+    try:
+        if n_jobs > 1 and len(measurement_values) > 1:
+            chunks = np.array_split(measurement_values, min(n_jobs, len(measurement_values)))
+            net_snapshot = pickle.dumps(net, protocol=pickle.HIGHEST_PROTOCOL)
+            with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_batch_worker,
+                                     initargs=(net_snapshot,)) as executor:
+                futures = [executor.submit(_estimate_steps_worker, chunk, se_kwargs, chi2_prob_false)
+                           for chunk in chunks]
+                chunk_results = [future.result() for future in futures]
+            results = {key: np.concatenate([chunk[key] for chunk in chunk_results])
+                       for key in chunk_results[0] if key != "chi2_threshold"}
+            results["chi2_threshold"] = chunk_results[0]["chi2_threshold"]
+        else:
+            results = _estimate_steps(net, measurement_values, se_kwargs, chi2_prob_false)
+    finally:
+        net.measurement["value"] = original_values
+    results["bad_data"] = results["objective_function_value"] > results["chi2_threshold"]
+    return results
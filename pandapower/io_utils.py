@@ -63,6 +63,7 @@ except ImportError:
 
 from pandapower.auxiliary import pandapowerNet, get_free_id, soft_dependency_error, _preserve_dtypes
 from pandapower.create import create_empty_network
+from pandapower.results import extract_pending_results
 
 from functools import singledispatch
 
@@ -114,6 +115,8 @@ def to_dict_of_dfs(net, include_results=False, include_std_types=True, include_p
     dodfs = dict()
     dtypes = []
     parameters = dict()  # pd.DataFrame(columns=["parameter"])
+    if include_results:
+        extract_pending_results(net)
     for item, value in net.items():
         # dont save internal variables and results (if not explicitely specified)
         if item.startswith("_") or (item.startswith("res") and not include_results):
@@ -967,6 +970,7 @@ def to_serializable(obj):
 @to_serializable.register(pandapowerNet)
 def json_pandapowernet(obj):
     logger.debug('pandapowerNet')
+    extract_pending_results(obj)
     net_dict = {k: item for k, item in obj.items() if not k.startswith("_")}
     for k, item in net_dict.items():
         if isinstance(item, str) and '_module' in item:
@@ -7,7 +7,7 @@ import numpy as np
 from pandapower.auxiliary import _select_is_elements_numba, _check_connectivity_opf, _check_connectivity, \
     _set_isolated_buses_out_of_service, _replace_nans_with_default_limits, _write_lookup_to_net
 from pandapower.build_branch import _switch_branches, _branches_with_oos_buses, \
-    _build_branch_ppc, _build_tcsc_ppc, _build_branch_dc_ppc
+    _build_branch_ppc, _build_tcsc_ppc, _build_branch_dc_ppc, _calc_trafo_parameter, _calc_trafo3w_parameter
 from pandapower.build_bus import _build_bus_ppc, _calc_pq_elements_and_add_on_ppc, \
     _calc_shunts_and_add_on_ppc, _add_ext_grid_sc_impedance, _add_motor_impedances_ppc, \
     _build_svc_ppc, _add_load_sc_impedances_ppc, _build_ssc_ppc, _build_vsc_ppc, _build_bus_dc_ppc
@@ -30,10 +30,13 @@ from itertools import combinations
 
 
 def _pd2ppc_recycle(net, sequence, recycle):
-    # TODO: for FACTS and DC elements: SVC, TCSC, SSC, VSC
+    # TODO: for DC elements: line_dc
     key = "_ppc" if sequence is None else "_ppc%d" % sequence
     if not recycle or not net.get(key, None):
         return _pd2ppc(net, sequence=sequence)
+    if sequence == 0 and recycle.get("trafo", False):
+        # the zero sequence branch impedances are built by pd2ppc_zero and cannot be updated separately
+        return _pd2ppc(net, sequence=sequence)
 
     ppc = net[key]
     ppc["success"] = False
@@ -44,13 +47,13 @@ def _pd2ppc_recycle(net, sequence, recycle):
         # update pq values in bus
         _calc_pq_elements_and_add_on_ppc(net, ppc, sequence=sequence)
 
-    # if "trafo" in recycle and recycle["trafo"]:
-    #     # update trafo in branch and Ybus
-    #     lookup = net._pd2ppc_lookups["branch"]
-    #     if "trafo" in lookup:
-    #         _calc_trafo_parameter(net, ppc)
-    #     if "trafo3w" in lookup:
-    #         _calc_trafo3w_parameter(net, ppc)
+    if "trafo" in recycle and recycle["trafo"]:
+        # update trafo in branch, the Ybus is updated for the changed branches only
+        _update_trafo_ppc(net, ppc)
+
+    if recycle.get("facts", False):
+        # update the setpoints of SVC, TCSC, SSC and VSC
+        _update_facts_ppc(net, ppc)
 
     if "gen" in recycle and recycle["gen"]:
         # updates the ppc["gen"] part
@@ -64,6 +67,36 @@ def _pd2ppc_recycle(net, sequence, recycle):
     return ppc, ppci
 
 
+def _update_trafo_ppc(net, ppc):
+    """
+    Recalculates the parameters of the trafo and trafo3w branches in ppc["branch"], e.g. after tap
+    changes, for a recycled power flow. The topology of the branches (F_BUS, T_BUS and BR_STATUS,
+    which can be changed by switches and the connectivity check) is kept as it is.
+    """
+    lookup = net._pd2ppc_lookups["branch"]
+    if "trafo" not in lookup and "trafo3w" not in lookup:
+        return
+    branch = ppc["branch"]
+    topology = branch[:, [F_BUS, T_BUS, BR_STATUS]].copy()
+    if "trafo" in lookup:
+        _calc_trafo_parameter(net, ppc)
+    if "trafo3w" in lookup:
+        _calc_trafo3w_parameter(net, ppc)
+    branch[:, [F_BUS, T_BUS, BR_STATUS]] = topology
+
+
+def _update_facts_ppc(net, ppc):
+    """
+    Rebuilds the ppc arrays of the FACTS devices (SVC, TCSC, SSC, VSC) with the current setpoints
+    for a recycled power flow. The admittance matrices of the FACTS devices are built in newtonpf.
+    """
+    mode = net["_options"]["mode"]
+    _build_tcsc_ppc(net, ppc, mode)
+    _build_svc_ppc(net, ppc, mode)
+    _build_ssc_ppc(net, ppc, mode)
+    _build_vsc_ppc(net, ppc, mode)
+
+
 def _check_line_dc_at_b2b_buses(ppci):
     b2b_buses = ppci["bus_dc"][ppci["bus_dc"][:, DC_BUS_TYPE] == DC_B2B, DC_BUS_I].astype(np.int64)
     intersect_from = np.intersect1d(ppci["branch_dc"][:, DC_F_BUS].astype(np.int64), b2b_buses)
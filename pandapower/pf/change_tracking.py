@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+import pandas as pd
+
+from pandapower.auxiliary import _internal_stored
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+# columns of the element tables that can be updated by a recycled power flow, for each recycle option
+RECYCLE_COLUMNS = {
+    "bus_pq": {"load": ["p_mw", "q_mvar", "scaling", "const_z_percent", "const_i_percent"],
+               "sgen": ["p_mw", "q_mvar", "scaling"],
+               "storage": ["p_mw", "q_mvar", "scaling"],
+               "ward": ["ps_mw", "qs_mvar"],
+               "xward": ["ps_mw", "qs_mvar"]},
+    "gen": {"gen": ["p_mw", "vm_pu", "scaling"],
+            "ext_grid": ["vm_pu", "va_degree"]},
+    "trafo": {"trafo": ["tap_pos"],
+              "trafo3w": ["tap_pos"]},
+    "facts": {"svc": ["set_vm_pu", "thyristor_firing_angle_degree"],
+              "tcsc": ["set_p_to_mw", "thyristor_firing_angle_degree"],
+              "ssc": ["set_vm_pu"],
+              "vsc": ["control_value_ac", "control_value_dc"]},
+}
+
+# tables and columns that are not relevant for the power flow
+IGNORED_TABLES = {"controller", "output_writer", "measurement", "group", "pwl_cost", "poly_cost",
+                  "bus_geodata", "line_geodata"}
+IGNORED_COLUMNS = {"name", "geo"}
+# options that are changed by the recycled power flow itself or do not affect the results
+IGNORED_OPTIONS = {"recycle", "init", "init_vm_pu", "init_va_degree", "init_results", "profile"}
+NET_ATTRIBUTES = ["sn_mva", "f_hz"]
+
+
+def _tracked_tables(net):
+    return [key for key, val in net.items() if isinstance(val, pd.DataFrame) and not key.startswith("_")
+            and not key.startswith("res_") and key not in IGNORED_TABLES]
+
+
+def _table_snapshot(df):
+    columns = [c for c in df.columns if c not in IGNORED_COLUMNS]
+    return df.index.copy(), columns, {c: df[c].to_numpy(copy=True) for c in columns}
+
+
+def store_change_tracking_snapshot(net, snapshot=None, changed=None):
+    """
+    Stores a copy of the power flow relevant element tables and options in net["_change_tracking"].
+    It belongs to the current net["_ppc"] and is the reference for get_changed_columns().
+    If a previous snapshot and the changed columns are given, only the changed tables are copied.
+    """
+    if snapshot is None or changed is None:
+        tables = {table: _table_snapshot(net[table]) for table in _tracked_tables(net)}
+    else:
+        tables = snapshot["tables"]
+        for table in changed:
+            tables[table] = _table_snapshot(net[table])
+    net["_change_tracking"] = {
+        "ppc": net["_ppc"],
+        "options": dict(net["_options"]),
+        "attributes": {attr: net.get(attr, None) for attr in NET_ATTRIBUTES},
+        "tables": tables}
+
+
+def clear_change_tracking_snapshot(net):
+    if "_change_tracking" in net:
+        del net["_change_tracking"]
+
+
+def _values_equal(a, b):
+    if a.shape != b.shape or a.dtype != b.dtype:
+        return False
+    if a.dtype.kind in "fc":
+        return np.array_equal(a, b, equal_nan=True)
+    if a.dtype.kind == "O":
+        return bool(np.all((a == b) | (pd.isna(a) & pd.isna(b))))
+    return np.array_equal(a, b)
+
+
+def _options_equal(options, stored_options):
+    keys = (set(options) | set(stored_options)) - IGNORED_OPTIONS
+    for key in keys:
+        if key not in options or key not in stored_options:
+            return False
+        val, stored_val = options[key], stored_options[key]
+        if val is stored_val:
+            continue
+        try:
+            if not bool(np.all(val == stored_val)):
+                return False
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+def get_changed_columns(net):
+    """
+    Compares the element tables with the snapshot of the last power flow with recycle="auto".
+
+    OUTPUT:
+        **changed** (dict or None) - the changed columns for each changed table. None if the net
+        structure has changed, i.e. if there is no snapshot that belongs to net["_ppc"], an option
+        of the power flow or a net attribute (sn_mva, f_hz) has changed, or tables, elements or
+        columns were added or removed.
+    """
+    snapshot = net.get("_change_tracking", None)
+    if snapshot is None or snapshot["ppc"] is not net["_ppc"] or net["_ppc"] is None:
+        return None
+    if not _options_equal(net["_options"], snapshot["options"]):
+        return None
+    for attr, val in snapshot["attributes"].items():
+        if net.get(attr, None) != val:
+            return None
+    tables = _tracked_tables(net)
+    if set(tables) != set(snapshot["tables"]):
+        return None
+
+    changed = dict()
+    for table in tables:
+        df = net[table]
+        index, columns, values = snapshot["tables"][table]
+        if not df.index.equals(index) or [c for c in df.columns if c not in IGNORED_COLUMNS] != columns:
+            return None
+        if not len(index):
+            continue
+        changed_columns = [c for c in columns if not _values_equal(df[c].to_numpy(), values[c])]
+        if len(changed_columns):
+            changed[table] = changed_columns
+    return changed
+
+
+def get_recycle_from_changes(net):
+    """
+    Determines which parts of the ppc have to be updated by comparing the element tables with the
+    snapshot of the last power flow with recycle="auto".
+
+    OUTPUT:
+        **recycle** (dict or None) - recycle options for _recycled_powerflow(), e.g.
+        dict(bus_pq=True, gen=False, trafo=False, facts=False) if only loads have changed. None if
+        the ppc has to be rebuilt.
+
+        **changed** (dict or None) - the changed columns for each changed table
+    """
+    options = net["_options"]
+    if not options["ac"] or options["algorithm"] not in ["nr", "iwamoto_nr"] or \
+            options["enforce_q_lims"] or options["tdpf"] or options["distributed_slack"]:
+        return None, None
+    changed = get_changed_columns(net)
+    if changed is None or not _internal_stored(net):
+        return None, None
+
+    recycle = {key: False for key in RECYCLE_COLUMNS}
+    for table, columns in changed.items():
+        for column in columns:
+            keys = [key for key, tables in RECYCLE_COLUMNS.items() if column in tables.get(table, [])]
+            if not len(keys):
+                logger.debug("%s.%s has changed, the ppc is rebuilt" % (table, column))
+                return None, None
+            recycle[keys[0]] = True
+    return recycle, changed
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+from scipy.sparse.linalg import spsolve, splu
+
+try:
+    from scikits.umfpack import UmfpackContext, UMFPACK_A
+    umfpack_installed = True
+except ImportError:
+    umfpack_installed = False
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SpsolveSolver:
+    """
+    Default linear solver of the Newton-Raphson power flow: every call of solve() runs
+    scipy.sparse.linalg.spsolve, i.e. the column ordering, the symbolic and the numeric
+    factorization are computed from scratch.
+    """
+
+    def __init__(self, permc_spec=None, use_umfpack=True):
+        self.permc_spec = permc_spec
+        self.use_umfpack = use_umfpack
+
+    def solve(self, J, F):
+        return spsolve(J, F, permc_spec=self.permc_spec, use_umfpack=self.use_umfpack)
+
+
+class CachedFactorizationSolver:
+    """
+    Linear solver that reuses the analysis of the Jacobian sparsity pattern. The pattern of J does
+    not change within a power flow and neither between power flows of a time series with the same
+    topology, so only the numeric factorization has to be repeated.
+
+    With scikit-umfpack, the symbolic factorization of UMFPACK is computed once and reused. With
+    SuperLU (scipy), the fill-reducing column ordering is computed once (COLAMD or permc_spec) and
+    the following factorizations are done on the permuted matrix with the "NATURAL" ordering.
+
+    The number of solves that could reuse the cached analysis is counted in "hits", the number of
+    analyses because of a new or changed sparsity pattern in "misses".
+    """
+
+    def __init__(self, permc_spec=None, use_umfpack=True):
+        self.permc_spec = permc_spec
+        self.use_umfpack = use_umfpack and umfpack_installed
+        self.hits = 0
+        self.misses = 0
+        self._shape = None
+        self._indptr = None
+        self._indices = None
+        self._perm_c = None
+        self._umfpack = None
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset(self):
+        """
+        drops the cached analysis, e.g. if the topology changed
+        """
+        self._shape = self._indptr = self._indices = self._perm_c = self._umfpack = None
+
+    def solve(self, J, F):
+        J = J.tocsc()
+        J.sort_indices()
+        if self._pattern_changed(J):
+            self.misses += 1
+            self._analyze(J)
+        else:
+            self.hits += 1
+
+        if self.use_umfpack:
+            self._umfpack.numeric(J)
+            return self._umfpack.solve(UMFPACK_A, J, F, autoTranspose=True)
+
+        # factorize J * Pc with the cached column permutation Pc
+        lu = splu(J[:, self._perm_c], permc_spec="NATURAL")
+        dx = np.empty(J.shape[1], dtype=np.result_type(J.dtype, F.dtype))
+        dx[self._perm_c] = lu.solve(F)
+        return dx
+
+    def _pattern_changed(self, J):
+        return self._shape != J.shape or not np.array_equal(self._indptr, J.indptr) or \
+            not np.array_equal(self._indices, J.indices)
+
+    def _analyze(self, J):
+        self._shape = J.shape
+        self._indptr = J.indptr.copy()
+        self._indices = J.indices.copy()
+        if self.use_umfpack:
+            family = "dl" if J.indices.dtype == np.int64 else "di"
+            self._umfpack = UmfpackContext(family)
+            self._umfpack.symbolic(J)
+        else:
+            lu = splu(J, permc_spec=self.permc_spec or "COLAMD")
+            self._perm_c = np.argsort(lu.perm_c)
+
+
+LINEAR_SOLVERS = {"spsolve": SpsolveSolver, "cached": CachedFactorizationSolver}
+
+
+def _get_linear_solver(ppci, options):
+    """
+    Returns the linear solver for the Newton-Raphson power flow, depending on
+    options["linear_solver"]:
+
+        - "spsolve" (default) - scipy spsolve in every iteration
+        - "cached" - CachedFactorizationSolver, stored in ppci["internal"]["linear_solver"] so that
+          it is reused by recycled power flows and the following power flows of a time series
+        - an object with a method solve(J, F) that returns the solution of J * x = F
+    """
+    linear_solver = options.get("linear_solver", "spsolve")
+    permc_spec, use_umfpack = options.get("permc_spec", None), options.get("use_umfpack", True)
+    if not isinstance(linear_solver, str):
+        if not hasattr(linear_solver, "solve"):
+            raise ValueError("linear_solver must be one of %s or an object with a method solve(J, F)"
+                             % list(LINEAR_SOLVERS.keys()))
+        return linear_solver
+    if linear_solver not in LINEAR_SOLVERS:
+        raise ValueError("linear_solver %s is unknown, choose one of %s" % (
+            linear_solver, list(LINEAR_SOLVERS.keys())))
+    if linear_solver == "spsolve":
+        return SpsolveSolver(permc_spec=permc_spec, use_umfpack=use_umfpack)
+
+    solver = ppci["internal"].get("linear_solver", None)
+    if not isinstance(solver, LINEAR_SOLVERS[linear_solver]):
+        solver = LINEAR_SOLVERS[linear_solver](permc_spec=permc_spec, use_umfpack=use_umfpack)
+        ppci["internal"]["linear_solver"] = solver
+    return solver
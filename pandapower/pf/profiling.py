@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+import pandas as pd
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+# stages of the power flow that are timed with runpp(..., profile=True). The stages are nested:
+# "total" contains all others, "newtonpf" contains "jacobian" and "linear_solver".
+PROFILE_STAGES = ["init_options", "pd2ppc", "makeYbus", "makeSbus", "newtonpf", "jacobian",
+                  "linear_solver", "pfsoln", "extract_results", "total"]
+
+_NO_PROFILE = nullcontext()
+
+
+def new_profile():
+    return {"time_s": {}, "iterations": 0, "jacobian_nnz": 0, "linear_solver": None, "numba": None,
+            "algorithm": None, "recycle": None, "converged": False}
+
+
+def start_stage(profile):
+    """
+    returns the start time of a stage, None if the power flow is not profiled
+    """
+    return None if profile is None else perf_counter()
+
+
+def stop_stage(profile, stage, t0):
+    """
+    adds the time since t0 (from start_stage()) to the stage. Stages can be timed several times
+    per power flow, e.g. the Jacobian in every iteration.
+    """
+    if profile is None:
+        return
+    time_s = profile["time_s"]
+    time_s[stage] = time_s.get(stage, 0.) + perf_counter() - t0
+
+
+class _StageTimer:
+    def __init__(self, profile, stage):
+        self.profile = profile
+        self.stage = stage
+        self.t0 = None
+
+    def __enter__(self):
+        self.t0 = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        stop_stage(self.profile, self.stage, self.t0)
+        return False
+
+
+def profile_stage(profile, stage):
+    """
+    context manager that times a stage of the power flow. Does nothing if profile is None.
+    """
+    if profile is None:
+        return _NO_PROFILE
+    return _StageTimer(profile, stage)
+
+
+def _get_profile(options):
+    return options.get("profile", None) if isinstance(options, dict) else None
+
+
+@contextmanager
+def profile_run(net, profile=False):
+    """
+    Profiles one power flow if profile is True or if a PowerFlowProfiler is active for the net
+    (see pf_profiling()). The context yields the profile dict, which has to be stored in
+    net._options["profile"] so that the stages of the power flow are timed, or None.
+    At the end of the power flow, the profile is stored in net["_pf_profile"] and handed over to the
+    active PowerFlowProfiler.
+    """
+    profiler = net.get("_pf_profiler", None)
+    if not profile and profiler is None:
+        yield None
+        return
+    run_profile = new_profile()
+    t0 = perf_counter()
+    try:
+        yield run_profile
+    finally:
+        stop_stage(run_profile, "total", t0)
+        options = net.get("_options", {})
+        run_profile["converged"] = bool(net.get("converged", False))
+        run_profile["numba"] = options.get("numba", None)
+        run_profile["algorithm"] = options.get("algorithm", None)
+        run_profile["recycle"] = options.get("recycle", None)
+        if _get_profile(options) is run_profile:
+            # the profile dict must not be part of the options of the following power flows
+            options["profile"] = None
+        net["_pf_profile"] = run_profile
+        if profiler is not None:
+            profiler.add(run_profile)
+
+
+class PowerFlowProfiler:
+    """
+    Collects the profiles of several power flows, e.g. of a time series or a contingency analysis.
+    Use it with the context manager pf_profiling().
+    """
+
+    def __init__(self):
+        self.profiles = list()
+
+    def add(self, profile):
+        self.profiles.append(profile)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def summary(self):
+        """
+        OUTPUT:
+            **summary** (DataFrame) - number of power flows in which the stage was executed, total,
+            mean and maximum time per stage in seconds. The row "iterations" contains the Newton-
+            Raphson iterations.
+        """
+        stages = [s for s in PROFILE_STAGES if any(s in p["time_s"] for p in self.profiles)]
+        stages += sorted({s for p in self.profiles for s in p["time_s"]} - set(stages))
+        summary = pd.DataFrame(index=stages + ["iterations"], columns=["count", "total", "mean", "max"],
+                               dtype=float)
+        for stage in stages:
+            times = [p["time_s"][stage] for p in self.profiles if stage in p["time_s"]]
+            summary.loc[stage] = [len(times), sum(times), sum(times) / len(times), max(times)]
+        iterations = [p["iterations"] for p in self.profiles]
+        if len(iterations):
+            summary.loc["iterations"] = [len(iterations), sum(iterations), sum(iterations) / len(iterations),
+                                         max(iterations)]
+        return summary
+
+
+@contextmanager
+def pf_profiling(net):
+    """
+    Profiles all power flows that are run with the net within the context, e.g. by run_timeseries()
+    or run_contingency(). The profile of the last power flow is available in net["_pf_profile"].
+
+    EXAMPLE:
+        with pf_profiling(net) as profiler:
+            run_timeseries(net)
+        print(profiler.summary())
+    """
+    previous = net.get("_pf_profiler", None)
+    profiler = PowerFlowProfiler()
+    net["_pf_profiler"] = profiler
+    try:
+        yield profiler
+    finally:
+        if previous is None:
+            del net["_pf_profiler"]
+        else:
+            net["_pf_profiler"] = previous
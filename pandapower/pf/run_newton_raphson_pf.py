@@ -7,15 +7,19 @@
 from time import perf_counter
 
 from numpy import flatnonzero as find, r_, zeros, argmax, setdiff1d, union1d, any, int32, \
-    sum as np_sum, abs as np_abs, int64
+    sum as np_sum, abs as np_abs, int64, array_equal, hstack, real
+from scipy.sparse import csr_matrix
 
 from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci, _store_results_from_pf_in_ppci
+from pandapower.pf.profiling import start_stage, stop_stage, _get_profile
 from pandapower.pf.run_dc_pf import _run_dc_pf
 from pandapower.pypower.bustypes import bustypes
+from pandapower.pypower.idx_brch import F_BUS, T_BUS, BR_R, BR_X, BR_G, BR_B, TAP, SHIFT, BR_STATUS, \
+    BR_R_ASYM, BR_X_ASYM, BR_G_ASYM, BR_B_ASYM
 from pandapower.pypower.idx_bus import BUS_I, PD, QD, BUS_TYPE, PQ, PV, GS, BS, SL_FAC as SL_FAC_BUS
 from pandapower.pypower.idx_gen import PG, QG, QMAX, QMIN, GEN_BUS, GEN_STATUS, SL_FAC
 from pandapower.pypower.makeSbus import makeSbus
-from pandapower.pypower.makeYbus import makeYbus as makeYbus_pypower
+from pandapower.pypower.makeYbus import makeYbus as makeYbus_pypower, branch_vectors
 from pandapower.pypower.newtonpf import newtonpf
 from pandapower.pypower.pfsoln import _update_v
 from pandapower.pypower.pfsoln import pfsoln as pfsoln_pypower
@@ -60,7 +64,9 @@ def _run_newton_raphson_pf(ppci, options):
     else:
         ppci, success, iterations = _run_ac_pf_without_qlims_enforced(ppci, options)
         # update data matrices with solution store in ppci
+        t_pfsoln = start_stage(_get_profile(options))
         bus, gen, branch = ppci_to_pfsoln(ppci, options)
+        stop_stage(_get_profile(options), "pfsoln", t_pfsoln)
     et = perf_counter() - t0
     ppci = _store_results_from_pf_in_ppci(ppci, bus, gen, branch, success, iterations, et)
     return ppci
@@ -106,9 +112,14 @@ def ppci_to_pfsoln(ppci, options, limited_gens=None):
 
 def _get_Y_bus(ppci, options, makeYbus, baseMVA, bus, branch):
     recycle = options["recycle"]
+    internal = ppci["internal"]
 
-    if isinstance(recycle, dict) and not recycle["trafo"] and ppci["internal"]["Ybus"].size:
-        Ybus, Yf, Yt = ppci["internal"]['Ybus'], ppci["internal"]['Yf'], ppci["internal"]['Yt']
+    if isinstance(recycle, dict) and internal["Ybus"].size:
+        # the stored Ybus includes the admittances of the FACTS devices, which are added in newtonpf
+        Ybus = internal.get("Ybus_without_facts", internal["Ybus"])
+        Yf, Yt = internal['Yf'], internal['Yt']
+        if recycle["trafo"]:
+            Ybus, Yf, Yt = _update_Y_bus(Ybus, Yf, Yt, internal["branch"], makeYbus, baseMVA, bus, branch)
     else:
         # build admittance matrices
         Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
@@ -116,6 +127,40 @@ def _get_Y_bus(ppci, options, makeYbus, baseMVA, bus, branch):
     return ppci, Ybus, Yf, Yt
 
 
+def _update_Y_bus(Ybus, Yf, Yt, branch_old, makeYbus, baseMVA, bus, branch):
+    """
+    Updates the admittance matrices for the branches whose parameters (impedance, tap ratio, phase
+    shift) differ between branch_old and branch, e.g. because of tap changes in a time series with
+    recycle. The matrices are only rebuilt if the topology has changed.
+    """
+    if branch_old.shape != branch.shape or \
+            not array_equal(branch_old[:, [F_BUS, T_BUS, BR_STATUS]], branch[:, [F_BUS, T_BUS, BR_STATUS]]):
+        return makeYbus(baseMVA, bus, branch)
+
+    cols = [BR_R, BR_X, BR_G, BR_B, TAP, SHIFT, BR_R_ASYM, BR_X_ASYM, BR_G_ASYM, BR_B_ASYM]
+    changed = find(any(branch_old[:, cols] != branch[:, cols], axis=1))
+    if len(changed) == 0:
+        return Ybus, Yf, Yt
+
+    # difference of the branch admittances of the changed branches
+    n = len(changed)
+    Ytt_old, Yff_old, Yft_old, Ytf_old = branch_vectors(branch_old[changed], n)
+    Ytt, Yff, Yft, Ytf = branch_vectors(branch[changed], n)
+    f = real(branch[changed, F_BUS]).astype(int64)
+    t = real(branch[changed, T_BUS]).astype(int64)
+    nl, nb = Yf.shape
+
+    dYf = csr_matrix((hstack([Yff - Yff_old, Yft - Yft_old]), (hstack([changed, changed]), hstack([f, t]))),
+                     (nl, nb))
+    dYt = csr_matrix((hstack([Ytf - Ytf_old, Ytt - Ytt_old]), (hstack([changed, changed]), hstack([f, t]))),
+                     (nl, nb))
+    dYbus = csr_matrix((hstack([Yff - Yff_old, Yft - Yft_old, Ytf - Ytf_old, Ytt - Ytt_old]),
+                        (hstack([f, f, t, t]), hstack([f, t, f, t]))), (nb, nb))
+
+    # the sparsity pattern does not change, the changed branches are already part of the matrices
+    return Ybus + dYbus, Yf + dYf, Yt + dYt
+
+
 def _get_numba_functions(ppci, options):
     """
     pfsoln from pypower maybe slow in some cases. This function chooses the fastest for the given pf calculation
@@ -153,26 +198,41 @@ def _get_Sbus(ppci, recycle=None):
 
 def _run_ac_pf_without_qlims_enforced(ppci, options):
     makeYbus, pfsoln = _get_numba_functions(ppci, options)
+    profile = _get_profile(options)
 
     baseMVA, bus, gen, branch, svc, tcsc, ssc, vsc, ref, pv, pq, *_, V0, ref_gens = _get_pf_variables_from_ppci(ppci, True)
 
+    t0 = start_stage(profile)
     ppci, Ybus, Yf, Yt = _get_Y_bus(ppci, options, makeYbus, baseMVA, bus, branch)
+    stop_stage(profile, "makeYbus", t0)
 
     # compute complex bus power injections [generation - load]
+    t0 = start_stage(profile)
     Sbus = _get_Sbus(ppci, options["recycle"])
+    stop_stage(profile, "makeSbus", t0)
 
 
     # run the newton power flow
+    t0 = start_stage(profile)
     if options["lightsim2grid"]:
         V, success, iterations, J, Vm_it, Va_it = newton_ls(Ybus.tocsc(), Sbus, V0, ref, pv, pq, ppci, options)
         T = None
         r_theta_kelvin_per_mw = None
+        if profile is not None:
+            profile["linear_solver"] = "lightsim2grid"
     else:
         V, success, iterations, J, Vm_it, Va_it, r_theta_kelvin_per_mw, T = newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppci, options, makeYbus)
         # due to TPDF, SVC, TCSC, the Ybus matrices can be updated in the newtonpf and stored in ppci["internal"],
         # so we extract them here for later use:
         Ybus, Ybus_svc, Ybus_tcsc, Ybus_ssc, Ybus_vsc = (ppci["internal"].get(key) for key in ("Ybus", "Ybus_svc", "Ybus_tcsc", "Ybus_ssc", "Ybus_vsc"))
+        # the admittance matrix without the FACTS devices is kept for recycle
+        ppci["internal"]["Ybus_without_facts"] = Ybus
         Ybus = Ybus + Ybus_svc + Ybus_tcsc + Ybus_ssc + Ybus_vsc
+    stop_stage(profile, "newtonpf", t0)
+    if profile is not None:
+        # with enforce_q_lims, the power flow is repeated -> the iterations are summed up
+        profile["iterations"] += iterations
+        profile["jacobian_nnz"] = 0 if J is None else J.nnz
 
     # keep "internal" variables in  memory / net["_ppc"]["internal"] -> needed for recycle.
     ppci = _store_internal(ppci, {"J": J, "Vm_it": Vm_it, "Va_it": Va_it, "bus": bus, "gen": gen, "branch": branch,
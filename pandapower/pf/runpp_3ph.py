@@ -9,7 +9,7 @@ import numpy as np
 from pandapower.auxiliary import _sum_by_group, _check_if_numba_is_installed,\
     _check_bus_index_and_print_warning_if_high,\
     _check_gen_index_and_print_warning_if_high, \
-    _add_pf_options, _add_ppc_options, _clean_up, sequence_to_phase, \
+    _add_pf_options, _add_ppc_options, _clean_up, sequence_to_phase, _get_result_selection, \
     phase_to_sequence, X012_to_X0, X012_to_X2, \
     I1_from_V012, S_from_VI_elementwise, V1_from_ppc, V_from_I,\
     combine_X012, I0_from_V012, I2_from_V012
@@ -24,7 +24,7 @@ from pandapower.pf.run_newton_raphson_pf import _run_newton_raphson_pf
 from pandapower.pypower.bustypes import bustypes
 from pandapower.run import _passed_runpp_parameters
 from pandapower.results import _copy_results_ppci_to_ppc, _extract_results_3ph,\
-    init_results
+    init_results, _clear_pending_results
 try:
     import pandaplan.core.pplog as logging
 except ImportError:
@@ -315,6 +315,8 @@ def runpp_3ph(net, calculate_voltage_angles=True, init="auto",
 
             gen: If True Sbus and the gen table in the ppc are recalculated
 
+            trafo: If True the trafo parameters are updated and the admittance matrices are rebuilt
+
             Ybus: If True the admittance matrix (Ybus, Yf, Yt) is taken from
 
             ppc["internal"] and not reconstructed
@@ -325,6 +327,14 @@ def runpp_3ph(net, calculate_voltage_angles=True, init="auto",
         buses are created for branches when switches are opened at the branch.
         Instead branches are set out of service
 
+        **result_tables** (list, None) - result tables that are extracted
+        directly after the power flow, e.g. ["bus", "line"]. The other
+        results are extracted when their table is accessed for the first time
+        or with extract_pending_results(net) (see runpp)
+
+        **result_columns** (dict, None) - result columns that are needed,
+        e.g. {"bus": ["vm_a_pu", "vm_b_pu", "vm_c_pu"]} (see runpp)
+
     SEE ALSO:
          pp.add_zero_impedance_parameters(net):
          To add zero sequence parameters into network from the standard type
@@ -381,6 +391,7 @@ def runpp_3ph(net, calculate_voltage_angles=True, init="auto",
 
     neglect_open_switch_branches = kwargs.get("neglect_open_switch_branches", False)
     only_v_results = kwargs.get("only_v_results", False)
+    result_tables, result_columns = _get_result_selection(**kwargs)
     net._options = {}
     _add_ppc_options(net, calculate_voltage_angles=calculate_voltage_angles,
                      trafo_model=trafo_model, check_connectivity=check_connectivity,
@@ -393,7 +404,8 @@ def runpp_3ph(net, calculate_voltage_angles=True, init="auto",
     _add_pf_options(net, tolerance_mva=tolerance_mva, trafo_loading=trafo_loading,
                     numba=numba, ac=ac, algorithm="nr", max_iteration=max_iteration,
                     only_v_results=only_v_results, v_debug=v_debug, use_umfpack=use_umfpack,
-                    permc_spec=permc_spec, lightsim2grid=False)
+                    permc_spec=permc_spec, lightsim2grid=False, result_tables=result_tables,
+                    result_columns=result_columns)
     net._options.update(overrule_options)
     _check_bus_index_and_print_warning_if_high(net)
     _check_gen_index_and_print_warning_if_high(net)
@@ -412,6 +424,7 @@ def runpp_3ph(net, calculate_voltage_angles=True, init="auto",
     _,        bus2, gen2, branch2,      _,      _,      _ = _get_pf_variables_from_ppci(ppci2)
 
     # initialize the results after the conversion to ppc is done, otherwise init=results does not work
+    _clear_pending_results(net)
     init_results(net, "pf_3ph")
 
 # =============================================================================
@@ -585,7 +598,7 @@ def _current_from_voltage_results(y_0_pu, y_1_pu, v_012_pu):
 
 
 def _get_y_bus(ppci0, ppci1, ppci2, recycle):
-    if recycle and recycle["Ybus"] and ppci0["internal"]["Ybus"].size and \
+    if recycle and recycle["Ybus"] and not recycle.get("trafo", False) and ppci0["internal"]["Ybus"].size and \
             ppci1["internal"]["Ybus"].size and ppci2["internal"]["Ybus"].size:
         y_0_bus, y_0_f, y_0_t = ppci0["internal"]['Ybus'], ppci0["internal"]['Yf'], ppci0["internal"]['Yt']
         y_1_bus, y_1_f, y_1_t = ppci1["internal"]['Ybus'], ppci1["internal"]['Yf'], ppci1["internal"]['Yt']
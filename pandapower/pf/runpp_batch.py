@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.linalg import spsolve
+
+from pandapower.pf.pfsoln_numba import calc_branch_flows_batch
+from pandapower.pypower.idx_brch import F_BUS, T_BUS
+from pandapower.pypower.idx_bus import PD, QD, CID, CZD, BASE_KV
+from pandapower.run import runpp
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def runpp_batch(net, p_load=None, q_load=None, p_sgen=None, q_sgen=None, p_gen=None, batch_size=100,
+                **kwargs):
+    """
+    Runs a batch of AC power flows for many injection scenarios on the same topology.
+
+    The base case is solved with runpp to get the internal ppci, Ybus, Yf and Yt, which are then
+    reused for all scenarios. The Newton-Raphson iterations are carried out for many scenarios at
+    once: the mismatch is evaluated for all scenarios in one vectorized step and the Jacobians
+    of the scenarios are assembled into one block-diagonal matrix, which is solved in one call.
+    The results are not written to the res_* tables but returned as dense arrays.
+
+    INPUT:
+        **net** - The pandapower format network
+
+    OPTIONAL:
+        **p_load** (array-like, None) - active power of the loads in MW with shape
+        (n_scenarios, len(net.load)). If None, net.load.p_mw is used for all scenarios.
+
+        **q_load** (array-like, None) - reactive power of the loads in MVar, same shape as p_load
+
+        **p_sgen** (array-like, None) - active power of the static generators in MW with shape
+        (n_scenarios, len(net.sgen))
+
+        **q_sgen** (array-like, None) - reactive power of the static generators in MVar
+
+        **p_gen** (array-like, None) - active power of the generators in MW with shape
+        (n_scenarios, len(net.gen))
+
+        **batch_size** (int, 100) - number of scenarios that are solved in one block-diagonal
+        linear system. Limits the memory usage for a large number of scenarios.
+
+        **kwargs** - power flow options that are passed to runpp for the base case (e.g.
+        tolerance_mva, max_iteration, voltage_depend_loads). distributed_slack, enforce_q_lims,
+        tdpf and FACTS devices are not supported.
+
+    OUTPUT:
+        **results** (dict) - dense result arrays with one row per scenario. The keys follow the
+        naming of the OutputWriter ("res_bus.vm_pu", "res_line.loading_percent", ...) and the
+        columns are in the order of the element tables. Additionally, "converged" and
+        "iterations" contain the convergence information per scenario.
+
+    EXAMPLE:
+        import numpy as np
+        import pandapower.networks as nw
+        net = nw.example_simple()
+        p_load = net.load.p_mw.values * np.random.uniform(0.5, 1.5, (1000, len(net.load)))
+        res = pp.runpp_batch(net, p_load=p_load)
+        res["res_bus.vm_pu"]
+    """
+    # the base case initializes the options, the lookups and the internal ppci
+    runpp(net, **kwargs)
+    options = net["_options"]
+    _check_batch_options(net, options)
+
+    internal = net["_ppc"]["internal"]
+    baseMVA = internal["baseMVA"]
+    Ybus = internal["Ybus"].tocsr()
+    ref, pv, pq = internal["ref"], internal["pv"], internal["pq"]
+    V0 = internal["V"]
+
+    injections = {("load", "p_mw"): p_load, ("load", "q_mvar"): q_load, ("sgen", "p_mw"): p_sgen,
+                  ("sgen", "q_mvar"): q_sgen, ("gen", "p_mw"): p_gen}
+    n_scenarios = _get_number_of_scenarios(net, injections)
+
+    S_load, S_gen = _get_base_injections(internal, options["voltage_depend_loads"])
+    dS_load, dS_gen = _get_injection_deltas(net, injections, n_scenarios, len(V0), baseMVA)
+
+    # the pattern of the Jacobian is the same for all scenarios and is therefore computed once
+    jac_pattern = _JacobianPattern(Ybus, pv, pq)
+
+    V = np.empty((n_scenarios, len(V0)), dtype=np.complex128)
+    converged = np.zeros(n_scenarios, dtype=bool)
+    iterations = np.zeros(n_scenarios, dtype=np.int64)
+    for start in range(0, n_scenarios, max(int(batch_size), 1)):
+        sl = slice(start, min(start + int(batch_size), n_scenarios))
+        V[sl], converged[sl], iterations[sl] = _newtonpf_batch(
+            Ybus, S_load + dS_load[sl], S_gen + dS_gen[sl], V0, ref, pv, pq, jac_pattern,
+            options, internal["bus"])
+
+    if not np.all(converged):
+        logger.warning("Power flow did not converge for %i of %i scenarios" % (
+            np.sum(~converged), n_scenarios))
+
+    results = _get_batch_results(net, V)
+    results["converged"] = converged
+    results["iterations"] = iterations
+    return results
+
+
+def _check_batch_options(net, options):
+    if options["algorithm"] != "nr":
+        raise NotImplementedError("runpp_batch is only available for algorithm 'nr'")
+    for option in ["distributed_slack", "enforce_q_lims", "tdpf"]:
+        if options.get(option, False):
+            raise NotImplementedError("runpp_batch does not support the option %s" % option)
+    ppci_facts = [key for key in ["svc", "tcsc", "ssc", "vsc"] if len(net["_ppc"][key])]
+    if len(ppci_facts):
+        raise NotImplementedError("runpp_batch does not support the elements %s" % ppci_facts)
+
+
+def _get_number_of_scenarios(net, injections):
+    n_scenarios = None
+    for (element, column), values in injections.items():
+        if values is None:
+            continue
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        if values.shape[1] != len(net[element]):
+            raise ValueError("The %s.%s values must have one column for each element in net.%s, "
+                             "got shape %s" % (element, column, element, values.shape))
+        if n_scenarios is not None and values.shape[0] != n_scenarios:
+            raise ValueError("All injection arrays must have the same number of scenarios (rows)")
+        n_scenarios = values.shape[0]
+    if n_scenarios is None:
+        raise ValueError("At least one of p_load, q_load, p_sgen, q_sgen, p_gen must be given")
+    return n_scenarios
+
+
+def _get_base_injections(internal, voltage_depend_loads):
+    # Sbus = S_gen - S_load, with S_load also containing the sgens (as in makeSbus)
+    bus = internal["bus"]
+    S_load = (bus[:, PD] + 1j * bus[:, QD]) / internal["baseMVA"]
+    S_gen = internal["Sbus"] + S_load
+    if not voltage_depend_loads:
+        return np.zeros_like(S_load), internal["Sbus"].copy()
+    return S_load, S_gen
+
+
+def _get_injection_deltas(net, injections, n_scenarios, n_bus, baseMVA):
+    """
+    Maps the injection changes of all scenarios to the ppci buses with a sparse incidence matrix.
+    Loads and sgens are considered in the load part, gens in the generation part of Sbus.
+    """
+    bus_lookup = net["_pd2ppc_lookups"]["bus"]
+    dS_load = np.zeros((n_scenarios, n_bus), dtype=np.complex128)
+    dS_gen = np.zeros((n_scenarios, n_bus), dtype=np.complex128)
+    for (element, column), values in injections.items():
+        if values is None:
+            continue
+        tab = net[element]
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        active = net["_is_elements"][element]
+        scaling = tab["scaling"].values[active] if "scaling" in tab.columns else 1.
+        sign = -1. if element == "sgen" else 1.
+        bus = bus_lookup[tab["bus"].values[active]]
+        C = coo_matrix((np.ones(len(bus)), (np.arange(len(bus)), bus)),
+                       shape=(len(bus), n_bus)).tocsr()
+        delta = (values[:, active] - tab[column].values[active]) * scaling / baseMVA
+        delta = delta @ C
+        if column == "q_mvar":
+            delta = delta * 1j
+        if element == "gen":
+            dS_gen += delta
+        else:
+            dS_load += delta * sign
+    return dS_load, dS_gen
+
+
+class _JacobianPattern:
+    """
+    Sparsity pattern of the Newton-Raphson Jacobian derived from the Ybus pattern. It contains the
+    index arrays to gather the Jacobian entries of all scenarios from dS_dVa and dS_dVm in one
+    step and to assemble the block-diagonal Jacobian of a batch of scenarios.
+    """
+
+    def __init__(self, Ybus, pv, pq):
+        n = Ybus.shape[0]
+        pvpq = np.r_[pv, pq]
+        self.Ybus = Ybus
+        self.pvpq, self.pq = pvpq, pq
+        self.dim = len(pvpq) + len(pq)
+
+        # Ybus pattern with explicit diagonal entries (needed for dS_dV)
+        Y = Ybus.tocoo()
+        Y = coo_matrix((np.r_[Y.data, np.zeros(n)], (np.r_[Y.row, np.arange(n)], np.r_[Y.col, np.arange(n)])),
+                       shape=(n, n)).tocsr()
+        Y.sum_duplicates()
+        self.y = Y.data
+        self.rows = np.repeat(np.arange(n), np.diff(Y.indptr))
+        self.cols = Y.indices
+        self.is_diag = self.rows == self.cols
+
+        pvpq_pos = np.full(n, -1, dtype=np.int64)
+        pvpq_pos[pvpq] = np.arange(len(pvpq))
+        pq_pos = np.full(n, -1, dtype=np.int64)
+        pq_pos[pq] = np.arange(len(pq))
+        npvpq = len(pvpq)
+
+        # J11 = dP/dVa, J12 = dP/dVm, J21 = dQ/dVa, J22 = dQ/dVm
+        blocks = [(pvpq_pos, 0, pvpq_pos, 0, "va", "real"), (pvpq_pos, 0, pq_pos, npvpq, "vm", "real"),
+                  (pq_pos, npvpq, pvpq_pos, 0, "va", "imag"), (pq_pos, npvpq, pq_pos, npvpq, "vm", "imag")]
+        j_rows, j_cols, self.gather = [], [], []
+        for row_pos, row_offset, col_pos, col_offset, derivative, part in blocks:
+            entries = np.flatnonzero((row_pos[self.rows] >= 0) & (col_pos[self.cols] >= 0))
+            j_rows.append(row_pos[self.rows[entries]] + row_offset)
+            j_cols.append(col_pos[self.cols[entries]] + col_offset)
+            self.gather.append((entries, derivative, part))
+        j_rows, j_cols = np.concatenate(j_rows), np.concatenate(j_cols)
+
+        # permutation from the gathered entries to the CSR data order of one Jacobian block
+        J = csr_matrix((np.arange(len(j_rows), dtype=np.float64) + 1, (j_rows, j_cols)), shape=(self.dim, self.dim))
+        self.perm = J.data.astype(np.int64) - 1
+        self.indices = J.indices
+        self.indptr = J.indptr
+
+    def block_diagonal_jacobian(self, V):
+        """
+        Jacobians of all scenarios in V (n_scenarios x n_bus) as one block-diagonal CSR matrix
+        """
+        n_scenarios = V.shape[0]
+        Vnorm = V / np.abs(V)
+        Ibus = self._ybus_dot(V)
+        r, c, y = self.rows, self.cols, self.y
+        # dS_dVa and dS_dVm on the Ybus pattern (see dSbus_dV)
+        dS_dVa = 1j * V[:, r] * np.conj(-y * V[:, c])
+        dS_dVm = V[:, r] * np.conj(y * Vnorm[:, c])
+        dS_dVa[:, self.is_diag] += 1j * V[:, r[self.is_diag]] * np.conj(Ibus[:, r[self.is_diag]])
+        dS_dVm[:, self.is_diag] += np.conj(Ibus[:, r[self.is_diag]]) * Vnorm[:, r[self.is_diag]]
+
+        values = []
+        for entries, derivative, part in self.gather:
+            dS = dS_dVa if derivative == "va" else dS_dVm
+            values.append(dS[:, entries].real if part == "real" else dS[:, entries].imag)
+        data = np.concatenate(values, axis=1)[:, self.perm]
+
+        nnz = len(self.perm)
+        offsets = np.arange(n_scenarios, dtype=np.int64)
+        indices = (self.indices[np.newaxis, :] + (offsets * self.dim)[:, np.newaxis]).ravel()
+        indptr = np.r_[(self.indptr[np.newaxis, :-1] + (offsets * nnz)[:, np.newaxis]).ravel(), n_scenarios * nnz]
+        dim = n_scenarios * self.dim
+        return csr_matrix((data.ravel(), indices, indptr), shape=(dim, dim))
+
+    def _ybus_dot(self, V):
+        # Ibus = Ybus * V for all scenarios
+        return (self.Ybus @ V.T).T
+
+    def mismatch(self, V, Sbus):
+        mis = V * np.conj(self._ybus_dot(V)) - Sbus
+        return np.hstack([mis[:, self.pvpq].real, mis[:, self.pq].imag])
+
+
+def _get_Sbus_batch(S_load, S_gen, bus, Vm, voltage_depend_loads):
+    if not voltage_depend_loads:
+        return S_gen - S_load
+    ci = bus[:, CID]
+    cz = bus[:, CZD]
+    return S_gen - S_load * ((1 - ci - cz) + ci * Vm + cz * Vm ** 2)
+
+
+def _newtonpf_batch(Ybus, S_load, S_gen, V0, ref, pv, pq, jac_pattern, options, bus):
+    """
+    Newton-Raphson power flow for a batch of scenarios. Only the scenarios that have not converged
+    yet are considered in each iteration.
+    """
+    tol = options["tolerance_mva"]
+    max_it = options["max_iteration"]
+    voltage_depend_loads = options["voltage_depend_loads"]
+    n_scenarios = S_load.shape[0]
+    npvpq = len(pv) + len(pq)
+    pvpq = np.r_[pv, pq]
+
+    V = np.tile(V0, (n_scenarios, 1))
+    Va, Vm = np.angle(V), np.abs(V)
+    iterations = np.zeros(n_scenarios, dtype=np.int64)
+
+    Sbus = _get_Sbus_batch(S_load, S_gen, bus, Vm, voltage_depend_loads)
+    F = jac_pattern.mismatch(V, Sbus)
+    converged = np.max(np.abs(F), axis=1, initial=0.) < tol
+    i = 0
+    while not np.all(converged) and i < max_it:
+        i += 1
+        active = np.flatnonzero(~converged)
+        iterations[active] = i
+
+        J = jac_pattern.block_diagonal_jacobian(V[active])
+        dx = -1 * spsolve(J, F[active].ravel(), permc_spec=options["permc_spec"],
+                          use_umfpack=options["use_umfpack"])
+        dx = dx.reshape(len(active), -1)
+
+        Va[np.ix_(active, pvpq)] += dx[:, :npvpq]
+        Vm[np.ix_(active, pq)] += dx[:, npvpq:]
+        V[active] = Vm[active] * np.exp(1j * Va[active])
+        Vm[active] = np.abs(V[active])
+        Va[active] = np.angle(V[active])
+
+        Sbus_active = _get_Sbus_batch(S_load[active], S_gen[active], bus, Vm[active], voltage_depend_loads)
+        F[active] = jac_pattern.mismatch(V[active], Sbus_active)
+        converged[active] = np.max(np.abs(F[active]), axis=1, initial=0.) < tol
+
+    return V, converged, iterations
+
+
+def _get_batch_results(net, V):
+    # lazy import to avoid a circular import of the timeseries module
+    from pandapower.timeseries.read_batch_results import get_batch_line_results, get_batch_trafo_results, \
+        get_batch_trafo3w_results, _get_empty_branch
+
+    ppc = net["_ppc"]
+    internal = ppc["internal"]
+    n_scenarios, n_bus_ppci = V.shape
+
+    # bus results in the order of net.bus, buses that are not in the ppci are nan
+    bus_idx = net["_pd2ppc_lookups"]["bus"][net.bus.index.values]
+    in_ppci = (bus_idx >= 0) & (bus_idx < n_bus_ppci)
+    vm = np.full((n_scenarios, len(net.bus)), np.nan)
+    va = np.full((n_scenarios, len(net.bus)), np.nan)
+    vm[:, in_ppci] = np.abs(V[:, bus_idx[in_ppci]])
+    va[:, in_ppci] = np.rad2deg(np.angle(V[:, bus_idx[in_ppci]]))
+    results = {"res_bus.vm_pu": vm, "res_bus.va_degree": va}
+
+    # branch flows for the ppci branches, copied to ppc shaped arrays afterwards
+    Yf, Yt = internal["Yf"], internal["Yt"]
+    branch = internal["branch"]
+    base_kv = internal["bus"][:, BASE_KV]
+    f_bus = np.real(branch[:, F_BUS]).astype(np.int64)
+    t_bus = np.real(branch[:, T_BUS]).astype(np.int64)
+    baseMVA = internal["baseMVA"]
+    Sb_f, sf_abs, if_abs = calc_branch_flows_batch(Yf.data, Yf.indptr, Yf.indices, V, baseMVA, Yf.shape[0],
+                                                   f_bus, base_kv)
+    Sb_t, st_abs, it_abs = calc_branch_flows_batch(Yt.data, Yt.indptr, Yt.indices, V, baseMVA, Yt.shape[0],
+                                                   t_bus, base_kv)
+    sb_f, sb_t, s_f_abs, s_t_abs, i_f_abs, i_t_abs = _get_empty_branch((n_scenarios, ppc["branch"].shape[0]))
+    in_service = internal["branch_is"]
+    for ppc_array, ppci_array in zip([sb_f, sb_t, s_f_abs, s_t_abs, i_f_abs, i_t_abs],
+                                     [Sb_f, Sb_t, sf_abs, st_abs, if_abs, it_abs]):
+        ppc_array[:, in_service] = ppci_array
+    i_abs, s_abs = (i_f_abs, i_t_abs), (s_f_abs, s_t_abs)
+
+    lookup = net["_pd2ppc_lookups"]["branch"]
+    if "line" in lookup:
+        f, t = lookup["line"]
+        i_ka, i_from_ka, i_to_ka, loading_percent = get_batch_line_results(net, i_abs)
+        results.update({"res_line.p_from_mw": sb_f[:, f:t].real, "res_line.q_from_mvar": sb_f[:, f:t].imag,
+                        "res_line.p_to_mw": sb_t[:, f:t].real, "res_line.q_to_mvar": sb_t[:, f:t].imag,
+                        "res_line.i_ka": i_ka, "res_line.i_from_ka": i_from_ka, "res_line.i_to_ka": i_to_ka,
+                        "res_line.loading_percent": loading_percent})
+    if "trafo" in lookup:
+        f, t = lookup["trafo"]
+        i_ka, i_hv_ka, i_lv_ka, s_mva, loading_percent = get_batch_trafo_results(net, i_abs, s_abs)
+        results.update({"res_trafo.p_hv_mw": sb_f[:, f:t].real, "res_trafo.q_hv_mvar": sb_f[:, f:t].imag,
+                        "res_trafo.p_lv_mw": sb_t[:, f:t].real, "res_trafo.q_lv_mvar": sb_t[:, f:t].imag,
+                        "res_trafo.i_hv_ka": i_hv_ka, "res_trafo.i_lv_ka": i_lv_ka,
+                        "res_trafo.loading_percent": loading_percent})
+    if "trafo3w" in lookup:
+        i_h, i_m, i_l, loading_percent = get_batch_trafo3w_results(net, i_abs, s_abs)
+        results.update({"res_trafo3w.i_hv_ka": i_h, "res_trafo3w.i_mv_ka": i_m, "res_trafo3w.i_lv_ka": i_l,
+                        "res_trafo3w.loading_percent": loading_percent})
+    return results
@@ -6,10 +6,13 @@
 from numpy import nan_to_num, array, allclose, int64
 
 from pandapower.auxiliary import LoadflowNotConverged, AlgorithmUnknown, _clean_up, _add_auxiliary_elements
-from pandapower.build_branch import _calc_trafo_parameter, _calc_trafo3w_parameter
 from pandapower.build_gen import _build_gen_ppc
-from pandapower.pd2ppc import _pd2ppc, _calc_pq_elements_and_add_on_ppc, _ppc2ppci
+from pandapower.pf.change_tracking import get_recycle_from_changes, store_change_tracking_snapshot, \
+    clear_change_tracking_snapshot
+from pandapower.pd2ppc import _pd2ppc, _calc_pq_elements_and_add_on_ppc, _ppc2ppci, _update_trafo_ppc, \
+    _update_facts_ppc
 from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci
+from pandapower.pf.profiling import profile_stage, _get_profile
 from pandapower.pf.run_bfswpf import _run_bfswpf
 from pandapower.pf.run_dc_pf import _run_dc_pf
 from pandapower.pf.run_newton_raphson_pf import _run_newton_raphson_pf
@@ -19,7 +22,7 @@ from pandapower.pypower.idx_bus import VM
 from pandapower.pypower.makeYbus import makeYbus as makeYbus_pypower
 from pandapower.pypower.pfsoln import pfsoln as pfsoln_pypower
 from pandapower.results import _extract_results, _copy_results_ppci_to_ppc, init_results, \
-    verify_results, _ppci_bus_to_ppc, _ppci_other_to_ppc
+    verify_results, _ppci_bus_to_ppc, _ppci_other_to_ppc, _clear_pending_results
 
 try:
     import pandaplan.core.pplog as logging
@@ -40,6 +43,8 @@ def _powerflow(net, **kwargs):
 
     net["converged"] = False
     net["OPF_converged"] = False
+    # results that are still pending from the last power flow are outdated
+    _clear_pending_results(net)
     _add_auxiliary_elements(net)  # create gen elements for start and end buses of dcline
 
     if not ac or net["_options"]["init_results"]:
@@ -58,8 +63,14 @@ def _powerflow(net, **kwargs):
                            "ext_grid": array([], dtype=int64), "gen": array([], dtype=int64),
                            "branch": array([], dtype=int64), "branch_dc": array([], dtype=int64)}
 
+    # the cached analysis of the linear solver stays valid as long as the Jacobian pattern is unchanged
+    linear_solver = _get_stored_linear_solver(net)
+
     # convert pandapower net to ppc
-    ppc, ppci = _pd2ppc(net, **kwargs)
+    with profile_stage(_get_profile(net["_options"]), "pd2ppc"):
+        ppc, ppci = _pd2ppc(net, **kwargs)
+    if linear_solver is not None:
+        ppci["internal"]["linear_solver"] = linear_solver
 
     # store variables
     net["_ppc"] = ppc
@@ -73,7 +84,37 @@ def _powerflow(net, **kwargs):
     _ppci_to_net(result, net)
 
 
+def _get_stored_linear_solver(net):
+    ppc = net.get("_ppc", None)
+    if not isinstance(ppc, dict) or "internal" not in ppc:
+        return None
+    return ppc["internal"].get("linear_solver", None)
+
+
+def _auto_recycled_powerflow(net, **kwargs):
+    """
+    Power flow with recycle="auto": the element tables are compared with the state of the last
+    power flow with recycle="auto". Depending on the changed columns, the ppc is rebuilt, only the
+    changed parts (injections, gens, trafo taps, FACTS setpoints) are updated or reused as it is.
+    """
+    snapshot = net.get("_change_tracking", None)
+    recycle, changed = get_recycle_from_changes(net)
+    clear_change_tracking_snapshot(net)
+    if recycle is None:
+        kwargs["recycle"] = None
+        net["_options"]["recycle"] = None
+        _powerflow(net, **kwargs)
+        store_change_tracking_snapshot(net)
+    else:
+        kwargs["recycle"] = recycle
+        _recycled_powerflow(net, **kwargs)
+        store_change_tracking_snapshot(net, snapshot, changed)
+
+
 def _recycled_powerflow(net, **kwargs):
+    # the snapshot of the auto recycle does not match the ppc anymore if it is updated from outside
+    clear_change_tracking_snapshot(net)
+    _clear_pending_results(net)
     options = net["_options"]
     options["recycle"] = kwargs.get("recycle", None)
     options["init_vm_pu"] = "results"
@@ -96,24 +137,25 @@ def _recycled_powerflow(net, **kwargs):
     ppc["iterations"] = 0.
     ppc["et"] = 0.
 
-    if "bus_pq" in recycle and recycle["bus_pq"]:
-        # update pq values in bus
-        _calc_pq_elements_and_add_on_ppc(net, ppc)
+    with profile_stage(_get_profile(options), "pd2ppc"):
+        if "bus_pq" in recycle and recycle["bus_pq"]:
+            # update pq values in bus
+            _calc_pq_elements_and_add_on_ppc(net, ppc)
 
-    if "trafo" in recycle and recycle["trafo"]:
-        # update trafo in branch and Ybus
-        lookup = net._pd2ppc_lookups["branch"]
-        if "trafo" in lookup:
-            _calc_trafo_parameter(net, ppc,)
-        if "trafo3w" in lookup:
-            _calc_trafo3w_parameter(net, ppc)
+        if "trafo" in recycle and recycle["trafo"]:
+            # update trafo in branch, the Ybus is updated for the changed branches only
+            _update_trafo_ppc(net, ppc)
 
-    if "gen" in recycle and recycle["gen"]:
-        # updates the ppc["gen"] part
-        _build_gen_ppc(net, ppc)
-        ppc["gen"] = nan_to_num(ppc["gen"])
+        if recycle.get("facts", False):
+            # update the setpoints of SVC, TCSC, SSC and VSC
+            _update_facts_ppc(net, ppc)
 
-    ppci = _ppc2ppci(ppc, net, ppci=ppci)
+        if "gen" in recycle and recycle["gen"]:
+            # updates the ppc["gen"] part
+            _build_gen_ppc(net, ppc)
+            ppc["gen"] = nan_to_num(ppc["gen"])
+
+        ppci = _ppc2ppci(ppc, net, ppci=ppci)
     ppci["internal"] = net["_ppc"]["internal"]
     net["_ppc"] = ppc
 
@@ -163,7 +205,11 @@ def _run_pf_algorithm(ppci, options, **kwargs):
 
 def _ppci_to_net(result, net):
     # reads the results from result (== ppci with results) to pandapower net
+    with profile_stage(_get_profile(net["_options"]), "extract_results"):
+        _ppci_results_to_net(result, net)
+
 
+def _ppci_results_to_net(result, net):
     mode = net["_options"]["mode"]
     # ppci doesn't contain out of service elements, but ppc does -> copy results accordingly
     ppc = net["_ppc"]
@@ -16,10 +16,11 @@ from numpy import float64, array, angle, sqrt, square, exp, linalg, conj, r_, in
 from pandapower.pypower.bustypes import bustypes_dc
 from pandapower.pypower.idx_brch_dc import DC_BR_R, DC_PF, DC_IF, DC_PT, DC_IT, DC_BR_STATUS, DC_F_BUS, DC_T_BUS
 from scipy.sparse import csr_matrix, eye, vstack
-from scipy.sparse.linalg import spsolve
 
 from pandapower.auxiliary import _sum_by_group
 from pandapower.pf.iwamoto_multiplier import _iwamoto_step
+from pandapower.pf.linear_solver import _get_linear_solver
+from pandapower.pf.profiling import start_stage, stop_stage, _get_profile
 from pandapower.pf.makeYbus_facts import makeYbus_svc, makeYft_tcsc, calc_y_svc_pu, \
     makeYbus_ssc_vsc, make_Ybus_facts, make_Yft_facts
 from pandapower.pypower.idx_bus_dc import DC_PD, DC_VM, DC_BUS_TYPE, DC_NONE, DC_BUS_I, DC_REF, DC_P
@@ -74,8 +75,8 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppci, options, makeYbus=None):
     voltage_depend_loads = options["voltage_depend_loads"]
     dist_slack = options["distributed_slack"]
     v_debug = options["v_debug"]
-    use_umfpack = options["use_umfpack"]
-    permc_spec = options["permc_spec"]
+    linear_solver = _get_linear_solver(ppci, options)
+    profile = _get_profile(options)
 
     baseMVA = ppci['baseMVA']
     bus = ppci['bus']
@@ -397,6 +398,7 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppci, options, makeYbus=None):
             Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
             g, b = calc_g_b(r, x)
 
+        t_jacobian = start_stage(profile)
         # todo: adjust the SSC J function to take care about the Ybus_ssc_not_controllable instead
         J = create_jacobian_matrix(Ybus+Ybus_ssc_not_controllable+Ybus_vsc_not_controllable, V, ref, refpvpq, pvpq, pq, createJ, pvpq_lookup, nref, npv, npq, numba, slack_weights, dist_slack)
 
@@ -438,7 +440,11 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppci, options, makeYbus=None):
                                                   dc_p_lookup, vsc_dc_fb, vsc_dc_tb, vsc_dc_mode_v, vsc_dc_mode_p)
             J = J + J_m_hvdc
 
-        dx = -1 * spsolve(J, F, permc_spec=permc_spec, use_umfpack=use_umfpack)
+        stop_stage(profile, "jacobian", t_jacobian)
+
+        t_solve = start_stage(profile)
+        dx = -1 * linear_solver.solve(J, F)
+        stop_stage(profile, "linear_solver", t_solve)
         # update voltage
         if dist_slack:
             slack = slack + dx[j0:j1]
@@ -603,6 +609,8 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppci, options, makeYbus=None):
     # ppci["internal"]["Yt_tcsc"] = Yt_tcsc
     ppci["internal"]["tcsc_fb"] = tcsc_fb
     ppci["internal"]["tcsc_tb"] = tcsc_tb
+    if profile is not None:
+        profile["linear_solver"] = type(linear_solver).__name__
 
     return V, converged, i, J, Vm_it, Va_it, r_theta_pu / baseMVA * T_base, T * T_base
 
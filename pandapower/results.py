@@ -7,12 +7,22 @@
 import numpy as np
 import pandas as pd
 
-from pandapower.results_branch import _get_branch_results, _get_branch_results_3ph
+from pandapower.auxiliary import _set_pending_results
+from pandapower.pf.change_tracking import IGNORED_COLUMNS, _table_snapshot, _values_equal
+from pandapower.results_branch import _get_branch_results, _get_branch_results_3ph, _get_branch_flows, \
+    _get_xward_branch_results, _get_element_branch_results, BRANCH_RESULT_ELEMENTS
 from pandapower.results_bus import _get_bus_results, _get_bus_dc_results, _set_buses_out_of_service, \
     _get_shunt_results, _get_p_q_results, _get_bus_v_results, _get_bus_v_results_3ph, _get_p_q_results_3ph, \
     _get_bus_results_3ph, _get_bus_dc_v_results, _get_p_dc_results, _set_dc_buses_out_of_service
 from pandapower.results_gen import _get_gen_results, _get_gen_results_3ph, _get_dc_slack_results
 
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
 BRANCH_RESULTS_KEYS = ("branch_ikss_f", "branch_ikss_t",
                        "branch_ikss_angle_f", "branch_ikss_angle_t",
                        "branch_pkss_f", "branch_pkss_t",
@@ -25,25 +35,42 @@ BRANCH_RESULTS_KEYS = ("branch_ikss_f", "branch_ikss_t",
 suffix_mode = {"sc": "sc", "se": "est", "pf_3ph": "3ph"}
 
 
+# result tables that are written together with the bus power injections (res_bus p_mw, q_mvar)
+INJECTION_RESULT_ELEMENTS = {
+    "pf": ("load", "motor", "sgen", "storage", "ward", "xward", "asymmetric_load", "asymmetric_sgen",
+           "shunt", "svc", "ssc", "vsc", "ext_grid", "gen", "dcline", "bus_dc"),
+    "pf_3ph": ("load", "sgen", "storage", "asymmetric_load", "asymmetric_sgen", "ext_grid")}
+BRANCH_RESULT_ELEMENTS_3PH = ("line", "trafo")
+# columns of the bus results that do not need the results of the injection elements
+BUS_VOLTAGE_COLUMNS = {"pf": ("vm_pu", "va_degree"),
+                       "pf_3ph": ("vm_a_pu", "va_a_degree", "vm_b_pu", "va_b_degree", "vm_c_pu",
+                                  "va_c_degree", "unbalance_percent")}
+
+
 def _extract_results(net, ppc):
     _set_buses_out_of_service(ppc)  # for NaN results in net.res_bus for inactive buses
     _set_dc_buses_out_of_service(ppc)  # for NaN results in net.res_bus_dc for inactive buses
-    bus_lookup_aranged = _get_aranged_lookup(net)
-    bus_dc_lookup_aranged = _get_aranged_lookup(net, "bus_dc")
     _get_bus_v_results(net, ppc)
     _get_bus_dc_v_results(net, ppc)
+    for group in _defer_result_groups(net, "pf", (ppc,)):
+        _extract_result_group(net, "pf", group, (ppc,))
+    if net._options["mode"] == "opf":
+        _get_costs(net, ppc)
+    else:
+        _remove_costs(net)
+
+
+def _extract_injection_results(net, ppc):
+    bus_lookup_aranged = _get_aranged_lookup(net)
+    bus_dc_lookup_aranged = _get_aranged_lookup(net, "bus_dc")
     bus_pq = _get_p_q_results(net, ppc, bus_lookup_aranged)
     _get_shunt_results(net, ppc, bus_lookup_aranged, bus_pq)
-    _get_branch_results(net, ppc, bus_lookup_aranged, bus_pq)
+    _get_xward_branch_results(net, ppc, bus_lookup_aranged, bus_pq)
     _get_gen_results(net, ppc, bus_lookup_aranged, bus_pq)
     _get_bus_results(net, ppc, bus_pq)
     bus_p_dc = _get_p_dc_results(net, ppc, bus_dc_lookup_aranged)
     # _get_dc_slack_results(net, ppc, bus_dc_lookup_aranged, bus_p_dc)
     _get_bus_dc_results(net, bus_p_dc)
-    if net._options["mode"] == "opf":
-        _get_costs(net, ppc)
-    else:
-        _remove_costs(net)
 
 
 def _extract_results_3ph(net, ppc0, ppc1, ppc2):
@@ -51,16 +78,173 @@ def _extract_results_3ph(net, ppc0, ppc1, ppc2):
     _set_buses_out_of_service(ppc0)
     _set_buses_out_of_service(ppc1)
     _set_buses_out_of_service(ppc2)
-    bus_lookup_aranged = _get_aranged_lookup(net)
 
     _get_bus_v_results_3ph(net, ppc0, ppc1, ppc2)
+    for group in _defer_result_groups(net, "pf_3ph", (ppc0, ppc1, ppc2)):
+        _extract_result_group(net, "pf_3ph", group, (ppc0, ppc1, ppc2))
+
+
+def _extract_injection_results_3ph(net, ppc0, ppc1, ppc2):
+    bus_lookup_aranged = _get_aranged_lookup(net)
     bus_pq = _get_p_q_results_3ph(net, bus_lookup_aranged)
     # _get_shunt_results(net, ppc, bus_lookup_aranged, bus_pq)
-    _get_branch_results_3ph(net, ppc0, ppc1, ppc2, bus_lookup_aranged, bus_pq)
     _get_gen_results_3ph(net, ppc0, ppc1, ppc2, bus_lookup_aranged, bus_pq)
     _get_bus_results_3ph(net, bus_pq)
 
 
+def _extract_result_group(net, mode, group, ppcs):
+    """
+    Writes the results of a group of result tables: "injections" (all elements that are summed up to the
+    bus powers, and the bus powers) or the branch results ("branch" for pf_3ph, e.g. "line" otherwise).
+    """
+    if group == "injections":
+        if mode == "pf_3ph":
+            _extract_injection_results_3ph(net, *ppcs)
+        else:
+            _extract_injection_results(net, *ppcs)
+    elif mode == "pf_3ph":
+        _get_branch_results_3ph(net, *ppcs, None, None)
+    else:
+        i_ft, s_ft = _get_branch_flows(ppcs[0])
+        _get_element_branch_results(net, ppcs[0], group, i_ft, s_ft)
+
+
+def _result_groups(mode):
+    if mode == "pf_3ph":
+        # the branch results of the three phase power flow are calculated together
+        return ["injections", "branch"]
+    return ["injections"] + list(BRANCH_RESULT_ELEMENTS)
+
+
+def _group_of_element(element, mode):
+    if element == "bus" or element in INJECTION_RESULT_ELEMENTS[mode]:
+        return "injections"
+    if mode == "pf_3ph":
+        return "branch" if element in BRANCH_RESULT_ELEMENTS_3PH else None
+    return element if element in BRANCH_RESULT_ELEMENTS else None
+
+
+def _result_element(table, mode):
+    # "res_line_3ph", "res_line" and "line" refer to the element "line"
+    element = table[4:] if table.startswith("res_") else table
+    suffix = suffix_mode.get(mode, None)
+    if suffix is not None and element.endswith("_" + suffix):
+        element = element[:-len(suffix) - 1]
+    return element
+
+
+def _defer_result_groups(net, mode, ppcs):
+    """
+    Decides which results are extracted directly after the power flow, depending on the options
+    "result_tables" and "result_columns". The groups of result tables that are not requested are
+    registered in net["_pending_results"] and extracted when one of their tables is accessed.
+
+    OUTPUT:
+        **groups** (list) - groups of result tables that are extracted directly
+    """
+    groups = _result_groups(mode)
+    options = net["_options"]
+    result_tables, result_columns = options.get("result_tables", None), options.get("result_columns", None)
+    if result_tables is None and result_columns is None:
+        return groups
+
+    requested = result_tables if result_tables is not None else list(result_columns.keys())
+    elements = {_result_element(table, mode) for table in requested}
+    unknown = [e for e in elements if _group_of_element(e, mode) is None]
+    if len(unknown):
+        logger.warning("there are no %s power flow results for %s" % (mode, unknown))
+    selected = {_group_of_element(e, mode) for e in elements} - {None}
+    bus_columns = None if result_columns is None else next(
+        (columns for table, columns in result_columns.items() if _result_element(table, mode) == "bus"), None)
+    bus_voltages_only = bus_columns is not None and set(bus_columns) <= set(BUS_VOLTAGE_COLUMNS[mode]) and \
+        not any(_group_of_element(e, mode) == "injections" for e in elements - {"bus"})
+    if bus_voltages_only:
+        # the bus voltages are always extracted, only the bus powers need the injection results
+        selected.discard("injections")
+    if mode == "pf" and len(net["dcline"]):
+        # the auxiliary gens of dclines are removed from net.gen directly after the power flow
+        selected.add("injections")
+
+    deferred = [g for g in groups if g not in selected]
+    if len(deferred):
+        suffix = suffix_mode.get(mode, None)
+        elements = [e for e in get_relevant_elements(mode) if e in net]
+        # the bus powers of res_bus and res_bus_dc are written by the injection results, the bus voltages are
+        # always extracted -> if only the bus voltages are requested, accessing them does not trigger it
+        tables = {get_result_tables(e, suffix)[0]: _group_of_element(e, mode) for e in elements
+                  if _group_of_element(e, mode) in deferred and not (bus_voltages_only and e in ("bus", "bus_dc"))}
+        # the deferred extraction reads the element tables, changes are detected with a copy of them
+        inputs = {e: _table_snapshot(net[e]) for e in elements
+                  if e in ("bus", "bus_dc") or _group_of_element(e, mode) in deferred}
+        pending = {"mode": mode, "groups": deferred, "tables": tables, "ppcs": ppcs, "options": options,
+                   "inputs": inputs}
+        if not _set_pending_results(net, pending):
+            return groups
+    return [g for g in groups if g in selected]
+
+
+def _clear_pending_results(net):
+    _set_pending_results(net, None)
+
+
+def _pending_results_valid(net, pending):
+    ppc_keys = ["_ppc0", "_ppc1", "_ppc2"] if pending["mode"] == "pf_3ph" else ["_ppc"]
+    if any(net.get(key, None) is not ppc for key, ppc in zip(ppc_keys, pending["ppcs"])):
+        return False
+    for element, (index, columns, values) in pending["inputs"].items():
+        df = net[element]
+        if not df.index.equals(index) or [c for c in df.columns if c not in IGNORED_COLUMNS] != columns:
+            return False
+        if any(not _values_equal(df[c].to_numpy(), values[c]) for c in columns):
+            return False
+    return True
+
+
+def _extract_pending_results(net, table=None):
+    """
+    Extracts the results that were deferred because of the options "result_tables" and
+    "result_columns" of the power flow: all of them or only the group of the given result table.
+    """
+    pending = dict.get(net, "_pending_results", None)
+    if pending is None:
+        return
+    if table is None:
+        groups = list(pending["groups"])
+    elif table in pending["tables"]:
+        groups = [pending["tables"][table]]
+    else:
+        return
+    # the groups are removed before the extraction, which accesses the result tables itself
+    pending["groups"] = [g for g in pending["groups"] if g not in groups]
+    pending["tables"] = {t: g for t, g in pending["tables"].items() if g not in groups}
+    if not len(pending["groups"]):
+        _set_pending_results(net, None)
+
+    if not _pending_results_valid(net, pending):
+        logger.warning("the deferred results %s are not extracted because the net has changed since the "
+                       "power flow. Call extract_pending_results(net) before changing the net." % groups)
+        _set_pending_results(net, None)
+        return
+    options = net["_options"]
+    net["_options"] = pending["options"]
+    try:
+        for group in groups:
+            _extract_result_group(net, pending["mode"], group, pending["ppcs"])
+    finally:
+        net["_options"] = options
+
+
+def extract_pending_results(net):
+    """
+    Extracts all results of the last power flow that were deferred because of the options
+    "result_tables" and "result_columns" of runpp, rundcpp or runpp_3ph.
+
+    INPUT:
+        **net** - pandapower net
+    """
+    _extract_pending_results(net)
+
+
 def _extract_results_se(net, ppc):
     _set_buses_out_of_service(ppc)
     bus_lookup_aranged = _get_aranged_lookup(net)
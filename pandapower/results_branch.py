@@ -15,6 +15,9 @@ from pandapower.pypower.idx_bus_dc import DC_BASE_KV, DC_VM
 from pandapower.pypower.idx_tcsc import TCSC_THYRISTOR_FIRING_ANGLE, TCSC_X_PU, TCSC_PF, TCSC_PT, TCSC_QF, TCSC_QT, \
     TCSC_IF, TCSC_IT
 
+# elements whose power flow results can be extracted separately, see _get_element_branch_results()
+BRANCH_RESULT_ELEMENTS = ("line", "line_dc", "trafo", "trafo3w", "impedance", "switch", "tcsc")
+
 
 def _get_branch_results(net, ppc, bus_lookup_aranged, pq_buses, suffix=None):
     """
@@ -48,6 +51,29 @@ def _get_branch_results(net, ppc, bus_lookup_aranged, pq_buses, suffix=None):
     _get_tcsc_results(net, ppc, suffix=suffix)
 
 
+def _get_element_branch_results(net, ppc, element, i_ft, s_ft):
+    """
+    Extracts the power flow results of one branch element (one of BRANCH_RESULT_ELEMENTS). The
+    xward branches are not included, they are part of the bus power results.
+    """
+    if element == "line":
+        _get_line_results(net, ppc, i_ft)
+    elif element == "line_dc":
+        _get_line_dc_results(net, ppc)
+    elif element == "trafo":
+        _get_trafo_results(net, ppc, s_ft, i_ft)
+    elif element == "trafo3w":
+        _get_trafo3w_results(net, ppc, s_ft, i_ft)
+    elif element == "impedance":
+        _get_impedance_results(net, ppc, i_ft)
+    elif element == "switch":
+        _get_switch_results(net, ppc, i_ft)
+    elif element == "tcsc":
+        _get_tcsc_results(net, ppc)
+    else:
+        raise ValueError("%s is not a branch element" % element)
+
+
 def _get_branch_results_3ph(net, ppc0, ppc1, ppc2, bus_lookup_aranged, pq_buses):
     """
     Extract the bus results and writes it in the Dataframe net.res_line and net.res_trafo.
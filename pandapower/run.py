@@ -10,7 +10,9 @@ from pandapower.auxiliary import _check_bus_index_and_print_warning_if_high, \
     _check_gen_index_and_print_warning_if_high, _init_runpp_options, _init_rundcopp_options, \
     _init_rundcpp_options, _init_runopp_options, _internal_stored
 from pandapower.opf.validate_opf_input import _check_necessary_opf_parameters
-from pandapower.powerflow import _powerflow, _recycled_powerflow
+from pandapower.powerflow import _powerflow, _recycled_powerflow, _auto_recycled_powerflow
+from pandapower.pf.profiling import profile_run, start_stage, stop_stage
+from pandapower.results import extract_pending_results
 from pandapower.optimal_powerflow import _optimal_powerflow
 
 try:
@@ -49,7 +51,8 @@ def set_user_pf_options(net, overwrite=False, **kwargs):
                            'trafo3w_losses', 'init', 'init_vm_pu', 'init_va_degree', 'init_results',
                            'tolerance_mva', 'trafo_loading', 'numba', 'ac', 'algorithm',
                            'max_iteration', 'v_debug', 'run_control', 'distributed_slack', 'lightsim2grid',
-                           'tdpf', 'tdpf_delay_s', 'tdpf_update_r_theta']
+                           'tdpf', 'tdpf_delay_s', 'tdpf_update_r_theta', 'linear_solver', 'profile',
+                           'result_tables', 'result_columns']
 
     if overwrite or 'user_pf_options' not in net.keys():
         net['user_pf_options'] = dict()
@@ -211,12 +214,27 @@ def runpp(net, algorithm='nr', calculate_voltage_angles=True, init="auto",
             - an iterable with a voltage angle value for each bus (length and order has to match with the buses in net.bus)
             - a pandas Series with a voltage angle value for each bus (indexes have to match the indexes in net.bus)
 
-        **recycle** (dict, none) - Reuse of internal powerflow variables for time series calculation
+        **recycle** (dict, "auto", none) - Reuse of internal powerflow variables for time series calculation
 
-            Contains a dict with the following parameters:
+            With "auto", the element tables are compared with their state at the last power flow with recycle="auto" and it is decided automatically whether the ppc is rebuilt (e.g. after topology, parameter or option changes), only the changed injections, gen setpoints, trafo taps or FACTS setpoints are updated, or everything is reused.
+
+            Otherwise contains a dict with the following parameters:
             bus_pq: If True PQ values of buses are updated
-            trafo: If True trafo relevant variables, e.g., the Ybus matrix, is recalculated
+            trafo: If True trafo relevant variables, e.g., the Ybus matrix, is recalculated. Only the entries of the branches with changed parameters (e.g. tap positions) are updated in Ybus, Yf and Yt
             gen: If True Sbus and the gen table in the ppc are recalculated
+            facts: If True the setpoints of SVC, TCSC, SSC and VSC are updated
+
+        **linear_solver** (str or object, "spsolve") - linear solver for the Newton-Raphson iterations
+
+            - "spsolve": scipy.sparse.linalg.spsolve in every iteration (uses use_umfpack and permc_spec)
+            - "cached": the analysis of the Jacobian sparsity pattern (fill-reducing ordering with SuperLU, symbolic factorization with scikit-umfpack) is done once and stored in net._ppc["internal"]["linear_solver"], so that only the numeric factorization is repeated in the following iterations and power flows with the same topology. The attributes "hits" and "misses" of the stored solver count how often the cached analysis could be reused.
+            - an object with a method solve(J, F), which returns the solution x of J * x = F
+
+        **profile** (bool, False) - If True, the time spent in the stages of the power flow ("init_options", "pd2ppc", "makeYbus", "makeSbus", "newtonpf" with the nested "jacobian" and "linear_solver", "pfsoln", "extract_results" and "total") and counters (Newton-Raphson iterations, number of nonzeros of the Jacobian, used linear solver, numba, recycle) are stored in the dict net["_pf_profile"]. To aggregate the profiles of many power flows, e.g. of run_timeseries() or run_contingency(), use the context manager pandapower.pf.profiling.pf_profiling(net).
+
+        **result_tables** (list, None) - result tables that are extracted directly after the power flow, e.g. ["bus", "line"] or ["res_bus", "res_line"]. The results of the other tables are extracted when the table is accessed for the first time (e.g. net.res_trafo), or with extract_pending_results(net). The results of all elements that inject power (loads, sgens, gens, ext_grids, shunts, ...) are extracted together, since they are needed for p_mw and q_mvar of res_bus, also when res_bus is accessed. If the element tables are changed before the deferred results are accessed, they are not extracted anymore and a warning is logged. None extracts all results.
+
+        **result_columns** (dict, None) - result columns that are needed, e.g. {"bus": ["vm_pu"], "line": ["loading_percent"]}. The tables are extracted as with result_tables. If only the voltage columns of res_bus are requested, p_mw and q_mvar are not calculated (NaN) until extract_pending_results(net) is called.
 
         **neglect_open_switch_branches** (bool, False) - If True no auxiliary buses are created for branches when switches are opened at the branch. Instead branches are set out of service
 
@@ -225,31 +243,42 @@ def runpp(net, algorithm='nr', calculate_voltage_angles=True, init="auto",
 
     # if dict 'user_pf_options' is present in net, these options overrule the net._options
     # except for parameters that are passed by user
+    profile = kwargs.get("profile", net.user_pf_options.get("profile", False))
     if isinstance(kwargs.get("recycle", None), dict) and _internal_stored(net):
-        _recycled_powerflow(net, **kwargs)
+        with profile_run(net, profile) as run_profile:
+            net["_options"]["profile"] = run_profile
+            _recycled_powerflow(net, **kwargs)
         return
 
     if run_control and net.controller.in_service.any():
+        # the power flows within run_control are profiled separately
         from pandapower.control import run_control
         parameters = {**locals(), **kwargs}
         # disable run control for inner loop to avoid infinite loop
         parameters["run_control"] = False
         run_control(**parameters)
     else:
-        passed_parameters = _passed_runpp_parameters(locals())
-        _init_runpp_options(net, algorithm=algorithm,
-                            calculate_voltage_angles=calculate_voltage_angles,
-                            init=init, max_iteration=max_iteration, tolerance_mva=tolerance_mva,
-                            trafo_model=trafo_model, trafo_loading=trafo_loading,
-                            enforce_q_lims=enforce_q_lims, check_connectivity=check_connectivity,
-                            voltage_depend_loads=voltage_depend_loads,
-                            consider_line_temperature=consider_line_temperature,
-                            tdpf=tdpf, tdpf_delay_s=tdpf_delay_s,
-                            distributed_slack=distributed_slack,
-                            passed_parameters=passed_parameters, **kwargs)
-        _check_bus_index_and_print_warning_if_high(net)
-        _check_gen_index_and_print_warning_if_high(net)
-        _powerflow(net, **kwargs)
+        with profile_run(net, profile) as run_profile:
+            passed_parameters = _passed_runpp_parameters(locals())
+            t0 = start_stage(run_profile)
+            _init_runpp_options(net, algorithm=algorithm,
+                                calculate_voltage_angles=calculate_voltage_angles,
+                                init=init, max_iteration=max_iteration, tolerance_mva=tolerance_mva,
+                                trafo_model=trafo_model, trafo_loading=trafo_loading,
+                                enforce_q_lims=enforce_q_lims, check_connectivity=check_connectivity,
+                                voltage_depend_loads=voltage_depend_loads,
+                                consider_line_temperature=consider_line_temperature,
+                                tdpf=tdpf, tdpf_delay_s=tdpf_delay_s,
+                                distributed_slack=distributed_slack,
+                                passed_parameters=passed_parameters, **kwargs)
+            net["_options"]["profile"] = run_profile
+            stop_stage(run_profile, "init_options", t0)
+            _check_bus_index_and_print_warning_if_high(net)
+            _check_gen_index_and_print_warning_if_high(net)
+            if isinstance(kwargs.get("recycle", None), str) and kwargs["recycle"] == "auto":
+                _auto_recycled_powerflow(net, **kwargs)
+            else:
+                _powerflow(net, **kwargs)
 
 
 def runpp_pgm(net, algorithm="nr", max_iterations=20, error_tolerance_vm_pu=1e-8, symmetric=True, validate_input=False):
@@ -378,19 +407,27 @@ def rundcpp(net, trafo_model="t", trafo_loading="current", recycle=None, check_c
 
         **trafo3w_losses** (str, "hv") - defines where open loop losses of three-winding transformers are considered. Valid options are "hv", "mv", "lv" for HV/MV/LV side or "star" for the star point.
 
+        **profile** (bool, False) - If True, the time spent in the stages of the power flow is stored in net["_pf_profile"] (see runpp)
+
+        **result_tables** (list, None) - result tables that are extracted directly after the power flow, the others are extracted when they are accessed (see runpp)
+
+        **result_columns** (dict, None) - result columns that are needed, e.g. {"bus": ["va_degree"]} (see runpp)
+
         **kwargs** - options to use for PYPOWER.runpf
     """
-    _init_rundcpp_options(net, trafo_model=trafo_model, trafo_loading=trafo_loading,
-                          recycle=recycle, check_connectivity=check_connectivity,
-                          switch_rx_ratio=switch_rx_ratio, trafo3w_losses=trafo3w_losses, **kwargs)
+    with profile_run(net, kwargs.get("profile", False)) as run_profile:
+        _init_rundcpp_options(net, trafo_model=trafo_model, trafo_loading=trafo_loading,
+                              recycle=recycle, check_connectivity=check_connectivity,
+                              switch_rx_ratio=switch_rx_ratio, trafo3w_losses=trafo3w_losses, **kwargs)
+        net["_options"]["profile"] = run_profile
 
-    if isinstance(recycle, dict) and _internal_stored(net, ac=False):
-        _recycled_powerflow(net, recycle=recycle, **kwargs)
-        return
+        if isinstance(recycle, dict) and _internal_stored(net, ac=False):
+            _recycled_powerflow(net, recycle=recycle, **kwargs)
+            return
 
-    _check_bus_index_and_print_warning_if_high(net)
-    _check_gen_index_and_print_warning_if_high(net)
-    _powerflow(net, **kwargs)
+        _check_bus_index_and_print_warning_if_high(net)
+        _check_gen_index_and_print_warning_if_high(net)
+        _powerflow(net, **kwargs)
 
 
 def runopp(net, verbose=False, calculate_voltage_angles=True, check_connectivity=True,
@@ -20,7 +20,7 @@ from pandapower.contingency.contingency import _convert_trafo_phase_shifter, get
 from pandapower.networks.power_system_test_cases import case9, case118, case14
 from pandapower.create import create_empty_network, create_buses, create_ext_grid, create_lines, \
     create_transformer_from_parameters, create_load, create_lines_from_parameters, create_transformers_from_parameters, \
-    create_gen
+    create_gen, create_line
 from pandapower.timeseries.output_writer import OutputWriter
 from pandapower.timeseries.run_time_series import run_timeseries
 from pandapower.timeseries.data_sources.frame_data import DFData
@@ -376,6 +376,90 @@ def check_cause_index(net, nminus1_cases):
                               rtol=0, atol=1e-6)
 
 
+def test_contingency_parallel(get_net):
+    net = get_net
+    nminus1_cases = {"line": {"index": net.line.index.values}}
+    if len(net.trafo) > 0:
+        nminus1_cases["trafo"] = {"index": net.trafo.index.values}
+
+    res = run_contingency(net, nminus1_cases, contingency_evaluation_function=run_for_from_bus_loading)
+    res_line, res_bus = net.res_line.copy(), net.res_bus.copy()
+    res_trafo = net.res_trafo.copy()
+
+    res_parallel = run_contingency(net, nminus1_cases, contingency_evaluation_function=run_for_from_bus_loading,
+                                   n_jobs=2)
+    for element, element_results in res.items():
+        for var, val in element_results.items():
+            if var == "cause_index" or var == "cause_element":
+                valid = ~np.isnan(element_results["max_loading_percent"])
+                assert np.array_equal(val[valid], res_parallel[element][var][valid])
+            elif val.dtype.kind == "f":
+                assert np.allclose(val, res_parallel[element][var], rtol=0, atol=1e-9, equal_nan=True)
+            else:
+                assert np.array_equal(val, res_parallel[element][var])
+    assert_frame_equal(net.res_line, res_line)
+    assert_frame_equal(net.res_bus, res_bus)
+    assert_frame_equal(net.res_trafo, res_trafo)
+
+
+def test_contingency_dc_screening():
+    net = case14()
+    runpp(net)
+    net.line["max_i_ka"] = net.res_line.i_ka.values / 0.6
+    nminus1_cases = {"line": {"index": net.line.index.values}, "trafo": {"index": net.trafo.index.values}}
+    net.line.at[3, "in_service"] = False
+
+    res = run_contingency(net, nminus1_cases)
+    res_screened = run_contingency(net, nminus1_cases, screening_margin=10)
+
+    screening = res_screened["screening"]
+    assert len(screening) == len(net.line) + len(net.trafo)
+    assert not screening.critical.all()
+    assert screening.loc[(screening.element == "line") & (screening.element_index == 3), "reason"].iat[0] == \
+           "element is out of service"
+    calculated = screening.loc[screening.critical, "estimated_max_loading_percent"]
+    assert np.all(calculated.isnull() | (calculated > 90))
+    # the screened N-1 cases do not cause overloadings
+    for element in ("line", "trafo"):
+        assert np.array_equal(res[element]["causes_overloading"], res_screened[element]["causes_overloading"])
+        assert np.array_equal(res[element]["causes_overloading"], net[f"res_{element}"].causes_overloading.values)
+    assert np.allclose(res["line"]["loading_percent"], res_screened["line"]["loading_percent"])
+
+
+def test_contingency_warm_start(get_net):
+    net = get_net
+    create_line(net, net.bus.index[0], net.bus.index[-1], 1., std_type="NAYY 4x50 SE", in_service=False)
+    nminus1_cases = {"line": {"index": net.line.index.values}}
+    if len(net.trafo) > 0:
+        nminus1_cases["trafo"] = {"index": net.trafo.index.values}
+
+    res = run_contingency(net, nminus1_cases)
+    res_warm_start = run_contingency(net, nminus1_cases, warm_start=True)
+    for element, element_results in res.items():
+        for var in ("vm_pu", "loading_percent", "max_vm_pu", "min_vm_pu", "max_loading_percent",
+                    "min_loading_percent"):
+            if var in element_results:
+                # different starting voltages -> differences within the tolerance of the power flow
+                assert np.allclose(element_results[var], res_warm_start[element][var], rtol=1e-6, atol=1e-6,
+                                   equal_nan=True)
+        if element != "bus":
+            assert np.array_equal(element_results["causes_overloading"],
+                                  res_warm_start[element]["causes_overloading"])
+
+    # parallel lines lead to the same max. loading -> check that the cause leads to the max. loading
+    for element in ("line", "trafo"):
+        if element not in res_warm_start:
+            continue
+        element_results = res_warm_start[element]
+        for j in np.flatnonzero(~np.isnan(element_results["max_loading_percent"]))[:5]:
+            cause_element, cause_index = element_results["cause_element"][j], element_results["cause_index"][j]
+            net[cause_element].at[cause_index, "in_service"] = False
+            runpp(net)
+            net[cause_element].at[cause_index, "in_service"] = True
+            assert np.isclose(net[f"res_{element}"].loading_percent.values[j],
+                              element_results["max_loading_percent"][j], rtol=1e-6, atol=1e-6)
+
+
 def run_for_from_bus_loading(net, **kwargs):
     runpp(net, **kwargs)
     net.res_line["loading_percent"] = net.res_line.i_from_ka / net.line.max_i_ka * 100
@@ -4,6 +4,8 @@
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
 import copy
+
+import numpy as np
 import pytest
 
 try:
@@ -15,10 +17,15 @@ from pandapower import runpp
 from pandapower.create import create_sgen
 from pandapower.networks import create_kerber_vorstadtnetz_kabel_1
 from pandapower.control import ControllerNotConverged
-from pandapower.control.run_control import get_controller_order
+from pandapower.control.run_control import get_controller_order, prepare_run_ctrl, run_control
+from pandapower.control.controller.const_control import ConstControl
 from pandapower.control.basic_controller import Controller
 from pandapower.control.controller.trafo_control import TrafoController
 from pandapower.control.controller.trafo.ContinuousTapControl import ContinuousTapControl
+from pandapower.control.controller.trafo.DiscreteTapControl import DiscreteTapControl
+from pandapower.control.controller.DERController import DERController, QModelQVCurve, QVCurve
+from pandapower.control.util.sensitivity import voltage_sensitivities
+from pandapower.test.timeseries.test_timeseries import simple_test_net
 from pandapower.timeseries.output_writer import OutputWriter
 from pandapower.timeseries.run_time_series import run_timeseries
 
@@ -47,6 +54,24 @@ class DummyController(Controller):
         return self.applied
 
 
+class InputController(Controller):
+    # converged controller which counts how often its convergence is checked
+    def __init__(self, net, bus):
+        super().__init__(net, initial_run=False)
+        self.bus = bus
+        self.n_checks = 0
+
+    def get_input_variables(self, net):
+        return [("res_bus", self.bus, "vm_pu", "single_index")]
+
+    def get_controlled_variables(self, net):
+        return list()
+
+    def is_converged(self, net):
+        self.n_checks += 1
+        return True
+
+
 @pytest.fixture
 def net():
     net = create_kerber_vorstadtnetz_kabel_1()
@@ -208,5 +233,110 @@ def test_matching_params(net):
     assert net.controller.object.at[4] is c4
 
 
+def run_control_counting(net, **kwargs):
+    # runs the controllers and returns the number of power flows
+    n_runs = [0]
+
+    def counting_runpp(net, **kwargs):
+        n_runs[0] += 1
+        runpp(net, **kwargs)
+
+    ctrl_variables = prepare_run_ctrl(net, None, run=counting_runpp, **kwargs)
+    run_control(net, ctrl_variables=ctrl_variables)
+    return n_runs[0], ctrl_variables
+
+
+def test_incremental_control(simple_test_net):
+    results = dict()
+    for incremental in [False, True]:
+        net = copy.deepcopy(simple_test_net)
+        ConstControl(net, "load", "p_mw", element_index=0)
+        ContinuousTapControl(net, 0, 1.02, tol=1e-6)
+        DiscreteTapControl(net, 0, 0.99, 1.01, side="mv", element="trafo3w")
+        constant_input = InputController(net, 0)
+        changed_input = InputController(net, 2)
+        n_runs, ctrl_variables = run_control_counting(net, incremental_control=incremental)
+        assert (ctrl_variables["controller_graph"] is not None) == incremental
+        results[incremental] = (net, n_runs, constant_input.n_checks, changed_input.n_checks)
+
+    (net, n_runs, n_constant, n_changed), (net_inc, n_runs_inc, n_constant_inc, n_changed_inc) = \
+        results[False], results[True]
+    assert np.allclose(net.trafo.tap_pos.values, net_inc.trafo.tap_pos.values)
+    assert np.array_equal(net.trafo3w.tap_pos.values, net_inc.trafo3w.tap_pos.values)
+    assert np.allclose(net.res_bus.vm_pu.values, net_inc.res_bus.vm_pu.values)
+    # the power flow of the ConstControl level is skipped, the values were applied in the initial power flow
+    assert n_runs_inc == n_runs - 1
+    # the voltage of the ext_grid bus does not change, the voltage of the controlled bus changes in each power flow
+    assert n_constant_inc == 1 < n_constant
+    assert n_changed_inc == n_changed
+
+
+def test_incremental_control_not_possible(net):
+    DummyController(net)
+    ContinuousTapControl(net, 0, 1.0)
+    n_runs, ctrl_variables = run_control_counting(net)
+    assert ctrl_variables["controller_graph"] is None
+    assert n_runs == 2
+
+
+def test_voltage_sensitivities(simple_test_net):
+    net = simple_test_net
+    create_sgen(net, 2, 1., q_mvar=0.)
+    runpp(net)
+    buses = net.bus.index
+    tap_elements = [("trafo", 0), ("trafo3w", 0)]
+    q_elements = [("sgen", 0), ("load", 2)]
+    sensitivities = voltage_sensitivities(net, buses, tap_elements, q_elements)
+    # compared to the voltage changes of power flows with small changes
+    for column, (element, idx, variable, change) in enumerate([("trafo", 0, "tap_pos", 1.),
+                                                               ("trafo3w", 0, "tap_pos", 1.),
+                                                               ("sgen", 0, "q_mvar", 0.1),
+                                                               ("load", 2, "q_mvar", 0.1)]):
+        changed_net = copy.deepcopy(net)
+        changed_net[element].at[idx, variable] += change
+        runpp(changed_net)
+        delta_vm_pu = changed_net.res_bus.vm_pu.loc[buses].values - net.res_bus.vm_pu.loc[buses].values
+        assert np.allclose(sensitivities[:, column] * change, delta_vm_pu, rtol=0.05, atol=5e-5)
+    # the ext_grid bus has a fixed voltage
+    assert np.all(sensitivities[0] == 0)
+
+
+def test_sensitivity_control_taps(simple_test_net):
+    results = dict()
+    for sensitivity in [False, True]:
+        net = copy.deepcopy(simple_test_net)
+        net.load.at[0, "p_mw"] = 25.
+        ContinuousTapControl(net, 0, 1.0)
+        DiscreteTapControl(net, 0, 0.995, 1.005, side="mv", element="trafo3w")
+        n_runs, _ = run_control_counting(net, sensitivity_control=sensitivity)
+        results[sensitivity] = (net, n_runs)
+
+    (net, n_runs), (net_sens, n_runs_sens) = results[False], results[True]
+    assert np.array_equal(net.trafo3w.tap_pos.values, net_sens.trafo3w.tap_pos.values)
+    assert abs(net.res_bus.vm_pu.at[2] - 1.0) < 1e-3
+    assert abs(net_sens.res_bus.vm_pu.at[2] - 1.0) < 1e-3
+    assert 0.995 < net_sens.res_bus.vm_pu.at[3] < 1.005
+    # the initial power flow and the power flow which verifies the predicted tap positions
+    assert n_runs_sens == 2 < n_runs
+
+
+def test_sensitivity_control_der(simple_test_net):
+    results = dict()
+    for sensitivity in [False, True]:
+        net = copy.deepcopy(simple_test_net)
+        create_sgen(net, 3, 5., sn_mva=6.)
+        create_sgen(net, 4, 1., sn_mva=1.2)
+        DERController(net, net.sgen.index, q_model=QModelQVCurve(QVCurve([0.9, 0.98, 1.0, 1.1],
+                                                                          [0.4, 0., 0., -0.4])))
+        ContinuousTapControl(net, 0, 1.01, tol=1e-6)
+        n_runs, _ = run_control_counting(net, sensitivity_control=sensitivity)
+        results[sensitivity] = (net, n_runs)
+
+    (net, n_runs), (net_sens, n_runs_sens) = results[False], results[True]
+    assert np.allclose(net.sgen.q_mvar.values, net_sens.sgen.q_mvar.values, atol=1e-5)
+    assert np.allclose(net.res_bus.vm_pu.values, net_sens.res_bus.vm_pu.values, atol=1e-5)
+    assert n_runs_sens < n_runs
+
+
 if __name__ == '__main__':
     pytest.main([__file__, "-xs"])
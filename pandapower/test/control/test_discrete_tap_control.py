@@ -400,5 +400,19 @@ def test_discrete_trafo_control_with_oos_trafo():
     net.trafo.loc[114, 'in_service'] = False
     DiscreteTapControl(net=net, element_index=114, vm_lower_pu=1.01, vm_upper_pu=1.03)
 
+
+def test_discrete_tap_control_recycle_auto():
+    net = mv_oberrhein()
+    net.ext_grid["vm_pu"] = 1.05
+    DiscreteTapControl(net=net, element_index=net.trafo.index, vm_lower_pu=0.99, vm_upper_pu=1.01)
+    net_auto = deepcopy(net)
+
+    runpp(net, run_control=True)
+    runpp(net_auto, run_control=True, recycle="auto")
+    assert not np.all(net.trafo.tap_pos.values == 0)
+    assert np.array_equal(net.trafo.tap_pos.values, net_auto.trafo.tap_pos.values)
+    assert np.allclose(net.res_bus.vm_pu, net_auto.res_bus.vm_pu, rtol=0, atol=1e-8, equal_nan=True)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, "-xs"])
@@ -8,7 +8,7 @@ import pytest
 
 from pandapower.run import runpp
 from pandapower.networks.power_system_test_cases import case30
-from pandapower.estimation import StateEstimation
+from pandapower.estimation import StateEstimation, estimate
 from pandapower.estimation.util import add_virtual_meas_from_loadflow
 
 
@@ -30,5 +30,35 @@ def test_recycle_case30():
     assert np.allclose(net.res_bus.vm_pu, net.res_bus_est.vm_pu, atol=1e-5)
     assert np.allclose(net.res_bus.va_degree, net.res_bus_est.va_degree, atol=1e-5)
 
+
+def test_measurement_index_cache():
+    net = case30()
+    runpp(net)
+    add_virtual_meas_from_loadflow(net)
+    assert estimate(net)
+    meas_index = net._measurement_index
+
+    # new measurement values are gathered with the cached measurement index
+    net.load.p_mw *= 1.05
+    runpp(net)
+    values = net.measurement.value.values.copy()
+    net.measurement.drop(net.measurement.index, inplace=True)
+    add_virtual_meas_from_loadflow(net)
+    assert not np.allclose(values, net.measurement.value.values)
+    assert estimate(net)
+    assert net._measurement_index is meas_index
+    assert np.allclose(net.res_bus.vm_pu, net.res_bus_est.vm_pu, atol=1e-5)
+
+    # the index is rebuilt if the structure of the measurements changes
+    net.measurement.loc[net.measurement.index[0], "std_dev"] *= 2
+    assert estimate(net)
+    assert net._measurement_index is not meas_index
+    meas_index = net._measurement_index
+    net.measurement = net.measurement.drop(net.measurement.index[-5:])
+    assert estimate(net)
+    assert net._measurement_index is not meas_index
+    assert np.allclose(net.res_bus.vm_pu, net.res_bus_est.vm_pu, atol=1e-5)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, "-xs"])
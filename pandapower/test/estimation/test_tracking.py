@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import numpy as np
+import pytest
+
+from pandapower.run import runpp
+from pandapower.networks.power_system_test_cases import case30
+from pandapower.estimation import StateEstimation, TrackingStateEstimation, estimate_batch
+from pandapower.estimation.util import add_virtual_meas_from_loadflow
+
+
+def measurement_values(net):
+    # values of the virtual measurements of the current power flow results, in the order of net.measurement
+    measurement = net.measurement
+    net.measurement = measurement.iloc[:0].copy()
+    add_virtual_meas_from_loadflow(net)
+    values = net.measurement.value.values.copy()
+    net.measurement = measurement
+    return values
+
+
+def test_tracking_case30():
+    net = case30()
+    runpp(net)
+    add_virtual_meas_from_loadflow(net)
+    se = TrackingStateEstimation(net)
+    assert se.estimate()
+    assert np.allclose(net.res_bus.vm_pu.values, se.vm_pu, atol=1e-5)
+    assert np.allclose(net.res_bus.va_degree.values, se.va_degree, atol=1e-5)
+    iterations_flat = se.solver.iterations
+
+    for scaling in [1.02, 0.99, 1.01]:
+        net.load.p_mw *= scaling
+        runpp(net)
+        assert se.estimate(measurement_values(net))
+        assert np.allclose(net.res_bus.vm_pu.values, se.vm_pu, atol=1e-5)
+        assert np.allclose(net.res_bus.va_degree.values, se.va_degree, atol=1e-5)
+        # the estimation starts from the last estimate
+        assert se.solver.iterations < iterations_flat
+
+    # the result tables are only written on request and match the estimation of a new StateEstimation
+    se.write_results()
+    vm_tracking = net.res_bus_est.vm_pu.values.copy()
+    assert np.allclose(vm_tracking, se.vm_pu)
+    StateEstimation(net).estimate()
+    assert np.allclose(vm_tracking, net.res_bus_est.vm_pu.values, atol=1e-8)
+
+
+def test_tracking_fixed_measurement_set():
+    net = case30()
+    runpp(net)
+    add_virtual_meas_from_loadflow(net)
+    se = TrackingStateEstimation(net)
+    values = net.measurement.value.values.copy()
+    with pytest.raises(UserWarning):
+        se.estimate(values[:-1])
+    values[0] = np.nan
+    with pytest.raises(UserWarning):
+        se.estimate(values)
+    net.measurement = net.measurement.drop(net.measurement.index[0])
+    with pytest.raises(UserWarning):
+        se.estimate(net.measurement.value.values)
+    with pytest.raises(UserWarning):
+        TrackingStateEstimation(net, algorithm="lp")
+
+
+def test_estimate_batch():
+    net = case30()
+    runpp(net)
+    add_virtual_meas_from_loadflow(net)
+    values, vm_pu, va_degree = list(), list(), list()
+    for scaling in [1., 1.02, 0.97, 1.05]:
+        net.load.p_mw *= scaling
+        runpp(net)
+        values.append(measurement_values(net))
+        vm_pu.append(net.res_bus.vm_pu.values)
+        va_degree.append(net.res_bus.va_degree.values)
+    # bad data in the last time step
+    values[-1][0] += 5.
+    original_values = net.measurement.value.values.copy()
+
+    results = estimate_batch(net, values)
+    assert results["vm_pu"].shape == (4, len(net.bus))
+    assert np.all(results["converged"])
+    assert np.allclose(results["vm_pu"][:3], vm_pu[:3], atol=1e-5)
+    assert np.allclose(results["va_degree"][:3], va_degree[:3], atol=1e-5)
+    assert list(results["bad_data"]) == [False, False, False, True]
+    # the measurement values of the net are not changed
+    assert np.array_equal(net.measurement.value.values, original_values)
+
+    # the performance index of the chi^2 test
+    net.measurement["value"] = values[-1]
+    se = StateEstimation(net, recycle=True)
+    se.estimate()
+    objective_function_value = np.sum(np.square((se.eppci.z - se.solver.hx) / se.eppci.r_cov))
+    assert np.isclose(results["objective_function_value"][-1], objective_function_value, rtol=1e-6)
+    net.measurement["value"] = original_values
+
+    # the time steps are split into two chunks which are estimated in parallel
+    results_parallel = estimate_batch(net, values, n_jobs=2)
+    for key in ["vm_pu", "va_degree", "objective_function_value"]:
+        assert np.allclose(results[key], results_parallel[key], atol=1e-8)
+    assert np.array_equal(results["bad_data"], results_parallel["bad_data"])
+
+    with pytest.raises(UserWarning):
+        estimate_batch(net, np.array(values)[:, 1:])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
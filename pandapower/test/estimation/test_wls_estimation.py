@@ -9,11 +9,14 @@ from copy import deepcopy
 
 import numpy as np
 import pytest
+from scipy.sparse import csr_matrix, diags
 
 from pandapower import pp_dir
 from pandapower.create import create_empty_network, create_bus, create_ext_grid, create_line_from_parameters, \
     create_measurement, create_load, create_transformer, create_line, create_sgen, create_transformer3w, create_switch
 from pandapower.estimation import chi2_analysis, remove_bad_data, estimate
+from pandapower.estimation.algorithm.base import estimate_condition_number, factorize_gain_matrix, \
+    residual_covariance_diagonal
 from pandapower.file_io import from_json
 from pandapower.networks.cigre_networks import create_cigre_network_mv
 from pandapower.networks.power_system_test_cases import case9
@@ -449,6 +452,47 @@ def test_cigre_network_with_slack_init():
     test_cigre_network(init='slack')
 
 
+def test_check_condition():
+    net = create_cigre_network_mv(with_der=False)
+    runpp(net)
+    for bus, row in net.res_bus.iterrows():
+        create_measurement(net, "v", "bus", row.vm_pu, 0.01, bus)
+        create_measurement(net, "p", "bus", row.p_mw, 0.001, bus)
+        create_measurement(net, "q", "bus", row.q_mvar, 0.001, bus)
+    estimate(net, init="flat")
+    vm_pu = net.res_bus_est.vm_pu.values.copy()
+    # the condition estimate does not change the results
+    assert estimate(net, init="flat", check_condition=True)["success"]
+    assert np.allclose(net.res_bus_est.vm_pu.values, vm_pu)
+    assert np.allclose(net.res_bus_est.vm_pu.values, net.res_bus.vm_pu.values, atol=1e-6)
+
+
+def test_estimate_condition_number():
+    rng = np.random.default_rng(0)
+    H = rng.normal(size=(60, 20)) * (rng.random((60, 20)) < 0.2) + np.vstack([np.eye(20), np.zeros((40, 20))])
+    H[:, 0] *= 1e4
+    G_m = csr_matrix(H.T @ H)
+    cond = estimate_condition_number(G_m, factorize_gain_matrix(G_m))
+    exact = np.linalg.cond(G_m.toarray(), 1)
+    # the estimate is a lower bound, which is usually exact or within a small factor
+    assert exact / 3 <= cond <= exact * (1 + 1e-8)
+
+
+def test_residual_covariance_diagonal():
+    rng = np.random.default_rng(1)
+    H = csr_matrix(rng.normal(size=(600, 40)) * (rng.random((600, 40)) < 0.1) +
+                   np.vstack([np.eye(40), np.zeros((560, 40))]))
+    R_inv = diags(1 / rng.uniform(0.01, 0.1, 600) ** 2, format="csr")
+    G_m = H.T @ R_inv @ H
+    # the diagonal of the dense residual covariance matrix
+    H_dense = H.toarray()
+    expected = np.diag(np.linalg.inv(R_inv.toarray()) - H_dense @ np.linalg.inv(G_m.toarray()) @ H_dense.T)
+    # the measurements are solved in several blocks
+    assert np.allclose(residual_covariance_diagonal(H, R_inv, G_m), expected, rtol=1e-8, atol=1e-12)
+    assert np.allclose(residual_covariance_diagonal(H, R_inv, G_m, factorize_gain_matrix(G_m), block_size=7),
+                       expected, rtol=1e-8, atol=1e-12)
+
+
 def test_cigre_with_bad_data():
     np.random.seed(123456)
     net = create_cigre_network_mv(with_der=False)
@@ -4,7 +4,11 @@ import numpy as np
 import pytest
 
 from pandapower.create import create_empty_network, create_bus, create_line_from_parameters, create_load, create_gen, \
-    create_transformer, create_ext_grid, create_line, create_transformer_from_parameters
+    create_transformer, create_ext_grid, create_line, create_transformer_from_parameters, \
+    create_transformer3w_from_parameters, create_switch, create_svc
+from pandapower.networks import case9, mv_oberrhein
+from pandapower.pf import change_tracking
+from pandapower.pypower.makeYbus import makeYbus
 from pandapower.run import set_user_pf_options, runpp, rundcpp
 from pandapower.test.consistency_checks import runpp_with_consistency_checks, rundcpp_with_consistency_checks
 from pandapower.test.helper_functions import add_grid_connection
@@ -220,5 +224,117 @@ def test_recycle_dc_trafo_ideal(recycle_net):
     assert np.allclose(net.res_bus.va_degree, net2.res_bus.va_degree, rtol=0, atol=1e-9, equal_nan=True)
 
 
+def test_recycle_trafo_partial_ybus(recycle_net):
+    # the admittance matrices are only updated for the changed trafo branches
+    net = recycle_net
+    b4 = create_bus(net, vn_kv=20.)
+    b5 = create_bus(net, vn_kv=20.)
+    b6 = create_bus(net, vn_kv=0.4)
+    create_transformer(net, 3, b4, std_type="0.4 MVA 10/0.4 kV")
+    create_transformer3w_from_parameters(net, 3, b5, b6, vn_hv_kv=20., vn_mv_kv=20., vn_lv_kv=0.4, sn_hv_mva=1.,
+                                         sn_mv_mva=0.5, sn_lv_mva=0.5, vk_hv_percent=6., vk_mv_percent=6.,
+                                         vk_lv_percent=6., vkr_hv_percent=0.5, vkr_mv_percent=0.5,
+                                         vkr_lv_percent=0.5, pfe_kw=1., i0_percent=0.1, tap_side="hv",
+                                         tap_neutral=0, tap_min=-5, tap_max=5, tap_step_percent=1.5, tap_pos=0,
+                                         tap_changer_type="Ratio")
+    create_load(net, b6, p_mw=0.1)
+    # open switch at the trafo: the auxiliary bus must not be removed by the recycle
+    create_transformer(net, 3, b6, std_type="0.4 MVA 20/0.4 kV")
+    create_switch(net, b6, 1, et="t", closed=False)
+    runpp(net)
+
+    recycle = dict(trafo=True, bus_pq=False, gen=False)
+    for tap_pos in [2, -3]:
+        net.trafo["tap_pos"] = tap_pos
+        net.trafo3w["tap_pos"] = tap_pos
+        runpp_with_consistency_checks(net, recycle=recycle)
+        internal = net._ppc["internal"]
+        Ybus, Yf, Yt = makeYbus(internal["baseMVA"], internal["bus"], internal["branch"])
+        for Y, Y_recycled in zip((Ybus, Yf, Yt), (internal["Ybus"], internal["Yf"], internal["Yt"])):
+            assert np.allclose(Y.toarray(), Y_recycled.toarray(), rtol=0, atol=1e-10)
+
+        net2 = copy.deepcopy(net)
+        net2._ppc = None
+        runpp(net2)
+        assert np.allclose(net.res_bus.vm_pu, net2.res_bus.vm_pu, rtol=0, atol=1e-10, equal_nan=True)
+        assert np.allclose(net.res_trafo.p_hv_mw, net2.res_trafo.p_hv_mw, rtol=0, atol=1e-8, equal_nan=True)
+        assert np.allclose(net.res_trafo3w.p_hv_mw, net2.res_trafo3w.p_hv_mw, rtol=0, atol=1e-8)
+
+
+def test_recycle_facts():
+    net = case9()
+    create_svc(net, 5, x_l_ohm=1, x_cvar_ohm=-10, set_vm_pu=1., thyristor_firing_angle_degree=144)
+    runpp(net)
+    # without facts=True the svc is unchanged, but its admittance must not be added twice
+    vm_pu = net.res_bus.vm_pu.values.copy()
+    runpp(net, recycle=dict(trafo=False, bus_pq=True, gen=False))
+    assert np.allclose(net.res_bus.vm_pu.values, vm_pu, rtol=0, atol=1e-10)
+
+    for set_vm_pu in [1.01, 0.99]:
+        net.svc["set_vm_pu"] = set_vm_pu
+        runpp(net, recycle=dict(trafo=False, bus_pq=False, gen=False, facts=True))
+        assert np.isclose(net.res_bus.at[5, "vm_pu"], set_vm_pu, rtol=0, atol=1e-6)
+        net2 = copy.deepcopy(net)
+        net2._ppc = None
+        runpp(net2)
+        assert np.allclose(net.res_bus.vm_pu, net2.res_bus.vm_pu, rtol=0, atol=1e-10)
+        assert np.allclose(net.res_svc.thyristor_firing_angle_degree, net2.res_svc.thyristor_firing_angle_degree)
+
+
+def _assert_res_equal_to_full_runpp(net):
+    net2 = copy.deepcopy(net)
+    net2._ppc = None
+    runpp(net2)
+    assert np.allclose(net.res_bus.vm_pu, net2.res_bus.vm_pu, rtol=0, atol=1e-8, equal_nan=True)
+    assert np.allclose(net.res_line.p_from_mw, net2.res_line.p_from_mw, rtol=0, atol=1e-6, equal_nan=True)
+
+
+def test_recycle_auto(monkeypatch):
+    net = mv_oberrhein()
+    recycle_options = list()
+
+    def get_recycle_from_changes(net):
+        recycle, changed = change_tracking.get_recycle_from_changes(net)
+        recycle_options.append(recycle)
+        return recycle, changed
+
+    monkeypatch.setattr("pandapower.powerflow.get_recycle_from_changes", get_recycle_from_changes)
+    runpp(net, recycle="auto")
+    assert recycle_options[-1] is None
+
+    net.load["p_mw"] *= 1.1
+    net.sgen.loc[net.sgen.index[:3], "q_mvar"] = 0.1
+    runpp(net, recycle="auto")
+    assert recycle_options[-1] == dict(bus_pq=True, gen=False, trafo=False, facts=False)
+    _assert_res_equal_to_full_runpp(net)
+
+    net.trafo["tap_pos"] += 1
+    net.ext_grid["vm_pu"] = 1.02
+    runpp(net, recycle="auto")
+    assert recycle_options[-1] == dict(bus_pq=False, gen=True, trafo=True, facts=False)
+    _assert_res_equal_to_full_runpp(net)
+
+    runpp(net, recycle="auto")
+    assert recycle_options[-1] == dict(bus_pq=False, gen=False, trafo=False, facts=False)
+
+    # topology change
+    net.line.at[net.line.index[0], "in_service"] = False
+    runpp(net, recycle="auto")
+    assert recycle_options[-1] is None
+    _assert_res_equal_to_full_runpp(net)
+
+    # changed power flow option
+    runpp(net, recycle="auto", tolerance_mva=1e-9)
+    assert recycle_options[-1] is None
+
+    # the ppc is rebuilt by a power flow without recycle="auto" in between
+    net.line.at[net.line.index[0], "in_service"] = True
+    runpp(net)
+    net.line.at[net.line.index[0], "in_service"] = False
+    runpp(net, recycle="auto", tolerance_mva=1e-9)
+    assert recycle_options[-1] is None
+    _assert_res_equal_to_full_runpp(net)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-xs"])
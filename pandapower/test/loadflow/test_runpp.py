@@ -23,12 +23,13 @@ from pandapower.networks import create_cigre_network_mv, four_loads_with_branche
     example_simple, simple_four_bus_system, example_multivoltage, case118
 from pandapower.pd2ppc import _pd2ppc
 from pandapower.pf.create_jacobian import _create_J_without_numba
+from pandapower.pf.profiling import pf_profiling
 from pandapower.pf.run_newton_raphson_pf import _get_pf_variables_from_ppci
 from pandapower.powerflow import LoadflowNotConverged
 from pandapower.pypower.idx_brch import BR_R, BR_X, BR_B, BR_G
 from pandapower.pypower.makeYbus import makeYbus as makeYbus_pypower
-from pandapower.results import reset_results
-from pandapower.run import set_user_pf_options, runpp, runopp
+from pandapower.results import reset_results, extract_pending_results
+from pandapower.run import set_user_pf_options, runpp, runopp, rundcpp
 from pandapower.test.consistency_checks import runpp_with_consistency_checks
 from pandapower.test.control.test_shunt_control import simple_test_net_shunt_control
 from pandapower.test.helper_functions import add_grid_connection, create_test_line, assert_net_equal, assert_res_equal
@@ -1669,5 +1670,184 @@ def test_q_capability_curve_for_sgen():
     assert net.res_sgen.q_mvar.loc[0] < 218.0099945068
     assert net.res_sgen.q_mvar.loc[0] > -265.01001
 
+def test_cached_linear_solver():
+    net = case118()
+    runpp(net, init="dc")
+    vm_pu = net.res_bus.vm_pu.values.copy()
+    va_degree = net.res_bus.va_degree.values.copy()
+
+    runpp(net, init="dc", linear_solver="cached")
+    assert np.allclose(net.res_bus.vm_pu.values, vm_pu, atol=1e-10)
+    assert np.allclose(net.res_bus.va_degree.values, va_degree, atol=1e-8)
+    solver = net._ppc["internal"]["linear_solver"]
+    assert solver.misses == 1
+    assert solver.hits == net._ppc["iterations"] - 1
+
+    # the cached analysis is kept for the next power flow with the same topology
+    hits = solver.hits
+    net.load.p_mw *= 1.05
+    runpp(net, init="dc", linear_solver="cached")
+    assert net._ppc["internal"]["linear_solver"] is solver
+    assert solver.misses == 1
+    assert solver.hits == hits + net._ppc["iterations"]
+
+    # and for recycled power flows
+    net.load.p_mw *= 1.05
+    runpp(net, linear_solver="cached", recycle=dict(bus_pq=True, gen=False, trafo=False))
+    assert net._ppc["internal"]["linear_solver"] is solver
+    assert solver.misses == 1
+
+    # a changed topology leads to a new analysis
+    net.line.at[5, "in_service"] = False
+    runpp(net, init="dc", linear_solver="cached")
+    assert solver.misses == 2
+    net2 = copy.deepcopy(net)
+    runpp(net2, init="dc")
+    assert np.allclose(net.res_bus.vm_pu.values, net2.res_bus.vm_pu.values, atol=1e-10)
+
+
+def test_custom_linear_solver():
+    class CountingSolver:
+        def __init__(self):
+            self.calls = 0
+
+        def solve(self, J, F):
+            self.calls += 1
+            return np.linalg.solve(J.toarray(), F)
+
+    net = example_simple()
+    runpp(net)
+    vm_pu = net.res_bus.vm_pu.values.copy()
+    solver = CountingSolver()
+    runpp(net, linear_solver=solver, init="dc")
+    assert solver.calls == net._ppc["iterations"]
+    assert np.allclose(net.res_bus.vm_pu.values, vm_pu, atol=1e-10)
+
+    with pytest.raises(ValueError):
+        runpp(net, linear_solver="unknown_solver")
+
+
+def test_runpp_profile():
+    net = example_simple()
+    runpp(net)
+    assert "_pf_profile" not in net
+    vm_pu = net.res_bus.vm_pu.values.copy()
+
+    runpp(net, profile=True)
+    assert np.allclose(net.res_bus.vm_pu.values, vm_pu, atol=1e-10)
+    profile = net._pf_profile
+    assert profile["converged"]
+    assert profile["iterations"] == net._ppc["iterations"]
+    assert profile["jacobian_nnz"] == net._ppc["internal"]["J"].nnz
+    assert profile["linear_solver"] == "SpsolveSolver"
+    assert profile["algorithm"] == "nr"
+    time_s = profile["time_s"]
+    for stage in ["init_options", "pd2ppc", "makeYbus", "makeSbus", "newtonpf", "jacobian",
+                  "linear_solver", "pfsoln", "extract_results", "total"]:
+        assert time_s[stage] >= 0
+    # the stages are nested in "total" and "newtonpf"
+    assert time_s["total"] >= time_s["pd2ppc"] + time_s["newtonpf"] + time_s["extract_results"]
+    assert time_s["newtonpf"] >= time_s["jacobian"] + time_s["linear_solver"]
+    # the profile is not kept in the options for the following power flows
+    assert net._options["profile"] is None
+
+    runpp(net, recycle=dict(bus_pq=True, gen=False, trafo=False), profile=True)
+    assert net._pf_profile["recycle"]["bus_pq"]
+    assert "init_options" not in net._pf_profile["time_s"]
+
+    rundcpp(net, profile=True)
+    assert net._pf_profile["iterations"] == 0
+    assert "extract_results" in net._pf_profile["time_s"]
+
+
+def test_pf_profiling_aggregation():
+    from pandapower.contingency import run_contingency
+    net = example_simple()
+    with pf_profiling(net) as profiler:
+        runpp(net)
+        runpp(net, recycle="auto")
+        runpp(net, recycle="auto")
+        nminus1_cases = {"line": {"index": net.line.index.values[:2]}}
+        run_contingency(net, nminus1_cases)
+    assert "_pf_profiler" not in net
+    assert len(profiler) == 3 + 3
+    summary = profiler.summary()
+    assert summary.at["total", "count"] == 6
+    assert summary.at["iterations", "total"] == sum(p["iterations"] for p in profiler.profiles)
+    assert np.isclose(summary.at["newtonpf", "total"],
+                      sum(p["time_s"].get("newtonpf", 0.) for p in profiler.profiles))
+    # the profiled power flows with recycle="auto" are recycled
+    assert profiler.profiles[2]["recycle"] is not None
+
+    runpp(net)
+    assert len(profiler) == 6
+
+
+def test_result_tables():
+    net = example_multivoltage()
+    runpp(net)
+    res_tables = [key for key in net.keys() if key.startswith("res_") and isinstance(net[key], pd.DataFrame)]
+    expected = {key: net[key].copy() for key in res_tables}
+
+    runpp(net, result_tables=["bus", "res_line"])
+    assert net._pending_results is not None
+    # the deferred tables are not extracted yet
+    assert dict.__getitem__(net, "res_trafo").loading_percent.isnull().all()
+    # the injection results are needed for the bus powers
+    assert "res_load" not in net._pending_results["tables"]
+    pd.testing.assert_frame_equal(dict.__getitem__(net, "res_line"), expected["res_line"])
+    pd.testing.assert_frame_equal(dict.__getitem__(net, "res_bus"), expected["res_bus"])
+    # the results are extracted when they are accessed, the switch results depend on the line results
+    pd.testing.assert_frame_equal(net.res_trafo, expected["res_trafo"])
+    pd.testing.assert_frame_equal(net["res_switch"], expected["res_switch"])
+    extract_pending_results(net)
+    assert "_pending_results" not in net
+    assert type(net) is type(example_simple())
+    for table in res_tables:
+        pd.testing.assert_frame_equal(net[table], expected[table])
+
+    # only the bus voltages -> the bus powers are not calculated
+    runpp(net, result_columns={"bus": ["vm_pu", "va_degree"], "line": ["loading_percent"]})
+    assert np.allclose(net.res_bus.vm_pu.values, expected["res_bus"].vm_pu.values)
+    assert net.res_bus.p_mw.isnull().all()
+    extract_pending_results(net)
+    pd.testing.assert_frame_equal(net.res_bus, expected["res_bus"])
+
+    # the bus powers are extracted with the injection results when res_bus is accessed
+    runpp(net, result_tables=["line"])
+    assert "res_bus" in net._pending_results["tables"]
+    pd.testing.assert_frame_equal(net.res_bus, expected["res_bus"])
+    pd.testing.assert_frame_equal(net.res_load, expected["res_load"])
+
+    # the deferred results are outdated if the net changes
+    runpp(net, result_tables=["bus"])
+    drop_elements(net, "line", net.line.index[:1])
+    assert net.res_trafo.loading_percent.isnull().all()
+    runpp(net, result_tables=["line"])
+    runpp(net)
+    assert "_pending_results" not in net
+
+
+def test_result_tables_changed_input(caplog):
+    net = example_simple()
+    runpp(net, result_tables=["line"])
+    # the load results would be extracted from the changed load table
+    net.load.loc[0, "p_mw"] = 5.
+    with caplog.at_level("WARNING"):
+        assert net.res_load.p_mw.isnull().all()
+    assert "not extracted because the net has changed" in caplog.text
+    assert "_pending_results" not in net
+    assert net.res_bus.p_mw.isnull().all()
+
+
+def test_result_tables_dc():
+    net = example_simple()
+    rundcpp(net)
+    expected = net.res_trafo.copy()
+    rundcpp(net, result_tables=["bus", "line"])
+    assert "res_trafo" in net._pending_results["tables"]
+    pd.testing.assert_frame_equal(net.res_trafo, expected)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-xs"])
@@ -583,5 +583,19 @@ def test_shunt_3ph():
     assert np.max(np.abs(line_power_pp - line_power_expected)) < 1e-5
 
 
+def test_3ph_result_tables(net):
+    runpp_3ph(net)
+    expected = {key: net[key].copy() for key in ["res_bus_3ph", "res_line_3ph", "res_ext_grid_3ph",
+                                                 "res_asymmetric_load_3ph"]}
+    runpp_3ph(net, result_columns={"bus": ["vm_a_pu", "vm_b_pu", "vm_c_pu"]})
+    assert np.allclose(net.res_bus_3ph.vm_a_pu.values, expected["res_bus_3ph"].vm_a_pu.values)
+    assert net.res_bus_3ph.p_a_mw.isnull().all()
+    # deferred results are extracted when they are accessed
+    assert np.allclose(net.res_line_3ph.i_a_from_ka.values, expected["res_line_3ph"].i_a_from_ka.values)
+    assert np.allclose(net.res_ext_grid_3ph.p_a_mw.values, expected["res_ext_grid_3ph"].p_a_mw.values)
+    assert np.allclose(net.res_bus_3ph.p_a_mw.values, expected["res_bus_3ph"].p_a_mw.values, equal_nan=True)
+    assert "_pending_results" not in net
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-xs"])
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import numpy as np
+import pytest
+
+from pandapower.networks import example_simple, case9
+from pandapower.pf.runpp_batch import runpp_batch
+from pandapower.run import runpp
+
+
+def _compare_with_runpp(net, res, p_load, q_load=None, p_sgen=None, p_gen=None, **kwargs):
+    for s in range(p_load.shape[0]):
+        net.load.p_mw = p_load[s]
+        if q_load is not None:
+            net.load.q_mvar = q_load[s]
+        if p_sgen is not None:
+            net.sgen.p_mw = p_sgen[s]
+        if p_gen is not None:
+            net.gen.p_mw = p_gen[s]
+        runpp(net, **kwargs)
+        assert np.allclose(net.res_bus.vm_pu.values, res["res_bus.vm_pu"][s], atol=1e-8, equal_nan=True)
+        assert np.allclose(net.res_bus.va_degree.values, res["res_bus.va_degree"][s], atol=1e-6,
+                           equal_nan=True)
+        assert np.allclose(net.res_line.p_from_mw.values, res["res_line.p_from_mw"][s], atol=1e-6)
+        assert np.allclose(net.res_line.loading_percent.values, res["res_line.loading_percent"][s],
+                           atol=1e-5)
+        if len(net.trafo):
+            assert np.allclose(net.res_trafo.loading_percent.values, res["res_trafo.loading_percent"][s],
+                               atol=1e-5)
+
+
+def test_runpp_batch_example_simple():
+    net = example_simple()
+    rng = np.random.default_rng(2)
+    n_scenarios = 7
+    p_load = net.load.p_mw.values * rng.uniform(0.5, 1.5, (n_scenarios, len(net.load)))
+    q_load = net.load.q_mvar.values * rng.uniform(0.5, 1.5, (n_scenarios, len(net.load)))
+    p_sgen = net.sgen.p_mw.values * rng.uniform(0., 1., (n_scenarios, len(net.sgen)))
+    p_gen = net.gen.p_mw.values * rng.uniform(0.5, 1., (n_scenarios, len(net.gen)))
+
+    res = runpp_batch(net, p_load=p_load, q_load=q_load, p_sgen=p_sgen, p_gen=p_gen, batch_size=3)
+    assert np.all(res["converged"])
+    assert res["res_bus.vm_pu"].shape == (n_scenarios, len(net.bus))
+    _compare_with_runpp(net, res, p_load, q_load, p_sgen, p_gen)
+
+
+def test_runpp_batch_voltage_dependent_loads():
+    net = case9()
+    net.load["const_z_percent"] = 40.
+    net.load["const_i_percent"] = 30.
+    rng = np.random.default_rng(3)
+    p_load = net.load.p_mw.values * rng.uniform(0.8, 1.2, (5, len(net.load)))
+
+    res = runpp_batch(net, p_load=p_load, voltage_depend_loads=True)
+    assert np.all(res["converged"])
+    _compare_with_runpp(net, res, p_load, voltage_depend_loads=True)
+
+
+def test_runpp_batch_input_errors():
+    net = example_simple()
+    with pytest.raises(ValueError):
+        runpp_batch(net)
+    with pytest.raises(ValueError):
+        runpp_batch(net, p_load=np.ones((3, len(net.load) + 1)))
+    with pytest.raises(ValueError):
+        runpp_batch(net, p_load=np.ones((3, len(net.load))), q_load=np.ones((2, len(net.load))))
+    with pytest.raises(NotImplementedError):
+        runpp_batch(net, p_load=np.ones((3, len(net.load))), distributed_slack=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-xs"])
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import os
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pandapower.control import ConstControl, ContinuousTapControl
+from pandapower.test.timeseries.test_timeseries import create_data_source, simple_test_net
+from pandapower.timeseries.output_writer import OutputWriter
+from pandapower.timeseries.run_time_series import run_timeseries
+
+n_timesteps = 10
+time_steps = range(n_timesteps)
+
+
+class AbortedSimulation(Exception):
+    pass
+
+
+class CountingControl(ConstControl):
+    # counts the time steps and aborts the time series simulation at abort_at
+    abort_at = None
+
+    def __init__(self, net, **kwargs):
+        super().__init__(net, **kwargs)
+        self.n_time_steps = 0
+
+    def time_step(self, net, time):
+        if time == CountingControl.abort_at:
+            raise AbortedSimulation
+        super().time_step(net, time)
+        self.n_time_steps += 1
+
+
+def create_net(net, ds, output_path=None, output_file_type=".p"):
+    net = deepcopy(net)
+    CountingControl(net, element="load", variable="p_mw", element_index=[0, 1, 2], data_source=ds,
+                    profile_name=["load1", "load2_mv_p", "load3_hv_p"])
+    ContinuousTapControl(net, 0, 1.0)
+    ow = OutputWriter(net, output_path=output_path, output_file_type=output_file_type, log_variables=list(),
+                      chunk_size=3)
+    ow.log_variable("res_bus", "vm_pu")
+    ow.log_variable("res_line", "i_ka")
+    ow.log_variable("trafo", "tap_pos")
+    return net, ow
+
+
+@pytest.fixture
+def abort_at():
+    yield 6
+    CountingControl.abort_at = None
+
+
+def test_checkpoint_resume(simple_test_net, tmp_path, abort_at):
+    _, ds = create_data_source(n_timesteps)
+    net, ow = create_net(simple_test_net, ds)
+    run_timeseries(net, time_steps, verbose=False)
+    expected = {key: df.copy() for key, df in ow.output.items()}
+
+    checkpoint_path = os.path.join(str(tmp_path), "checkpoint.p")
+    CountingControl.abort_at = abort_at
+    net, ow = create_net(simple_test_net, ds)
+    with pytest.raises(AbortedSimulation):
+        # a checkpoint is written after each time step
+        run_timeseries(net, time_steps, verbose=False, checkpoint_path=checkpoint_path, checkpoint_time=0.)
+    assert os.path.isfile(checkpoint_path)
+
+    CountingControl.abort_at = None
+    net, ow = create_net(simple_test_net, ds)
+    run_timeseries(net, time_steps, verbose=False, checkpoint_path=checkpoint_path, resume_from=checkpoint_path)
+    for key, df in expected.items():
+        pd.testing.assert_frame_equal(df, ow.output[key])
+    # the state of the controllers is restored
+    assert net.controller.object.at[0].n_time_steps == n_timesteps
+    # the checkpoint is removed after the last time step
+    assert not os.path.isfile(checkpoint_path)
+
+    # the checkpoint has to match the time steps
+    net, ow = create_net(simple_test_net, ds)
+    CountingControl.abort_at = abort_at
+    with pytest.raises(AbortedSimulation):
+        run_timeseries(net, time_steps, verbose=False, checkpoint_path=checkpoint_path, checkpoint_time=0.)
+    with pytest.raises(UserWarning):
+        run_timeseries(net, range(n_timesteps - 1), verbose=False, resume_from=checkpoint_path)
+
+
+def test_checkpoint_resume_streamed_output(simple_test_net, tmp_path, abort_at):
+    pytest.importorskip("pyarrow")
+    _, ds = create_data_source(n_timesteps)
+    net, ow = create_net(simple_test_net, ds, output_path=os.path.join(str(tmp_path), "expected"),
+                         output_file_type=".parquet")
+    run_timeseries(net, time_steps, verbose=False)
+    expected = ow.read_output("res_bus", "vm_pu")
+
+    output_path = os.path.join(str(tmp_path), "resumed")
+    checkpoint_path = os.path.join(str(tmp_path), "checkpoint.p")
+    CountingControl.abort_at = abort_at
+    net, ow = create_net(simple_test_net, ds, output_path=output_path, output_file_type=".parquet")
+    with pytest.raises(AbortedSimulation):
+        # the checkpoints are written after each chunk of 3 time steps
+        run_timeseries(net, time_steps, verbose=False, checkpoint_path=checkpoint_path)
+    assert len(ow.read_output("res_bus", "vm_pu")) == 6
+
+    CountingControl.abort_at = None
+    net, ow = create_net(simple_test_net, ds, output_path=output_path, output_file_type=".parquet")
+    run_timeseries(net, time_steps, verbose=False, resume_from=checkpoint_path)
+    pd.testing.assert_frame_equal(expected, ow.read_output("res_bus", "vm_pu"))
+    assert np.array_equal(ow.read_output("Parameters").time_step.values, np.arange(n_timesteps))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
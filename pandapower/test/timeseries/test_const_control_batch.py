@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pandapower.control import ConstControl
+from pandapower.control.run_control import get_controller_order
+from pandapower.create import create_load, create_sgen
+from pandapower.networks import mv_oberrhein
+from pandapower.test.timeseries.test_timeseries import simple_test_net
+from pandapower.timeseries.const_control_batch import init_const_control_batch
+from pandapower.timeseries.data_sources.frame_data import DFData
+from pandapower.timeseries.data_sources.mmap_data import save_mmap_profiles
+
+
+def controller_order(net):
+    return get_controller_order(net, net.controller)[1]
+
+
+def apply_time_step(net, time_step):
+    # applies the profiles of a time step with ConstControl.time_step() and with the ConstControlBatch
+    net_loop = copy.deepcopy(net)
+    for level in controller_order(net_loop):
+        for ctrl, ctrl_net in level:
+            ctrl.time_step(ctrl_net, time_step)
+    batch, remaining_order = init_const_control_batch(controller_order(net))
+    batch.time_step(time_step)
+    for level in remaining_order:
+        for ctrl, ctrl_net in level:
+            ctrl.time_step(ctrl_net, time_step)
+    return net_loop, batch, remaining_order
+
+
+def test_const_control_batch(simple_test_net, tmp_path):
+    net = simple_test_net
+    create_sgen(net, 2, 1.)
+    create_sgen(net, 3, 2.)
+    profiles = pd.DataFrame(np.random.default_rng(1).random((4, 4)), columns=["a", "b", "c", 3])
+    ds = DFData(profiles)
+    flag_ds = DFData(pd.DataFrame({"flag": [True, False, True, False]}))
+    mmap_ds = save_mmap_profiles(profiles[["a", "b"]] * 10, os.path.join(str(tmp_path), "profiles.npy"))
+    ConstControl(net, "load", "p_mw", element_index=0, data_source=ds, profile_name="a")
+    ConstControl(net, "load", "p_mw", element_index=[2, 1], data_source=ds, profile_name=["b", 3],
+                 scale_factor=2.)
+    ConstControl(net, "load", "q_mvar", element_index=[0, 1, 2], data_source=ds, profile_name="c",
+                 scale_factor=np.array([1., 2., 3.]))
+    ConstControl(net, "sgen", "p_mw", element_index=[0, 1], data_source=mmap_ds, profile_name=["a", "b"])
+    # the last controller of the same element wins
+    ConstControl(net, "sgen", "q_mvar", element_index=0, data_source=ds, profile_name="a")
+    ConstControl(net, "sgen", "q_mvar", element_index=0, data_source=ds, profile_name="b")
+    # controllers which are called in each time step
+    ConstControl(net, "sgen", "in_service", element_index=1, data_source=flag_ds, profile_name="flag")
+    ConstControl(net, "ext_grid", "vm_pu", element_index=0)
+
+    for time_step in range(len(profiles)):
+        net_loop, batch, remaining_order = apply_time_step(net, time_step)
+        for element in ["load", "sgen", "ext_grid"]:
+            pd.testing.assert_frame_equal(net[element], net_loop[element])
+        for ctrl, ctrl_loop in zip(net.controller.object, net_loop.controller.object):
+            assert np.allclose(ctrl.values, ctrl_loop.values)
+            assert np.shape(ctrl.values) == np.shape(ctrl_loop.values)
+            assert not ctrl.applied
+    assert len(batch.controllers) == 6
+    assert len(batch.columns) == 4
+    assert len(batch.data_sources) == 2
+    assert [ctrl.index for level in remaining_order for ctrl, _ in level] == [6, 7]
+
+    # the rows are looked up again if the element table changes
+    create_load(net, 0, 5., index=10)
+    net.load = net.load.sort_index(ascending=False)
+    net_loop, _, _ = apply_time_step(net, 1)
+    pd.testing.assert_frame_equal(net.load, net_loop.load)
+
+
+def test_const_control_batch_not_possible(simple_test_net):
+    net = simple_test_net
+    profiles = pd.DataFrame({"a": [1., 2.], "name": ["x", "y"]})
+    ds = DFData(profiles)
+    ConstControl(net, "load", "name", element_index=0, data_source=ds, profile_name="name")
+    ConstControl(net, "load", "p_mw", element_index=0, data_source=ds, profile_name="missing")
+    batch, remaining_order = init_const_control_batch(controller_order(net))
+    assert batch is None
+    assert remaining_order == controller_order(net)
+
+
+@pytest.mark.slow
+def test_const_control_batch_mv_oberrhein():
+    # one ConstControl per load, applied by the controllers and by the batch
+    net = mv_oberrhein()
+    profiles = pd.DataFrame(np.random.default_rng(0).random((20, len(net.load))), columns=net.load.index)
+    ds = DFData(profiles)
+    for idx in net.load.index:
+        ConstControl(net, "load", "p_mw", element_index=idx, data_source=ds, profile_name=idx)
+    net_loop = copy.deepcopy(net)
+    order_loop = controller_order(net_loop)
+    batch, _ = init_const_control_batch(controller_order(net))
+    for time_step in profiles.index:
+        for level in order_loop:
+            for ctrl, ctrl_net in level:
+                ctrl.time_step(ctrl_net, time_step)
+        batch.time_step(time_step)
+        assert np.array_equal(net.load.p_mw.values, net_loop.load.p_mw.values)
+    assert np.allclose(net.load.p_mw.values, profiles.iloc[-1].values)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
@@ -5,12 +5,15 @@
 
 import copy
 import os
+import pickle
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from pandapower import pp_dir
 from pandapower.timeseries.data_sources.frame_data import DFData
+from pandapower.timeseries.data_sources.mmap_data import MMapData, save_mmap_profiles
 
 epsilon = 0.00000000000001
 
@@ -34,5 +37,36 @@ def test_data_source():
                - -5.37E-3) < epsilon
 
 
+def test_mmap_data_source(tmp_path):
+    filename = os.path.join(pp_dir, "test", "timeseries", "test_files", "small_profile.csv")
+    df = pd.read_csv(filename, sep=";")
+    df_data = DFData(df)
+    file_path = os.path.join(str(tmp_path), "profiles.npy")
+    mmap_data = save_mmap_profiles(df, file_path)
+
+    assert mmap_data.get_time_steps_len() == df_data.get_time_steps_len()
+    profile_names = list(df.columns)
+    for time_step in range(len(df)):
+        assert np.allclose(mmap_data.get_time_step_value(time_step, profile_names, 0.5),
+                           df_data.get_time_step_value(time_step, profile_names, 0.5))
+        assert np.isclose(mmap_data.get_time_step_value(time_step, "constload3"),
+                          df_data.get_time_step_value(time_step, "constload3"))
+    # not consecutive profiles
+    profile_names = profile_names[::-1]
+    assert np.allclose(mmap_data.get_time_step_value(4, profile_names),
+                       df_data.get_time_step_value(4, profile_names))
+
+    # the profile names are read from the file, the memory map is not copied
+    mmap_data = MMapData(file_path)
+    assert isinstance(mmap_data.data, np.memmap)
+    copied = pickle.loads(pickle.dumps(mmap_data))
+    assert copied._data is None
+    assert np.isclose(copied.get_time_step_value(8, "constload3"), -5.37E-3)
+    copied = copy.deepcopy(mmap_data)
+    assert np.isclose(copied.get_time_step_value(8, "constload3"), -5.37E-3)
+    copied = MMapData.from_json(mmap_data.to_json())
+    assert np.isclose(copied.get_time_step_value(8, "constload3"), -5.37E-3)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, "-xs"])
@@ -330,6 +330,80 @@ def test_equal_eval_name_warning_and_costs():
     assert len(ow.np_results) == 3
 
 
+@pytest.mark.parametrize("file_type, package", [(".parquet", "pyarrow"), (".h5", "tables"), (".zarr", "zarr")])
+def test_output_writer_streaming(simple_test_net, tmp_path, file_type, package):
+    pytest.importorskip(package)
+    net = simple_test_net
+    n_timesteps = 7
+    profiles, ds = create_data_source(n_timesteps)
+    ConstControl(net, element='load', variable='p_mw', element_index=[0, 1, 2],
+                 data_source=ds, profile_name=["load1", "load2_mv_p", "load3_hv_p"])
+    time_steps = range(0, n_timesteps)
+
+    ow = OutputWriter(net, time_steps, output_path=None)
+    ow.log_variable('res_load', 'p_mw')
+    ow.log_variable('res_bus', 'vm_pu', eval_function=max, eval_name="max")
+    run_timeseries(net, time_steps, verbose=False)
+    expected = {key: df.copy() for key, df in ow.output.items()}
+
+    ow = OutputWriter(net, time_steps, output_path=str(tmp_path), output_file_type=file_type, chunk_size=3)
+    ow.log_variable('res_load', 'p_mw')
+    ow.log_variable('res_bus', 'vm_pu', eval_function=max, eval_name="max")
+    run_timeseries(net, time_steps, verbose=False)
+
+    # only one chunk of time steps is kept in memory
+    assert all(values.shape[0] == 3 for values in ow.np_results.values())
+    for table, variable in [("res_load", "p_mw"), ("res_bus", "vm_pu"), ("res_line", "loading_percent")]:
+        df = ow.read_output(table, variable)
+        pd.testing.assert_frame_equal(df, expected["%s.%s" % (table, variable)], check_dtype=False,
+                                      check_index_type=False)
+    parameters = ow.read_output("Parameters")
+    assert np.array_equal(parameters.index, time_steps)
+    assert not parameters.powerflow_failed.any()
+
+    # the stored results are overwritten by the next time series simulation
+    run_timeseries(net, range(0, 2), verbose=False)
+    assert len(ow.read_output("res_load", "p_mw")) == 2
+
+
+def test_output_writer_async(simple_test_net):
+    net = simple_test_net
+    n_timesteps = 6
+    profiles, ds = create_data_source(n_timesteps)
+    ConstControl(net, element='load', variable='p_mw', element_index=[0, 1, 2],
+                 data_source=ds, profile_name=["load1", "load2_mv_p", "load3_hv_p"])
+    time_steps = range(0, n_timesteps)
+
+    outputs = list()
+    for async_buffer_size in [None, 2]:
+        ow = OutputWriter(net, time_steps, output_path=None, async_buffer_size=async_buffer_size)
+        ow.log_variable('res_load', 'p_mw')
+        ow.log_variable('res_bus', 'vm_pu', index=[3, 1])
+        ow.log_variable('res_line', 'loading_percent', eval_function=np.max, eval_name="max_loading")
+        ow.log_variable('load', 'p_mw')
+        run_timeseries(net, time_steps, verbose=False, recycle=False)
+        outputs.append({key: df.copy() for key, df in ow.output.items()})
+
+    assert ow._async_thread is None
+    assert outputs[0].keys() == outputs[1].keys()
+    for key, df in outputs[0].items():
+        pd.testing.assert_frame_equal(df, outputs[1][key])
+    assert np.allclose(outputs[1]["load.p_mw"][0].values, profiles["load1"].values)
+
+    # the background thread is also stopped if the time series is aborted
+    def run_until_step_3(net, **kwargs):
+        if net.load.at[0, "p_mw"] == profiles["load1"].iat[3]:
+            raise ValueError("aborted")
+        runpp(net, **kwargs)
+
+    ow = OutputWriter(net, time_steps, output_path=None, async_buffer_size=2)
+    ow.log_variable('res_load', 'p_mw')
+    with pytest.raises(ValueError):
+        run_timeseries(net, time_steps, verbose=False, recycle=False, run=run_until_step_3)
+    assert ow._async_thread is None
+    assert not np.isnan(ow.np_results["res_load.p_mw"][:3]).any()
+
+
 def cost_logging(result, n_columns=4):
     return np.array([result[i][0][2] for i in range(len(result))])
 
@@ -5,12 +5,13 @@
 
 import logging
 import tempfile
+from copy import deepcopy
 
 import numpy as np
 import pandas as pd
 import pytest
 
-from pandapower.control import ContinuousTapControl, ConstControl
+from pandapower.control import ContinuousTapControl, ConstControl, VmSetTapControl, Characteristic, PQController
 from pandapower.control.util.diagnostic import logger as diagnostic_logger
 from pandapower.create import create_empty_network, create_bus, create_ext_grid, create_line, create_transformer, \
     create_load, create_loads, create_buses, create_switch, create_lines, create_transformer3w_from_parameters
@@ -227,6 +228,89 @@ def test_timeseries_results(simple_test_net):
     assert np.allclose(ow.output['res_load.p_mw'][0].sum(), profiles["load1"].sum())
 
 
+def test_timeseries_parallel(simple_test_net):
+    profiles, ds = create_data_source(7)
+    time_steps = range(0, 7)
+    outputs = dict()
+    for n_jobs in [1, 2]:
+        net = deepcopy(simple_test_net)
+        ConstControl(net, 'load', 'p_mw', element_index=[0, 1, 2], data_source=ds,
+                     profile_name=["load1", "load2_mv_p", "load3_hv_p"])
+        ConstControl(net, 'ext_grid', 'vm_pu', element_index=0, data_source=ds, profile_name='slack_v')
+        # batch read of the bus and line results and results of other tables
+        for log_variables in [[('res_bus', 'vm_pu'), ('res_line', 'loading_percent')],
+                              [('res_load', 'p_mw'), ('res_trafo3w', 'p_hv_mw')]]:
+            ow = OutputWriter(net, time_steps, output_path=None)
+            for table, variable in log_variables:
+                ow.log_variable(table, variable)
+            run_timeseries(net, time_steps, verbose=False, n_jobs=n_jobs)
+            outputs[n_jobs] = outputs.get(n_jobs, dict())
+            outputs[n_jobs].update({key: df.copy() for key, df in ow.output.items()})
+    assert outputs[1].keys() == outputs[2].keys()
+    for key, df in outputs[1].items():
+        pd.testing.assert_frame_equal(df, outputs[2][key], check_dtype=False)
+    assert np.allclose(outputs[2]["res_load.p_mw"][0].values, profiles["load1"].values)
+
+    # the tap changer controller carries its tap position from one time step to the next
+    net = deepcopy(simple_test_net)
+    ConstControl(net, 'load', 'p_mw', element_index=0, data_source=ds, profile_name="load1")
+    ContinuousTapControl(net, 0, 1.0)
+    ow = setup_output_writer(net, time_steps)
+    run_timeseries(net, time_steps, verbose=False, n_jobs=2)
+    assert len(ow.output['res_bus.vm_pu']) == 7
+
+    # the PQController (and the DERController derived from it) depends on the previous time step
+    net = deepcopy(simple_test_net)
+    ConstControl(net, 'load', 'p_mw', element_index=0, data_source=ds, profile_name="load1")
+    pq_ctrl = PQController(net, [1], element="load")
+    assert net.controller.object.at[0].is_chunkable(net)
+    assert not pq_ctrl.is_chunkable(net)
+    ow = setup_output_writer(net, time_steps)
+    run_timeseries(net, time_steps, verbose=False, n_jobs=2)
+    assert len(ow.output['res_bus.vm_pu']) == 7
+
+
+def test_skip_unchanged_steps(simple_test_net):
+    # piecewise constant profiles, the time steps 1, 2 and 5 do not change the loads
+    profiles = pd.DataFrame({"load1": [10., 10., 10., 15., 12., 12.], "load2": [20., 20., 20., 20., 25., 25.]})
+    ds = DFData(profiles)
+    time_steps = range(len(profiles))
+    outputs = dict()
+    for skip in [False, True]:
+        net = deepcopy(simple_test_net)
+        ConstControl(net, 'load', 'p_mw', element_index=[0, 1], data_source=ds, profile_name=["load1", "load2"])
+        ContinuousTapControl(net, 0, 1.0)
+        ow = OutputWriter(net, time_steps, output_path=None)
+        ow.log_variable('res_bus', 'vm_pu')
+        ow.log_variable('res_load', 'p_mw', index=[0])
+        n_skipped = run_timeseries(net, time_steps, verbose=False, skip_unchanged_steps=skip)
+        assert n_skipped == (3 if skip else 0)
+        outputs[skip] = ow.output
+    for key in ["res_bus.vm_pu", "res_load.p_mw"]:
+        pd.testing.assert_frame_equal(outputs[False][key], outputs[True][key])
+    assert "skipped" not in outputs[False]["Parameters"].columns
+    assert list(outputs[True]["Parameters"].index[outputs[True]["Parameters"].skipped]) == [1, 2, 5]
+
+    # the profile changes are below the tolerance
+    ds.df["load1"] += np.arange(len(profiles)) * 1e-6
+    ConstControl(net, 'load', 'p_mw', element_index=[0, 1], data_source=ds, profile_name=["load1", "load2"],
+                 drop_same_existing_ctrl=True)
+    assert run_timeseries(net, time_steps, verbose=False, skip_unchanged_steps=True, skip_tolerance=1e-5) == 3
+    assert list(ow.output["Parameters"].index[ow.output["Parameters"].skipped]) == [1, 2, 5]
+
+
+def test_skip_unchanged_steps_not_possible(simple_test_net):
+    net = simple_test_net
+    profiles = pd.DataFrame({"load1": [10., 10., 10.]})
+    ConstControl(net, 'load', 'p_mw', element_index=0, data_source=DFData(profiles), profile_name="load1")
+    # the characteristic controller does not define the values it writes to the net
+    tc = ContinuousTapControl(net, 0, 1.0)
+    VmSetTapControl(net, tc.index, Characteristic(net, [0, 20], [1.01, 1.0]).index)
+    ow = setup_output_writer(net, range(3))
+    assert run_timeseries(net, range(3), verbose=False, skip_unchanged_steps=True) == 0
+    assert "skipped" not in ow.output["Parameters"].columns
+
+
 def test_timeseries_var_func(simple_test_net):
     # This test checks if the output writer works with a user defined function
 
@@ -5,13 +5,14 @@ import numpy as np
 import pytest
 
 from pandapower.control.controller.trafo.ContinuousTapControl import ContinuousTapControl
-from pandapower.create import create_gen, create_bus, create_line, create_transformer, create_transformer3w
+from pandapower.create import create_gen, create_bus, create_line, create_transformer, create_transformer3w, \
+    create_sgen, create_impedance
 from pandapower.run import runpp, rundcpp
 from pandapower.test.timeseries.test_output_writer import create_data_source, OutputWriter, ConstControl, \
     run_timeseries, simple_test_net
 from pandapower.timeseries.data_sources.frame_data import DFData
 from pandapower.timeseries.read_batch_results import get_batch_line_results, get_batch_trafo_results, \
-    get_batch_trafo3w_results, v_to_i_s, polar_to_rad
+    get_batch_trafo3w_results, v_to_i_s, polar_to_rad, BATCH_RESULT_VARIABLES
 
 n_timesteps = 5
 time_steps = range(0, n_timesteps)
@@ -223,6 +224,25 @@ def test_trafo_tap(simple_test_net, run_function=runpp):
     assert np.allclose(ll, ow.output["res_line.loading_percent"])
 
 
+def test_trafo_tap_recycle_auto(simple_test_net):
+    # the changes of the ConstControl and the ContinuousTapControl are detected by runpp
+    net = simple_test_net
+    _, ds = create_data_source(n_timesteps)
+    c1 = add_const(net, ds, recycle=False)
+    c2 = ContinuousTapControl(net, 0, .99, recycle=False, tol=1e-9)
+    ow = OutputWriter(net, output_path=tempfile.gettempdir(), output_file_type=".json",
+                      log_variables=[("res_bus", "vm_pu"), ("res_line", "loading_percent")])
+    run_timeseries(net, time_steps, recycle="auto", verbose=False)
+    vm_pu = copy.deepcopy(ow.output["res_bus.vm_pu"])
+    ll = copy.deepcopy(ow.output["res_line.loading_percent"])
+    net.output_writer = net.output_writer.drop(index=net.output_writer.index)
+    del ow, c1, c2
+
+    ow = _run_normal(net, runpp)
+    assert np.allclose(vm_pu, ow.output["res_bus.vm_pu"])
+    assert np.allclose(ll, ow.output["res_line.loading_percent"])
+
+
 def test_trafo_tap_dc(simple_test_net, run_function=rundcpp):
     # allows to use recycle = {"trafo"} but not fast output read
     net = simple_test_net
@@ -355,6 +375,40 @@ def test_const_pq_gen_trafo_tap_shifter(simple_test_net, run_function):
     assert np.allclose(ll, ow.output["res_line.loading_percent"], rtol=0, atol=1e-6)
 
 
+def test_batch_read_all_variables(simple_test_net):
+    # branch powers, losses and currents, injection results and tap changes from profiles are read in batch
+    net = simple_test_net
+    create_sgen(net, 2, 3., 0.5)
+    create_gen(net, 3, 4., 1.01)
+    create_impedance(net, 1, 2, 0.01, 0.02, 100)
+    net.load.loc[0, "const_i_percent"] = 20.
+    net.load.loc[1, "const_z_percent"] = 30.
+    _, ds = create_data_source(n_timesteps)
+    log_variables = [(table, variable) for table, variables in BATCH_RESULT_VARIABLES.items()
+                     for variable in variables]
+
+    outputs = list()
+    for recycle in [None, False]:
+        controllers = [add_const(net, ds, recycle=recycle),
+                       add_const(net, ds, recycle=recycle, element="sgen", variable="q_mvar", element_index=[0],
+                                 profile_name=["load1"]),
+                       add_const(net, ds, recycle=recycle, element="gen", variable="p_mw", element_index=[0],
+                                 profile_name=["load1"]),
+                       add_const(net, ds, recycle=recycle, element="trafo", variable="tap_pos", element_index=0,
+                                 profile_name="trafo_tap")]
+        ow = OutputWriter(net, output_path=None, log_variables=list(log_variables))
+        run_timeseries(net, time_steps, verbose=False)
+        if recycle is None:
+            assert net.output_writer.object.at[0].output_list == log_variables
+        outputs.append(ow.output)
+        net.controller = net.controller.drop(index=net.controller.index)
+        del controllers, ow
+
+    for table, variable in log_variables:
+        name = "%s.%s" % (table, variable)
+        assert np.allclose(outputs[0][name], outputs[1][name], rtol=0, atol=1e-6, equal_nan=True), name
+
+
 def test_const_pq_out_of_service(simple_test_net, run_function):
     # allows to use recycle = {"bus_pq"} and fast output read
     net = simple_test_net
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import copy
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pandapower.control import ConstControl, ContinuousTapControl
+from pandapower.create import create_gen, create_sgen, create_svc
+from pandapower.networks import mv_oberrhein
+from pandapower.run import runpp
+from pandapower.test.timeseries.test_timeseries import create_data_source, simple_test_net
+from pandapower.timeseries.data_sources.frame_data import DFData
+from pandapower.timeseries.output_writer import OutputWriter
+from pandapower.timeseries.run_time_series import run_timeseries, init_time_series
+from pandapower.timeseries.ts_runpp import TimeSeriesRunpp
+
+n_timesteps = 8
+time_steps = range(n_timesteps)
+# results which are read in batch after the time series and results which are extracted in each time step
+BATCH_LOG_VARIABLES = [("res_bus", "vm_pu"), ("res_bus", "va_degree"), ("res_line", "p_from_mw"),
+                       ("res_trafo", "loading_percent"), ("res_trafo3w", "q_hv_mvar"), ("res_ext_grid", "p_mw")]
+STEP_LOG_VARIABLES = [("res_bus", "vm_pu", [1, 2, 3]), ("res_line", "i_ka", [0]),
+                      ("res_trafo", "p_lv_mw", [0]), ("res_ext_grid", "q_mvar", [0])]
+
+
+def add_load_controllers(net, ds):
+    ConstControl(net, "load", "p_mw", element_index=[0, 1, 2], data_source=ds,
+                 profile_name=["load1", "load2_mv_p", "load3_hv_p"])
+    ConstControl(net, "load", "q_mvar", element_index=[1, 2], data_source=ds,
+                 profile_name=["load2_mv_q", "load3_hv_q"])
+
+
+def run_engines(net, log_variables, **kwargs):
+    # results of the standard engine without recycle and of the fast engine
+    outputs = list()
+    for engine in ["standard", "fast"]:
+        net_engine = copy.deepcopy(net)
+        ow = OutputWriter(net_engine, output_path=None, log_variables=list())
+        for output in log_variables:
+            ow.log_variable(*output)
+        if engine == "standard":
+            run_timeseries(net_engine, time_steps, verbose=False, recycle=False, **kwargs)
+        else:
+            run_timeseries(net_engine, time_steps, verbose=False, engine="fast", **kwargs)
+        outputs.append(ow.output)
+    return outputs
+
+
+def assert_outputs_equal(outputs):
+    standard, fast = outputs
+    for name, df in standard.items():
+        if name == "Parameters":
+            continue
+        assert np.allclose(df.values, fast[name].values, atol=1e-6, equal_nan=True), name
+
+
+@pytest.mark.parametrize("log_variables", [BATCH_LOG_VARIABLES, STEP_LOG_VARIABLES])
+def test_fast_engine_loads(simple_test_net, log_variables):
+    net = simple_test_net
+    create_sgen(net, 2, 5., q_mvar=1.)
+    _, ds = create_data_source(n_timesteps)
+    add_load_controllers(net, ds)
+    ConstControl(net, "sgen", "p_mw", element_index=0, data_source=ds, profile_name="load1")
+    net.load["const_z_percent"] = [20., 0., 50.]
+    assert_outputs_equal(run_engines(net, log_variables))
+
+
+def test_fast_engine_gen_ext_grid_trafo_tap(simple_test_net):
+    net = simple_test_net
+    create_gen(net, 3, 10., vm_pu=1.01)
+    _, ds = create_data_source(n_timesteps)
+    add_load_controllers(net, ds)
+    ConstControl(net, "gen", "p_mw", element_index=0, data_source=ds, profile_name="load1")
+    ConstControl(net, "gen", "vm_pu", element_index=0, data_source=ds, profile_name="trafo_v")
+    ConstControl(net, "ext_grid", "vm_pu", element_index=0, data_source=ds, profile_name="trafo_v")
+    ConstControl(net, "trafo", "tap_pos", element_index=0, data_source=ds, profile_name="trafo_tap")
+    ConstControl(net, "trafo3w", "tap_pos", element_index=0, data_source=ds, profile_name="trafo_tap")
+    log_variables = BATCH_LOG_VARIABLES + [("res_gen", "q_mvar"), ("res_trafo3w", "p_mv_mw", [0])]
+    assert_outputs_equal(run_engines(net, log_variables))
+
+
+def test_fast_engine_tap_control(simple_test_net):
+    # the tap changes of the controller are applied by updating the admittance matrices
+    net = simple_test_net
+    _, ds = create_data_source(n_timesteps)
+    add_load_controllers(net, ds)
+    ContinuousTapControl(net, 0, vm_set_pu=1.02, tol=1e-6)
+    outputs = run_engines(net, STEP_LOG_VARIABLES + [("trafo", "tap_pos")])
+    assert_outputs_equal(outputs)
+    assert np.allclose(outputs[1]["res_bus.vm_pu"][2].values, 1.02, atol=1e-5)
+
+
+def test_fast_engine_distributed_slack(simple_test_net):
+    net = simple_test_net
+    create_gen(net, 3, 10., vm_pu=1.01, slack_weight=2.)
+    net.ext_grid["slack_weight"] = 1.
+    profiles, ds = create_data_source(n_timesteps)
+    add_load_controllers(net, ds)
+    ConstControl(net, "gen", "p_mw", element_index=0, data_source=ds, profile_name="load1")
+    log_variables = STEP_LOG_VARIABLES + [("res_gen", "p_mw")]
+    outputs = run_engines(net, log_variables, distributed_slack=True)
+    assert_outputs_equal(outputs)
+    # the gen takes part in balancing the loads
+    assert not np.allclose(outputs[1]["res_gen.p_mw"].values[:, 0], profiles["load1"].values)
+
+
+def test_fast_engine_facts(simple_test_net):
+    net = simple_test_net
+    create_svc(net, 3, x_l_ohm=1, x_cvar_ohm=-10, set_vm_pu=1.0, thyristor_firing_angle_degree=140)
+    _, ds = create_data_source(n_timesteps)
+    # the profiles keep the svc in the same operating range
+    ds.df["load1"] = np.linspace(5., 15., n_timesteps)
+    ds.df["svc_v"] = np.linspace(0.99, 1.01, n_timesteps)
+    ConstControl(net, "load", "p_mw", element_index=0, data_source=ds, profile_name="load1")
+    ConstControl(net, "svc", "set_vm_pu", element_index=0, data_source=ds, profile_name="svc_v")
+    log_variables = STEP_LOG_VARIABLES + [("res_svc", "q_mvar", [0])]
+    outputs = run_engines(net, log_variables)
+    assert_outputs_equal(outputs)
+    assert np.allclose(outputs[1]["res_bus.vm_pu"][3].values, ds.df["svc_v"].values, atol=1e-6)
+
+
+def test_fast_engine_run_function(simple_test_net):
+    net = simple_test_net
+    _, ds = create_data_source(n_timesteps)
+    add_load_controllers(net, ds)
+    OutputWriter(net, output_path=None)
+    ts_variables = init_time_series(net, time_steps, verbose=False, engine="fast")
+    run = ts_variables["run"]
+    assert isinstance(run, TimeSeriesRunpp)
+    assert run.recycle == dict(bus_pq=True, gen=False, trafo=False, facts=False)
+    with pytest.raises(ValueError):
+        init_time_series(net, time_steps, verbose=False, engine="faster")
+
+    # the controllers have to be recyclable, otherwise runpp is used
+    ConstControl(net, "load", "scaling", element_index=0, data_source=ds, profile_name="trafo_v", recycle=False)
+    ts_variables = init_time_series(net, time_steps, verbose=False, engine="fast")
+    assert ts_variables["run"] is runpp
+
+    # the stored variables are used after the first power flow
+    net.controller = net.controller.iloc[:2]
+    run = TimeSeriesRunpp(net, dict(bus_pq=True))
+    run(net, recycle=run.recycle)
+    assert run.fast_runs == 0
+    for p_mw in [10., 20.]:
+        net.load.loc[0, "p_mw"] = p_mw
+        run(net, recycle=run.recycle)
+        net_runpp = copy.deepcopy(net)
+        runpp(net_runpp)
+        assert np.allclose(net.res_bus.vm_pu.values, net_runpp.res_bus.vm_pu.values)
+    assert run.fast_runs == 2
+
+
+def _mv_oberrhein_timeseries_net(n_steps):
+    net = mv_oberrhein()
+    profiles = pd.DataFrame(np.random.default_rng(0).random((n_steps, len(net.load))) * net.load.p_mw.values,
+                            columns=net.load.index)
+    ConstControl(net, "load", "p_mw", net.load.index, profile_name=net.load.index, data_source=DFData(profiles))
+    log_variables = [("res_bus", "vm_pu", net.bus.index), ("res_line", "loading_percent", net.line.index)]
+    return net, log_variables
+
+
+def _run_mv_oberrhein_timeseries(net, log_variables, time_steps, **kwargs):
+    ow = OutputWriter(net, output_path=None, log_variables=list())
+    for output in log_variables:
+        ow.log_variable(*output)
+    run_timeseries(net, time_steps, verbose=False, **kwargs)
+    return ow
+
+
+@pytest.mark.slow
+def test_fast_engine_mv_oberrhein():
+    # the fast engine gives the results of the standard engine on a larger net
+    n_steps = 50
+    net, log_variables = _mv_oberrhein_timeseries_net(n_steps)
+
+    results = dict()
+    for engine in ["standard", "fast"]:
+        ow = _run_mv_oberrhein_timeseries(copy.deepcopy(net), log_variables, range(n_steps), engine=engine)
+        results[engine] = {key: df.values.copy() for key, df in ow.output.items() if key != "Parameters"}
+    for key, values in results["standard"].items():
+        assert np.allclose(values, results["fast"][key], atol=1e-8)
+
+
+@pytest.mark.slow
+def test_fast_engine_throughput():
+    # reports the throughput of the standard engine (without and with recycle) and of the fast engine,
+    # the durations are only printed (pytest -s) since they depend on the machine
+    n_steps = 50
+    net, log_variables = _mv_oberrhein_timeseries_net(n_steps)
+    runs = {"standard without recycle": dict(engine="standard", recycle=False),
+            "standard with recycle": dict(engine="standard"),
+            "fast": dict(engine="fast")}
+    for name, kwargs in runs.items():
+        net_engine = copy.deepcopy(net)
+        # the first run compiles the numba functions
+        _run_mv_oberrhein_timeseries(net_engine, log_variables, range(2), **kwargs)
+        t0 = perf_counter()
+        ow = _run_mv_oberrhein_timeseries(net_engine, log_variables, range(n_steps), **kwargs)
+        duration = perf_counter() - t0
+        print("engine %s: %.1f time steps/s (%.1f ms/step)" % (name, n_steps / duration, duration / n_steps * 1e3))
+        assert len(ow.output["res_bus.vm_pu"]) == n_steps
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, "-xs"])
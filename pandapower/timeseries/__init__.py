@@ -1,3 +1,4 @@
 from pandapower.timeseries.data_sources.frame_data import DFData
+from pandapower.timeseries.data_sources.mmap_data import MMapData, save_mmap_profiles
 from pandapower.timeseries.run_time_series import run_timeseries
 from pandapower.timeseries.output_writer import OutputWriter
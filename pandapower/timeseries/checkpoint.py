@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import os
+import pickle
+
+from pandapower.io_utils import mkdirs_if_not_existent
+from pandapower.timeseries.data_source import DataSource
+
+try:
+    import pandaplan.core.pplog as pplog
+except ImportError:
+    import logging as pplog
+
+logger = pplog.getLogger(__name__)
+
+# variables of the time series loop which are written to the checkpoints
+TS_CHECKPOINT_VARIABLES = ["controlled_values", "skipped_time_steps"]
+
+
+def _net_state(net):
+    # element and result tables; the internal power flow variables are built again in the next time step
+    return {key: val for key, val in net.items() if not key.startswith("_") and
+            key not in ["controller", "output_writer"]}
+
+
+def _controller_state(ctrl):
+    # the data sources do not change during the time series simulation and can be large
+    return {key: val for key, val in ctrl.__dict__.items() if not isinstance(val, DataSource)}
+
+
+def write_checkpoint(net, ts_variables, position, file_path):
+    """
+    Writes the state of a time series simulation after position time steps to a binary file: the element and
+    result tables of the net, the attributes of the controllers (except their data sources), the results of the
+    output writer so far and the state of the time series loop. The file is replaced atomically, so that the
+    last checkpoint is kept if the simulation is aborted while writing.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **ts_variables** (dict) - variables of the time series simulation, see init_time_series()
+
+        **position** (int) - number of calculated time steps of ts_variables["time_steps"]
+
+        **file_path** (str) - path of the checkpoint file
+    """
+    checkpoint = {
+        "time_steps": list(ts_variables["time_steps"]),
+        "position": position,
+        "net": _net_state(net),
+        "controller": {idx: _controller_state(ctrl) for idx, ctrl in net.controller.object.items()}
+        if "controller" in net else dict(),
+        "output_writer": net.output_writer.iat[0, 0].get_checkpoint_state(),
+        "ts_variables": {key: ts_variables[key] for key in TS_CHECKPOINT_VARIABLES if key in ts_variables}}
+    dir_name = os.path.dirname(file_path)
+    if dir_name:
+        mkdirs_if_not_existent(dir_name)
+    with open(file_path + ".tmp", "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(file_path + ".tmp", file_path)
+    logger.debug("checkpoint after %i time steps written to %s" % (position, file_path))
+
+
+def restore_checkpoint(net, ts_variables, file_path):
+    """
+    Restores the state of a time series simulation from a checkpoint written by write_checkpoint(). The net has
+    to contain the same controllers and the output writer has to log the same variables as in the simulation
+    which wrote the checkpoint. ts_variables has to be initialized by init_time_series() with the same time
+    steps.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **ts_variables** (dict) - variables of the time series simulation, see init_time_series()
+
+        **file_path** (str) - path of the checkpoint file
+
+    OUTPUT:
+        **position** (int) - number of time steps of ts_variables["time_steps"] which are already calculated
+    """
+    with open(file_path, "rb") as f:
+        checkpoint = pickle.load(f)
+    if checkpoint["time_steps"] != list(ts_variables["time_steps"]):
+        raise UserWarning("The time steps of the checkpoint %s differ from the time steps to calculate"
+                          % file_path)
+    controllers = net.controller.object if "controller" in net else dict()
+    if set(checkpoint["controller"].keys()) != set(controllers.keys()):
+        raise UserWarning("The controllers of the checkpoint %s differ from the controllers in net" % file_path)
+
+    for key, val in checkpoint["net"].items():
+        net[key] = val
+    for idx, state in checkpoint["controller"].items():
+        controllers[idx].__dict__.update(state)
+    net.output_writer.iat[0, 0].restore_checkpoint_state(checkpoint["output_writer"])
+    ts_variables.update(checkpoint["ts_variables"])
+    return checkpoint["position"]
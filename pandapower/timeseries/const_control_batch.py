@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import numpy as np
+import pandas as pd
+
+from pandapower.control.controller.const_control import ConstControl
+from pandapower.timeseries.data_sources.frame_data import DFData
+from pandapower.timeseries.data_sources.mmap_data import MMapData
+
+try:
+    import pandaplan.core.pplog as pplog
+except ImportError:
+    import logging as pplog
+
+logger = pplog.getLogger(__name__)
+
+
+def _profile_names(ctrl, n_elements):
+    if isinstance(ctrl.profile_name, (list, tuple, np.ndarray, pd.Index)):
+        return list(ctrl.profile_name)
+    return [ctrl.profile_name] * n_elements
+
+
+def _batch_possible(ctrl, net):
+    # ConstControls which read numeric profiles of a DFData or MMapData and write them to columns of element
+    # tables. All other controllers are called in the time series loop
+    if type(ctrl) is not ConstControl or type(ctrl.data_source) not in [DFData, MMapData] or \
+            ctrl.write_flag not in ["single_index", "loc"] or ctrl.element not in net or \
+            not isinstance(net[ctrl.element], pd.DataFrame) or ctrl.variable not in net[ctrl.element].columns:
+        return False
+    element_index = np.atleast_1d(np.asarray(ctrl.element_index))
+    if element_index.ndim != 1 or len(element_index) == 0 or \
+            np.any(net[ctrl.element].index.get_indexer(element_index) < 0):
+        return False
+    names = _profile_names(ctrl, len(element_index))
+    if len(names) != len(element_index) or np.ndim(ctrl.scale_factor) > 1 or \
+            np.size(ctrl.scale_factor) not in [1, len(element_index)]:
+        return False
+    if isinstance(ctrl.data_source, DFData):
+        df = ctrl.data_source.df
+        return all(name in df.columns for name in names) and \
+            all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+                for dtype in df.dtypes[names])
+    return all(name in ctrl.data_source._positions for name in names)
+
+
+class ConstControlBatch:
+    """
+    Applies the profiles of all ConstControls with a DFData or MMapData data source in one pass instead of
+    calling ConstControl.time_step() of each controller: The profile values of all controllers with the same
+    data source are read with one call of get_time_step_value() and the values of all controllers which write
+    to the same column of an element table are written with one assignment.
+
+    INPUT:
+        **controllers** (list) - (ConstControl, net) tuples in the order of the time series loop
+    """
+
+    def __init__(self, controllers):
+        self.controllers = controllers
+        data_sources = dict()
+        columns = dict()
+        position = 0
+        # positions of the values of each controller in self.values
+        self.controller_positions = list()
+        for ctrl, net in controllers:
+            element_index = np.atleast_1d(np.asarray(ctrl.element_index))
+            names = _profile_names(ctrl, len(element_index))
+            positions = np.arange(position, position + len(names))
+            _, ds_names, ds_scale_factors, ds_positions = data_sources.setdefault(
+                id(ctrl.data_source), (ctrl.data_source, list(), list(), list()))
+            ds_names.extend(names)
+            ds_scale_factors.append(np.broadcast_to(np.asarray(ctrl.scale_factor, dtype=np.float64),
+                                                    len(names)))
+            ds_positions.append(positions)
+            _, column_index, column_positions = columns.setdefault((id(net), ctrl.element, ctrl.variable),
+                                                                   (net, list(), list()))
+            column_index.append(element_index)
+            column_positions.append(positions)
+            self.controller_positions.append(positions[0] if ctrl.write_flag == "single_index" else positions)
+            position += len(names)
+        self.values = np.zeros(position)
+        # profile names, scale factors and positions in self.values of each data source. The list of profile
+        # names is kept, so that the positions of the profiles are cached by MMapData
+        self.data_sources = [(data_source, names, np.concatenate(scale_factors), np.concatenate(positions))
+                             for data_source, names, scale_factors, positions in data_sources.values()]
+        # element index and positions in self.values of each column, which are written together
+        self.columns = [(net, element, variable, np.concatenate(element_index), np.concatenate(positions))
+                        for (_, element, variable), (net, element_index, positions) in columns.items()]
+        # row positions of the element index of each column, which are updated if the element table changes
+        self._row_positions = [(None, None)] * len(self.columns)
+
+    def __repr__(self):
+        return "%s of %i ConstControls writing to %i columns" % (self.__class__.__name__, len(self.controllers),
+                                                                 len(self.columns))
+
+    def _get_row_positions(self, i, table, element_index):
+        table_index, rows = self._row_positions[i]
+        if table_index is not table.index:
+            rows = table.index.get_indexer(element_index)
+            self._row_positions[i] = (table.index, rows)
+        return rows
+
+    def time_step(self, time_step):
+        """
+        Reads the profile values of the time step and writes them to the net, as ConstControl.time_step() of
+        all controllers.
+        """
+        for data_source, names, scale_factors, positions in self.data_sources:
+            self.values[positions] = np.asarray(data_source.get_time_step_value(
+                time_step=time_step, profile_name=names), dtype=np.float64) * scale_factors
+        for i, (net, element, variable, element_index, positions) in enumerate(self.columns):
+            table = net[element]
+            rows = self._get_row_positions(i, table, element_index)
+            table.iloc[rows, table.columns.get_loc(variable)] = self.values[positions]
+        for (ctrl, _), positions in zip(self.controllers, self.controller_positions):
+            ctrl.values = self.values[positions]
+            ctrl.applied = False
+
+
+def init_const_control_batch(controller_order):
+    """
+    Splits the controllers of the time series loop into the ConstControls which are applied by a
+    ConstControlBatch and the remaining controllers.
+
+    INPUT:
+        **controller_order** (list) - controller order of the time series loop, see prepare_run_ctrl()
+
+    OUTPUT:
+        **batch** (ConstControlBatch) - batch of the ConstControls, None if there are none
+
+        **controller_order** (list) - controller order of the remaining controllers
+    """
+    batch_controllers = [(ctrl, net) for level in controller_order for ctrl, net in level
+                         if _batch_possible(ctrl, net)]
+    if not len(batch_controllers):
+        return None, controller_order
+    in_batch = {id(ctrl) for ctrl, _ in batch_controllers}
+    remaining_order = [[(ctrl, net) for ctrl, net in level if id(ctrl) not in in_batch]
+                       for level in controller_order]
+    return ConstControlBatch(batch_controllers), remaining_order
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+import json
+import os
+
+import numpy as np
+
+from pandapower.timeseries.data_source import DataSource
+
+try:
+    import pandaplan.core.pplog as pplog
+except ImportError:
+    import logging as pplog
+
+logger = pplog.getLogger(__name__)
+
+
+def _profile_names_path(file_path):
+    return os.path.splitext(file_path)[0] + ".profiles.json"
+
+
+def save_mmap_profiles(df, file_path):
+    """
+    Saves the profiles of a DataFrame (time steps x profiles) to a .npy file which can be used by
+    MMapData. The profile names are saved next to it in a .profiles.json file.
+
+    INPUT:
+        **df** (DataFrame) - numeric profiles with the time steps 0, 1, ... as rows
+
+        **file_path** (str) - path of the .npy file
+
+    OUTPUT:
+        **data_source** (MMapData) - data source of the saved profiles
+    """
+    np.save(file_path, np.ascontiguousarray(df.to_numpy(dtype=np.float64)))
+    with open(_profile_names_path(file_path), "w") as f:
+        json.dump([c.item() if isinstance(c, np.generic) else c for c in df.columns], f)
+    return MMapData(file_path)
+
+
+class MMapData(DataSource):
+    """
+    Data source of profiles in a .npy file (time steps x profiles), which is memory-mapped instead of
+    loaded. The rows are the time steps 0, 1, ..., so only the pages of the calculated time steps are read
+    from disk. The positions of the profiles are looked up once for each list of profile names, e.g. of a
+    ConstControl, and the values of all profiles are read with one slice per time step.
+    Use save_mmap_profiles() to write the profiles of a DataFrame.
+
+    INPUT:
+        **file_path** (str) - path of the .npy file
+
+    OPTIONAL:
+        **profile_names** (list, None) - names of the columns of the array. If None, they are read from the
+        .profiles.json file written by save_mmap_profiles()
+    """
+    json_excludes = DataSource.json_excludes + ["_data", "_positions", "_cached_positions"]
+
+    def __init__(self, file_path, profile_names=None):
+        super().__init__()
+        self.file_path = file_path
+        if profile_names is None:
+            with open(_profile_names_path(file_path)) as f:
+                profile_names = json.load(f)
+        self.profile_names = list(profile_names)
+        self._init_lookup()
+
+    def _init_lookup(self):
+        self._data = None
+        self._positions = {name: i for i, name in enumerate(self.profile_names)}
+        # positions of the profile names given by the controllers, by id of the profile names
+        self._cached_positions = dict()
+
+    def __getstate__(self):
+        # the memory map is opened again after unpickling, e.g. in the worker processes of run_timeseries
+        return {key: val for key, val in self.__dict__.items() if key not in self.json_excludes}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_lookup()
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = super().from_dict(d)
+        obj._init_lookup()
+        return obj
+
+    def __repr__(self):
+        return "%s of '%s' with %d profiles" % (self.__class__.__name__, self.file_path, len(self.profile_names))
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = np.load(self.file_path, mmap_mode="r")
+            if self._data.ndim != 2 or self._data.shape[1] != len(self.profile_names):
+                raise ValueError("%s has the shape %s, but %d profile names are given"
+                                 % (self.file_path, self._data.shape, len(self.profile_names)))
+        return self._data
+
+    def _get_positions(self, profile_name):
+        cached = self._cached_positions.get(id(profile_name), None)
+        if cached is not None and cached[0] is profile_name:
+            return cached[1]
+        if isinstance(profile_name, (list, tuple, np.ndarray)) or hasattr(profile_name, "__array__"):
+            positions = np.array([self._positions[name] for name in profile_name], dtype=np.int64)
+            if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+                # consecutive profiles are read as a view of the row
+                positions = slice(positions[0], positions[0] + len(positions))
+        else:
+            positions = self._positions[profile_name]
+        # the profile names are kept in the cache, so that their id is not reused by another object
+        self._cached_positions[id(profile_name)] = (profile_name, positions)
+        return positions
+
+    def get_time_step_value(self, time_step, profile_name, scale_factor=1.0):
+        res = self.data[time_step, self._get_positions(profile_name)]
+        if isinstance(res, np.ndarray):
+            return res * scale_factor
+        return float(res) * scale_factor
+
+    def get_time_steps_len(self):
+        return self.data.shape[0]
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+import glob
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from pandapower.io_utils import mkdirs_if_not_existent
+
+# file types of the OutputWriter which are written in chunks of time steps during the time series simulation
+STREAMING_FILE_TYPES = (".parquet", ".h5", ".zarr")
+HDF5_FILE_NAME = "results.h5"
+
+
+def _import_backend(output_file_type):
+    try:
+        if output_file_type == ".parquet":
+            import pyarrow
+            return pyarrow
+        if output_file_type == ".h5":
+            import tables
+            return tables
+        if output_file_type == ".zarr":
+            import zarr
+            return zarr
+    except ImportError:
+        packages = {".parquet": "pyarrow", ".h5": "tables", ".zarr": "zarr"}
+        raise ImportError("The output file type %s requires the package %s, which is not installed."
+                          % (output_file_type, packages[output_file_type]))
+    raise UserWarning("output_file_type %s is not a streaming file type %s"
+                      % (output_file_type, STREAMING_FILE_TYPES))
+
+
+def _store_path(output_path, table, variable):
+    if variable is None:
+        return os.path.join(output_path, table)
+    return os.path.join(output_path, table, str(variable))
+
+
+def _str_columns(df):
+    # the columns of parquet and hdf5 tables must be strings
+    df = df.copy(deep=False)
+    df.columns = [str(c) for c in df.columns]
+    df.index.name = "time_step"
+    return df
+
+
+def _restore_columns(df):
+    # element indices are integers, columns of eval functions are named by eval_name
+    df.columns = pd.Index([int(c) if c.lstrip("-").isdigit() else c for c in df.columns])
+    return df
+
+
+def _append_parquet(path, df, part, compression):
+    # every chunk is a separate file, so that the finished chunks can be read during the simulation
+    if part == 0 and os.path.isdir(path):
+        for file_path in glob.glob(os.path.join(path, "part-*.parquet")):
+            os.remove(file_path)
+    mkdirs_if_not_existent(path)
+    file_path = os.path.join(path, "part-%05i.parquet" % part)
+    df.to_parquet(file_path + ".tmp", engine="pyarrow",
+                  compression="snappy" if compression is None else compression)
+    os.replace(file_path + ".tmp", file_path)
+
+
+def _read_parquet(path):
+    file_paths = sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+    if not len(file_paths):
+        raise FileNotFoundError("No results stored in %s" % path)
+    return pd.concat([pd.read_parquet(file_path, engine="pyarrow") for file_path in file_paths])
+
+
+def _hdf5_key(table, variable):
+    return table if variable is None else "%s/%s" % (table, variable)
+
+
+def _append_hdf5(output_path, key, df, part, compression):
+    # the file is closed after each chunk, so that it can be read during the simulation
+    mkdirs_if_not_existent(output_path)
+    kwargs = dict() if compression is None else dict(complib=compression, complevel=5)
+    with pd.HDFStore(os.path.join(output_path, HDF5_FILE_NAME), mode="a", **kwargs) as store:
+        if part == 0 and key in store:
+            store.remove(key)
+        store.append(key, df, format="table")
+
+
+def _append_zarr(path, df, part):
+    import zarr
+    n_rows, n_columns = df.shape
+    if part == 0:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        mkdirs_if_not_existent(path)
+        values = zarr.open_array(store=os.path.join(path, "values"), mode="w", shape=(0, n_columns),
+                                 chunks=(max(n_rows, 1), max(n_columns, 1)), dtype="f8")
+        values.attrs["columns"] = [str(c) for c in df.columns]
+        values.attrs["dtypes"] = [str(dtype) for dtype in df.dtypes]
+        time_steps = zarr.open_array(store=os.path.join(path, "time_step"), mode="w", shape=(0,),
+                                     chunks=(max(n_rows, 1),), dtype="i8")
+    else:
+        values = zarr.open_array(store=os.path.join(path, "values"), mode="a")
+        time_steps = zarr.open_array(store=os.path.join(path, "time_step"), mode="a")
+    # the values are written before the time steps, which define the number of readable rows
+    values.append(df.to_numpy(dtype=np.float64), axis=0)
+    time_steps.append(df.index.to_numpy(dtype=np.int64))
+
+
+def _read_zarr(path):
+    import zarr
+    if not os.path.isdir(path):
+        raise FileNotFoundError("No results stored in %s" % path)
+    values = zarr.open_array(store=os.path.join(path, "values"), mode="r")
+    time_steps = zarr.open_array(store=os.path.join(path, "time_step"), mode="r")[:]
+    df = pd.DataFrame(values[:len(time_steps)], index=pd.Index(time_steps, name="time_step"),
+                      columns=values.attrs["columns"])
+    return df.astype(dict(zip(df.columns, values.attrs["dtypes"])))
+
+
+def append_output_chunk(output_path, output_file_type, table, variable, df, part, compression=None):
+    """
+    Appends the results of a chunk of time steps to the store of a logged variable.
+
+    INPUT:
+        **output_path** (str) - folder of the results
+
+        **output_file_type** (str) - ".parquet", ".h5" or ".zarr"
+
+        **table** (str) - table of the logged variable, e.g. "res_bus" or "Parameters"
+
+        **variable** (str) - logged variable, e.g. "vm_pu". None for "Parameters"
+
+        **df** (DataFrame) - results of the chunk, indexed by the time steps
+
+        **part** (int) - number of the chunk. The stored results are overwritten by part 0
+
+    OPTIONAL:
+        **compression** (str, None) - compression of parquet ("snappy" by default, e.g. "zstd", "gzip") or
+        hdf5 files (no compression by default, e.g. "blosc", "zlib"). Zarr arrays are compressed with the
+        default compressor of zarr.
+    """
+    _import_backend(output_file_type)
+    df = _str_columns(df)
+    if output_file_type == ".parquet":
+        _append_parquet(_store_path(output_path, table, variable), df, part, compression)
+    elif output_file_type == ".h5":
+        _append_hdf5(output_path, _hdf5_key(table, variable), df, part, compression)
+    else:
+        _append_zarr(_store_path(output_path, table, variable) + ".zarr", df, part)
+
+
+def read_streamed_output(output_path, table, variable=None, output_file_type=".parquet"):
+    """
+    Reads the results of a logged variable which were written in chunks by an OutputWriter with
+    output_file_type ".parquet", ".h5" or ".zarr". The finished chunks can be read while the time
+    series simulation is still running.
+
+    INPUT:
+        **output_path** (str) - output_path of the OutputWriter
+
+        **table** (str) - table of the logged variable, e.g. "res_bus" or "Parameters"
+
+    OPTIONAL:
+        **variable** (str, None) - logged variable, e.g. "vm_pu". None for "Parameters"
+
+        **output_file_type** (str, ".parquet") - output_file_type of the OutputWriter
+
+    OUTPUT:
+        **df** (DataFrame) - results of the time steps which are stored
+    """
+    _import_backend(output_file_type)
+    if output_file_type == ".parquet":
+        df = _read_parquet(_store_path(output_path, table, variable))
+    elif output_file_type == ".h5":
+        df = pd.read_hdf(os.path.join(output_path, HDF5_FILE_NAME), _hdf5_key(table, variable))
+    else:
+        df = _read_zarr(_store_path(output_path, table, variable) + ".zarr")
+    df.index.name = None
+    return _restore_columns(df)
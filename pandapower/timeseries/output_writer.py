@@ -5,6 +5,8 @@
 import copy
 import functools
 import os
+import queue
+import threading
 from time import perf_counter
 from types import FunctionType
 
@@ -14,10 +16,10 @@ from collections.abc import Iterable
 from pandapower.io_utils import JSONSerializableClass
 from pandapower.io_utils import mkdirs_if_not_existent
 from pandapower.pd2ppc import _pd2ppc
-from pandapower.pypower.idx_bus import VM, VA, NONE, BUS_TYPE
+from pandapower.pypower.idx_bus import VM, VA, PD, QD, NONE, BUS_TYPE
 from pandapower.run import _init_runpp_options
-from pandapower.timeseries.read_batch_results import v_to_i_s, get_batch_line_results, get_batch_trafo3w_results, \
-    get_batch_trafo_results, get_batch_bus_results
+from pandapower.timeseries.output_stores import STREAMING_FILE_TYPES, append_output_chunk, read_streamed_output
+from pandapower.timeseries.read_batch_results import get_batch_results
 
 try:
     import pandaplan.core.pplog as pplog
@@ -25,6 +27,9 @@ except ImportError:
     import logging as pplog
 logger = pplog.getLogger(__name__)
 
+# columns of the ppci bus table which can be logged as "ppc_bus"
+PPC_BUS_COLUMNS = {"vm": VM, "va": VA, "p": PD, "q": QD}
+
 
 class OutputWriter(JSONSerializableClass):
     """
@@ -57,9 +62,13 @@ class OutputWriter(JSONSerializableClass):
         **output_path** (string, None) - Path to a folder where the output is written to.
 
         **output_file_type** (string, ".p") - output filetype to use.
-        Allowed file extensions: [.xls, .xlsx, .csv, .csv.*, .p, .json]
+        Allowed file extensions: [.xls, .xlsx, .csv, .csv.*, .p, .json, .parquet, .h5, .zarr]
         Note: XLS has a maximum number of 256 rows.
         Note: CSV files can be saved in a compressed format like `.csv.zip`.
+        Note: .parquet (pyarrow), .h5 (tables) and .zarr (zarr) are written in chunks of chunk_size time steps
+        during the simulation, only one chunk is kept in memory. The results are not available in ow.output, but
+        can be read with ow.read_output(table, variable), also while the simulation is running. The fast batch
+        read of the bus and branch results is not used with these file types.
 
         **csv_separator** (string, ";") - The separator used when writing to a csv file
 
@@ -69,6 +78,17 @@ class OutputWriter(JSONSerializableClass):
         Defaults are: res_bus.vm_pu and res_line.loading_percent. Additional variables can be added later on
         with ow.log_variable or removed with ow.remove_log_variable
 
+        **chunk_size** (int, 1000) - number of time steps which are written at once with the output file types
+        .parquet, .h5 and .zarr
+
+        **compression** (string, None) - compression of .parquet ("snappy" by default, e.g. "zstd", "gzip") or
+        .h5 files (uncompressed by default, e.g. "blosc", "zlib"). .zarr files use the default compressor of zarr.
+
+        **async_buffer_size** (int, None) - If given, the time series loop only copies the logged columns of the
+        result tables (and the ppc voltages) after each power flow into a buffer of this number of time steps.
+        The selection of the logged indices, the eval functions and the storage in np_results are done by a
+        background thread while the next power flows are calculated. The loop only waits if the buffer is full.
+
 
 
     EXAMPLE:
@@ -86,13 +106,19 @@ class OutputWriter(JSONSerializableClass):
 
 
     """
+    json_excludes = JSONSerializableClass.json_excludes + ["_async_queue", "_async_thread"]
 
     def __init__(self, net, time_steps=None, output_path=None, output_file_type=".p", write_time=None,
-                 log_variables=None, csv_separator=";"):
+                 log_variables=None, csv_separator=";", chunk_size=1000, compression=None, async_buffer_size=None):
         super().__init__()
         self.output_path = output_path
         self.output_file_type = output_file_type
         self.write_time = write_time
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self.async_buffer_size = async_buffer_size
+        self._async_queue = None
+        self._async_thread = None
         self.log_variables = log_variables
         # these are the default log variables which are added if log_variables is None
         self.default_log_variables = [("res_bus", "vm_pu"), ("res_line", "loading_percent")]
@@ -121,6 +147,9 @@ class OutputWriter(JSONSerializableClass):
 
         self.time_step = None
         self.time_step_lookup = None
+        # index of the first time step in np_results and number of written chunks per output if results are streamed
+        self._chunk_start = 0
+        self._stream_parts = dict()
         # add output_writer to net
         self.add_to_net(net, element="output_writer", index=0, overwrite=True)
         # inits dataframes and numpy arrays which store results
@@ -169,7 +198,10 @@ class OutputWriter(JSONSerializableClass):
         if isinstance(self.time_steps, Iterable):
             self.output = dict()
             self.np_results = dict()
+            self._stop_async()
             self.output_list = list()
+            self._chunk_start = 0
+            self._stream_parts = dict()
             self.init_log_variables(net)
             self.init_timesteps(self.time_steps)
             self._init_np_results()
@@ -238,8 +270,13 @@ class OutputWriter(JSONSerializableClass):
            **append** (bool, False) - Option for appending instead of overwriting the file
         """
         save_single = False
+        self._wait_async()
+        if self.streams_output():
+            # the results are not kept in memory, only the current chunk is written
+            self._flush_chunk()
+            return
         self._np_to_pd()
-        if recycle_options not in [None, False] and recycle_options["batch_read"]:
+        if isinstance(recycle_options, dict) and recycle_options["batch_read"]:
             self.get_batch_outputs(net, recycle_options)
         if self.output_path is not None:
             try:
@@ -276,6 +313,8 @@ class OutputWriter(JSONSerializableClass):
             self.output["Parameters"].loc[time_step, "powerflow_failed"] = True
         elif not ctrl_converged:
             self.output["Parameters"].loc[time_step, "controller_unstable"] = True
+        elif self.async_buffer_size is not None:
+            self._save_snapshot()
         else:
             self.save_to_parameters()
 
@@ -284,7 +323,95 @@ class OutputWriter(JSONSerializableClass):
             if perf_counter() - self.cur_realtime > self.write_time:
                 self.dump(net)
         if self.time_step == self.time_steps[-1]:
+            self._stop_async()
             self.dump(net, recycle_options)
+        elif self.streams_output() and self._time_step_row() + 1 == self._chunk_rows():
+            self._flush_chunk()
+
+    def streams_output(self):
+        """
+        True if the results are written in chunks of time steps to .parquet, .h5 or .zarr files during the
+        time series simulation.
+        """
+        return self.output_path is not None and self.output_file_type in STREAMING_FILE_TYPES
+
+    def read_output(self, table, variable=None):
+        """
+        Reads the results of a logged variable which are written to .parquet, .h5 or .zarr files, also while
+        the time series simulation is running.
+
+        INPUT:
+            **table** (str) - table of the logged variable, e.g. "res_bus" or "Parameters"
+
+        OPTIONAL:
+            **variable** (str, None) - logged variable, e.g. "vm_pu". None for "Parameters"
+        """
+        return read_streamed_output(self.output_path, table, variable, self.output_file_type)
+
+    def get_checkpoint_state(self):
+        """
+        Returns the results of the time steps calculated so far, which are written to the checkpoints of
+        run_timeseries().
+        """
+        self._wait_async()
+        return {"np_results": self.np_results, "parameters": self.output["Parameters"],
+                "time_step": self.time_step, "chunk_start": self._chunk_start, "stream_parts": self._stream_parts}
+
+    def restore_checkpoint_state(self, state):
+        """
+        Restores the results of a checkpoint (see get_checkpoint_state()) after init_all() was called with the
+        same time steps and logged variables.
+        """
+        if set(state["np_results"].keys()) != set(self.np_results.keys()):
+            raise UserWarning("The logged variables of the checkpoint differ from the logged variables %s"
+                              % list(self.np_results.keys()))
+        for name, values in state["np_results"].items():
+            if values.shape != self.np_results[name].shape:
+                raise UserWarning("The results %s of the checkpoint have the shape %s instead of %s"
+                                  % (name, values.shape, self.np_results[name].shape))
+            self.np_results[name][:] = values
+        self.output["Parameters"] = state["parameters"].copy()
+        self.time_step = state["time_step"]
+        self._chunk_start = state["chunk_start"]
+        self._stream_parts = dict(state["stream_parts"])
+
+    def _chunk_rows(self):
+        return min(len(self.time_steps), self.chunk_size)
+
+    def _time_step_row(self):
+        # row of the current time step in np_results
+        return self.time_step_lookup[self.time_step] - self._chunk_start
+
+    def _flush_chunk(self):
+        # writes the time steps since the last chunk and resets np_results for the next chunk
+        self._wait_async()
+        n_rows = self._time_step_row() + 1
+        if n_rows <= 0:
+            return
+        time_steps = self.time_steps[self._chunk_start:self._chunk_start + n_rows]
+        parameters = self.output["Parameters"].iloc[self._chunk_start:self._chunk_start + n_rows]
+        self._stream_results(time_steps, {name: values[:n_rows] for name, values in self.np_results.items()},
+                             parameters)
+        for values in self.np_results.values():
+            values[:] = 0.
+
+    def _stream_results(self, time_steps, np_results, parameters):
+        # appends the results of consecutive time steps to the files of the logged variables
+        outputs = {("Parameters", None): parameters}
+        for partial_func in self.output_list:
+            table, variable = partial_func.args[0], partial_func.args[1]
+            res_df = pd.DataFrame(np_results[self._get_np_name(partial_func.args)], index=time_steps,
+                                  columns=self._get_columns(partial_func.args))
+            if (table, variable) in outputs:
+                res_df = pd.concat([outputs[(table, variable)], res_df], axis=1)
+            outputs[(table, variable)] = res_df
+        for (table, variable), res_df in outputs.items():
+            res_name = self._get_output_name(table, variable)
+            part = self._stream_parts.get(res_name, 0)
+            append_output_chunk(self.output_path, self.output_file_type, table, variable, res_df, part,
+                                compression=self.compression)
+            self._stream_parts[res_name] = part + 1
+        self._chunk_start += len(time_steps)
 
     def save_to_parameters(self):
         # Saves the results of the current time step to self.output,
@@ -300,6 +427,63 @@ class OutputWriter(JSONSerializableClass):
                              % (of.__name__, self.time_step))
                 self.save_nans_to_parameters()
 
+    def _save_snapshot(self):
+        # copies the raw values of the logged variables, which are processed by the background thread
+        if getattr(self, "_async_thread", None) is None:
+            self._async_queue = queue.Queue(maxsize=max(self.async_buffer_size, 1))
+            self._async_thread = threading.Thread(target=self._async_worker, daemon=True)
+            self._async_thread.start()
+        snapshots = list()
+        for of in self.output_list:
+            if of.func == self._log:
+                table, variable, net = of.args[:3]
+                snapshots.append((of, net[table][variable].to_numpy(copy=True), net[table].index))
+            elif of.func == self._log_ppc:
+                table, variable, net = of.args[:3]
+                column = PPC_BUS_COLUMNS[variable]
+                snapshots.append((of, net["_ppc"]["internal"][table.split("_")[-1]][:, column].copy(), None))
+            else:
+                of()
+        self._async_queue.put((self._time_step_row(), self.time_step, snapshots))
+
+    def _async_worker(self):
+        while True:
+            item = self._async_queue.get()
+            try:
+                if item is None:
+                    return
+                row, time_step, snapshots = item
+                for of, values, table_index in snapshots:
+                    self._store_snapshot(of, row, time_step, values, table_index)
+            finally:
+                self._async_queue.task_done()
+
+    def _store_snapshot(self, of, row, time_step, values, table_index):
+        (table, variable, net, index, eval_function, eval_name) = of.args
+        try:
+            if table_index is not None and not table_index.equals(pd.Index(index)):
+                positions = table_index.get_indexer(pd.Index(index))
+                if np.any(positions < 0):
+                    raise KeyError("%s not in index" % list(np.asarray(index)[positions < 0]))
+                values = values[positions]
+            if eval_function is not None:
+                values = eval_function(values)
+            self.np_results[self._get_np_name(of.args)][row, :] = values
+        except Exception as e:
+            logger.error("Error at index %s for %s[%s] in time step %s: %s" % (index, table, variable, time_step, e))
+
+    def _wait_async(self):
+        # waits until the background thread has stored all snapshots in np_results
+        if getattr(self, "_async_queue", None) is not None:
+            self._async_queue.join()
+
+    def _stop_async(self):
+        if getattr(self, "_async_thread", None) is not None:
+            self._async_queue.put(None)
+            self._async_thread.join()
+        self._async_queue = None
+        self._async_thread = None
+
     def save_nans_to_parameters(self):
         # Saves NaNs to for the given time step.
         time_step_idx = self.time_step_lookup[self.time_step]
@@ -486,7 +670,7 @@ class OutputWriter(JSONSerializableClass):
                 result = eval_function(result)
 
             # save results to numpy array
-            time_step_idx = self.time_step_lookup[self.time_step]
+            time_step_idx = self._time_step_row()
             hash_name = self._get_np_name((table, variable, net, index, eval_function, eval_name))
             self.np_results[hash_name][time_step_idx, :] = result
 
@@ -496,18 +680,15 @@ class OutputWriter(JSONSerializableClass):
     def _log_ppc(self, table, variable, net, index, eval_function=None, eval_name=None):
         # custom log function fo ppc results
         ppci = net["_ppc"]["internal"]
-        if variable == "vm":
-            v = VM
-        elif variable == "va":
-            v = VA
-        else:
+        if variable not in PPC_BUS_COLUMNS:
             raise NotImplementedError("No other variable implemented yet.")
+        v = PPC_BUS_COLUMNS[variable]
         result = ppci[table.split("_")[-1]][:, v]
         if eval_function is not None:
             result = eval_function(result)
 
         # save results to numpy array
-        time_step_idx = self.time_step_lookup[self.time_step]
+        time_step_idx = self._time_step_row()
         hash_name = self._get_np_name((table, variable, net, index, eval_function, eval_name))
         self.np_results[hash_name][time_step_idx, :] = result
 
@@ -520,13 +701,7 @@ class OutputWriter(JSONSerializableClass):
             # res_name = self._get_hash(table, variable)
             res_name = self._get_output_name(table, variable)
             np_name = self._get_np_name(partial_func.args)
-            columns = index
-            if eval_name is not None and eval_func is not None:
-                if isinstance(eval_func, FunctionType):
-                    if "n_columns" not in eval_func.__code__.co_varnames:
-                        columns = [eval_name]
-                else:
-                    columns = [eval_name]
+            columns = self._get_columns(partial_func.args)
 
             res_df = pd.DataFrame(self.np_results[np_name], index=self.time_steps, columns=columns)
             if res_name in self.output and eval_name is not None:
@@ -540,6 +715,17 @@ class OutputWriter(JSONSerializableClass):
                 # new dataframe
                 self.output[res_name] = res_df
 
+    def _get_columns(self, partial_args):
+        (table, variable, net, index, eval_func, eval_name) = partial_args
+        columns = index
+        if eval_name is not None and eval_func is not None:
+            if isinstance(eval_func, FunctionType):
+                if "n_columns" not in eval_func.__code__.co_varnames:
+                    columns = [eval_name]
+            else:
+                columns = [eval_name]
+        return columns
+
     def _get_output_name(self, table, variable):
         return "%s.%s" % (table, variable)
 
@@ -569,36 +755,24 @@ class OutputWriter(JSONSerializableClass):
             if isinstance(eval_function, FunctionType):
                 if "n_columns" in eval_function.__code__.co_varnames:
                     n_columns = eval_function.__defaults__[0]
-        self.np_results[hash_name] = np.zeros((len(self.time_steps), n_columns))
+        n_rows = len(self.time_steps)
+        if self.streams_output():
+            n_rows = self._chunk_rows()
+        self.np_results[hash_name] = np.zeros((n_rows, n_columns))
 
     def get_batch_outputs(self, net, recycle_options):
         # read the results in batch from vm, va (ppci values)
 
         if isinstance(recycle_options["batch_read"], list) and len(recycle_options["batch_read"]):
             # vm, va is without out of service elements
-            vm, va = self.output["ppc_bus.vm"], self.output["ppc_bus.va"]
-            _, s_abs, i_abs = v_to_i_s(net, vm, va)
-            results = dict()
+            results = get_batch_results(net, self.output, recycle_options["batch_read"],
+                                        trafo_recycle=recycle_options.get("trafo", False))
             new_output_list = list()
             for table, variable in recycle_options["batch_read"]:
-                if table == "res_line" and "res_line" not in results:
-                    i_ka, i_from_ka, i_to_ka, loading_percent = get_batch_line_results(net, i_abs)
-                    results["res_line"] = dict(i_ka=i_ka, i_from_ka=i_from_ka, i_to_ka=i_to_ka,
-                                               loading_percent=loading_percent)
-                elif table == "res_trafo" and "res_trafo" not in results:
-                    i_ka, i_hv_ka, i_lv_ka, s_mva, loading_percent = get_batch_trafo_results(net, i_abs, s_abs)
-                    results["res_trafo"] = dict(i_ka=i_ka, i_hv_ka=i_hv_ka, i_lv_ka=i_lv_ka,
-                                                loading_percent=loading_percent)
-                elif table == "res_trafo3w":
-                    i_h, i_m, i_l, loading_percent = get_batch_trafo3w_results(net, i_abs, s_abs)
-                    results["res_trafo3w"] = dict(i_h=i_h, i_m=i_m, i_l=i_l, loading_percent=loading_percent)
-                elif table == "res_bus" and "res_bus" not in results:
-                    vm_full, va_full = get_batch_bus_results(net, vm, va)
-                    results["res_bus"] = dict(vm_pu=vm_full, va_degree=va_full)
-                else:
-                    raise ValueError("Something went wrong")
                 output_name = "%s.%s" % (table, variable)
+                values = results[(table, variable)]
+                columns = net[table[4:]].index if values.shape[1] == len(net[table[4:]]) else None
                 # convert to dataframe
-                self.output[output_name] = pd.DataFrame(data=results[table][variable], index=self.time_steps)
+                self.output[output_name] = pd.DataFrame(data=values, index=self.time_steps, columns=columns)
                 new_output_list.append((table, variable))
             self.output_list = new_output_list
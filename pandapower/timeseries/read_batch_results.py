@@ -1,13 +1,40 @@
-from cmath import rect
+import numpy as np
+from numpy import real, deg2rad, maximum, sqrt, empty, zeros, nan, int64, exp
 
-from numpy import real, vectorize, deg2rad, maximum, sqrt, empty, zeros, nan, int64
-
-from pandapower.pypower.idx_brch import F_BUS, T_BUS
+from pandapower.pd2ppc import _pd2ppc
 from pandapower.pf.pfsoln_numba import calc_branch_flows_batch
-from pandapower.pypower.idx_bus import BASE_KV
+from pandapower.pypower.idx_brch import F_BUS, T_BUS
+from pandapower.pypower.idx_bus import BASE_KV, BUS_TYPE, REF
+from pandapower.pypower.makeYbus import makeYbus
 from pandapower.results_branch import _get_trafo3w_lookups
 from pandapower.results_bus import _get_bus_idx
 
+# result variables which can be calculated after the time series simulation from the bus voltages of all
+# time steps (and the logged inputs of the injection elements)
+BATCH_RESULT_VARIABLES = {
+    "res_bus": ["vm_pu", "va_degree"],
+    "res_line": ["p_from_mw", "q_from_mvar", "p_to_mw", "q_to_mvar", "pl_mw", "ql_mvar", "i_from_ka", "i_to_ka",
+                 "i_ka", "loading_percent"],
+    "res_trafo": ["p_hv_mw", "q_hv_mvar", "p_lv_mw", "q_lv_mvar", "pl_mw", "ql_mvar", "i_hv_ka", "i_lv_ka",
+                  "loading_percent"],
+    "res_trafo3w": ["p_hv_mw", "q_hv_mvar", "p_mv_mw", "q_mv_mvar", "p_lv_mw", "q_lv_mvar", "pl_mw", "ql_mvar",
+                    "i_hv_ka", "i_mv_ka", "i_lv_ka", "loading_percent"],
+    "res_impedance": ["p_from_mw", "q_from_mvar", "p_to_mw", "q_to_mvar", "pl_mw", "ql_mvar", "i_from_ka",
+                      "i_to_ka"],
+    "res_load": ["p_mw", "q_mvar"],
+    "res_sgen": ["p_mw", "q_mvar"],
+    "res_storage": ["p_mw", "q_mvar"],
+    "res_gen": ["p_mw", "q_mvar", "vm_pu", "va_degree"],
+    "res_ext_grid": ["p_mw", "q_mvar"],
+}
+BRANCH_TABLES = ["res_line", "res_trafo", "res_trafo3w", "res_impedance"]
+PQ_TABLES = ["res_load", "res_sgen", "res_storage"]
+GEN_TABLES = ["res_gen", "res_ext_grid"]
+# the power of gens and ext_grids is calculated from the bus power, which is only possible without
+# other elements with a gen in the ppc, and if the gen power is not distributed or limited
+GEN_EXCLUDING_ELEMENTS = ["xward", "dcline", "svc", "tcsc", "ssc", "vsc"]
+GEN_EXCLUDING_OPTIONS = ["distributed_slack", "enforce_q_lims"]
+
 
 def get_batch_bus_results(net, vm, va):
     # convert ppci bus results to net.res_bus results
@@ -103,9 +130,10 @@ def _get_empty_branch(ppc_branch_shape):
     return empties
 
 
-def v_to_i_s(net, vm, va):
+def v_to_i_s(net, vm, va, internal=None):
     ppc = net["_ppc"]
-    internal = ppc["internal"]
+    if internal is None:
+        internal = ppc["internal"]
     Yf = internal["Yf"]
     Yt = internal["Yt"]
     V = polar_to_rad(vm, va)
@@ -127,7 +155,7 @@ def v_to_i_s(net, vm, va):
     ppc_branch_shape = (V.shape[0], ppc["branch"].shape[0])
     sb_f_ppc, sb_t_ppc, s_f_abs_ppc, s_t_abs_ppc, i_f_abs_ppc, i_t_abs_ppc = _get_empty_branch(ppc_branch_shape)
 
-    in_service = ppc["internal"]['branch_is']
+    in_service = internal['branch_is']
     sb_f_ppc[:, in_service] = Sb_f
     sb_t_ppc[:, in_service] = Sb_t
     s_f_abs_ppc[:, in_service] = sf_abs
@@ -140,5 +168,243 @@ def v_to_i_s(net, vm, va):
 
 def polar_to_rad(vm, va):
     # get complex V matrix (input to batch branch flow function) from vm and va matrices
-    nprect = vectorize(rect)
-    return nprect(vm, deg2rad(va))
+    return np.asarray(vm, dtype=np.float64) * exp(1j * deg2rad(np.asarray(va, dtype=np.float64)))
+
+
+def _gen_results_possible(net, **kwargs):
+    if any(element in net and len(net[element]) for element in GEN_EXCLUDING_ELEMENTS):
+        return False
+    user_pf_options = net.get("user_pf_options", dict())
+    if any(kwargs.get(option, user_pf_options.get(option, False)) for option in GEN_EXCLUDING_OPTIONS):
+        return False
+    buses = np.concatenate([net[element].bus.values[net[element].in_service.values.astype(bool)]
+                            for element in ["ext_grid", "gen"]])
+    return len(np.unique(buses)) == len(buses)
+
+
+def _trafo_recycle_possible(net):
+    # the branch admittances are rebuilt for each combination of tap positions, so only tap positions from
+    # profiles are allowed. Tap changer controllers need the results of each power flow.
+    if "controller" not in net:
+        return True
+    for ctrl, recycle in zip(net.controller.object.values, net.controller.recycle.values):
+        if isinstance(recycle, dict) and recycle.get("trafo", False):
+            if getattr(ctrl, "element", None) not in ["trafo", "trafo3w"] or \
+                    getattr(ctrl, "variable", None) != "tap_pos":
+                return False
+    return True
+
+
+def batch_read_possible(net, table, variable, trafo_recycle=False, **kwargs):
+    """
+    Checks if the logged result variable can be calculated after the time series simulation from the bus voltages
+    of all time steps.
+
+    INPUT:
+        **net** - The pandapower format network
+
+        **table** (str) - result table, e.g. "res_line"
+
+        **variable** (str) - result variable, e.g. "p_from_mw"
+
+    OPTIONAL:
+        **trafo_recycle** (bool, False) - True if tap positions change during the time series simulation
+
+        **kwargs** - options of the power flow
+    """
+    if variable not in BATCH_RESULT_VARIABLES.get(table, []):
+        return False
+    if trafo_recycle and not _trafo_recycle_possible(net):
+        return False
+    if table in GEN_TABLES and (variable in ["p_mw", "q_mvar"]) and not _gen_results_possible(net, **kwargs):
+        return False
+    return True
+
+
+def get_batch_input_variables(net, batch_read, trafo_recycle=False):
+    """
+    Returns the variables which have to be logged in each time step in addition to the bus voltages
+    (ppc_bus.vm, ppc_bus.va) to calculate the batch results.
+    """
+    log_variables = list()
+    tables = {table for table, _ in batch_read}
+    for table in PQ_TABLES:
+        if table in tables:
+            element = table[4:]
+            log_variables += [(element, "p_mw"), (element, "q_mvar"), (element, "scaling")]
+    if "res_gen" in tables:
+        log_variables += [("gen", "p_mw"), ("gen", "scaling")]
+    if (("res_gen", "q_mvar") in batch_read or ("res_gen", "p_mw") in batch_read or
+            "res_ext_grid" in tables):
+        log_variables += [("ppc_bus", "p"), ("ppc_bus", "q")]
+    if trafo_recycle:
+        log_variables += [(element, "tap_pos") for element in ["trafo", "trafo3w"] if len(net[element])]
+    return log_variables
+
+
+def _tap_internal(net, taps):
+    # branch admittances and ppci for the given tap positions, the stored ppc of the net is not changed
+    ppc, options = net["_ppc"], net["_options"]
+    tap_pos = {element: net[element]["tap_pos"].values.copy() for element in taps}
+    try:
+        for element, values in taps.items():
+            net[element]["tap_pos"] = values
+        _, ppci = _pd2ppc(net)
+        Ybus, Yf, Yt = makeYbus(ppci["baseMVA"], ppci["bus"], ppci["branch"])
+        return dict(Ybus=Ybus.tocsr(), Yf=Yf.tocsr(), Yt=Yt.tocsr(), baseMVA=ppci["baseMVA"], bus=ppci["bus"],
+                    branch=ppci["branch"], branch_is=ppci["internal"]["branch_is"])
+    finally:
+        for element, values in tap_pos.items():
+            net[element]["tap_pos"] = values
+        net["_ppc"], net["_options"] = ppc, options
+
+
+def _internal_groups(net, output, n_time_steps, trafo_recycle):
+    # groups of time steps with the same branch admittances
+    elements = [element for element in ["trafo", "trafo3w"]
+                if trafo_recycle and "%s.tap_pos" % element in output]
+    if not len(elements):
+        return [(np.arange(n_time_steps), net["_ppc"]["internal"])]
+    taps = np.hstack([output["%s.tap_pos" % element].values for element in elements])
+    unique_taps, inverse = np.unique(taps, axis=0, return_inverse=True)
+    groups = list()
+    for i, row in enumerate(unique_taps):
+        columns = np.cumsum([0] + [len(output["%s.tap_pos" % element].columns) for element in elements])
+        tap_dict = {element: row[columns[j]:columns[j + 1]] for j, element in enumerate(elements)}
+        groups.append((np.flatnonzero(inverse.ravel() == i), _tap_internal(net, tap_dict)))
+    return groups
+
+
+def _bus_power(internal, V):
+    # complex power injected at the buses in MVA
+    Ybus = internal["Ybus"]
+    return V * np.conj((Ybus @ V.T).T) * internal["baseMVA"]
+
+
+def _branch_results(net, table, s, s_abs, i_abs):
+    element = table[4:]
+    if element not in net._pd2ppc_lookups["branch"]:
+        return dict()
+    sf, st = s
+    if table == "res_line":
+        f, t = net._pd2ppc_lookups["branch"]["line"]
+        i_ka, i_from_ka, i_to_ka, loading_percent = get_batch_line_results(net, i_abs)
+        res = dict(p_from_mw=sf[:, f:t].real, q_from_mvar=sf[:, f:t].imag, p_to_mw=st[:, f:t].real,
+                   q_to_mvar=st[:, f:t].imag, i_from_ka=i_from_ka, i_to_ka=i_to_ka, i_ka=i_ka,
+                   loading_percent=loading_percent)
+    elif table == "res_trafo":
+        f, t = net._pd2ppc_lookups["branch"]["trafo"]
+        i_ka, i_hv_ka, i_lv_ka, s_mva, loading_percent = get_batch_trafo_results(net, i_abs, s_abs)
+        res = dict(p_hv_mw=sf[:, f:t].real, q_hv_mvar=sf[:, f:t].imag, p_lv_mw=st[:, f:t].real,
+                   q_lv_mvar=st[:, f:t].imag, i_hv_ka=i_hv_ka, i_lv_ka=i_lv_ka, loading_percent=loading_percent)
+    elif table == "res_trafo3w":
+        f, hv, mv, lv = _get_trafo3w_lookups(net)
+        i_h, i_m, i_l, loading_percent = get_batch_trafo3w_results(net, i_abs, s_abs)
+        res = dict(p_hv_mw=sf[:, f:hv].real, q_hv_mvar=sf[:, f:hv].imag, p_mv_mw=st[:, hv:mv].real,
+                   q_mv_mvar=st[:, hv:mv].imag, p_lv_mw=st[:, mv:lv].real, q_lv_mvar=st[:, mv:lv].imag,
+                   i_hv_ka=i_h, i_mv_ka=i_m, i_lv_ka=i_l, loading_percent=loading_percent)
+    else:
+        f, t = net._pd2ppc_lookups["branch"]["impedance"]
+        res = dict(p_from_mw=sf[:, f:t].real, q_from_mvar=sf[:, f:t].imag, p_to_mw=st[:, f:t].real,
+                   q_to_mvar=st[:, f:t].imag, i_from_ka=i_abs[0][:, f:t], i_to_ka=i_abs[1][:, f:t])
+    p_columns = [c for c in res if c.startswith("p_")]
+    res["pl_mw"] = sum(res[c] for c in p_columns)
+    res["ql_mvar"] = sum(res["q_" + c[2:-3] + "_mvar"] for c in p_columns)
+    return res
+
+
+def _pq_results(net, table, output, vm_bus):
+    element = table[4:]
+    df = net[element]
+    in_service = df["in_service"].values
+    factor = output["%s.scaling" % element].values * in_service
+    p = output["%s.p_mw" % element].values * factor
+    q = output["%s.q_mvar" % element].values * factor
+    if element == "load" and net["_options"]["voltage_depend_loads"]:
+        cz = df["const_z_percent"].values / 100.
+        ci = df["const_i_percent"].values / 100.
+        vm = vm_bus[:, net.bus.index.get_indexer(df["bus"].values)]
+        volt_depend = 1. - (cz + ci) + ci * vm + cz * vm ** 2
+        p, q = p * volt_depend, q * volt_depend
+    return dict(p_mw=p, q_mvar=q)
+
+
+def _gen_results(net, table, output, s_bus, vm_bus, va_bus):
+    element = table[4:]
+    df = net[element]
+    in_service = df["in_service"].values.astype(bool)
+    bus = net._pd2ppc_lookups["bus"][df["bus"].values]
+    slack = net["_ppc"]["bus"][bus, BUS_TYPE] == REF
+    res = dict()
+    if s_bus.shape[1]:
+        # gen power = injected bus power + load at the bus (as in pfsoln). Out of service buses are not in ppci
+        bus = np.where(in_service & (bus < s_bus.shape[1]), bus, 0)
+        p_bus = s_bus.real + output["ppc_bus.p"].values
+        q_bus = s_bus.imag + output["ppc_bus.q"].values
+        res["p_mw"] = np.where(slack & in_service, p_bus[:, bus], 0.)
+        res["q_mvar"] = np.where(in_service, q_bus[:, bus], 0.)
+    if element == "gen":
+        if "gen.p_mw" in output:
+            p_set = output["gen.p_mw"].values * output["gen.scaling"].values * in_service
+            res["p_mw"] = np.where(slack, res["p_mw"], p_set) if "p_mw" in res else p_set
+        bus_position = net.bus.index.get_indexer(df["bus"].values)
+        res["vm_pu"] = vm_bus[:, bus_position]
+        res["va_degree"] = va_bus[:, bus_position]
+    return res
+
+
+def get_batch_results(net, output, batch_read, trafo_recycle=False):
+    """
+    Calculates the logged result variables of all time steps from the bus voltages "ppc_bus.vm" and "ppc_bus.va"
+    (and the logged inputs of the injection elements) in the output of the OutputWriter.
+
+    INPUT:
+        **net** - The pandapower format network after the time series simulation
+
+        **output** (dict) - output of the OutputWriter
+
+        **batch_read** (list) - tuples of (table, variable) to calculate
+
+    OPTIONAL:
+        **trafo_recycle** (bool, False) - True if tap positions changed during the time series simulation,
+        the logged tap positions are considered then
+
+    OUTPUT:
+        **results** (dict) - arrays (time steps x elements) for each (table, variable)
+    """
+    vm, va = output["ppc_bus.vm"], output["ppc_bus.va"]
+    tables = {table for table, _ in batch_read}
+    n_time_steps = vm.shape[0]
+    V = polar_to_rad(vm.values, va.values)
+    vm_bus, va_bus = get_batch_bus_results(net, vm, va)
+
+    groups = _internal_groups(net, output, n_time_steps, trafo_recycle)
+    need_branches = any(table in BRANCH_TABLES for table in tables)
+    need_bus_power = "ppc_bus.p" in output
+    n_branch = net["_ppc"]["branch"].shape[0]
+    s = (np.full((n_time_steps, n_branch), nan, dtype=complex), np.full((n_time_steps, n_branch), nan, dtype=complex))
+    s_abs = (np.full((n_time_steps, n_branch), nan), np.full((n_time_steps, n_branch), nan))
+    i_abs = (np.full((n_time_steps, n_branch), nan), np.full((n_time_steps, n_branch), nan))
+    s_bus = np.zeros((n_time_steps, V.shape[1] if need_bus_power else 0), dtype=complex)
+    for rows, internal in groups:
+        if need_branches:
+            group_s, group_s_abs, group_i_abs = v_to_i_s(net, vm.values[rows], va.values[rows], internal)
+            for full, group in zip(s + s_abs + i_abs, group_s + group_s_abs + group_i_abs):
+                full[rows] = group
+        if need_bus_power:
+            s_bus[rows] = _bus_power(internal, V[rows])
+
+    results = dict()
+    for table in tables:
+        if table == "res_bus":
+            res = dict(vm_pu=vm_bus, va_degree=va_bus)
+        elif table in BRANCH_TABLES:
+            res = _branch_results(net, table, s, s_abs, i_abs)
+        elif table in PQ_TABLES:
+            res = _pq_results(net, table, output, vm_bus)
+        else:
+            res = _gen_results(net, table, output, s_bus, vm_bus, va_bus)
+        for (res_table, variable) in batch_read:
+            if res_table == table and variable in res:
+                results[(table, variable)] = res[variable]
+    return results
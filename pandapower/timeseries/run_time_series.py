@@ -3,16 +3,27 @@
 # Copyright (c) 2016-2023 by University of Kassel and Fraunhofer Institute for Energy Economics
 # and Energy System Technology (IEE), Kassel. All rights reserved.
 
+import os
+import pickle
 import tempfile
 from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
 
+import numpy as np
+import pandas as pd
 import tqdm
 
-from pandapower.auxiliary import ControllerNotConverged
+from pandapower.auxiliary import ControllerNotConverged, read_from_net
 from pandapower.control import prepare_run_ctrl, run_control
 from pandapower.control.util.diagnostic import control_diagnostic
 from pandapower.run import runpp
+from pandapower.timeseries.checkpoint import write_checkpoint, restore_checkpoint
+from pandapower.timeseries.const_control_batch import init_const_control_batch
+from pandapower.timeseries.output_stores import STREAMING_FILE_TYPES
 from pandapower.timeseries.output_writer import OutputWriter
+from pandapower.timeseries.read_batch_results import batch_read_possible, get_batch_input_variables
+from pandapower.timeseries.ts_runpp import TimeSeriesRunpp
 
 try:
     import pandaplan.core.pplog as pplog
@@ -122,8 +133,18 @@ def run_time_step(net, time_step, ts_variables, run_control_fct=run_control, out
     ctrl_converged = True
     pf_converged = True
     # run time step function for each controller
-
-    control_time_step(ts_variables['controller_order'], time_step)
+    const_control_batch = ts_variables.get("const_control_batch", None)
+    if const_control_batch is None:
+        control_time_step(ts_variables['controller_order'], time_step)
+    else:
+        const_control_batch.time_step(time_step)
+        control_time_step(ts_variables['time_step_controller_order'], time_step)
+
+    if _skip_time_step(net, time_step, ts_variables):
+        # the results of the last calculated time step are still in net
+        output_writer_fct(net, time_step, pf_converged, ctrl_converged, ts_variables)
+        finalize_step(ts_variables['controller_order'], time_step)
+        return
 
     try:
         # calls controller init, control steps and run function (runpp usually is called in here)
@@ -137,14 +158,52 @@ def run_time_step(net, time_step, ts_variables, run_control_fct=run_control, out
         pf_converged = False
         pf_not_converged(time_step, ts_variables)
 
+    if ts_variables.get("skip_tolerance", None) is not None:
+        # values of the controllers which belong to the results in net
+        ts_variables["controlled_values"] = _get_controlled_values(ts_variables) \
+            if pf_converged and ctrl_converged else None
+
     output_writer_fct(net, time_step, pf_converged, ctrl_converged, ts_variables)
 
     finalize_step(ts_variables['controller_order'], time_step)
 
 
+def _get_controlled_values(ts_variables):
+    values = [np.asarray(read_from_net(net, *variable), dtype=np.float64).ravel()
+              for levelorder in ts_variables["controller_order"] for ctrl, net in levelorder
+              for variable in ctrl.get_controlled_variables(net)]
+    return np.concatenate(values) if len(values) else np.array([])
+
+
+def _skip_time_step(net, time_step, ts_variables):
+    # True if the values written by the controllers did not change since the last calculated time step
+    if ts_variables.get("skip_tolerance", None) is None or ts_variables["controlled_values"] is None:
+        return False
+    values = _get_controlled_values(ts_variables)
+    last_values = ts_variables["controlled_values"]
+    if len(values) != len(last_values) or \
+            not np.allclose(values, last_values, rtol=0., atol=ts_variables["skip_tolerance"], equal_nan=True):
+        return False
+    ts_variables["skipped_time_steps"].append(time_step)
+    net.output_writer.iat[0, 0].output["Parameters"].at[time_step, "skipped"] = True
+    return True
+
+
+def _skip_unchanged_possible(ts_variables):
+    # the values written by all controllers in service have to be known
+    unknown = [str(ctrl) for levelorder in ts_variables["controller_order"] for ctrl, net in levelorder
+               if ctrl.get_controlled_variables(net) is None]
+    if len(unknown):
+        logger.warning("skip_unchanged_steps is not possible because the controllers %s do not define the values "
+                       "they write to the net (see Controller.get_controlled_variables()). All time steps are "
+                       "calculated." % unknown)
+        return False
+    return True
+
+
 def _check_controller_recyclability(net):
     # if a parameter is set to True here, it will be recalculated during the time series simulation
-    recycle = dict(trafo=False, gen=False, bus_pq=False)
+    recycle = dict(trafo=False, gen=False, bus_pq=False, facts=False)
     if "controller" not in net:
         # everything can be recycled since no controller is in net. But the time series simulation makes no sense
         # then anyway...
@@ -158,52 +217,51 @@ def _check_controller_recyclability(net):
             recycle = False
             break
         # else check which recycle parameter are set to True
-        for rp in ["trafo", "bus_pq", "gen"]:
-            recycle[rp] = recycle[rp] or ctrl_recycle[rp]
+        for rp in ["trafo", "bus_pq", "gen", "facts"]:
+            recycle[rp] = recycle[rp] or ctrl_recycle.get(rp, False)
 
     return recycle
 
 
-def _check_output_writer_recyclability(net, recycle, run):
+def _check_output_writer_recyclability(net, recycle, run, pf_options=None):
     if "output_writer" not in net:
         raise ValueError("OutputWriter not defined")
     ow = net.output_writer.at[0, "object"]
     # results which are read with a faster batch function after the time series simulation
     recycle["batch_read"] = list()
     recycle["only_v_results"] = False
-    new_log_variables = list()
 
-    if hasattr(run, "__name__") and run.__name__ == "rundcpp":
+    if (hasattr(run, "__name__") and run.__name__ == "rundcpp") or ow.output_file_type in STREAMING_FILE_TYPES:
+        # the batch read needs the voltages of all time steps, which are not kept in memory if the results are
+        # written in chunks
         recycle["only_v_results"] = False
         recycle["batch_read"] = False
         return recycle
 
     for output in ow.log_variables:
         table, variable = output[0], output[1]
-        if table not in ["res_bus", "res_line", "res_trafo", "res_trafo3w"] or recycle["trafo"] or len(output) > 2:
-            # no fast read of outputs possible if other elements are required as these or tap changer is active
+        if len(output) > 2 or not batch_read_possible(net, table, variable, trafo_recycle=recycle["trafo"],
+                                                      **(pf_options or dict())):
+            # no fast read of outputs possible if other variables are required or index / eval functions are given
             recycle["only_v_results"] = False
             recycle["batch_read"] = False
             return recycle
-        else:
-            # fast read is possible
-            if variable in ["vm_pu", "va_degree"]:
-                new_log_variables.append(('ppc_bus', 'vm'))
-                new_log_variables.append(('ppc_bus', 'va'))
-
-            recycle["only_v_results"] = True
-            recycle["batch_read"].append((table, variable))
-
-    ow.log_variables = new_log_variables
-    ow.log_variable('ppc_bus', 'vm')
-    ow.log_variable('ppc_bus', 'va')
+        # fast read is possible
+        recycle["only_v_results"] = True
+        recycle["batch_read"].append((table, variable))
+
+    # only the bus voltages and the inputs of the injection elements (and tap positions) are logged
+    ow.log_variables = list()
+    for table, variable in [('ppc_bus', 'vm'), ('ppc_bus', 'va')] + \
+            get_batch_input_variables(net, recycle["batch_read"], recycle["trafo"]):
+        ow.log_variable(table, variable)
     return recycle
 
 
 def get_recycle_settings(net, **kwargs):
     """
     checks if "run" is specified in kwargs and calls this function in time series loop.
-    if "recycle" is in kwargs we use the TimeSeriesRunpp class (not implemented yet)
+    The recycle options are also used by the TimeSeriesRunpp class of engine="fast"
 
     INPUT:
         **net** - The pandapower format network
@@ -213,12 +271,16 @@ def get_recycle_settings(net, **kwargs):
     """
 
     recycle = kwargs.get("recycle", None)
+    if isinstance(recycle, str) and recycle == "auto":
+        # the changes are detected by runpp in every time step
+        return recycle
     if recycle is not False:
         # check if every controller can be recycled and what can be recycled
         recycle = _check_controller_recyclability(net)
         # if still recycle is not None, also check for fast output_writer features
         if recycle is not False:
-            recycle = _check_output_writer_recyclability(net, recycle, kwargs.get("run", kwargs.get("run_control_fct")))
+            recycle = _check_output_writer_recyclability(net, recycle, kwargs.get("run", kwargs.get("run_control_fct")),
+                                                         pf_options=kwargs)
 
     return recycle
 
@@ -245,8 +307,23 @@ def init_time_steps(net, time_steps, **kwargs):
     return time_steps
 
 
-def init_time_series(net, time_steps, continue_on_divergence=False, verbose=True,
-                     **kwargs):
+def get_fast_run_function(net, run, recycle_options):
+    """
+    Returns the power flow function of engine="fast", which updates the stored ppci of the last time step
+    (see TimeSeriesRunpp). If this is not possible, the given run function is returned.
+    """
+    if not (hasattr(run, "__name__") and run.__name__ == "runpp"):
+        logger.warning("engine='fast' is only available for runpp, the run function %s is used" % run)
+        return run
+    if not isinstance(recycle_options, dict):
+        logger.warning("engine='fast' is only available if all controllers can be recycled (see the recycle "
+                       "attribute of the controllers) and recycle is not False or 'auto'. runpp is used")
+        return run
+    return TimeSeriesRunpp(net, recycle_options)
+
+
+def init_time_series(net, time_steps, continue_on_divergence=False, verbose=True, engine="standard",
+                     skip_unchanged_steps=False, skip_tolerance=0., **kwargs):
     """
     inits the time series calculation
     creates the dict ts_variables, which includes necessary variables for the time series / control function
@@ -262,7 +339,15 @@ def init_time_series(net, time_steps, continue_on_divergence=False, verbose=True
         **continue_on_divergence** (bool, False) - If True time series calculation continues in case of errors.
 
         **verbose** (bool, True) - prints progress bar or logger debug messages
+
+        **engine** (str, "standard") - power flow engine, see run_timeseries()
+
+        **skip_unchanged_steps** (bool, False) - skips the power flow of unchanged time steps, see run_timeseries()
+
+        **skip_tolerance** (float, 0.) - absolute tolerance of the controlled values, see run_timeseries()
     """
+    if engine not in ["standard", "fast"]:
+        raise ValueError("engine has to be 'standard' or 'fast', not %s" % engine)
 
     time_steps = init_time_steps(net, time_steps, **kwargs)
 
@@ -273,6 +358,8 @@ def init_time_series(net, time_steps, continue_on_divergence=False, verbose=True
     if hasattr(run, "__name__") and (run.__name__ == "runpp" or run.__name__ == "rundcpp"):
         # use faster runpp options if possible
         recycle_options = get_recycle_settings(net, run=run, **kwargs)
+    if engine == "fast":
+        run = get_fast_run_function(net, run, recycle_options)
 
     init_output_writer(net, time_steps)
     # as base take everything considered when preparing run_control
@@ -281,10 +368,23 @@ def init_time_series(net, time_steps, continue_on_divergence=False, verbose=True
     ts_variables["recycle_options"] = recycle_options
     # time steps to be calculated (list or range)
     ts_variables["time_steps"] = time_steps
+    # ConstControls of which the profiles are applied in one pass and the controllers which are called in each
+    # time step
+    ts_variables["const_control_batch"], ts_variables["time_step_controller_order"] = \
+        init_const_control_batch(ts_variables["controller_order"])
     # If True, a diverged run is ignored and the next step is calculated
     ts_variables["continue_on_divergence"] = continue_on_divergence
     # print settings
     ts_variables["verbose"] = verbose
+    # tolerance of the values written by the controllers, below which the power flow of a time step is skipped.
+    # None if all time steps are calculated
+    ts_variables["skip_tolerance"] = skip_tolerance if skip_unchanged_steps and \
+        _skip_unchanged_possible(ts_variables) else None
+    # values written by the controllers in the last calculated time step
+    ts_variables["controlled_values"] = None
+    ts_variables["skipped_time_steps"] = list()
+    if ts_variables["skip_tolerance"] is not None:
+        net.output_writer.iat[0, 0].output["Parameters"]["skipped"] = False
 
     if logger.level != 10 and verbose:
         # simple progress bar
@@ -315,6 +415,41 @@ def print_progress(i, time_step, time_steps, verbose, **kwargs):
         func(i, time_step, time_steps, **kwargs)
 
 
+def init_checkpoints(net, ts_variables, checkpoint_path=None, checkpoint_time=5., resume_from=None):
+    """
+    Sets the checkpoints of the time series loop and restores the state of the checkpoint resume_from, see
+    run_timeseries()
+    """
+    ts_variables["checkpoint_path"] = checkpoint_path
+    ts_variables["checkpoint_time"] = checkpoint_time * 60.  # convert to seconds
+    ts_variables["last_checkpoint"] = perf_counter()
+    ts_variables["resume_position"] = 0
+    if resume_from is not None:
+        ts_variables["resume_position"] = restore_checkpoint(net, ts_variables, resume_from)
+        logger.info("resuming the time series simulation after %i time steps from %s"
+                    % (ts_variables["resume_position"], resume_from))
+        if "progress_bar" in ts_variables:
+            ts_variables["progress_bar"].update(ts_variables["resume_position"])
+    ts_variables["checkpoint_chunk_start"] = net.output_writer.iat[0, 0]._chunk_start
+
+
+def _write_checkpoint_if_due(net, ts_variables, position):
+    file_path = ts_variables.get("checkpoint_path", None)
+    if file_path is None or position == len(ts_variables["time_steps"]):
+        return
+    output_writer = net.output_writer.iat[0, 0]
+    if output_writer.streams_output():
+        # results which are written to files after a checkpoint would be written again after resuming, so the
+        # checkpoints are written after each chunk
+        due = output_writer._chunk_start != ts_variables["checkpoint_chunk_start"]
+    else:
+        due = perf_counter() - ts_variables["last_checkpoint"] > ts_variables["checkpoint_time"]
+    if due:
+        write_checkpoint(net, ts_variables, position, file_path)
+        ts_variables["last_checkpoint"] = perf_counter()
+        ts_variables["checkpoint_chunk_start"] = output_writer._chunk_start
+
+
 def run_loop(net, ts_variables, run_control_fct=run_control, output_writer_fct=_call_output_writer, **kwargs):
     """
     runs the time series loop which calls runpp (or another run function) in each iteration
@@ -325,13 +460,139 @@ def run_loop(net, ts_variables, run_control_fct=run_control, output_writer_fct=_
     ts_variables - settings for time series
 
     """
+    # time steps which are restored from a checkpoint are not calculated again
+    resume_position = ts_variables.get("resume_position", 0)
     for i, time_step in enumerate(ts_variables["time_steps"]):
+        if i < resume_position:
+            continue
         print_progress(i, time_step, ts_variables["time_steps"], ts_variables["verbose"], ts_variables=ts_variables,
                        **kwargs)
         run_time_step(net, time_step, ts_variables, run_control_fct, output_writer_fct, **kwargs)
+        _write_checkpoint_if_due(net, ts_variables, i + 1)
+
+
+def _run_loop_and_stop_async(net, ts_variables, **kwargs):
+    """
+    Runs the time series loop. The background thread of an output writer with async_buffer_size is
+    stopped afterward, also if the loop is aborted by an error.
+    """
+    try:
+        run_loop(net, ts_variables, **kwargs)
+    finally:
+        output_writer = net.output_writer.iat[0, 0]
+        if getattr(output_writer, "async_buffer_size", None) is not None:
+            output_writer._stop_async()
+
+
+def _chunkable(net):
+    # all controllers in service have to be independent of the previous time steps
+    if "controller" not in net or not len(net.controller):
+        return True
+    not_chunkable = [str(ctrl) for ctrl, in_service in zip(net.controller.object.values,
+                                                          net.controller.in_service.values)
+                     if in_service and not ctrl.is_chunkable(net)]
+    if len(not_chunkable):
+        logger.warning("run_timeseries with n_jobs > 1 is not possible because the controllers %s carry a state "
+                       "from one time step to the next. The time steps are calculated serially."
+                       % not_chunkable)
+        return False
+    return True
+
+
+# net of the time series worker processes, unpickled for each chunk
+_worker_snapshot = None
+
 
+def _init_timeseries_worker(net_snapshot):
+    global _worker_snapshot
+    _worker_snapshot = net_snapshot
 
-def run_timeseries(net, time_steps=None, continue_on_divergence=False, verbose=True, check_controllers=True, **kwargs):
+
+def _call_output_writer_chunk(net, time_step, pf_converged, ctrl_converged, ts_variables):
+    # the batch results are read by the main process after all chunks are merged
+    output_writer_routine(net, time_step, pf_converged, ctrl_converged, None)
+
+
+def _run_timeseries_chunk(time_steps, continue_on_divergence, last_chunk, engine, skip_kwargs, kwargs):
+    net = pickle.loads(_worker_snapshot)
+    output_writer = net.output_writer.iat[0, 0]
+    # the results are written to files by the main process
+    output_writer.output_path = None
+    output_writer.write_time = None
+    ts_variables = init_time_series(net, time_steps, continue_on_divergence, verbose=False, engine=engine,
+                                    **skip_kwargs, **kwargs)
+    cleanup(net, ts_variables)
+    _run_loop_and_stop_async(net, ts_variables, output_writer_fct=_call_output_writer_chunk, **kwargs)
+
+    last_state = None
+    if last_chunk:
+        # results and internal power flow variables of the last time step, which are needed for the batch read
+        last_state = {key: net[key] for key in net.keys() if key.startswith("res_") or
+                      key in ["_ppc", "_pd2ppc_lookups", "_options", "_is_elements", "converged"]}
+    return output_writer.np_results, output_writer.output["Parameters"], last_state, \
+        ts_variables["skipped_time_steps"]
+
+
+def _run_timeseries_parallel(net, time_steps, continue_on_divergence, verbose, check_controllers, n_jobs,
+                             engine, skip_kwargs, **kwargs):
+    time_steps = list(init_time_steps(net, time_steps, **kwargs))
+    init_default_outputwriter(net, time_steps, **kwargs)
+    kwargs.pop("output_writer", None)
+    if check_controllers:
+        control_diagnostic(net)
+    # the workers initialize the time series themselves, starting from the net as given by the user
+    net_snapshot = pickle.dumps(net, protocol=pickle.HIGHEST_PROTOCOL)
+
+    ts_variables = init_time_series(net, time_steps, continue_on_divergence, verbose=False, **skip_kwargs,
+                                    **kwargs)
+    cleanup(net, ts_variables)
+    output_writer = net.output_writer.iat[0, 0]
+
+    chunks = [list(chunk) for chunk in np.array_split(np.array(time_steps, dtype=object), n_jobs)
+              if len(chunk)]
+    progress_bar = tqdm.tqdm(total=len(time_steps)) if logger.level != 10 and verbose else None
+    parameters = list()
+    last_state = None
+    with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_timeseries_worker,
+                             initargs=(net_snapshot,)) as executor:
+        futures = [executor.submit(_run_timeseries_chunk, chunk, continue_on_divergence, i == len(chunks) - 1,
+                                   engine, skip_kwargs, kwargs) for i, chunk in enumerate(chunks)]
+        for chunk, future in zip(chunks, futures):
+            np_results, chunk_parameters, chunk_state, skipped_time_steps = future.result()
+            ts_variables["skipped_time_steps"].extend(skipped_time_steps)
+            if output_writer.streams_output():
+                output_writer._stream_results(chunk, np_results, chunk_parameters)
+            else:
+                rows = slice(output_writer.time_step_lookup[chunk[0]],
+                             output_writer.time_step_lookup[chunk[-1]] + 1)
+                for name, values in np_results.items():
+                    output_writer.np_results[name][rows] = values
+            parameters.append(chunk_parameters)
+            if chunk_state is not None:
+                last_state = chunk_state
+            if progress_bar is not None:
+                progress_bar.update(len(chunk))
+
+    output_writer.output["Parameters"] = pd.concat(parameters)
+    for key, val in last_state.items():
+        net[key] = val
+    output_writer.time_step = time_steps[-1]
+    output_writer.dump(net, ts_variables["recycle_options"])
+    cleanup(net, ts_variables)
+    return ts_variables
+
+
+def _log_skipped_time_steps(ts_variables):
+    n_skipped = len(ts_variables["skipped_time_steps"])
+    if ts_variables["skip_tolerance"] is not None:
+        logger.info("%i of %i time steps were skipped because the controlled values did not change"
+                    % (n_skipped, len(ts_variables["time_steps"])))
+    return n_skipped
+
+
+def run_timeseries(net, time_steps=None, continue_on_divergence=False, verbose=True, check_controllers=True,
+                   n_jobs=1, engine="standard", skip_unchanged_steps=False, skip_tolerance=0., checkpoint_path=None,
+                   checkpoint_time=5., resume_from=None, **kwargs):
     """
     Time Series main function
 
@@ -350,19 +611,79 @@ def run_timeseries(net, time_steps=None, continue_on_divergence=False, verbose=T
 
         **verbose** (bool, True) - prints progress bar or if logger.level == Debug it prints debug messages
 
+        **check_controllers** (bool, True) - runs the control diagnostic before the time series simulation
+
+        **n_jobs** (int, 1) - number of processes. If n_jobs > 1, the time steps are split into contiguous
+        chunks, which are calculated in worker processes with their own copy of the net and the output writer.
+        The results are merged in the output writer of the net in time order. This is only possible if all
+        controllers are chunkable (see Controller.is_chunkable()), otherwise the time steps are calculated
+        serially. The net, the run function and kwargs have to be picklable. After the calculation, the net
+        contains the results of the last time step, but the element tables are not changed by the controllers.
+        -1 uses all CPUs.
+
+        **engine** (str, "standard") - power flow engine of the time steps:
+
+            - "standard" - the run function (runpp by default) is called in each time step
+            - "fast" - the ppci, the admittance matrices and the voltages of the first power flow are kept and
+              only the injections, gen setpoints, trafo taps and FACTS setpoints which can be changed by the
+              controllers are updated (see TimeSeriesRunpp). The Newton-Raphson power flow is started from the
+              voltages of the last time step. Only the result tables logged by the output writer are extracted
+              directly. This requires runpp as run function and controllers which can be recycled, otherwise
+              the standard engine is used.
+
+        **skip_unchanged_steps** (bool, False) - If True, the power flow of a time step is skipped if the values
+        written by the controllers (e.g. the profile values of ConstControls and the tap positions of trafo
+        controllers) did not change by more than skip_tolerance since the last calculated time step. The results
+        of that time step are stored by the output writer again. Skipped time steps are marked in the column
+        "skipped" of the "Parameters" output. This requires that all controllers define the values they write to
+        the net (see Controller.get_controlled_variables()), otherwise all time steps are calculated.
+
+        **skip_tolerance** (float, 0.) - absolute tolerance of the controlled values for skip_unchanged_steps
+
+        **checkpoint_path** (str, None) - file to which the state of the time series simulation is written
+        periodically: the element and result tables of the net, the attributes of the controllers (except their
+        data sources), the results of the output writer so far and the number of calculated time steps. If the
+        output writer streams the results to .parquet, .h5 or .zarr files, a checkpoint is written after each
+        chunk instead. The file is removed after the last time step was calculated.
+
+        **checkpoint_time** (float, 5.) - time in minutes between two checkpoints
+
+        **resume_from** (str, None) - checkpoint file from which an aborted time series simulation is resumed.
+        The net has to contain the same controllers and the output writer has to log the same variables and
+        time steps as in the aborted simulation.
+
         **kwargs** - Keyword arguments for run_control and run If "run" is in kwargs the default call to runpp()
         is replaced by the function kwargs["run"]
-    """
 
-    ts_variables = init_time_series(net, time_steps, continue_on_divergence, verbose, **kwargs)
+    OUTPUT:
+        **n_skipped** (int) - number of time steps whose power flow was skipped by skip_unchanged_steps (0 if
+        skip_unchanged_steps is False)
+    """
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    skip_kwargs = dict(skip_unchanged_steps=skip_unchanged_steps, skip_tolerance=skip_tolerance)
+    if n_jobs is not None and n_jobs > 1 and (checkpoint_path is not None or resume_from is not None):
+        logger.warning("checkpoints are not available for n_jobs > 1. The time steps are calculated serially.")
+        n_jobs = 1
+    if n_jobs is not None and n_jobs > 1 and _chunkable(net):
+        ts_variables = _run_timeseries_parallel(net, time_steps, continue_on_divergence, verbose, check_controllers,
+                                                n_jobs, engine, skip_kwargs, **kwargs)
+        return _log_skipped_time_steps(ts_variables)
+
+    ts_variables = init_time_series(net, time_steps, continue_on_divergence, verbose, engine, **skip_kwargs,
+                                    **kwargs)
 
     # cleanup ppc before first time step
     cleanup(net, ts_variables)
 
     if check_controllers:
         control_diagnostic(net)  # produces significant overhead if you run many timeseries of short duration
-    run_loop(net, ts_variables, **kwargs)
+    init_checkpoints(net, ts_variables, checkpoint_path, checkpoint_time, resume_from)
+    _run_loop_and_stop_async(net, ts_variables, **kwargs)
 
     # cleanup functions after the last time step was calculated
     cleanup(net, ts_variables)
+    if checkpoint_path is not None and os.path.isfile(checkpoint_path):
+        os.remove(checkpoint_path)
+    return _log_skipped_time_steps(ts_variables)
     # both cleanups, at the start AND at the end, are important!
@@ -1,24 +1,29 @@
-import inspect
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2016-2025 by University of Kassel and Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel. All rights reserved.
+
+from time import perf_counter
 
 import numpy as np
-from numpy import complex128, zeros
+from numpy import angle, exp, nan_to_num, r_
 
 from pandapower.auxiliary import _clean_up
-from pandapower.build_branch import _calc_trafo_parameter, _calc_trafo3w_parameter
 from pandapower.build_bus import _calc_pq_elements_and_add_on_ppc
-from pandapower.control.controller.const_control import ConstControl
-from pandapower.control.controller.trafo_control import TrafoController
-from pandapower.pd2ppc import _pd2ppc
-from pandapower.pf.pfsoln_numba import pfsoln as pfsoln_full, pf_solution_single_slack
-from pandapower.pf.run_newton_raphson_pf import newtonpf, _get_pf_variables_from_ppci, _get_Y_bus, makeYbus_numba
-from pandapower.powerflow import LoadflowNotConverged, _add_auxiliary_elements
-from pandapower.pypower.idx_bus import PD, QD
-from pandapower.pypower.idx_bus_dc import DC_PD
+from pandapower.build_gen import _build_gen_ppc
+from pandapower.pd2ppc import _ppc2ppci, _update_trafo_ppc, _update_facts_ppc
+from pandapower.pf.change_tracking import clear_change_tracking_snapshot
+from pandapower.pf.create_jacobian import create_jacobian_matrix, get_fastest_jacobian_function
+from pandapower.pf.linear_solver import _get_linear_solver
+from pandapower.pf.ppci_variables import _get_pf_variables_from_ppci, _store_results_from_pf_in_ppci
+from pandapower.pf.run_newton_raphson_pf import _run_newton_raphson_pf, _get_numba_functions, _store_internal, \
+    _update_Y_bus, ppci_to_pfsoln
+from pandapower.powerflow import LoadflowNotConverged, _ppci_to_net
+from pandapower.pypower.idx_bus import PD, QD, CID, CZD, VM, VA, BUS_TYPE, SL_FAC
+from pandapower.pypower.idx_gen import PG
 from pandapower.pypower.makeSbus import makeSbus
-from pandapower.results import _copy_results_ppci_to_ppc, _extract_results, _get_aranged_lookup
-from pandapower.results_branch import _get_branch_flows, _get_line_results, _get_trafo3w_results, _get_trafo_results
-from pandapower.results_bus import _get_bus_results, _get_bus_dc_results
-from pandapower.results_gen import _get_gen_results
+from pandapower.pypower.newtonpf import _evaluate_Fx, _check_for_convergence
+from pandapower.results import _clear_pending_results, _ppci_bus_to_ppc, _ppci_other_to_ppc
 from pandapower.run import runpp
 
 try:
@@ -28,237 +33,249 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# parts of the ppc which are updated by the fast time series engine, see _check_controller_recyclability()
+RECYCLE_KEYS = ("bus_pq", "gen", "trafo", "facts")
+BUS_PQ_COLUMNS = [PD, QD, CID, CZD]
+BUS_GEN_COLUMNS = [VM, VA, BUS_TYPE]
 
-class TimeSeriesRunpp:
+
+def _newtonpf_without_facts(Ybus, Sbus, V0, ref, pv, pq, ppci, options):
     """
-    Class for time series runpp.
-    The goal of this class is a runpp function, which reuses many NR variables in each time step of a time series
-    calculation.
-    Also, not all power flow results are calculated in each runpp. Instead, only the results the output writer wants
-    are calculated. Therefore, this class must be initialized with an output writer
+    Newton-Raphson power flow of newtonpf() for grids without FACTS devices, DC grids and
+    temperature dependent lines. The FACTS admittance matrices, which are empty in this case, are
+    neither built nor added to Ybus in each iteration.
     """
+    tol = options["tolerance_mva"]
+    max_it = options["max_iteration"]
+    numba = options["numba"]
+    dist_slack = options["distributed_slack"]
+    voltage_depend_loads = options["voltage_depend_loads"]
+    linear_solver = _get_linear_solver(ppci, options)
+    baseMVA, bus, gen = ppci["baseMVA"], ppci["bus"], ppci["gen"]
+    slack_weights = bus[:, SL_FAC].astype(np.float64)
+
+    V = V0
+    Va = angle(V)
+    Vm = abs(V)
+
+    if dist_slack and len(ref) > 1:
+        pv = r_[ref[1:], pv]
+        ref = ref[[0]]
+    pvpq = r_[pv, pq]
+    refpvpq = r_[ref, pvpq]
+    pvpq_lookup = np.zeros(max(Ybus.indices) + 1, dtype=np.int64)
+    if dist_slack:
+        pvpq_lookup[refpvpq] = np.arange(len(refpvpq))
+    else:
+        pvpq_lookup[pvpq] = np.arange(len(pvpq))
+    createJ = get_fastest_jacobian_function(pvpq, pq, numba, dist_slack)
+    nref, npv, npq = len(ref), len(pv), len(pq)
+    j1 = nref if dist_slack else 0
+    j2 = j1 + npv
+    j3, j4 = j2, j2 + npq
+    j5, j6 = j4, j4 + npq
+
+    slack = (gen[:, PG].sum() - bus[:, PD].sum()) / baseMVA
+    F = _evaluate_Fx(Ybus, V, Sbus, ref, pv, pq, slack_weights, dist_slack, slack)
+    converged = _check_for_convergence(F, tol)
+    i = 0
+    J = None
+    while not converged and i < max_it:
+        i += 1
+        J = create_jacobian_matrix(Ybus, V, ref, refpvpq, pvpq, pq, createJ, pvpq_lookup, nref, npv, npq, numba,
+                                   slack_weights, dist_slack)
+        dx = -1 * linear_solver.solve(J, F)
+        if dist_slack:
+            slack = slack + dx[:j1]
+        if npv:
+            Va[pv] = Va[pv] + dx[j1:j2]
+        if npq:
+            Va[pq] = Va[pq] + dx[j3:j4]
+            Vm[pq] = Vm[pq] + dx[j5:j6]
+        V = Vm * exp(1j * Va)
+        Vm = abs(V)
+        Va = angle(V)
+        if voltage_depend_loads:
+            Sbus = makeSbus(baseMVA, bus, gen, vm=Vm)
+        F = _evaluate_Fx(Ybus, V, Sbus, ref, pv, pq, slack_weights, dist_slack, slack)
+        converged = _check_for_convergence(F, tol)
+    return V, converged, i, J
 
-    def __init__(self, net):
-        self.net = net
-        self.output_writer = net.output_writer.iat[0, 0]
-
-        # update functions
-        self.update_pq = False
-        self.update_trafo = False
-        self.init_timeseries_newton()
 
-    def ts_newtonpf(self, net):
-        options = net["_options"]
-
-        bus = self.ppci["bus"]
-        branch = self.ppci["branch"]
-        gen = self.ppci["gen"]
-        svc = self.ppci["svc"]
-        tcsc = self.ppci["tcsc"]
-        ssc = self.ppci["ssc"]
-        vsc = self.ppci["vsc"]
-        # compute complex bus power injections [generation - load]
-        # self.Cg = _get_Cg(gen_on, bus)
-        # Sbus = _get_Sbus(self.baseMVA, bus, gen, self.Cg)
-        Sbus = makeSbus(self.baseMVA, bus, gen)
-
-        # run the newton power flow
-        V, success, _, _, _, _, _ = newtonpf(Ybus=self.Ybus,
-                                             Sbus=Sbus,
-                                             V0=self.V,
-                                             ref=self.ref,
-                                             pv=self.pv,
-                                             pq=self.pq,
-                                             ppci=self.ppci,
-                                             options=options)
-
-        if not success:
-            logger.warning("Loadflow not converged")
-            logger.info("Lines of of service:")
-            logger.info(net.line[~net.line.in_service])
-            raise LoadflowNotConverged("Power Flow did not converge after")
-
-        if self.ppci["gen"].shape[0] == 1 and not options["voltage_depend_loads"]:
-            pfsoln = pf_solution_single_slack
-        else:
-            pfsoln = pfsoln_full
+class TimeSeriesRunpp:
+    """
+    Power flow function of run_timeseries(..., engine="fast"). The first call runs runpp(). The
+    ppci, the admittance matrices and the voltages are kept, and in the following calls only the
+    parts of the ppci which can be changed by the controllers are updated (see the recycle
+    attribute of the controllers):
+
+        - "bus_pq": P and Q of loads, sgens, storages, wards and xwards
+        - "gen": setpoints of gens and ext_grids
+        - "trafo": tap positions, the admittance matrices are updated for the changed branches only
+        - "facts": setpoints of SVC, TCSC, SSC and VSC
+
+    The Newton-Raphson power flow is started from the voltages of the last time step. Grids without
+    FACTS devices and DC grids are solved by a Newton-Raphson loop without the FACTS terms of newtonpf().
+    Distributed slack is considered. Results are only extracted for the result tables logged by the
+    output writer, the other result tables are extracted when they are accessed (see the runpp option
+    result_tables).
+
+    INPUT:
+        **net** - The pandapower format network
+
+    OPTIONAL:
+        **recycle** (dict, None) - parts of the ppci to update in each time step, e.g.
+        dict(bus_pq=True, gen=False, trafo=False, facts=False). None updates all of them.
+    """
 
-        bus, gen, branch = pfsoln(self.baseMVA, bus, gen, branch, svc, tcsc, ssc, vsc, self.Ybus, self.Yf, self.Yt, V,
-                                  self.ref, self.ref_gens, Ibus=self.Ibus)
+    def __init__(self, net, recycle=None):
+        self.net = net
+        self.recycle = {key: True if recycle is None else bool(recycle.get(key, False)) for key in RECYCLE_KEYS}
+        self.result_tables = self._get_result_tables(net)
+        # number of power flows with the stored variables, i.e. without pd2ppc
+        self.fast_runs = 0
+        self.init_newton_variables()
 
-        self.ppci["bus"] = bus
-        self.ppci["branch"] = branch
-        self.ppci["gen"] = gen
-        self.ppci["success"] = success
-        self.ppci["et"] = None
+    def __call__(self, net, **kwargs):
+        return self.ts_runpp(net, **kwargs)
 
-        # ppci doesn't contain out of service elements, but ppc does -> copy results accordingly
-        self.ppc = _copy_results_ppci_to_ppc(self.ppci, self.ppc, options["mode"])
+    @staticmethod
+    def _get_result_tables(net):
+        if "output_writer" not in net or net.output_writer.iat[0, 0] is None:
+            return None
+        tables = {output[0] for output in net.output_writer.iat[0, 0].log_variables}
+        if not len(tables) or any(not table.startswith("res_") for table in tables):
+            return None
+        return sorted(tables)
 
-        # raise if PF was not successful. If DC -> success is always 1
-        if self.ppc["success"] != 1:
-            _clean_up(net, res=False)
-        else:
-            net["_ppc"] = self.ppc
-            net["converged"] = True
+    def init_newton_variables(self):
+        self.ppc = None
+        self.ppci = None
+        self.without_facts = False
 
-        self.V = V
+    def cleanup(self):
+        self.init_newton_variables()
 
-        _extract_results(net, self.ppc)
+    def _stored(self, net):
+        return self.ppci is not None and net["_ppc"] is self.ppc and len(net["dcline"]) == 0
 
+    def ts_runpp(self, net, **kwargs):
+        if not self._stored(net):
+            self.init_timeseries_newton(net, **kwargs)
+            return net
+        clear_change_tracking_snapshot(net)
+        _clear_pending_results(net)
+        self._update_nr_variables(net)
+        try:
+            self.ts_newtonpf(net)
+        except LoadflowNotConverged:
+            # the start from the voltages of the last time step failed, runpp starts from the initial voltages
+            logger.debug("the fast power flow did not converge, runpp is called")
+            self.init_timeseries_newton(net, **kwargs)
+            return net
+        self.fast_runs += 1
         return net
 
-    def _get_bus_p_q_results_from_ppc(self, net, ppc, net_bus_idx, ppc_bus_idx):
-        """
-        reads p, q results from ppc to net. Note: This function returns wrong vales if shunts, xwards and wards are in net
-        @param net:
-        @param ppc:
-        @return:
+    def init_timeseries_newton(self, net, **kwargs):
         """
-        # read bus_pq array which contains p and q values for each bus in net
-        bus_pq = np.zeros(shape=(len(net["bus"].index), 2), dtype=float)
-        bus_pq[net_bus_idx, 0] = ppc["bus"][ppc_bus_idx, PD] * 1e3
-        bus_pq[net_bus_idx, 1] = ppc["bus"][ppc_bus_idx, QD] * 1e3
-        bus_p_dc = np.zeros(shape=(len(net["bus_dc"].index), 1), dtype=np.float64)
-        bus_dc_lookup_aranged = _get_aranged_lookup(net, "bus_dc")
-        bus_p_dc[bus_dc_lookup_aranged, 0] = ppc["bus_dc"][:, DC_PD]  # todo test this
-
-        bus_lookup_aranged = _get_aranged_lookup(net)
-        _get_gen_results(net, ppc, bus_lookup_aranged, bus_pq)
-        _get_bus_results(net, ppc, bus_pq)
-        _get_bus_dc_results(net, bus_p_dc)
-
-        net["res_bus"].index = net["bus"].index
-
-    def get_branch_results(self, net, ppc, branch_update):
-        i_ft, s_ft = _get_branch_flows(ppc)
-        if "line" in branch_update:
-            _get_line_results(net, ppc, i_ft)
-        if "trafo" in branch_update:
-            _get_trafo_results(net, ppc, s_ft, i_ft)
-        if "trafo3w" in branch_update:
-            _get_trafo3w_results(net, ppc, s_ft, i_ft)
-
-    def init_timeseries_newton(self):
-        """
-        This function is called in the first iteration and variables needed in every loop are stored (Ybus, ppci...)
-        @param net:
-        @return:
+        Runs runpp() and stores the ppci with the internal variables (Ybus, V, ...) of the power flow.
         """
         self.init_newton_variables()
-        net = self.net
-        # get ppc and ppci
-        # runpp(net, init_vm_pu="flat", init_va_degree="dc")
-        # runpp(net, init_vm_pu="results", init_va_degree="results")
-        runpp(net, init="dc")
-        runpp(net, init="results")
-        net._options["init_results"] = True
-        net._options["init_vm_pu"] = "results"
-        net._options["init_va_degree"] = "results"
-        options = net._options
-        _add_auxiliary_elements(net)
-        self.ppc, self.ppci = _pd2ppc(net)
-        net["_ppc"] = self.ppc
-
-        self.baseMVA, bus, gen, branch, self.ref, self.pv, self.pq, _, _, self.V, self.ref_gens = \
-            _get_pf_variables_from_ppci(self.ppci)
-        self.ppci, self.Ybus, self.Yf, self.Yt = \
-            _get_Y_bus(self.ppci, options, makeYbus_numba, self.baseMVA, bus, branch)
-        self.Ibus = zeros(len(self.V), dtype=complex128)
-
-        # self.Cg = _get_Cg(gen, bus)  # assumes that all gens are on!
-
-        if "controller" in net:
-            self.get_update_ctrl()
-
+        if self.result_tables is not None and not kwargs.get("only_v_results", False) and \
+                "result_tables" not in kwargs and "result_columns" not in kwargs:
+            kwargs["result_tables"] = self.result_tables
+        runpp(net, **kwargs)
+        options = net["_options"]
+        if not options["ac"] or options["algorithm"] not in ["nr", "iwamoto_nr"]:
+            logger.warning("engine='fast' is only available for the Newton-Raphson power flow, the power flow "
+                           "is calculated by runpp in each time step")
+            return
+        options["init_vm_pu"] = "results"
+        options["init_va_degree"] = "results"
+        options["recycle"] = self.recycle
+
+        ppc = net["_ppc"]
+        internal = ppc["internal"]
+        ppci = {"bus": internal["bus"], "gen": internal["gen"], "branch": internal["branch"],
+                "baseMVA": internal["baseMVA"], "internal": internal}
+        ppci = _ppc2ppci(ppc, net, ppci=ppci)
+        ppci["internal"] = internal
+        self.ppc, self.ppci = ppc, ppci
+        self.without_facts = options["algorithm"] == "nr" and not options["enforce_q_lims"] and \
+            not options["tdpf"] and not options.get("lightsim2grid", False) and \
+            not any(len(ppci[key]) for key in ["svc", "tcsc", "ssc", "vsc", "bus_dc", "branch_dc"])
         return net
 
-    def _update_nr_variables(self):
+    def _update_nr_variables(self, net):
         """
-        This function updates the stored NR variables for the powerflow, depending on the defined controllers for the
-        time series calculation
-
-        example:
-        If only PQ updates are needed -> only pq values (in ppci.bus[:,PD]...) are updated
-        If taps of trafos are updated -> Ybus must be recalculated
-        Todo implement stuff for the controllers you use...
-
-        @return:
+        Updates the ppc and the ppci with the values of the element tables, depending on the recycle options.
         """
-        ### PQ Updates
-        if self.update_pq:
-            # update P, Q values
-            _calc_pq_elements_and_add_on_ppc(self.net, self.ppci)
-            # adds P and Q for shunts, wards and xwards (to PQ nodes)
-            # Todo: update shunts
-            # _calc_shunts_and_add_on_ppc(self.net, self.ppci)
-
-        ### Ybus recalculation
-        if self.update_trafo:
-            # update branch SHIFT entries for transformers (if tap changed)
-            self.update_trafos()
-            if "ybus_handler" in self.net:
-                logger.error("Ybus update by trafo tap controller and ybus_handler is not possible simultaneously")
-
-        if "ybus_handler" in self.net:
-            self.Ybus, self.Yf, self.Yt = self.net["ybus_handler"].get_y()
+        ppc, ppci = self.ppc, self.ppci
+        internal = ppci["internal"]
+        n_bus = len(ppci["bus"])
+        if self.recycle["bus_pq"]:
+            _calc_pq_elements_and_add_on_ppc(net, ppc)
+            ppci["bus"][:, BUS_PQ_COLUMNS] = ppc["bus"][:n_bus, BUS_PQ_COLUMNS]
+        if self.recycle["trafo"]:
+            self.update_trafos(net)
+        if self.recycle["facts"]:
+            _update_facts_ppc(net, ppc)
+            for key in ["svc", "tcsc", "ssc", "vsc"]:
+                ppci[key] = ppc[key][internal["%s_is" % key]]
+        if self.recycle["gen"]:
+            _build_gen_ppc(net, ppc)
+            ppc["gen"] = nan_to_num(ppc["gen"])
+            ppci["gen"] = ppc["gen"][internal["gen_is"]]
+            ppci["bus"][:, BUS_GEN_COLUMNS] = ppc["bus"][:n_bus, BUS_GEN_COLUMNS]
+
+    def update_trafos(self, net):
+        # the branch parameters of the trafos are recalculated, the Ybus is updated in the power flow
+        _update_trafo_ppc(net, self.ppc)
+        self.ppci["branch"] = self.ppc["branch"][self.ppci["internal"]["branch_is"]]
 
-    def cleanup(self):
-        _clean_up(self.net)
-        self.init_newton_variables()
+    def ts_newtonpf(self, net):
+        options = net["_options"]
+        ppc, ppci = self.ppc, self.ppci
+        ppc["success"] = False
+        ppc["iterations"] = 0.
+        ppc["et"] = 0.
+        if self.without_facts:
+            ppci = self._run_newton_without_facts(ppci, options)
+        else:
+            ppci = _run_newton_raphson_pf(ppci, options)
+        self.ppci = ppci
+        if not ppci["success"]:
+            # the stored variables are not valid anymore
+            self.init_newton_variables()
+            _clean_up(net, res=False)
+            raise LoadflowNotConverged("Power Flow {0} did not converge after {1} iterations!".format(
+                options["algorithm"], options["max_iteration"]))
 
-    def ts_runpp(self, net, **kwargs):
-        # update pq values in ppci
-        self._update_nr_variables()
+        if options["only_v_results"]:
+            _ppci_bus_to_ppc(ppci, ppc)
+            _ppci_other_to_ppc(ppci, ppc, options["mode"])
+            net["converged"] = True
+            return net
+        _ppci_to_net(ppci, net)
+        return net
 
-        # ----- run the powerflow -----
-        net = self.ts_newtonpf(net)
+    def _run_newton_without_facts(self, ppci, options):
+        t0 = perf_counter()
+        internal = ppci["internal"]
+        makeYbus, _ = _get_numba_functions(ppci, options)
+        baseMVA, bus, gen, branch, _, _, _, _, ref, pv, pq, *_, V0, ref_gens = _get_pf_variables_from_ppci(ppci)
+        Ybus, Yf, Yt = internal["Ybus"], internal["Yf"], internal["Yt"]
+        if self.recycle["trafo"]:
+            Ybus, Yf, Yt = _update_Y_bus(Ybus, Yf, Yt, internal["branch"], makeYbus, baseMVA, bus, branch)
+        if self.recycle["bus_pq"] or self.recycle["gen"] or "Sbus" not in internal:
+            Sbus = makeSbus(baseMVA, bus, gen)
+        else:
+            Sbus = internal["Sbus"]
 
-        return net
+        V, success, iterations, J = _newtonpf_without_facts(Ybus, Sbus, V0, ref, pv, pq, ppci, options)
 
-    def init_newton_variables(self):
-        self.baseMVA = None
-        self.ref = None
-        self.pv = None
-        self.pq = None
-        self.V = None
-        self.ppc = None
-        self.ppci = None
-        self.Ybus = None
-        self.Yf = None
-        self.Yt = None
-        self.Ibus = None
-        self.Cg = None
-
-    def update_trafos(self):
-        net = self.net
-        ppci = self.ppci
-
-        # update branch SHIFT entries for transfomers (if tap changed)
-        lookup = net._pd2ppc_lookups["branch"]
-        if "trafo" in lookup:
-            _calc_trafo_parameter(net, ppci)
-        if "trafo3w" in lookup:
-            _calc_trafo3w_parameter(net, ppci)
-
-        # update Ybus based on this
-        options = net._options
-        baseMVA, bus, gen, branch, svc, tcsc, ssc, vsc, ref, pv, pq, _, _, V, _ = _get_pf_variables_from_ppci(ppci)
-        self.ppci, self.Ybus, self.Yf, self.Yt = _get_Y_bus(ppci, options, makeYbus_numba, baseMVA, bus,
-                                                            branch)
-
-    def get_update_ctrl(self):
-        controllers = self.net.controller["object"]
-        update_pq = False
-        update_trafo = False
-        for controller in controllers:
-            base_clases = inspect.getmro(controller.__class__)
-            if ConstControl in base_clases:
-                update_pq = True
-            elif TrafoController in controller.__class__.__bases__:
-                update_trafo = True
-            else:
-                raise TypeError("controller class not supported for recycle %s" % controller.__class__)
-
-        self.update_pq = update_pq
-        self.update_trafo = update_trafo
+        ppci = _store_internal(ppci, {"J": J, "bus": bus, "gen": gen, "branch": branch, "baseMVA": baseMVA,
+                                      "V": V, "pv": pv, "pq": pq, "ref": ref, "Sbus": Sbus, "ref_gens": ref_gens,
+                                      "Ybus": Ybus, "Yf": Yf, "Yt": Yt, "Ybus_without_facts": Ybus})
+        bus, gen, branch = ppci_to_pfsoln(ppci, options)
+        return _store_results_from_pf_in_ppci(ppci, bus, gen, branch, success, iterations, perf_counter() - t0)